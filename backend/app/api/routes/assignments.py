@@ -2,23 +2,35 @@
 Assignment management API routes.
 """
 
+import logging
+
 from fastapi import APIRouter, HTTPException
 
+from app import deadlines
 from app.db.supabase_client import get_client
+from app.deadlines import DeadlineExceeded
 from app.models.schemas import (
     AssignmentCreateRequest,
     AssignmentBulkCreateRequest,
     AssignmentUpdateRequest,
     AssignmentResponse,
+    AssignmentBulkCreateError,
     AssignmentBulkCreateResponse,
+    AssignmentRecommendationRequest,
+    AssignmentRecommendationResponse,
 )
-from app.services.capacity_calculator import (
-    calculate_weekly_capacity,
-    detect_capacity_conflicts,
-)
+from app.services.assignment_optimizer import recommend_assignments
+from app.services.events import event_stream
+from app.services.member_weeks import conflicts_from_row, member_weeks
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Seconds of a bulk request's budget kept back to project what was created
+# and read the week's conflicts
+BULK_FINISH_RESERVE_SECONDS = 5.0
+
 
 @router.post("/", response_model=AssignmentResponse)
 async def create_assignment(request: AssignmentCreateRequest):
@@ -67,8 +79,10 @@ async def create_assignment(request: AssignmentCreateRequest):
 
     assignment = result.data[0]
 
-    # Recalculate capacity (handled by database trigger, but we can also do it here)
-    await calculate_weekly_capacity(request.team_member_id)
+    # Capacity read model and live stream update from the event
+    await event_stream.publish(
+        "assignment.created", [request.team_member_id], assignment_id=assignment["id"]
+    )
 
     return AssignmentResponse(
         id=assignment["id"],
@@ -87,12 +101,35 @@ async def create_assignment(request: AssignmentCreateRequest):
 
 @router.post("/bulk", response_model=AssignmentBulkCreateResponse)
 async def bulk_create_assignments(request: AssignmentBulkCreateRequest):
-    """Create multiple assignments at once and report any conflicts."""
+    """
+    Create multiple assignments at once and report any conflicts.
+
+    Each assignment is its own write. Rows that could not be created are
+    listed in `errors`; if the time budget runs low, the rest are listed
+    there too and the assignments already created are still returned.
+    """
     client = get_client()
     created_assignments: list[AssignmentResponse] = []
+    errors: list[AssignmentBulkCreateError] = []
+
+    def fail(index: int, error: str) -> None:
+        req = request.assignments[index]
+        errors.append(
+            AssignmentBulkCreateError(
+                index=index,
+                project_id=req.project_id,
+                team_member_id=req.team_member_id,
+                error=error,
+            )
+        )
 
     # Create each assignment
-    for req in request.assignments:
+    for index, req in enumerate(request.assignments):
+        left = deadlines.remaining()
+        if left is not None and left < BULK_FINISH_RESERVE_SECONDS:
+            for rest in range(index, len(request.assignments)):
+                fail(rest, "Not attempted: request deadline reached")
+            break
         try:
             # Get project and member info
             project = (
@@ -111,6 +148,7 @@ async def bulk_create_assignments(request: AssignmentBulkCreateRequest):
             )
 
             if not project.data or not member.data:
+                fail(index, "Project or team member not found")
                 continue
 
             assignment_data = {
@@ -144,19 +182,49 @@ async def bulk_create_assignments(request: AssignmentBulkCreateRequest):
                         confidence_score=assignment["confidence_score"],
                     )
                 )
+        except DeadlineExceeded as e:
+            # A timed-out insert may still have been written
+            fail(index, f"{e}; it may or may not have been created")
+            for rest in range(index + 1, len(request.assignments)):
+                fail(rest, "Not attempted: request deadline reached")
+            break
         except Exception as e:
-            print(f"Error creating assignment: {e}")
+            logger.exception("Error creating assignment %d", index)
+            fail(index, str(e))
             continue
 
-    # Detect any conflicts created by these assignments
-    conflicts = await detect_capacity_conflicts()
+    # Re-project the affected members, then report the week's conflicts. The
+    # rows are committed, so this finishes even if the budget is spent.
+    with deadlines.unbounded():
+        await event_stream.publish(
+            "assignment.created",
+            [a.team_member_id for a in created_assignments],
+            assignment_ids=[a.id for a in created_assignments],
+        )
+        conflicts = [c for row in member_weeks.read_week() for c in conflicts_from_row(row)]
 
     return AssignmentBulkCreateResponse(
         created=created_assignments,
         conflicts=conflicts,
+        errors=errors,
     )
 
 
+@router.post("/recommend", response_model=AssignmentRecommendationResponse)
+async def recommend_team(request: AssignmentRecommendationRequest):
+    """
+    Recommend people for one or many projects.
+
+    Deterministic alternative to the LLM recommendation route: scores the
+    active roster on role fit, skills, available hours and client
+    familiarity, and fills roles without double-booking anyone's hours.
+    """
+    try:
+        return await recommend_assignments(request)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 @router.get("/{assignment_id}", response_model=AssignmentResponse)
 async def get_assignment(assignment_id: str):
     """Get an assignment by ID."""
@@ -219,6 +287,13 @@ async def update_assignment(assignment_id: str, request: AssignmentUpdateRequest
     if not result.data:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
+    # Hours or status changes move the member's allocation
+    await event_stream.publish(
+        "assignment.updated",
+        [result.data[0]["team_member_id"]],
+        assignment_id=assignment_id,
+    )
+
     # Get full assignment data
     return await get_assignment(assignment_id)
 
@@ -245,8 +320,9 @@ async def delete_assignment(assignment_id: str):
     # Delete the assignment
     client.table("assignments").delete().eq("id", assignment_id).execute()
 
-    # Recalculate capacity
-    await calculate_weekly_capacity(team_member_id)
+    await event_stream.publish(
+        "assignment.deleted", [team_member_id], assignment_id=assignment_id
+    )
 
     return {"status": "deleted", "assignment_id": assignment_id}
 
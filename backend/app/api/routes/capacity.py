@@ -3,46 +3,172 @@ Capacity management API routes.
 """
 
 from datetime import date, timedelta
-from fastapi import APIRouter
-
-from app.models.schemas import CapacitySnapshot, CapacityConflict
-from app.services.capacity_calculator import (
-    get_current_week_capacity,
-    detect_capacity_conflicts,
-    get_week_start,
-    calculate_weekly_capacity,
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.models.schemas import (
+    CapacityRecomputeJob,
+    CapacityRecomputeRequest,
+    CapacitySnapshot,
+    CapacityConflict,
+    HistoryResponse,
+    RebalanceResponse,
+    ScenarioComparisonRequest,
+    ScenarioComparisonResponse,
+    VarianceResponse,
+)
+from app.services.capacity_calculator import get_week_start
+from app.services.capacity_stream import capacity_broadcaster, format_sse
+from app.services.exports import MAX_FORECAST_WEEKS
+from app.services.history_store import capacity_history
+from app.services.invalidation import CAPACITY_HISTORY, MEMBER_WEEKS, invalidation_bus
+from app.services.member_weeks import conflicts_from_row, member_weeks, snapshot_from_row
+from app.services.rebalancer import propose_rebalance
+from app.services.scenarios import compare_scenarios
+from app.services.snapshot_recompute import RecomputeConflictError, snapshot_recompute
+from app.services.timeline import (
+    DEFAULT_HORIZON_WEEKS,
+    MAX_HORIZON_WEEKS,
+    load_timeline_conflicts,
+)
+from app.services.variance import (
+    DEFAULT_LOOKBACK_WEEKS,
+    MAX_LOOKBACK_WEEKS,
+    calculate_variance,
+    forecast_member,
+    load_actuals,
 )
-from app.db.supabase_client import get_client
 
 router = APIRouter()
 
+# Seconds between keep-alive comments on idle streams
+STREAM_KEEPALIVE_SECONDS = 15
+
 
 @router.get("/current-week", response_model=list[CapacitySnapshot])
 async def get_current_week():
     """Get capacity overview for all team members for the current week."""
-    return await get_current_week_capacity()
+    rows = await member_weeks.coalesce("read_week", member_weeks.read_week)
+    snapshots = [snapshot_from_row(r) for r in rows]
+    snapshots.sort(key=lambda s: s.utilization_pct, reverse=True)
+    return snapshots
 
 
 @router.get("/conflicts", response_model=list[CapacityConflict])
-async def get_conflicts():
-    """Get all capacity conflicts for the current week."""
-    return await detect_capacity_conflicts()
+async def get_conflicts(include_timeline: bool = True):
+    """
+    Get all capacity conflicts for the current week.
+
+    Includes medium and high severity deadline crunches for the week unless
+    `include_timeline` is false.
+    """
+    rows = await member_weeks.coalesce("read_week", member_weeks.read_week)
+    conflicts = [c for row in rows for c in conflicts_from_row(row)]
+    if include_timeline:
+        crunches = await member_weeks.coalesce(
+            "timeline_conflicts", load_timeline_conflicts, None, 1, "medium"
+        )
+        # A crunch replaces the urgent-project conflict for the same member
+        crunched = {c.team_member_id for c in crunches}
+        conflicts = [
+            c
+            for c in conflicts
+            if c.type != "timeline-conflict" or c.team_member_id not in crunched
+        ]
+        conflicts.extend(crunches)
+    return conflicts
+
+
+@router.get("/timeline-conflicts", response_model=list[CapacityConflict])
+async def get_timeline_conflicts(
+    weeks: int = Query(DEFAULT_HORIZON_WEEKS, ge=1, le=MAX_HORIZON_WEEKS),
+    min_severity: Literal["low", "medium", "high"] = "low",
+):
+    """
+    Get overlapping deadline and milestone crunches over the coming weeks.
+
+    Each conflict carries the week range (`week_start` to `week_end`) in which
+    two or more of a member's projects are crunching at once.
+    """
+    return await member_weeks.coalesce(
+        "timeline_conflicts", load_timeline_conflicts, None, weeks, min_severity
+    )
+
+
+@router.get("/rebalance", response_model=RebalanceResponse)
+async def get_rebalance_proposal():
+    """
+    Propose hour transfers that resolve this week's overallocations.
+
+    Solves for the whole team at once, moving lower-priority work first to
+    role-compatible members with spare hours. Nothing is written.
+    """
+    return await propose_rebalance()
+
+
+@router.post("/scenarios", response_model=ScenarioComparisonResponse)
+async def evaluate_scenarios(request: ScenarioComparisonRequest):
+    """
+    Compare what-if scenarios against current capacity without saving anything.
+
+    Each scenario layers hypothetical assignment creates, updates and deletes
+    over the current state and reports the resulting utilization, changed
+    members and conflicts added or resolved. Use it to check a bulk import or
+    reshuffle before committing it.
+    """
+    return await compare_scenarios(request)
+
+
+@router.get("/stream")
+async def stream_capacity(request: Request):
+    """
+    Stream live capacity changes as server-sent events.
+
+    Sends a `snapshot` event on connect, then `delta` events with only the
+    members and conflicts that changed. Slow clients are resynced with a
+    fresh `snapshot` instead of buffering unbounded deltas.
+    """
+    subscription = await capacity_broadcaster.subscribe()
+
+    async def event_stream():
+        try:
+            while not await request.is_disconnected():
+                event = await capacity_broadcaster.next_event(
+                    subscription, timeout=STREAM_KEEPALIVE_SECONDS
+                )
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            capacity_broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/forecast")
-async def get_capacity_forecast(weeks: int = 4):
+async def get_capacity_forecast(
+    weeks: int = Query(4, ge=1, le=MAX_FORECAST_WEEKS), use_actuals: bool = True
+):
     """
     Get capacity forecast for the next N weeks.
 
-    Returns projected capacity based on current assignments.
+    Returns projected capacity based on current assignments. With
+    `use_actuals`, assignments whose logged hours have been running above
+    plan are counted at their actual weekly burn.
     """
-    client = get_client()
     current_week = get_week_start()
+    rows = await member_weeks.coalesce("read_week", member_weeks.read_week)
+    actuals = await member_weeks.coalesce("actuals", load_actuals) if use_actuals else None
 
-    # Get all active team members
-    members_response = (
-        client.table("team_members").select("*").eq("active", True).execute()
-    )
+    # For simplicity, we're using current hours_this_week for every week
+    # In production, you'd track week-specific allocations
+    members = [forecast_member(row, actuals) for row in rows]
 
     forecast = []
 
@@ -51,48 +177,37 @@ async def get_capacity_forecast(weeks: int = 4):
         week_data = {
             "week_start": week_start.isoformat(),
             "week_number": week_start.isocalendar()[1],
-            "members": [],
+            "members": [dict(m) for m in members],
         }
 
-        for member in members_response.data:
-            # Get assignments that overlap with this week
-            # For simplicity, we're using current hours_this_week
-            # In production, you'd track week-specific allocations
-            assignments_response = (
-                client.table("assignments")
-                .select("hours_this_week, projects(name)")
-                .eq("team_member_id", member["id"])
-                .eq("status", "active")
-                .execute()
-            )
-
-            allocated = sum(a["hours_this_week"] or 0 for a in assignments_response.data)
-            capacity = member["weekly_capacity_hours"] or 40
-
-            week_data["members"].append(
-                {
-                    "team_member_id": member["id"],
-                    "full_name": member["full_name"],
-                    "role": member["role"],
-                    "capacity": capacity,
-                    "allocated": allocated,
-                    "available": capacity - allocated,
-                    "utilization_pct": round((allocated / capacity * 100) if capacity else 0, 1),
-                    "overallocated": allocated > capacity,
-                }
-            )
-
         # Sort by utilization
         week_data["members"].sort(key=lambda m: m["utilization_pct"], reverse=True)
         forecast.append(week_data)
 
-    return {"forecast": forecast, "weeks": weeks}
+    return {"forecast": forecast, "weeks": weeks, "uses_actuals": use_actuals}
+
+
+@router.get("/variance", response_model=VarianceResponse)
+async def get_variance(
+    weeks: int = Query(DEFAULT_LOOKBACK_WEEKS, ge=1, le=MAX_LOOKBACK_WEEKS),
+    include_assignments: bool = False,
+):
+    """
+    Compare planned hours with logged time entries.
+
+    Covers the last `weeks` complete weeks: burn rate, variance and projected
+    overrun per project, and planned vs actual hours per member-week.
+    """
+    return await calculate_variance(weeks, include_assignments)
 
 
 @router.get("/team-member/{team_member_id}", response_model=CapacitySnapshot)
 async def get_team_member_capacity(team_member_id: str):
     """Get capacity for a specific team member for the current week."""
-    return await calculate_weekly_capacity(team_member_id)
+    row = await member_weeks.coalesce("read_member", member_weeks.read_member, team_member_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Team member not found or inactive")
+    return snapshot_from_row(row)
 
 
 @router.get("/summary")
@@ -102,8 +217,9 @@ async def get_capacity_summary():
 
     Returns aggregate stats for the current week.
     """
-    snapshots = await get_current_week_capacity()
-    conflicts = await detect_capacity_conflicts()
+    rows = await member_weeks.coalesce("read_week", member_weeks.read_week)
+    snapshots = [snapshot_from_row(r) for r in rows]
+    conflicts = [c for row in rows for c in conflicts_from_row(row)]
 
     if not snapshots:
         return {
@@ -140,40 +256,108 @@ async def recalculate_all_capacity():
     """
     Recalculate capacity snapshots for all team members.
 
+    Rebuilds the current week of the member-week read model from assignments.
     Use this endpoint after bulk changes or to fix data inconsistencies.
+    Members that could not be projected are listed in `errors` and keep
+    their previous row.
     """
-    client = get_client()
+    week_start = get_week_start()
+    errors: list[dict] = []
+    rows = member_weeks.rebuild(week_start, errors=errors)
+    snapshots = [snapshot_from_row(r) for r in rows]
 
-    # Get all active team members
-    members_response = (
-        client.table("team_members").select("id, full_name").eq("active", True).execute()
-    )
-
-    recalculated = []
-    errors = []
-
-    for member in members_response.data:
-        try:
-            snapshot = await calculate_weekly_capacity(member["id"])
-            recalculated.append(
-                {
-                    "team_member_id": member["id"],
-                    "full_name": member["full_name"],
-                    "allocated_hours": float(snapshot.allocated_hours),
-                    "utilization_pct": float(snapshot.utilization_pct),
-                }
-            )
-        except Exception as e:
-            errors.append(
-                {
-                    "team_member_id": member["id"],
-                    "full_name": member["full_name"],
-                    "error": str(e),
-                }
-            )
+    # Keep the analytics copy current without a separate sync
+    capacity_history.record(snapshots)
+    await invalidation_bus.publish(MEMBER_WEEKS, week_start=week_start)
+    await invalidation_bus.publish(CAPACITY_HISTORY)
 
     return {
-        "recalculated": recalculated,
+        "recalculated": [
+            {
+                "team_member_id": s.team_member_id,
+                "full_name": s.full_name,
+                "allocated_hours": float(s.allocated_hours),
+                "utilization_pct": float(s.utilization_pct),
+            }
+            for s in snapshots
+        ],
         "errors": errors,
-        "total": len(recalculated),
+        "total": len(snapshots),
     }
+
+
+def _recompute_job(job: dict) -> CapacityRecomputeJob:
+    total = job["total_weeks"] or 0
+    progress = job["completed_weeks"] / total * 100 if total else 100.0
+    return CapacityRecomputeJob(**job, progress_pct=round(progress, 1))
+
+
+@router.post("/recompute", response_model=CapacityRecomputeJob, status_code=202)
+async def recompute_capacity_snapshots(request: CapacityRecomputeRequest):
+    """
+    Recompute capacity snapshots for a range of past weeks in the background.
+
+    Allocations are re-derived from assignment date ranges and written in
+    bulk by a worker pool. Poll GET /recompute/{job_id} for progress.
+    """
+    try:
+        job = snapshot_recompute.create_job(request.week_from, request.week_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await snapshot_recompute.start(job["id"])
+    return _recompute_job(job)
+
+
+@router.get("/recompute/{job_id}", response_model=CapacityRecomputeJob)
+async def get_recompute_job(job_id: str):
+    """Get the progress of a snapshot recompute job."""
+    job = snapshot_recompute.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Recompute job not found")
+    return _recompute_job(job)
+
+
+@router.post("/recompute/{job_id}/resume", response_model=CapacityRecomputeJob, status_code=202)
+async def resume_recompute_job(job_id: str):
+    """
+    Resume an interrupted or failed recompute job.
+
+    Weeks the job already finished are skipped.
+    """
+    try:
+        job = await snapshot_recompute.start(job_id)
+    except RecomputeConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Recompute job not found")
+    return _recompute_job(job)
+
+
+@router.get("/history", response_model=HistoryResponse)
+async def get_capacity_history(
+    grain: Literal["weekly", "monthly", "quarterly"] = "weekly",
+    dimension: Literal["team", "role", "member"] = "team",
+    key: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+):
+    """
+    Get utilization trends from the local history store.
+
+    Reads precomputed rollups only; the primary database is not queried.
+    `key` selects one role or team member id within the dimension.
+    """
+    return capacity_history.query(grain, dimension, key, start, end)
+
+
+@router.post("/history/sync")
+async def sync_capacity_history(full: bool = False):
+    """
+    Copy capacity snapshot history into the local history store.
+
+    Incremental by default: only the latest stored week onward is re-read.
+    Pass `full=true` to rebuild the store from all history.
+    """
+    result = capacity_history.sync(full=full)
+    await invalidation_bus.publish(CAPACITY_HISTORY)
+    return result
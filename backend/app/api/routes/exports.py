@@ -0,0 +1,109 @@
+"""
+Bulk export API routes (CSV and Parquet, streamed).
+"""
+
+from datetime import date
+from typing import Callable, Literal
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.services.exports import (
+    MEDIA_TYPES,
+    Export,
+    ExportFilters,
+    encode,
+    export_assignments,
+    export_capacity,
+    export_forecast,
+    parquet_available,
+)
+
+router = APIRouter()
+
+ExportFormat = Literal["csv", "parquet"]
+
+
+def _stream(build: Callable[[], Export], file_format: str) -> StreamingResponse:
+    """Validate, then stream an export as a file download."""
+    if file_format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=501,
+            detail="Parquet exports are not available on this server (pyarrow is not installed)",
+        )
+    try:
+        export = build()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filename = f"{export.name}-{date.today().isoformat()}.{file_format}"
+    return StreamingResponse(
+        encode(export, file_format),
+        media_type=MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _filters(
+    date_from: date | None,
+    date_to: date | None,
+    team_member_id: str | None,
+    project_id: str | None,
+    status: str | None = None,
+) -> ExportFilters:
+    filters = ExportFilters(date_from, date_to, team_member_id, project_id, status)
+    try:
+        filters.validate()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return filters
+
+
+@router.get("/assignments")
+async def export_assignments_file(
+    file_format: ExportFormat = Query(default="csv", alias="format"),
+    date_from: date | None = None,
+    date_to: date | None = None,
+    team_member_id: str | None = None,
+    project_id: str | None = None,
+    status: str | None = None,
+):
+    """
+    Export assignments overlapping a date range.
+
+    Assignments with no start or end date count as open on that side.
+    """
+    filters = _filters(date_from, date_to, team_member_id, project_id, status)
+    return _stream(lambda: export_assignments(filters), file_format)
+
+
+@router.get("/capacity")
+async def export_capacity_file(
+    file_format: ExportFormat = Query(default="csv", alias="format"),
+    date_from: date | None = None,
+    date_to: date | None = None,
+    team_member_id: str | None = None,
+    project_id: str | None = None,
+):
+    """Export capacity snapshot history, one row per member-week."""
+    filters = _filters(date_from, date_to, team_member_id, project_id)
+    return _stream(lambda: export_capacity(filters), file_format)
+
+
+@router.get("/forecast")
+async def export_forecast_file(
+    file_format: ExportFormat = Query(default="csv", alias="format"),
+    date_from: date | None = None,
+    date_to: date | None = None,
+    team_member_id: str | None = None,
+    project_id: str | None = None,
+    use_actuals: bool = True,
+):
+    """
+    Export the capacity forecast, one row per member per week.
+
+    Weeks run from the current week (or date_from, if later) to date_to,
+    four weeks by default.
+    """
+    filters = _filters(date_from, date_to, team_member_id, project_id)
+    return _stream(lambda: export_forecast(filters, use_actuals), file_format)
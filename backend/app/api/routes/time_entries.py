@@ -0,0 +1,58 @@
+"""
+Time entry API routes.
+"""
+
+import asyncio
+import csv
+import io
+import tempfile
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Request
+
+from app.models.schemas import TimeEntryImportResponse
+from app.services.time_entries import detect_format, import_time_entries
+
+router = APIRouter()
+
+# Uploads above this size are spooled to disk instead of memory
+SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+
+# Largest accepted upload
+MAX_IMPORT_BYTES = 512 * 1024 * 1024
+
+
+@router.post("/import", response_model=TimeEntryImportResponse)
+async def import_time_entries_upload(
+    request: Request,
+    format: Literal["csv", "jsonl"] | None = None,
+    dry_run: bool = False,
+):
+    """
+    Import a timesheet export sent as the raw request body.
+
+    Send CSV (with a header row) or JSON Lines; the format comes from
+    `format` or the Content-Type. Each row needs a date, hours and either an
+    assignment_id or a team member (team_member_id, email or person) plus a
+    project (project_id or project). Invalid rows are skipped and reported.
+    Re-importing the same export adds its hours again.
+    """
+    fmt = format or detect_format(request.headers.get("content-type"))
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > MAX_IMPORT_BYTES:
+            spool.close()
+            raise HTTPException(status_code=413, detail="Import file too large")
+        spool.write(chunk)
+    spool.seek(0)
+
+    text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+    try:
+        # The import blocks on database round trips; keep the event loop free
+        return await asyncio.to_thread(import_time_entries, text, fmt, dry_run)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read import: {e}")
+    finally:
+        text.close()
@@ -2,18 +2,110 @@
 Transcript processing API routes.
 """
 
+import asyncio
+import logging
+import math
 from datetime import date
-from fastapi import APIRouter, HTTPException
+from typing import Awaitable, TypeVar
 
+from fastapi import APIRouter, HTTPException, Query
+
+from app.config import settings
 from app.db.supabase_client import get_client
+from app.deadlines import DeadlineExceeded
 from app.models.schemas import (
+    TranscriptApproveRequest,
+    TranscriptApproveResponse,
+    TranscriptExtractionSchema,
     TranscriptProcessRequest,
     TranscriptProcessResponse,
+    TranscriptReprocessRequest,
+    TranscriptReprocessResponse,
+    TranscriptSearchResponse,
 )
 from app.services.claude_extractor import extract_from_transcript
+from app.services.events import event_stream
+from app.services.invalidation import TRANSCRIPTS, invalidation_bus
+from app.services.member_weeks import conflicts_from_row, member_weeks
+from app.services.model_scheduler import ModelBusyError
+from app.services.reextraction import reextract_transcript
+from app.services.transcript_apply import apply_transcript
+from app.services.transcript_search import transcript_index
+from app.telemetry.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+T = TypeVar("T")
+
+
+async def _run_extraction(pending: Awaitable[T]) -> T:
+    """Await an extraction, mapping its failures to HTTP errors."""
+    try:
+        return await pending
+    except ModelBusyError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Failed to extract data from transcript: {str(e)}",
+        )
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"AI extraction failed: {str(e)}",
+        )
+
+
+def _unresolved_entities(extracted_data: TranscriptExtractionSchema) -> dict:
+    # TODO: Resolve entity names to database IDs
+    # This would fuzzy-match person_name -> team_member_id
+    # and project_name -> project_id
+    return {
+        "people": [
+            a.person_name
+            for a in extracted_data.assignments
+            # TODO: Check if name exists in team_members
+        ],
+        "projects": [
+            p.name
+            for p in extracted_data.projects
+            # TODO: Check if project exists in projects
+        ],
+    }
+
+
+def _find_duplicate(
+    client, request: TranscriptProcessRequest
+) -> tuple[dict, float] | None:
+    """The most similar stored transcript above the threshold, if any."""
+    matches = transcript_index.find_near_duplicates(
+        request.transcript_text, settings.duplicate_similarity_threshold
+    )
+    record_cache_lookup("transcript_dedupe", hit=bool(matches))
+    if not matches:
+        return None
+    similar = dict(matches)
+    result = (
+        client.table("transcripts")
+        .select("id, meeting_date, meeting_type, raw_text, extracted_data")
+        .in_("id", list(similar))
+        .execute()
+    )
+    for row in sorted(result.data, key=lambda r: similar[r["id"]], reverse=True):
+        # An explicit, different meeting date means a different meeting
+        if request.meeting_date and str(row["meeting_date"])[:10] != request.meeting_date.isoformat():
+            continue
+        return row, similar[row["id"]]
+    return None
+
 
 @router.post("/process", response_model=TranscriptProcessResponse)
 async def process_transcript(request: TranscriptProcessRequest):
@@ -21,32 +113,62 @@ async def process_transcript(request: TranscriptProcessRequest):
     Process a meeting transcript with AI extraction.
 
     This endpoint:
-    1. Stores the raw transcript
-    2. Sends to Claude for structured extraction
-    3. Returns extracted data with confidence scores
+    1. Checks the archive for a near-duplicate upload
+    2. Sends to Claude for structured extraction (only the lines that differ
+       from a near-duplicate, if there is one)
+    3. Stores the raw transcript
+    4. Returns extracted data with confidence scores
+
+    An upload whose text matches a stored transcript returns that transcript
+    as is, without storing a copy.
     """
     client = get_client()
 
     # Default meeting date to today if not provided
     meeting_date = request.meeting_date or date.today()
 
-    try:
-        # Extract structured data using Claude
-        extracted_data = await extract_from_transcript(
-            transcript_text=request.transcript_text,
-            meeting_date=meeting_date.isoformat(),
-            meeting_type=request.meeting_type,
-        )
-    except ValueError as e:
-        raise HTTPException(
-            status_code=422,
-            detail=f"Failed to extract data from transcript: {str(e)}",
+    # The index may still be syncing the archive (blocking reads), so off the loop
+    duplicate = (
+        await asyncio.to_thread(_find_duplicate, client, request) if request.dedupe else None
+    )
+    if duplicate is not None:
+        existing, similarity = duplicate
+        stored = existing.get("extracted_data")
+        reextraction = await _run_extraction(
+            reextract_transcript(
+                old_text=existing["raw_text"],
+                stored=TranscriptExtractionSchema(**stored) if stored else None,
+                new_text=request.transcript_text,
+                meeting_date=meeting_date.isoformat(),
+                meeting_type=request.meeting_type,
+                priority=request.priority,
+            )
         )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"AI extraction failed: {str(e)}",
+        extracted_data = reextraction.data
+        if reextraction.model is None:
+            return TranscriptProcessResponse(
+                transcript_id=existing["id"],
+                meeting_date=existing["meeting_date"],
+                meeting_type=existing["meeting_type"] or request.meeting_type,
+                extraction_confidence=extracted_data.overall_confidence,
+                extracted_data=extracted_data,
+                unresolved_entities=_unresolved_entities(extracted_data),
+                duplicate_of=existing["id"],
+                similarity=similarity,
+            )
+        extraction_model = reextraction.model
+    else:
+        # Extract structured data using Claude
+        extraction = await _run_extraction(
+            extract_from_transcript(
+                transcript_text=request.transcript_text,
+                meeting_date=meeting_date.isoformat(),
+                meeting_type=request.meeting_type,
+                priority=request.priority,
+            )
         )
+        extracted_data = extraction.data
+        extraction_model = extraction.model
 
     # Store transcript with extracted data
     transcript_data = {
@@ -54,7 +176,7 @@ async def process_transcript(request: TranscriptProcessRequest):
         "meeting_type": request.meeting_type,
         "raw_text": request.transcript_text,
         "extracted_data": extracted_data.model_dump(),
-        "extraction_model": "claude-sonnet-4-20250514",
+        "extraction_model": extraction_model,
         "extraction_confidence": extracted_data.overall_confidence,
         "processed_at": "now()",
     }
@@ -68,22 +190,8 @@ async def process_transcript(request: TranscriptProcessRequest):
         )
 
     transcript = result.data[0]
-
-    # TODO: Resolve entity names to database IDs
-    # This would fuzzy-match person_name -> team_member_id
-    # and project_name -> project_id
-    unresolved_entities = {
-        "people": [
-            a.person_name
-            for a in extracted_data.assignments
-            # TODO: Check if name exists in team_members
-        ],
-        "projects": [
-            p.name
-            for p in extracted_data.projects
-            # TODO: Check if project exists in projects
-        ],
-    }
+    transcript_index.add([transcript])
+    await invalidation_bus.publish(TRANSCRIPTS, [transcript["id"]])
 
     return TranscriptProcessResponse(
         transcript_id=transcript["id"],
@@ -91,7 +199,107 @@ async def process_transcript(request: TranscriptProcessRequest):
         meeting_type=request.meeting_type,
         extraction_confidence=extracted_data.overall_confidence,
         extracted_data=extracted_data,
-        unresolved_entities=unresolved_entities,
+        unresolved_entities=_unresolved_entities(extracted_data),
+        duplicate_of=duplicate[0]["id"] if duplicate else None,
+        similarity=duplicate[1] if duplicate else None,
+    )
+
+
+@router.post("/{transcript_id}/reprocess", response_model=TranscriptReprocessResponse)
+async def reprocess_transcript(transcript_id: str, request: TranscriptReprocessRequest):
+    """
+    Re-process an edited transcript.
+
+    Diffs the new text against the stored one and re-extracts only the
+    changed regions (with surrounding context), merging the result into the
+    stored extraction. The transcript needs approving again afterwards.
+    """
+    client = get_client()
+
+    result = (
+        client.table("transcripts")
+        .select("id, meeting_date, meeting_type, raw_text, extracted_data, extraction_model")
+        .eq("id", transcript_id)
+        .execute()
+    )
+    if not result.data:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    transcript = result.data[0]
+
+    stored = transcript.get("extracted_data")
+    reextraction = await _run_extraction(
+        reextract_transcript(
+            old_text=transcript["raw_text"],
+            stored=TranscriptExtractionSchema(**stored) if stored else None,
+            new_text=request.transcript_text,
+            meeting_date=str(transcript["meeting_date"]),
+            meeting_type=transcript["meeting_type"] or "wip",
+            priority=request.priority,
+        )
+    )
+    extracted_data = reextraction.data
+
+    if reextraction.model is not None:
+        update = (
+            client.table("transcripts")
+            .update(
+                {
+                    "raw_text": request.transcript_text,
+                    "extracted_data": extracted_data.model_dump(mode="json"),
+                    "extraction_model": reextraction.model,
+                    "extraction_confidence": extracted_data.overall_confidence,
+                    "processed_at": "now()",
+                    "approved": False,
+                    "approved_at": None,
+                }
+            )
+            .eq("id", transcript_id)
+            .execute()
+        )
+        if not update.data:
+            raise HTTPException(status_code=500, detail="Failed to store transcript")
+        transcript_index.add(update.data)
+        await invalidation_bus.publish(TRANSCRIPTS, [transcript_id])
+
+    return TranscriptReprocessResponse(
+        transcript_id=transcript_id,
+        meeting_date=transcript["meeting_date"],
+        meeting_type=transcript["meeting_type"] or "wip",
+        extraction_confidence=extracted_data.overall_confidence,
+        extracted_data=extracted_data,
+        unresolved_entities=_unresolved_entities(extracted_data),
+        changed_regions=reextraction.regions,
+        full_reextraction=reextraction.full,
+        reextracted_chars=reextraction.reextracted_chars,
+    )
+
+
+@router.get("/search", response_model=TranscriptSearchResponse)
+async def search_transcripts(
+    q: str = Query(min_length=1, description="Free-text query"),
+    date_from: date | None = None,
+    date_to: date | None = None,
+    meeting_type: str | None = None,
+    sort: str = Query(default="relevance", pattern="^(relevance|recent)$"),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+):
+    """
+    Search the transcript archive.
+
+    Matches raw text, extracted quotes, project names and people through the
+    local index, ranked by relevance (or most recent first with
+    sort=recent), optionally within a meeting date range.
+    """
+    return await asyncio.to_thread(
+        transcript_index.search,
+        q,
+        date_from=date_from,
+        date_to=date_to,
+        meeting_type=meeting_type,
+        sort=sort,
+        limit=limit,
+        offset=offset,
     )
 
 
@@ -130,19 +338,62 @@ async def list_transcripts(limit: int = 10, offset: int = 0):
     return {"transcripts": result.data, "total": len(result.data)}
 
 
-@router.post("/{transcript_id}/approve")
-async def approve_transcript(transcript_id: str):
-    """Mark a transcript as approved."""
+@router.post("/{transcript_id}/approve", response_model=TranscriptApproveResponse)
+async def approve_transcript(
+    transcript_id: str, request: TranscriptApproveRequest | None = None
+):
+    """
+    Approve a transcript and apply its extraction in one transaction.
+
+    Resolves extracted people and projects by name, creates missing
+    projects, inserts the assignments and updates the affected members'
+    capacity. Without a selection, low-confidence assignments are skipped
+    and listed in `skipped_assignments`; send `assignments` to apply only
+    the reviewer's selection.
+    Retrying the same approval returns the first result.
+    """
     client = get_client()
 
     result = (
         client.table("transcripts")
-        .update({"approved": True, "approved_at": "now()"})
+        .select("id, processed_at, extracted_data")
         .eq("id", transcript_id)
         .execute()
     )
-
     if not result.data:
         raise HTTPException(status_code=404, detail="Transcript not found")
 
-    return {"status": "approved", "transcript_id": transcript_id}
+    selection = request.assignments if request else None
+    try:
+        applied, plan = apply_transcript(result.data[0], selection, client)
+    except DeadlineExceeded:
+        raise
+    except Exception:
+        logger.exception("Error applying transcript %s", transcript_id)
+        raise HTTPException(status_code=500, detail="Failed to apply transcript")
+
+    member_ids = applied.get("team_member_ids") or []
+    if member_ids and not applied.get("replayed"):
+        # Re-project the affected members (read model, live stream)
+        await event_stream.publish(
+            "assignment.created",
+            member_ids,
+            assignment_ids=applied.get("assignment_ids") or [],
+        )
+    conflicts = [
+        c for row in member_weeks.read_members(member_ids) for c in conflicts_from_row(row)
+    ]
+
+    return TranscriptApproveResponse(
+        transcript_id=transcript_id,
+        projects_created=applied.get("projects_created", 0),
+        projects_updated=applied.get("projects_updated", 0),
+        assignments_created=applied.get("assignments_created", 0),
+        assignments_existing=applied.get("assignments_existing", 0),
+        assignment_ids=applied.get("assignment_ids") or [],
+        unresolved_people=plan.unresolved_people,
+        unresolved_projects=plan.unresolved_projects,
+        skipped_assignments=plan.skipped_assignments,
+        conflicts=conflicts,
+        replayed=bool(applied.get("replayed")),
+    )
@@ -0,0 +1,126 @@
+"""
+Command line tools for operating the backend.
+
+Usage (from backend/):
+    python -m app.cli import-time-entries timesheet.csv
+    python -m app.cli import-time-entries export.jsonl --dry-run
+    python -m app.cli rebuild-read-model --week 2025-01-13
+    python -m app.cli recompute-snapshots --from 2025-01-06 --to 2025-06-30
+    python -m app.cli recompute-snapshots --resume <job id>
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date
+
+from app.services.capacity_calculator import get_week_start
+from app.services.invalidation import CAPACITY_HISTORY, MEMBER_WEEKS, invalidation_bus
+from app.services.member_weeks import member_weeks
+from app.services.snapshot_recompute import RecomputeConflictError, snapshot_recompute
+from app.services.time_entries import detect_format, import_time_entries
+
+
+def _import_time_entries(args: argparse.Namespace) -> int:
+    fmt = args.format or detect_format(args.path)
+    if args.path == "-":
+        result = import_time_entries(sys.stdin, fmt, args.dry_run)
+    else:
+        with open(args.path, encoding="utf-8-sig", newline="") as f:
+            result = import_time_entries(f, fmt, args.dry_run)
+
+    print(json.dumps(result.model_dump(mode="json"), indent=2))
+    return 1 if result.skipped and not result.inserted else 0
+
+
+async def _notify_workers(scope: str, week_start) -> None:
+    """Tell running workers (when networked) to drop their cached copies."""
+    await invalidation_bus.start()
+    try:
+        await invalidation_bus.publish(scope, week_start=week_start)
+    finally:
+        await invalidation_bus.stop()
+
+
+def _rebuild_read_model(args: argparse.Namespace) -> int:
+    week_start = get_week_start(args.week)
+    rows = member_weeks.rebuild(week_start)
+    asyncio.run(_notify_workers(MEMBER_WEEKS, week_start))
+    result = {
+        "week_start": rows[0]["week_start_date"] if rows else None,
+        "members": len(rows),
+        "overallocated": sum(1 for r in rows if r["overallocated"]),
+    }
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def _recompute_snapshots(args: argparse.Namespace) -> int:
+    if args.resume:
+        job_id = args.resume
+    elif args.week_from and args.week_to:
+        try:
+            job_id = snapshot_recompute.create_job(args.week_from, args.week_to)["id"]
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            return 2
+    else:
+        print("Pass --from and --to, or --resume JOB_ID", file=sys.stderr)
+        return 2
+
+    try:
+        job = snapshot_recompute.run(job_id)
+    except (ValueError, RecomputeConflictError) as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    if job["status"] == "completed":
+        asyncio.run(_notify_workers(CAPACITY_HISTORY, None))
+    print(json.dumps(job, indent=2, default=str))
+    return 0 if job["status"] == "completed" else 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Traffic Manager backend tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    time_entries = commands.add_parser(
+        "import-time-entries", help="Import a CSV or JSONL timesheet export"
+    )
+    time_entries.add_argument("path", help="File to import, or - for stdin")
+    time_entries.add_argument("--format", choices=["csv", "jsonl"])
+    time_entries.add_argument(
+        "--dry-run", action="store_true", help="Validate and resolve without writing"
+    )
+    time_entries.set_defaults(handler=_import_time_entries)
+
+    read_model = commands.add_parser(
+        "rebuild-read-model",
+        help="Re-derive the member-week capacity read model from assignments",
+    )
+    read_model.add_argument(
+        "--week",
+        type=date.fromisoformat,
+        help="Any date in the week to rebuild (defaults to the current week)",
+    )
+    read_model.set_defaults(handler=_rebuild_read_model)
+
+    recompute = commands.add_parser(
+        "recompute-snapshots",
+        help="Recompute capacity snapshots for a range of past weeks",
+    )
+    recompute.add_argument(
+        "--from", dest="week_from", type=date.fromisoformat, help="Any date in the first week"
+    )
+    recompute.add_argument(
+        "--to", dest="week_to", type=date.fromisoformat, help="Any date in the last week"
+    )
+    recompute.add_argument("--resume", metavar="JOB_ID", help="Resume an unfinished job")
+    recompute.set_defaults(handler=_recompute_snapshots)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,8 @@
 Configuration management using Pydantic Settings.
 """
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -15,6 +17,43 @@ class Settings(BaseSettings):
 
     # Anthropic (Claude)
     anthropic_api_key: str = ""
+    # Override to point at a local stand-in (see benchmarks/fake_anthropic.py)
+    anthropic_base_url: str | None = None
+
+    # Extraction cascade: the fast model answers first; its answer is escalated
+    # to the full model when invalid or below either confidence threshold.
+    # An empty fast model sends everything to the full model.
+    extraction_model: str = "claude-sonnet-4-20250514"
+    extraction_fast_model: str = "claude-3-5-haiku-20241022"
+    extraction_escalation_confidence: float = 0.7
+    extraction_escalation_item_confidence: float = 0.5
+
+    # Uploads at least this similar (estimated Jaccard of word 5-grams) to a
+    # stored transcript reuse its extraction instead of a full one
+    duplicate_similarity_threshold: float = 0.85
+
+    # Approving a transcript without a selection applies only the extracted
+    # assignments at least this confident; the rest are reported as skipped
+    apply_min_assignment_confidence: float = 0.6
+
+    # Model call admission control (token budgets per minute across all calls)
+    model_input_tokens_per_minute: int = 400_000
+    model_output_tokens_per_minute: int = 80_000
+    model_max_concurrency: int = 8
+    model_max_queue: int = 200
+    # Longest a call may queue for budget before it is shed
+    model_max_wait_interactive_seconds: float = 30.0
+    model_max_wait_batch_seconds: float = 300.0
+
+    # Per-request time budgets in seconds, by route tier (0 disables a tier)
+    request_deadline_seconds: float = 10.0
+    model_request_deadline_seconds: float = 90.0
+    bulk_request_deadline_seconds: float = 300.0
+
+    # Hedged capacity reads: a read still running after its recent p95
+    # latency (at least the minimum) is duplicated and the first answer used
+    hedged_reads: bool = False
+    hedge_min_delay_ms: float = 20.0
 
     # CORS
     cors_origins: list[str] = [
@@ -25,6 +64,27 @@ class Settings(BaseSettings):
     # Debug mode
     debug: bool = True
 
+    # Per-request database query tracing (N+1 detection)
+    query_tracing: bool = False
+
+    # Directory of the local capacity history store (columnar analytics copy)
+    history_store_path: str = "data/capacity_history"
+
+    # Threads writing snapshots in a historical recompute job
+    recompute_workers: int = 4
+
+    # Directory of the local transcript search index
+    search_index_path: str = "data/transcript_index"
+
+    # Build clients and open their connections during startup
+    prewarm_on_startup: bool = True
+
+    # Cross-worker cache invalidation: "memory" (single worker) or "postgres"
+    invalidation_backend: Literal["memory", "postgres"] = "memory"
+    # Direct Postgres connection for LISTEN/NOTIFY (not the transaction pooler)
+    database_url: str = ""
+    invalidation_channel: str = "traffic_manager_invalidation"
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
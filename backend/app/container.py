@@ -0,0 +1,139 @@
+"""
+Lazily built, lifespan-managed service clients.
+
+Third-party SDKs are slow to import (the Anthropic SDK alone takes a few
+hundred milliseconds) and their clients open connection pools on first use.
+The container registers a factory per service and builds each client the
+first time it is asked for, so importing the app stays cheap. The FastAPI
+lifespan calls `prewarm` to build clients and open their connections during
+startup, outside the request path, and `aclose` on shutdown.
+
+Benchmarks and tools swap in stand-ins with `override`.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# Seconds a single service may spend warming up before startup moves on
+PREWARM_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass
+class ServiceSpec:
+    """How to build, warm up and close one service."""
+
+    factory: Callable[[], Any]
+    warm: Callable[[Any], Any] | None = None  # Opens connections; sync or async
+    close: Callable[[Any], Any] | None = None  # Sync or async
+
+
+class ServiceContainer:
+    """Process-wide registry of lazily created clients."""
+
+    def __init__(self):
+        self._specs: dict[str, ServiceSpec] = {}
+        self._instances: dict[str, Any] = {}
+        self._overridden: set[str] = set()
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        warm: Callable[[Any], Any] | None = None,
+        close: Callable[[Any], Any] | None = None,
+    ) -> None:
+        """Register how to build a service (nothing is built yet)."""
+        self._specs[name] = ServiceSpec(factory, warm, close)
+
+    def get(self, name: str) -> Any:
+        """
+        Return the service, building it on first use.
+
+        Raises:
+            KeyError: If no service of that name is registered
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        spec = self._specs[name]
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = spec.factory()
+            return self._instances[name]
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    def override(self, name: str, instance: Any) -> None:
+        """Use `instance` for a service; None drops it so the factory runs again."""
+        with self._lock:
+            if instance is None:
+                self._instances.pop(name, None)
+                self._overridden.discard(name)
+            else:
+                self._instances[name] = instance
+                self._overridden.add(name)
+
+    async def prewarm(self, names: list[str] | None = None) -> dict[str, Any]:
+        """
+        Build services and open their connections ahead of the first request.
+
+        Factories and warm-up calls run in worker threads so blocking SDK
+        imports and handshakes do not stall the event loop. Failures are
+        reported rather than raised: a service that cannot warm up is simply
+        built on first use instead.
+
+        Args:
+            names: Services to warm (defaults to all registered)
+
+        Returns:
+            Seconds spent per service, or the error message if it failed
+        """
+
+        async def warm(name: str) -> tuple[str, Any]:
+            start = time.perf_counter()
+            try:
+                instance = await asyncio.to_thread(self.get, name)
+                spec = self._specs[name]
+                if spec.warm is not None and name not in self._overridden:
+                    if inspect.iscoroutinefunction(spec.warm):
+                        pending = spec.warm(instance)
+                    else:
+                        pending = asyncio.to_thread(spec.warm, instance)
+                    await asyncio.wait_for(pending, PREWARM_TIMEOUT_SECONDS)
+            except Exception as e:
+                logger.warning("Prewarming %s failed: %s", name, e)
+                return name, f"{type(e).__name__}: {e}"
+            return name, round(time.perf_counter() - start, 4)
+
+        results = await asyncio.gather(*(warm(n) for n in names or list(self._specs)))
+        return dict(results)
+
+    async def aclose(self) -> None:
+        """Close every built service that has a close hook."""
+        for name, instance in list(self._instances.items()):
+            spec = self._specs.get(name)
+            if spec is None or spec.close is None or name in self._overridden:
+                continue
+            try:
+                result = spec.close(instance)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning("Closing %s failed: %s", name, e)
+        with self._lock:
+            for name in list(self._instances):
+                if name not in self._overridden:
+                    del self._instances[name]
+
+
+# Shared container for this process
+services = ServiceContainer()
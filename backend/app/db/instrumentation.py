@@ -0,0 +1,172 @@
+"""
+Instrumentation wrapper around the Supabase client.
+
+Every executed query is reported to registered listeners with its table,
+operation, filters and duration, and registered guards run just before each
+round trip (request deadlines use this). The wrapper only records the chain of
+builder calls, so it adds a few attribute lookups per query and nothing when
+no listeners or guards are registered.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+# Builder methods that narrow the rows a query touches
+FILTER_METHODS = {
+    "eq",
+    "neq",
+    "gt",
+    "gte",
+    "lt",
+    "lte",
+    "like",
+    "ilike",
+    "is_",
+    "in_",
+    "contains",
+    "contained_by",
+    "match",
+}
+
+# Builder methods that determine the kind of query
+OPERATIONS = ("select", "insert", "update", "upsert", "delete", "rpc")
+
+
+@dataclass(frozen=True)
+class QueryEvent:
+    """A single executed database round trip."""
+
+    table: str
+    operation: str
+    filters: tuple[tuple[str, str, Any], ...]  # (column, operator, value)
+    duration: float
+    failed: bool
+
+    @property
+    def shape(self) -> tuple:
+        """Query identity ignoring filter values, used to spot repeated queries."""
+        return (
+            self.table,
+            self.operation,
+            tuple((column, op) for column, op, _ in self.filters),
+        )
+
+
+QueryListener = Callable[[QueryEvent], None]
+
+_listeners: list[QueryListener] = []
+
+
+def add_query_listener(listener: QueryListener) -> None:
+    """Register a callback invoked after every executed query."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_query_listener(listener: QueryListener) -> None:
+    """Unregister a previously added query listener."""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+# Called with the request builder before each round trip; a guard may adjust
+# the builder or raise to stop the query (see app/deadlines.py)
+ExecuteGuard = Callable[[Any], None]
+
+_guards: list[ExecuteGuard] = []
+
+
+def add_execute_guard(guard: ExecuteGuard) -> None:
+    """Register a callback invoked before every query is executed."""
+    if guard not in _guards:
+        _guards.append(guard)
+
+
+def _build_event(
+    table: str,
+    chain: tuple[tuple[str, tuple], ...],
+    duration: float,
+    failed: bool,
+) -> QueryEvent:
+    operation = "select"
+    filters = []
+    for method, args in chain:
+        if method in OPERATIONS:
+            operation = method
+        elif method in FILTER_METHODS and args:
+            column = args[0] if method != "match" else ",".join(sorted(args[0]))
+            value = args[1] if len(args) > 1 else args[0]
+            filters.append((column, method.rstrip("_"), value))
+    return QueryEvent(
+        table=table,
+        operation=operation,
+        filters=tuple(filters),
+        duration=duration,
+        failed=failed,
+    )
+
+
+class _QueryProxy:
+    """Wraps a postgrest request builder and times its execution."""
+
+    __slots__ = ("_builder", "_table", "_chain")
+
+    def __init__(self, builder: Any, table: str, chain: tuple = ()):
+        self._builder = builder
+        self._table = table
+        self._chain = chain
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return _QueryProxy(result, self._table, self._chain + ((name, args),))
+            return result
+
+        return call
+
+    def execute(self) -> Any:
+        for guard in _guards:
+            guard(self._builder)
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self._builder.execute()
+            failed = False
+            return response
+        finally:
+            if _listeners:
+                event = _build_event(
+                    self._table,
+                    self._chain,
+                    time.perf_counter() - start,
+                    failed,
+                )
+                for listener in _listeners:
+                    listener(event)
+
+
+class InstrumentedClient:
+    """Supabase client wrapper that reports every query to the listeners."""
+
+    def __init__(self, client: Any):
+        self.raw = client
+
+    def table(self, table_name: str) -> _QueryProxy:
+        return _QueryProxy(self.raw.table(table_name), table_name)
+
+    def rpc(self, fn: str, params: dict | None = None, **kwargs) -> _QueryProxy:
+        return _QueryProxy(
+            self.raw.rpc(fn, params or {}, **kwargs),
+            f"rpc:{fn}",
+            (("rpc", (fn,)),),
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
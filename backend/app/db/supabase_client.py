@@ -2,29 +2,106 @@
 Supabase client wrapper for database operations.
 """
 
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+
 from app.config import settings
+from app.container import services
+from app.db.instrumentation import InstrumentedClient
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 
-def get_supabase_client() -> Client:
+def get_supabase_client() -> "Client":
     """
     Create and return a Supabase client instance.
 
-    Uses service role key for server-side operations with full access.
+    Uses service role key for server-side operations with full access. The
+    SDK is imported here rather than at module load to keep startup fast.
     """
+    from supabase import create_client
+
     return create_client(
         settings.supabase_url,
         settings.supabase_service_role_key,
     )
 
 
-# Singleton client instance
-_client: Client | None = None
+def _warm_client(client: InstrumentedClient) -> None:
+    """Open the HTTP connection to PostgREST with a one-row read."""
+    client.table("team_members").select("id").limit(1).execute()
+
+
+services.register(
+    "supabase",
+    lambda: InstrumentedClient(get_supabase_client()),
+    warm=_warm_client,
+)
+
+
+def get_client() -> InstrumentedClient:
+    """
+    Get or create the Supabase client singleton.
+
+    The client is wrapped so every query is reported to the instrumentation
+    listeners (metrics, tracing). The wrapper exposes the same table API.
+    """
+    return services.get("supabase")
+
+
+def set_client(client) -> None:
+    """
+    Replace the client singleton.
+
+    Used to inject an in-memory stand-in (see `benchmarks/fake_supabase.py`);
+    pass None to fall back to a real client on the next `get_client()` call.
+    """
+    if client is not None and not isinstance(client, InstrumentedClient):
+        client = InstrumentedClient(client)
+    services.override("supabase", client)
+
+
+# Rows PostgREST returns per request (the server's default max-rows)
+PAGE_SIZE = 1000
+
+
+def iter_pages(
+    build_query: Callable[[], Any], page_size: int = PAGE_SIZE
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Yield a query's rows one page at a time.
+
+    Each page is fetched only when the previous one has been consumed, so a
+    caller that streams pages out holds one page in memory at a time.
+
+    Args:
+        build_query: Returns a fresh, filtered query with a stable order
+            (e.g. ending in ``.order("id")``) each time it is called
+        page_size: Rows requested per page
+
+    Yields:
+        Non-empty lists of rows
+    """
+    offset = 0
+    while True:
+        page = build_query().range(offset, offset + page_size - 1).execute()
+        if page.data:
+            yield page.data
+        if len(page.data) < page_size:
+            return
+        offset += page_size
 
 
-def get_client() -> Client:
-    """Get or create the Supabase client singleton."""
-    global _client
-    if _client is None:
-        _client = get_supabase_client()
-    return _client
+def fetch_all(build_query: Callable[[], Any], page_size: int = PAGE_SIZE) -> list[dict[str, Any]]:
+    """
+    Fetch every row of a query, one page per round trip.
+
+    Args:
+        build_query: Returns a fresh, filtered query with a stable order
+            (e.g. ending in ``.order("id")``) each time it is called
+        page_size: Rows requested per page
+
+    Returns:
+        All matching rows
+    """
+    return [row for page in iter_pages(build_query, page_size) for row in page]
@@ -0,0 +1,222 @@
+"""
+Per-request time budgets.
+
+Every HTTP request gets a deadline from its route's budget tier. The
+deadline lives in a context variable, so it follows the request into
+`asyncio.to_thread` reads and coroutines, and is enforced where time is
+actually spent:
+
+  - database: each round trip checks the budget first and passes what is
+    left as the HTTP timeout of the call (the sync client cannot be
+    cancelled once a call is on the wire, so it is bounded instead)
+  - model: the scheduler will not queue a call past the deadline, and the
+    call itself runs under an asyncio timeout (the async client is
+    cancelled)
+  - request: `DeadlineMiddleware` cancels the request when the budget runs
+    out while it is awaiting something
+
+A request that runs out answers 504. Once the response has started, the
+deadline no longer applies, so streamed responses are never cut short.
+
+Work that must finish once a write has committed (event projections,
+invalidations, background jobs started by a request) runs under
+`unbounded()`.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from fnmatch import fnmatchcase
+from typing import Any, AsyncIterator, Iterator
+
+from starlette.responses import JSONResponse
+
+from app.config import settings
+from app.db.instrumentation import add_execute_guard
+from app.telemetry.metrics import record_deadline_exceeded
+
+
+# Routes outside the default tier: (method, path pattern, tier). Streams and
+# exports hold the connection open by design and have no budget.
+ROUTE_BUDGETS: list[tuple[str, str, str | None]] = [
+    ("GET", "/api/capacity/stream", None),
+    ("GET", "/api/exports/*", None),
+    ("POST", "/api/transcripts/process", "model"),
+    ("POST", "/api/transcripts/*/reprocess", "model"),
+    ("POST", "/api/assignments/bulk", "bulk"),
+    ("POST", "/api/time-entries/import", "bulk"),
+    ("POST", "/api/capacity/recalculate", "bulk"),
+    ("POST", "/api/capacity/scenarios", "bulk"),
+    ("POST", "/api/capacity/history/sync", "bulk"),
+]
+
+# Monotonic time the current request must finish by (None: no deadline)
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out before `stage` could finish."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Request deadline exceeded during {stage}")
+        self.stage = stage
+
+
+def remaining() -> float | None:
+    """Seconds left in the current request's budget, or None if unbounded."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check(stage: str) -> None:
+    """
+    Raises:
+        DeadlineExceeded: If the current request's budget is spent
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(stage)
+
+
+@contextmanager
+def unbounded() -> Iterator[None]:
+    """Run the block (and tasks or threads started in it) with no deadline."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@asynccontextmanager
+async def cancel_at_deadline(stage: str) -> AsyncIterator[None]:
+    """
+    Cancel the awaited block when the budget runs out.
+
+    Raises:
+        DeadlineExceeded: If it did
+    """
+    check(stage)
+    left = remaining()
+    if left is None:
+        yield
+        return
+    try:
+        async with asyncio.timeout(left):
+            yield
+    except TimeoutError as e:
+        if isinstance(e, DeadlineExceeded):
+            raise
+        raise DeadlineExceeded(stage) from e
+
+
+def route_budget(method: str, path: str) -> float | None:
+    """Budget in seconds for a request, or None for no deadline."""
+    tier: str | None = "default"
+    for route_method, pattern, route_tier in ROUTE_BUDGETS:
+        if method == route_method and fnmatchcase(path.rstrip("/"), pattern):
+            tier = route_tier
+            break
+    seconds = {
+        "default": settings.request_deadline_seconds,
+        "model": settings.model_request_deadline_seconds,
+        "bulk": settings.bulk_request_deadline_seconds,
+    }.get(tier, 0)
+    return seconds if seconds > 0 else None
+
+
+# ============================================================================
+# Database round trips
+# ============================================================================
+
+
+class _BudgetSession:
+    """HTTP session passing what is left of the budget as each call's timeout."""
+
+    def __init__(self, session: Any, timeout: float):
+        self.session = session
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            return self.session.request(*args, **kwargs)
+        except Exception as e:
+            from httpx import TimeoutException
+
+            if isinstance(e, TimeoutException):
+                raise DeadlineExceeded("database") from e
+            raise
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+
+def _bound_query(builder: Any) -> None:
+    """Execute guard: refuse spent budgets and time out the round trip."""
+    left = remaining()
+    if left is None:
+        return
+    if left <= 0:
+        raise DeadlineExceeded("database")
+    session = getattr(builder, "session", None)
+    if session is not None:
+        if isinstance(session, _BudgetSession):
+            session = session.session
+        builder.session = _BudgetSession(session, left)
+
+
+add_execute_guard(_bound_query)
+
+
+# ============================================================================
+# Middleware
+# ============================================================================
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware giving every request its route's time budget.
+
+    Answers 504 if the budget runs out before the response starts. Add it
+    innermost, so the other middleware see (and count) the 504.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget = route_budget(scope.get("method", ""), scope.get("path", ""))
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = False
+        token = _deadline.set(time.monotonic() + budget)
+        try:
+            async with asyncio.timeout(budget) as timeout:
+
+                async def send_until_started(message):
+                    nonlocal started
+                    if message["type"] == "http.response.start":
+                        started = True
+                        timeout.reschedule(None)
+                    await send(message)
+
+                await self.app(scope, receive, send_until_started)
+        except TimeoutError as e:
+            if not (isinstance(e, DeadlineExceeded) or timeout.expired()):
+                raise
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            record_deadline_exceeded(route, getattr(e, "stage", "request"))
+            if started:
+                raise
+            response = JSONResponse({"detail": "Request deadline exceeded"}, status_code=504)
+            await response(scope, receive, send)
+        finally:
+            _deadline.reset(token)
@@ -4,11 +4,64 @@ Alt/Shift Traffic Manager - FastAPI Backend
 AI-powered traffic management with capacity tracking.
 """
 
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.config import settings
-from app.api.routes import transcripts, assignments, capacity
+from app.container import services
+from app.deadlines import DeadlineMiddleware
+from app.api.routes import transcripts, assignments, capacity, time_entries, exports
+from app.services.invalidation import invalidation_bus
+from app.services.snapshot_recompute import snapshot_recompute
+from app.services.transcript_search import transcript_index
+from app.telemetry.metrics import REGISTRY, MetricsMiddleware
+from app.telemetry.tracing import QueryTracingMiddleware, get_recent_traces, get_trace
+
+logger = logging.getLogger(__name__)
+
+
+def _prewarm_targets() -> list[str]:
+    """Services worth warming: configured ones and injected stand-ins."""
+    targets = []
+    if settings.supabase_url or services.is_built("supabase"):
+        targets.append("supabase")
+    if settings.anthropic_api_key:
+        targets.append("anthropic")
+    return targets
+
+
+async def _warm_search_index() -> None:
+    """Sync the transcript index before the first upload or search needs it."""
+    try:
+        await asyncio.to_thread(transcript_index.warm)
+    except Exception as e:
+        logger.warning("Warming the transcript index failed: %s", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open long-lived connections before serving and close them after."""
+    await invalidation_bus.start()
+    app.state.prewarm = {}
+    search_warmup = None
+    if settings.prewarm_on_startup:
+        app.state.prewarm = await services.prewarm(_prewarm_targets())
+        if "supabase" in app.state.prewarm:
+            # In the background: the whole archive may need indexing
+            search_warmup = asyncio.create_task(_warm_search_index())
+    yield
+    if search_warmup is not None:
+        search_warmup.cancel()
+    await snapshot_recompute.stop()
+    transcript_index.save()
+    await services.aclose()
+    await invalidation_bus.stop()
+
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -17,8 +70,12 @@ app = FastAPI(
     description="AI-powered traffic management with capacity tracking",
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
+    lifespan=lifespan,
 )
 
+# Per-route time budgets (innermost, so the middleware below see the 504)
+app.add_middleware(DeadlineMiddleware)
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -28,6 +85,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and database round trip metrics
+app.add_middleware(MetricsMiddleware)
+
+# Opt-in query tracing for spotting N+1 patterns
+if settings.query_tracing:
+    app.add_middleware(QueryTracingMiddleware)
+
 
 # Health check endpoint
 @app.get("/health")
@@ -40,6 +104,41 @@ async def health_check():
     }
 
 
+# Metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of application metrics."""
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+if settings.query_tracing:
+
+    @app.get("/debug/query-traces", include_in_schema=False)
+    async def list_query_traces(limit: int = 20):
+        """Summaries of recent request traces, newest first."""
+        return {
+            "traces": [
+                {
+                    key: value
+                    for key, value in trace.to_dict().items()
+                    if key != "queries"
+                }
+                for trace in get_recent_traces()[:limit]
+            ]
+        }
+
+    @app.get("/debug/query-traces/{trace_id}", include_in_schema=False)
+    async def get_query_trace(trace_id: str):
+        """Full per-query trace for one request as JSON."""
+        trace = get_trace(trace_id)
+        if trace is None:
+            raise HTTPException(status_code=404, detail="Trace not found")
+        return trace.to_dict()
+
+
 # Include routers
 app.include_router(
     transcripts.router,
@@ -56,6 +155,16 @@ app.include_router(
     prefix="/api/capacity",
     tags=["capacity"],
 )
+app.include_router(
+    time_entries.router,
+    prefix="/api/time-entries",
+    tags=["time-entries"],
+)
+app.include_router(
+    exports.router,
+    prefix="/api/exports",
+    tags=["exports"],
+)
 
 
 # Root endpoint
@@ -2,7 +2,7 @@
 Pydantic schemas for request/response validation.
 """
 
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from pydantic import BaseModel, Field
 from typing import Literal
@@ -82,6 +82,33 @@ class TranscriptProcessRequest(BaseModel):
     transcript_text: str = Field(min_length=50)
     meeting_date: date | None = None
     meeting_type: Literal["wip", "planning", "client-debrief"] = "wip"
+    # Backfills pass "batch" so they queue behind uploads someone is waiting on
+    priority: Literal["interactive", "batch"] = "interactive"
+    # Reuse the extraction of a stored near-duplicate instead of a full one
+    dedupe: bool = True
+
+
+class TranscriptReprocessRequest(BaseModel):
+    """Request body for re-processing an edited transcript."""
+
+    transcript_text: str = Field(min_length=50)
+    priority: Literal["interactive", "batch"] = "interactive"
+
+
+class ApprovedAssignment(BaseModel):
+    """An extracted assignment the reviewer approved, possibly edited."""
+
+    person_name: str
+    project_name: str
+    role_on_project: str | None = None
+    hours_this_week: Decimal | None = Field(default=None, ge=0, le=80)
+
+
+class TranscriptApproveRequest(BaseModel):
+    """Request body for approving a transcript (optional)."""
+
+    # Apply only these assignments (defaults to every extracted assignment)
+    assignments: list[ApprovedAssignment] | None = None
 
 
 class AssignmentCreateRequest(BaseModel):
@@ -102,6 +129,29 @@ class AssignmentBulkCreateRequest(BaseModel):
     assignments: list[AssignmentCreateRequest]
 
 
+class RoleRequirement(BaseModel):
+    """A role to staff on a project."""
+
+    role: str = "lead"
+    hours_per_week: Decimal = Field(gt=0, default=Decimal(8))
+    skills: list[str] = []
+    count: int = Field(ge=1, le=20, default=1)
+
+
+class ProjectStaffingRequest(BaseModel):
+    """Roles needed on one project."""
+
+    project_id: str
+    roles: list[RoleRequirement] = Field(default_factory=lambda: [RoleRequirement()])
+
+
+class AssignmentRecommendationRequest(BaseModel):
+    """Request body for optimizer-based team recommendations."""
+
+    projects: list[ProjectStaffingRequest] = Field(min_length=1)
+    candidates_per_role: int = Field(ge=1, le=50, default=5)
+
+
 class AssignmentUpdateRequest(BaseModel):
     """Request body for updating an assignment."""
 
@@ -111,6 +161,36 @@ class AssignmentUpdateRequest(BaseModel):
     notes: str | None = None
 
 
+class ScenarioAssignmentUpdate(AssignmentUpdateRequest):
+    """A hypothetical change to an existing assignment."""
+
+    assignment_id: str
+    team_member_id: str | None = None  # Reassign to another member
+
+
+class CapacityScenario(BaseModel):
+    """Hypothetical assignment changes evaluated together."""
+
+    name: str
+    creates: list[AssignmentCreateRequest] = []
+    updates: list[ScenarioAssignmentUpdate] = []
+    deletes: list[str] = []  # Assignment ids
+
+
+class ScenarioComparisonRequest(BaseModel):
+    """Request body for comparing what-if scenarios."""
+
+    scenarios: list[CapacityScenario] = Field(min_length=1, max_length=500)
+    week_start_date: date | None = None
+
+
+class CapacityRecomputeRequest(BaseModel):
+    """Request body for recomputing snapshots over past weeks."""
+
+    week_from: date  # Any date in the first week
+    week_to: date  # Any date in the last week
+
+
 # ============================================================================
 # Response Schemas
 # ============================================================================
@@ -125,6 +205,36 @@ class TranscriptProcessResponse(BaseModel):
     extraction_confidence: float
     extracted_data: TranscriptExtractionSchema
     unresolved_entities: dict = {}  # Names that couldn't be matched
+    duplicate_of: str | None = None  # Near-duplicate the extraction was reused from
+    similarity: float | None = None  # Estimated similarity to duplicate_of
+
+
+class TranscriptReprocessResponse(TranscriptProcessResponse):
+    """Response body for re-processing an edited transcript."""
+
+    changed_regions: int  # Edited regions found by the diff
+    full_reextraction: bool  # Whole text re-extracted instead of the regions
+    reextracted_chars: int  # Characters sent to the model (0 if unchanged)
+
+
+class TranscriptSearchHit(BaseModel):
+    """One transcript matching a search."""
+
+    transcript_id: str
+    meeting_date: date | None = None
+    meeting_type: str | None = None
+    score: float
+    matched_terms: list[str]
+    snippet: str | None = None  # Extracted quote that best matches the query
+
+
+class TranscriptSearchResponse(BaseModel):
+    """Ranked transcript search results."""
+
+    query: str
+    terms: list[str]  # Query terms after tokenizing
+    total: int  # Matching transcripts before paging
+    hits: list[TranscriptSearchHit]
 
 
 class CapacitySnapshot(BaseModel):
@@ -152,6 +262,27 @@ class CapacityConflict(BaseModel):
     severity: Literal["low", "medium", "high"]
     description: str
     suggested_resolution: str | None = None
+    week_start: date | None = None  # First week affected (timeline conflicts)
+    week_end: date | None = None  # Last week affected, inclusive
+
+
+class TranscriptApproveResponse(BaseModel):
+    """Outcome of approving a transcript and applying its extraction."""
+
+    status: Literal["approved"] = "approved"
+    transcript_id: str
+    projects_created: int
+    projects_updated: int
+    assignments_created: int
+    assignments_existing: int  # Already assigned; left unchanged
+    assignment_ids: list[str]
+    unresolved_people: list[str]
+    unresolved_projects: list[str]  # Names matching several projects
+    # Extracted assignments below the confidence threshold; send them in
+    # `assignments` to apply them
+    skipped_assignments: list[ApprovedAssignment]
+    conflicts: list[CapacityConflict]
+    replayed: bool = False  # A retry of an approval already applied
 
 
 class AssignmentResponse(BaseModel):
@@ -170,8 +301,255 @@ class AssignmentResponse(BaseModel):
     confidence_score: float | None
 
 
+class AssignmentBulkCreateError(BaseModel):
+    """A requested assignment that was not created."""
+
+    index: int  # Position in the request's assignments
+    project_id: str
+    team_member_id: str
+    error: str
+
+
 class AssignmentBulkCreateResponse(BaseModel):
     """Response body for bulk assignment creation."""
 
     created: list[AssignmentResponse]
     conflicts: list[CapacityConflict]
+    errors: list[AssignmentBulkCreateError] = []
+
+
+class CandidateScore(BaseModel):
+    """A ranked candidate for a role, with the components of its score."""
+
+    team_member_id: str
+    full_name: str
+    role: str
+    available_hours: Decimal
+    score: float
+    role_fit: float
+    skill_match: float
+    availability: float
+    client_familiarity: float
+
+
+class RoleRecommendation(BaseModel):
+    """Recommendation for one role slot on a project."""
+
+    role: str
+    hours_per_week: Decimal
+    assigned: CandidateScore | None = None
+    candidates: list[CandidateScore] = []
+
+
+class ProjectRecommendation(BaseModel):
+    """Recommended team for one project."""
+
+    project_id: str
+    project_name: str
+    roles: list[RoleRecommendation]
+    unfilled_roles: list[str] = []
+
+
+class AssignmentRecommendationResponse(BaseModel):
+    """Response body for optimizer-based team recommendations."""
+
+    projects: list[ProjectRecommendation]
+    total_score: float
+    warnings: list[str] = []
+
+
+class RebalanceMove(BaseModel):
+    """A proposed hour transfer (or deferral) for one assignment."""
+
+    type: Literal["transfer", "defer"]
+    assignment_id: str
+    project_id: str
+    project_name: str
+    project_priority: str
+    from_team_member_id: str
+    from_team_member_name: str
+    to_team_member_id: str | None = None
+    to_team_member_name: str | None = None
+    to_assignment_id: str | None = None  # Receiver's existing assignment, if any
+    hours: Decimal
+    reason: str
+
+
+class MemberUtilization(BaseModel):
+    """A member's utilization before and after proposed moves."""
+
+    team_member_id: str
+    full_name: str
+    total_capacity_hours: Decimal
+    allocated_before: Decimal
+    allocated_after: Decimal
+    utilization_before: Decimal
+    utilization_after: Decimal
+    overallocated_after: bool
+
+
+class RebalanceResponse(BaseModel):
+    """Proposed moves resolving the current week's overallocations."""
+
+    week_start_date: date
+    moves: list[RebalanceMove]
+    members: list[MemberUtilization]
+    hours_transferred: Decimal
+    hours_deferred: Decimal
+    remaining_overallocated: int
+
+
+class ScenarioMemberChange(BaseModel):
+    """A member whose capacity differs from the baseline in a scenario."""
+
+    team_member_id: str
+    full_name: str
+    total_capacity_hours: Decimal
+    allocated_before: Decimal
+    allocated_after: Decimal
+    utilization_before: Decimal
+    utilization_after: Decimal
+    overallocated_before: bool
+    overallocated_after: bool
+
+
+class ScenarioSummary(BaseModel):
+    """Team-wide capacity totals for the baseline or a scenario."""
+
+    name: str
+    total_capacity_hours: Decimal
+    total_allocated_hours: Decimal
+    utilization_pct: Decimal
+    overallocated_count: int
+    conflict_count: int
+
+
+class ScenarioResult(ScenarioSummary):
+    """Outcome of one what-if scenario relative to the baseline."""
+
+    members: list[ScenarioMemberChange] = []
+    conflicts_added: list[CapacityConflict] = []
+    conflicts_resolved: list[CapacityConflict] = []
+    errors: list[str] = []
+
+
+class ScenarioComparisonResponse(BaseModel):
+    """Baseline capacity and every evaluated scenario."""
+
+    week_start_date: date
+    baseline: ScenarioSummary
+    scenarios: list[ScenarioResult]
+
+
+class HistoryPoint(BaseModel):
+    """Utilization for one rollup key in one period."""
+
+    period: str  # 2026-10-05, 2026-10 or 2026-Q4 depending on grain
+    key: str
+    label: str
+    capacity_hours: Decimal
+    allocated_hours: Decimal
+    utilization_pct: Decimal
+    member_weeks: int
+    overallocated_weeks: int
+
+
+class HistoryResponse(BaseModel):
+    """Utilization trend read from the local history store."""
+
+    grain: Literal["weekly", "monthly", "quarterly"]
+    dimension: Literal["team", "role", "member"]
+    synced_at: datetime | None = None
+    points: list[HistoryPoint]
+
+
+class CapacityRecomputeJob(BaseModel):
+    """Progress of a snapshot recompute job."""
+
+    id: str
+    week_from: date
+    week_to: date
+    status: Literal["pending", "running", "interrupted", "completed", "failed"]
+    total_weeks: int
+    completed_weeks: int
+    snapshots_written: int
+    progress_pct: float
+    error: str | None = None
+    created_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+class TimeEntryImportError(BaseModel):
+    """A timesheet row that was skipped."""
+
+    line: int
+    error: str
+
+
+class TimeEntryImportResponse(BaseModel):
+    """Outcome of a time entry import."""
+
+    rows_read: int
+    inserted: int  # Rows that would be inserted when dry_run
+    skipped: int
+    hours_imported: Decimal
+    assignments_updated: int
+    projects_updated: int
+    errors: list[TimeEntryImportError]
+    errors_truncated: bool = False
+    dry_run: bool = False
+    duration_seconds: float
+
+
+class AssignmentVariance(BaseModel):
+    """Planned vs actual weekly hours on one assignment."""
+
+    assignment_id: str
+    project_id: str
+    project_name: str
+    team_member_id: str
+    full_name: str
+    planned_weekly_hours: Decimal
+    actual_weekly_hours: Decimal
+    variance_hours: Decimal  # Actual minus planned
+    burn_ratio: float | None = None  # Actual / planned
+
+
+class MemberWeekVariance(BaseModel):
+    """A member's planned vs logged hours for one week."""
+
+    team_member_id: str
+    full_name: str
+    week_start: date
+    planned_hours: Decimal
+    actual_hours: Decimal
+    variance_hours: Decimal
+
+
+class ProjectVariance(BaseModel):
+    """Burn rate and projected overrun for one project."""
+
+    project_id: str
+    project_name: str
+    estimated_total_hours: Decimal | None = None
+    hours_consumed: Decimal
+    planned_weekly_hours: Decimal
+    burn_rate: Decimal  # Actual hours per week over the window
+    variance_hours: Decimal  # Burn rate minus planned weekly hours
+    weeks_to_deadline: float | None = None
+    projected_total_hours: Decimal | None = None
+    projected_overrun_hours: Decimal | None = None
+    at_risk: bool
+
+
+class VarianceResponse(BaseModel):
+    """Plan-vs-actual variance over a window of complete weeks."""
+
+    window_start: date
+    window_end: date
+    weeks: int
+    projects: list[ProjectVariance]
+    member_weeks: list[MemberWeekVariance]
+    assignments: list[AssignmentVariance] = []
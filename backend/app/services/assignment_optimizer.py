@@ -0,0 +1,359 @@
+"""
+Assignment optimizer for team recommendations.
+
+Staffs one or many projects from the active roster using the same data
+`calculate_weekly_capacity` reads (weekly capacity and active assignment
+hours), scoring each member on role fit, skills, available hours and client
+familiarity. Roles are filled with a regret-ordered greedy search: the role
+that would lose the most by not getting its best candidate is filled first,
+and a member's remaining hours shrink as they are assigned, so one person is
+not promised to every project at once.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any
+
+from app.db.supabase_client import fetch_all, get_client
+from app.models.schemas import (
+    AssignmentRecommendationRequest,
+    AssignmentRecommendationResponse,
+    CandidateScore,
+    ProjectRecommendation,
+    RoleRecommendation,
+)
+
+
+# Weights of the score components (sum to 1)
+SCORE_WEIGHTS = {
+    "role_fit": 0.35,
+    "skill_match": 0.30,
+    "availability": 0.25,
+    "client_familiarity": 0.10,
+}
+
+# Members below this role fit are ranked but never assigned
+MIN_ROLE_FIT = 0.5
+
+# Roles on a project that team member roles can fill
+ROLE_COMPATIBILITY = {
+    "lead": {"producer", "director", "strategy"},
+    "producer": {"producer", "director"},
+    "strategy": {"strategy", "director"},
+    "creative": {"creative", "designer", "director"},
+    "editor": {"editor", "creative"},
+    "designer": {"designer", "creative"},
+}
+
+PRIORITY_ORDER = {"urgent": 0, "high": 1, "medium": 2, "low": 3}
+
+# Team member columns needed to build a roster
+ROSTER_COLUMNS = (
+    "id, full_name, role, weekly_capacity_hours, skills, core_roles, "
+    "capabilities, known_clients"
+)
+
+
+@dataclass
+class RosterMember:
+    """A team member's fit-relevant attributes and current load."""
+
+    id: str
+    full_name: str
+    role: str
+    roles: set[str]
+    skills: set[str]
+    clients: set[str]
+    capacity: float
+    allocated: float = 0.0
+    projects: set[str] = field(default_factory=set)
+
+    @property
+    def available(self) -> float:
+        return self.capacity - self.allocated
+
+
+@dataclass
+class RoleSlot:
+    """One position to fill on a project."""
+
+    project_id: str
+    project_name: str
+    client: str | None
+    priority: str
+    role: str
+    hours: float
+    skills: set[str]
+
+
+def _normalise(values: list[str] | None) -> set[str]:
+    return {v.strip().lower() for v in values or [] if v and v.strip()}
+
+
+def role_fit(member: RosterMember, role: str) -> float:
+    """How well a member's roles match the role being staffed (0-1)."""
+    role = role.lower()
+    if role in member.roles:
+        return 1.0
+    if member.role in ROLE_COMPATIBILITY.get(role, set()):
+        return 0.8
+    if any(r in role or role in r for r in member.roles):
+        return 0.8
+    if role == "support":
+        return 0.6
+    return 0.2
+
+
+def skill_match(member: RosterMember, skills: set[str]) -> float:
+    """Fraction of required skills the member has (1 if none required)."""
+    if not skills:
+        return 1.0
+    return len(skills & member.skills) / len(skills)
+
+
+def availability_score(available: float, hours: float) -> float:
+    """How much of the requested weekly hours the member can absorb (0-1)."""
+    if available <= 0:
+        return 0.0
+    return min(available / hours, 1.0)
+
+
+def load_roster(client=None) -> dict[str, RosterMember]:
+    """
+    Load active team members and their current allocation.
+
+    One paged read for members and one for all active assignments, so the
+    round trips grow with table size / PAGE_SIZE, not with team size.
+    """
+    client = client or get_client()
+
+    members = fetch_all(
+        lambda: client.table("team_members")
+        .select(ROSTER_COLUMNS)
+        .eq("active", True)
+        .order("id")
+    )
+    assignments = fetch_all(
+        lambda: client.table("assignments")
+        .select("team_member_id, project_id, hours_this_week")
+        .eq("status", "active")
+        .order("id")
+    )
+    return build_roster(members, assignments)
+
+
+def build_roster(
+    members: list[dict[str, Any]],
+    assignments: list[dict[str, Any]],
+) -> dict[str, RosterMember]:
+    """Build roster entries from team member rows and active assignment rows."""
+    roster = {}
+    for m in members:
+        role = (m.get("role") or "").lower()
+        roster[m["id"]] = RosterMember(
+            id=m["id"],
+            full_name=m["full_name"],
+            role=role,
+            roles={role} | _normalise(m.get("core_roles")),
+            skills=_normalise(m.get("skills")) | _normalise(m.get("capabilities")),
+            clients=_normalise(m.get("known_clients")),
+            capacity=float(m.get("weekly_capacity_hours") or 40),
+        )
+
+    for a in assignments:
+        member = roster.get(a["team_member_id"])
+        if member is not None:
+            member.allocated += float(a.get("hours_this_week") or 0)
+            member.projects.add(a["project_id"])
+
+    return roster
+
+
+class _RankedSlot:
+    """Members ordered by the best score they could reach on one slot."""
+
+    def __init__(self, slot: RoleSlot, members: list[RosterMember]):
+        self.slot = slot
+        self.static: dict[str, tuple[float, float, float, float]] = {}
+        client = (slot.client or "").lower()
+        for member in members:
+            if slot.project_id in member.projects:
+                continue
+            fit = role_fit(member, slot.role)
+            skills = skill_match(member, slot.skills)
+            familiar = 1.0 if client and client in member.clients else 0.0
+            partial = (
+                SCORE_WEIGHTS["role_fit"] * fit
+                + SCORE_WEIGHTS["skill_match"] * skills
+                + SCORE_WEIGHTS["client_familiarity"] * familiar
+            )
+            self.static[member.id] = (partial, fit, skills, familiar)
+        # Upper bound assumes full availability, so scans can stop early
+        self.order = sorted(
+            (m for m in members if m.id in self.static),
+            key=lambda m: self.static[m.id][0],
+            reverse=True,
+        )
+
+    def score(self, member: RosterMember) -> CandidateScore:
+        partial, fit, skills, familiar = self.static[member.id]
+        available = availability_score(member.available, self.slot.hours)
+        return CandidateScore(
+            team_member_id=member.id,
+            full_name=member.full_name,
+            role=member.role,
+            available_hours=Decimal(str(round(member.available, 2))),
+            score=round(partial + SCORE_WEIGHTS["availability"] * available, 4),
+            role_fit=fit,
+            skill_match=round(skills, 4),
+            availability=round(available, 4),
+            client_familiarity=familiar,
+        )
+
+    def top(self, n: int, feasible_only: bool = False) -> list[CandidateScore]:
+        """Best n candidates, scanning in upper-bound order."""
+        best: list[CandidateScore] = []
+        ceiling = SCORE_WEIGHTS["availability"]
+        for member in self.order:
+            if len(best) >= n and self.static[member.id][0] + ceiling <= best[-1].score:
+                break
+            if feasible_only and not self.feasible(member):
+                continue
+            best.append(self.score(member))
+            best.sort(key=lambda c: c.score, reverse=True)
+            del best[n:]
+        return best
+
+    def feasible(self, member: RosterMember) -> bool:
+        return (
+            self.slot.project_id not in member.projects
+            and self.static[member.id][1] >= MIN_ROLE_FIT
+            and member.available >= self.slot.hours
+        )
+
+
+def optimize_assignments(
+    slots: list[RoleSlot],
+    roster: dict[str, RosterMember],
+    candidates_per_role: int = 5,
+) -> tuple[list[CandidateScore | None], list[list[CandidateScore]]]:
+    """
+    Fill role slots from the roster.
+
+    Returns:
+        (assigned candidate per slot or None, ranked candidates per slot).
+        Rankings reflect availability before any of these slots are filled.
+    """
+    members = list(roster.values())
+    ranked = [_RankedSlot(slot, members) for slot in slots]
+    rankings = [r.top(candidates_per_role) for r in ranked]
+    assigned: list[CandidateScore | None] = [None] * len(slots)
+    open_slots = set(range(len(slots)))
+
+    while open_slots:
+        choice = None
+        for index in open_slots:
+            top_two = ranked[index].top(2, feasible_only=True)
+            if not top_two:
+                continue
+            regret = top_two[0].score - (top_two[1].score if len(top_two) > 1 else 0.0)
+            key = (regret, -PRIORITY_ORDER.get(slots[index].priority, 2), -index)
+            if choice is None or key > choice[0]:
+                choice = (key, index, top_two[0])
+
+        if choice is None:
+            break  # Remaining slots have no feasible candidate
+
+        _, index, candidate = choice
+        member = roster[candidate.team_member_id]
+        member.allocated += slots[index].hours
+        member.projects.add(slots[index].project_id)
+        assigned[index] = candidate
+        open_slots.discard(index)
+
+    return assigned, rankings
+
+
+async def recommend_assignments(
+    request: AssignmentRecommendationRequest,
+) -> AssignmentRecommendationResponse:
+    """
+    Recommend people for the requested project roles.
+
+    Args:
+        request: Projects and the roles each needs
+
+    Returns:
+        AssignmentRecommendationResponse with an assignment and ranked
+        candidates for every role slot
+
+    Raises:
+        ValueError: If a requested project does not exist
+    """
+    client = get_client()
+    project_ids = list(dict.fromkeys(p.project_id for p in request.projects))
+
+    projects_response = (
+        client.table("projects")
+        .select("id, name, client, priority")
+        .in_("id", project_ids)
+        .execute()
+    )
+    projects: dict[str, dict[str, Any]] = {p["id"]: p for p in projects_response.data}
+    missing = [pid for pid in project_ids if pid not in projects]
+    if missing:
+        raise ValueError(f"Projects not found: {', '.join(missing)}")
+
+    roster = load_roster(client)
+
+    slots: list[RoleSlot] = []
+    for staffing in request.projects:
+        project = projects[staffing.project_id]
+        for requirement in staffing.roles:
+            for _ in range(requirement.count):
+                slots.append(
+                    RoleSlot(
+                        project_id=project["id"],
+                        project_name=project["name"],
+                        client=project.get("client"),
+                        priority=project.get("priority") or "medium",
+                        role=requirement.role,
+                        hours=float(requirement.hours_per_week),
+                        skills=_normalise(requirement.skills),
+                    )
+                )
+
+    assigned, rankings = optimize_assignments(
+        slots, roster, request.candidates_per_role
+    )
+
+    by_project: dict[str, ProjectRecommendation] = {}
+    warnings = []
+    for slot, chosen, candidates in zip(slots, assigned, rankings):
+        recommendation = by_project.setdefault(
+            slot.project_id,
+            ProjectRecommendation(
+                project_id=slot.project_id,
+                project_name=slot.project_name,
+                roles=[],
+            ),
+        )
+        recommendation.roles.append(
+            RoleRecommendation(
+                role=slot.role,
+                hours_per_week=Decimal(str(slot.hours)),
+                assigned=chosen,
+                candidates=candidates,
+            )
+        )
+        if chosen is None:
+            recommendation.unfilled_roles.append(slot.role)
+            warnings.append(
+                f"No one with {slot.hours:g}h available fits {slot.role} on {slot.project_name}"
+            )
+
+    return AssignmentRecommendationResponse(
+        projects=list(by_project.values()),
+        total_score=round(sum(c.score for c in assigned if c is not None), 4),
+        warnings=warnings,
+    )
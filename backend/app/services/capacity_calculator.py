@@ -2,6 +2,7 @@
 Capacity calculation and conflict detection service.
 """
 
+import logging
 from datetime import date, timedelta
 from decimal import Decimal
 from typing import Any
@@ -9,6 +10,8 @@ from typing import Any
 from app.db.supabase_client import get_client
 from app.models.schemas import CapacitySnapshot, CapacityConflict
 
+logger = logging.getLogger(__name__)
+
 
 def get_week_start(d: date | None = None) -> date:
     """Get Monday of the week for given date."""
@@ -63,9 +66,6 @@ async def calculate_weekly_capacity(
     )
 
     total_capacity = Decimal(str(member["weekly_capacity_hours"] or 40))
-    available_hours = total_capacity - allocated_hours
-    utilization_pct = (allocated_hours / total_capacity * 100) if total_capacity > 0 else Decimal(0)
-    overallocated = allocated_hours > total_capacity
 
     # Upsert capacity snapshot
     snapshot_data = {
@@ -98,9 +98,37 @@ async def calculate_weekly_capacity(
 
     snapshot = result.data[0] if result.data else snapshot_data
 
+    return build_capacity_snapshot(
+        member, allocated_hours, week_start_date, snapshot.get("id", "")
+    )
+
+
+def build_capacity_snapshot(
+    member: dict[str, Any],
+    allocated_hours: Decimal,
+    week_start_date: date,
+    snapshot_id: str = "",
+) -> CapacitySnapshot:
+    """
+    Build a snapshot from a team member row and their allocated hours.
+
+    Args:
+        member: Team member row (id, full_name, role, weekly_capacity_hours)
+        allocated_hours: Sum of active assignment hours for the week
+        week_start_date: Monday of the week
+        snapshot_id: Stored snapshot id, if persisted
+
+    Returns:
+        CapacitySnapshot with derived available/utilization/overallocated
+    """
+    total_capacity = Decimal(str(member["weekly_capacity_hours"] or 40))
+    available_hours = total_capacity - allocated_hours
+    utilization_pct = (allocated_hours / total_capacity * 100) if total_capacity > 0 else Decimal(0)
+    overallocated = allocated_hours > total_capacity
+
     return CapacitySnapshot(
-        id=snapshot.get("id", ""),
-        team_member_id=team_member_id,
+        id=snapshot_id,
+        team_member_id=member["id"],
         full_name=member["full_name"],
         role=member["role"],
         week_start_date=week_start_date,
@@ -136,7 +164,7 @@ async def get_current_week_capacity() -> list[CapacitySnapshot]:
             snapshot = await calculate_weekly_capacity(member["id"], week_start)
             snapshots.append(snapshot)
         except Exception as e:
-            print(f"Error calculating capacity for {member['full_name']}: {e}")
+            logger.warning("Error calculating capacity for %s: %s", member["full_name"], e)
 
     # Sort by utilization descending
     snapshots.sort(key=lambda s: s.utilization_pct, reverse=True)
@@ -171,9 +199,7 @@ async def detect_capacity_conflicts(
     snapshots = await get_current_week_capacity()
 
     for snapshot in snapshots:
-        # Check overallocation
         if snapshot.overallocated:
-            # Get assignments for this member
             assignments_response = (
                 client.table("assignments")
                 .select("*, projects(name, priority, deadline)")
@@ -181,68 +207,103 @@ async def detect_capacity_conflicts(
                 .eq("status", "active")
                 .execute()
             )
+            conflicts.extend(build_member_conflicts(snapshot, assignments_response.data))
 
-            affected_projects = [
-                a["projects"]["name"] for a in assignments_response.data if a.get("projects")
-            ]
-
-            overage = float(snapshot.allocated_hours - snapshot.total_capacity_hours)
-
-            # Determine severity
-            if overage > 10:
-                severity = "high"
-            elif overage > 5:
-                severity = "medium"
-            else:
-                severity = "low"
-
-            # Find project with most hours to suggest reduction
-            assignments_sorted = sorted(
-                assignments_response.data,
-                key=lambda a: a.get("hours_this_week", 0),
-                reverse=True,
-            )
-            suggested_project = (
-                assignments_sorted[0]["projects"]["name"]
-                if assignments_sorted and assignments_sorted[0].get("projects")
-                else None
-            )
+    return conflicts
 
-            conflicts.append(
-                CapacityConflict(
-                    type="overallocation",
-                    team_member_id=snapshot.team_member_id,
-                    team_member_name=snapshot.full_name,
-                    affected_projects=affected_projects,
-                    severity=severity,
-                    description=f"{snapshot.full_name} is {overage:.0f}h overallocated this week",
-                    suggested_resolution=f"Reduce hours on: {suggested_project}"
-                    if suggested_project
-                    else None,
-                )
-            )
 
-            # Check for multiple urgent projects
-            urgent_projects = [
-                a for a in assignments_response.data
-                if a.get("projects", {}).get("priority") == "urgent"
-            ]
-
-            if len(urgent_projects) > 1:
-                conflicts.append(
-                    CapacityConflict(
-                        type="timeline-conflict",
-                        team_member_id=snapshot.team_member_id,
-                        team_member_name=snapshot.full_name,
-                        affected_projects=[
-                            p["projects"]["name"]
-                            for p in urgent_projects
-                            if p.get("projects")
-                        ],
-                        severity="high",
-                        description=f"{snapshot.full_name} has {len(urgent_projects)} urgent projects with overlapping deadlines",
-                        suggested_resolution=None,
-                    )
-                )
+def build_member_conflicts(
+    snapshot: CapacitySnapshot,
+    assignments: list[dict[str, Any]],
+) -> list[CapacityConflict]:
+    """
+    Build conflicts for a member from their snapshot and active assignments.
+
+    Args:
+        snapshot: Capacity snapshot for the team member
+        assignments: Active assignment rows with embedded ``projects`` data
+
+    Returns:
+        List of CapacityConflict objects (empty if not overallocated)
+    """
+    conflicts: list[CapacityConflict] = []
+
+    if not snapshot.overallocated:
+        return conflicts
+
+    affected_projects = [
+        a["projects"]["name"] for a in assignments if a.get("projects")
+    ]
+
+    overage = float(snapshot.allocated_hours - snapshot.total_capacity_hours)
+
+    # Determine severity
+    if overage > 10:
+        severity = "high"
+    elif overage > 5:
+        severity = "medium"
+    else:
+        severity = "low"
+
+    # Find project with most hours to suggest reduction
+    assignments_sorted = sorted(
+        assignments,
+        key=lambda a: a.get("hours_this_week", 0),
+        reverse=True,
+    )
+    suggested_project = (
+        assignments_sorted[0]["projects"]["name"]
+        if assignments_sorted and assignments_sorted[0].get("projects")
+        else None
+    )
+
+    conflicts.append(
+        CapacityConflict(
+            type="overallocation",
+            team_member_id=snapshot.team_member_id,
+            team_member_name=snapshot.full_name,
+            affected_projects=affected_projects,
+            severity=severity,
+            description=f"{snapshot.full_name} is {overage:.0f}h overallocated this week",
+            suggested_resolution=f"Reduce hours on: {suggested_project}"
+            if suggested_project
+            else None,
+        )
+    )
+
+    # Check for multiple urgent projects
+    urgent_projects = [
+        a for a in assignments
+        if a.get("projects", {}).get("priority") == "urgent"
+    ]
+
+    if len(urgent_projects) > 1:
+        conflicts.append(
+            CapacityConflict(
+                type="timeline-conflict",
+                team_member_id=snapshot.team_member_id,
+                team_member_name=snapshot.full_name,
+                affected_projects=[
+                    p["projects"]["name"]
+                    for p in urgent_projects
+                    if p.get("projects")
+                ],
+                severity="high",
+                description=f"{snapshot.full_name} has {len(urgent_projects)} urgent projects with overlapping deadlines",
+                suggested_resolution=None,
+            )
+        )
 
     return conflicts
+
+
+def diff_conflicts(
+    previous: list[CapacityConflict],
+    current: list[CapacityConflict],
+) -> tuple[list[CapacityConflict], list[CapacityConflict]]:
+    """Split conflicts into (new, resolved) relative to the previous set."""
+    previous_keys = {c.model_dump_json(): c for c in previous}
+    current_keys = {c.model_dump_json(): c for c in current}
+    new = [c for k, c in current_keys.items() if k not in previous_keys]
+    resolved = [c for k, c in previous_keys.items() if k not in current_keys]
+    return new, resolved
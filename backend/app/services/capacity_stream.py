@@ -0,0 +1,272 @@
+"""
+Live capacity stream for dashboards.
+
+Subscribers receive a full snapshot when they connect and afterwards only
+per-member deltas and conflict changes. Changes arrive as `capacity.changed`
+events from the member-week read model, so the stream never queries
+assignments itself. Writes made on other workers arrive as member-week
+invalidations and are re-read from the read model.
+"""
+
+import asyncio
+import json
+from datetime import date
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.schemas import CapacitySnapshot, CapacityConflict
+from app.services.capacity_calculator import diff_conflicts, get_week_start
+from app.services.events import DomainEvent, event_stream
+from app.services.invalidation import MEMBER_WEEKS, Invalidation, invalidation_bus
+from app.services.member_weeks import conflicts_from_row, member_weeks, snapshot_from_row
+
+
+# Events buffered per subscriber before it is considered slow
+SUBSCRIBER_QUEUE_SIZE = 64
+
+
+class Subscription:
+    """
+    A single stream subscriber with a bounded event queue.
+
+    When the queue fills up the pending deltas are dropped and the subscriber
+    is flagged for a resync, so slow consumers cost a fixed amount of memory
+    and catch up with one fresh snapshot instead of a backlog of deltas.
+    """
+
+    def __init__(self, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize)
+        self.needs_resync = False
+
+    def offer(self, event: dict[str, Any]) -> None:
+        """Queue an event without blocking the publisher."""
+        if self.needs_resync:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.needs_resync = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+
+
+class CapacityBroadcaster:
+    """
+    Fan-out of capacity changes to all connected subscribers.
+
+    The broadcaster keeps the last published snapshot and conflicts for every
+    member of the current week, so deltas are computed once per change no
+    matter how many subscribers are connected. State is only maintained while
+    somebody is listening.
+    """
+
+    def __init__(self):
+        self._subscribers: set[Subscription] = set()
+        self._lock = asyncio.Lock()
+        self._week_start: date | None = None
+        self._snapshots: dict[str, CapacitySnapshot] = {}
+        self._conflicts: dict[str, list[CapacityConflict]] = {}
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def subscribe(self) -> Subscription:
+        """Register a subscriber and queue the initial snapshot for it."""
+        async with self._lock:
+            if self._week_start != get_week_start():
+                await self._load_state()
+
+            subscription = Subscription()
+            subscription.offer(self.snapshot_event())
+            self._subscribers.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber, dropping cached state once nobody listens."""
+        self._subscribers.discard(subscription)
+        if not self._subscribers:
+            self._week_start = None
+            self._snapshots.clear()
+            self._conflicts.clear()
+
+    async def next_event(
+        self,
+        subscription: Subscription,
+        timeout: float,
+    ) -> dict[str, Any] | None:
+        """
+        Wait for the next event for a subscriber.
+
+        Returns None if nothing arrived within the timeout, so callers can
+        send keep-alives.
+        """
+        if subscription.needs_resync:
+            subscription.needs_resync = False
+            return self.snapshot_event()
+
+        try:
+            return await asyncio.wait_for(subscription.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def snapshot_event(self) -> dict[str, Any]:
+        """Build a full snapshot event from the cached state."""
+        members = sorted(
+            self._snapshots.values(),
+            key=lambda s: s.utilization_pct,
+            reverse=True,
+        )
+        return {
+            "event": "snapshot",
+            "week_start": self._week_start,
+            "members": members,
+            "conflicts": [c for cs in self._conflicts.values() for c in cs],
+        }
+
+    async def publish_member_changes(
+        self,
+        team_member_ids: list[str],
+        rows: list[dict[str, Any]],
+    ) -> None:
+        """
+        Push deltas for re-projected members to all subscribers.
+
+        Args:
+            team_member_ids: Members whose assignments changed
+            rows: Their fresh read model rows; members without a row are
+                no longer active and are removed
+        """
+        if not self._subscribers:
+            return
+
+        async with self._lock:
+            if self._week_start != get_week_start():
+                # Week rolled over: everyone gets a fresh snapshot
+                await self._load_state()
+                self._broadcast(self.snapshot_event())
+                return
+
+            known = {r["team_member_id"]: r for r in rows}
+            member_deltas = []
+            added: list[CapacityConflict] = []
+            resolved: list[CapacityConflict] = []
+
+            for team_member_id in dict.fromkeys(team_member_ids):
+                row = known.get(team_member_id)
+                snapshot = snapshot_from_row(row) if row is not None else None
+
+                previous = self._snapshots.get(team_member_id)
+                if snapshot is None:
+                    self._snapshots.pop(team_member_id, None)
+                    conflicts = []
+                    if previous is not None:
+                        member_deltas.append(
+                            {"team_member_id": team_member_id, "removed": True}
+                        )
+                else:
+                    self._snapshots[team_member_id] = snapshot
+                    conflicts = conflicts_from_row(row)
+                    delta = _member_delta(previous, snapshot)
+                    if delta:
+                        member_deltas.append(delta)
+
+                new, gone = diff_conflicts(
+                    self._conflicts.get(team_member_id, []), conflicts
+                )
+                added.extend(new)
+                resolved.extend(gone)
+                if conflicts:
+                    self._conflicts[team_member_id] = conflicts
+                else:
+                    self._conflicts.pop(team_member_id, None)
+
+            if member_deltas or added or resolved:
+                self._broadcast(
+                    {
+                        "event": "delta",
+                        "week_start": self._week_start,
+                        "members": member_deltas,
+                        "conflicts": {"added": added, "resolved": resolved},
+                    }
+                )
+
+    async def _load_state(self) -> None:
+        """Load the full current-week state from the database."""
+        self._week_start = get_week_start()
+        rows = member_weeks.read_week(self._week_start)
+        self._snapshots = {r["team_member_id"]: snapshot_from_row(r) for r in rows}
+        self._conflicts = {}
+        for row in rows:
+            conflicts = conflicts_from_row(row)
+            if conflicts:
+                self._conflicts[row["team_member_id"]] = conflicts
+
+    async def handle_capacity_event(self, event: DomainEvent) -> None:
+        """Forward read model changes to subscribers."""
+        await self.publish_member_changes(
+            list(event.team_member_ids), event.payload.get("rows", [])
+        )
+
+    async def handle_invalidation(self, message: Invalidation) -> None:
+        """Catch up with member-weeks changed elsewhere."""
+        if message.local and message.keys:
+            return  # Already applied from this worker's capacity.changed event
+        if not self._subscribers:
+            return
+
+        if message.keys and message.week_start == self._week_start:
+            rows = member_weeks.read_members(list(message.keys), message.week_start)
+            await self.publish_member_changes(list(message.keys), rows)
+            return
+
+        # Whole week rebuilt, or notifications were missed: resync everyone
+        async with self._lock:
+            await self._load_state()
+            self._broadcast(self.snapshot_event())
+
+    def _broadcast(self, event: dict[str, Any]) -> None:
+        for subscription in self._subscribers:
+            subscription.offer(event)
+
+
+def _member_delta(
+    previous: CapacitySnapshot | None,
+    current: CapacitySnapshot,
+) -> dict[str, Any] | None:
+    """Return the changed fields for a member, or None if nothing changed."""
+    if (
+        previous is not None
+        and previous.allocated_hours == current.allocated_hours
+        and previous.total_capacity_hours == current.total_capacity_hours
+    ):
+        return None
+
+    delta = current.model_dump(
+        mode="json",
+        include={
+            "team_member_id",
+            "full_name",
+            "allocated_hours",
+            "available_hours",
+            "utilization_pct",
+            "overallocated",
+        },
+    )
+    delta["overallocated_changed"] = (
+        previous is None or previous.overallocated != current.overallocated
+    )
+    return delta
+
+
+def format_sse(event: dict[str, Any]) -> str:
+    """Encode an event as a server-sent events frame."""
+    payload = jsonable_encoder({k: v for k, v in event.items() if k != "event"})
+    return f"event: {event['event']}\ndata: {json.dumps(payload)}\n\n"
+
+
+# Shared broadcaster for this process
+capacity_broadcaster = CapacityBroadcaster()
+event_stream.subscribe("capacity.", capacity_broadcaster.handle_capacity_event)
+invalidation_bus.subscribe(MEMBER_WEEKS, capacity_broadcaster.handle_invalidation)
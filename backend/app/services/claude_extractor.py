@@ -1,15 +1,103 @@
 """
 Claude AI integration for transcript extraction.
+
+Extraction runs as a cascade: the transcript goes to a fast model first and
+is escalated to the full model only when the fast model's answer is not
+trustworthy (invalid JSON or schema, low overall confidence, or any
+low-confidence item). Short, clear stand-ups finish on the fast model; hard
+meetings still get the full model. An API error from the fast model (say a
+retired model id, or an overloaded endpoint) also falls back to the full
+model; rate limits do not, since the full model shares the budget.
 """
 
 import json
-from anthropic import Anthropic
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from app import deadlines
 from app.config import settings
+from app.container import services
 from app.models.schemas import TranscriptExtractionSchema
+from app.services.model_scheduler import (
+    ModelBusyError,
+    Priority,
+    estimate_tokens,
+    model_scheduler,
+)
+from app.telemetry.metrics import (
+    record_model_call,
+    record_model_escalation,
+    record_model_response,
+    record_model_retry,
+)
+
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
+
+logger = logging.getLogger(__name__)
+
+# Model that has the final say on transcript extraction
+EXTRACTION_MODEL = settings.extraction_model
+
+# Model tried first; empty disables the cascade
+FAST_EXTRACTION_MODEL = settings.extraction_fast_model
+
+# Output token cap for an extraction (reserved in full until usage is known)
+EXTRACTION_MAX_TOKENS = 4000
+
+# Seconds to hold model calls after a 429 that did not say how long
+DEFAULT_RATE_LIMIT_BACKOFF_SECONDS = 10.0
+
+
+def create_anthropic_client() -> "AsyncAnthropic":
+    """
+    Build the Anthropic client (the request hook counts SDK retries).
+
+    The async client keeps concurrent extractions from blocking the event
+    loop. The SDK is imported here, on first use or during prewarm, because
+    importing it dominates the app's import time.
+    """
+    from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+    return AsyncAnthropic(
+        api_key=settings.anthropic_api_key,
+        base_url=settings.anthropic_base_url,
+        http_client=DefaultAsyncHttpxClient(
+            event_hooks={
+                "request": [record_model_retry],
+                "response": [record_model_response],
+            }
+        ),
+    )
+
+
+async def _warm_anthropic_client(client: "AsyncAnthropic") -> None:
+    """Open the HTTP connection with a token-free models request."""
+    await client.with_options(max_retries=0).models.list(limit=1)
+
+
+services.register(
+    "anthropic",
+    create_anthropic_client,
+    warm=_warm_anthropic_client,
+    close=lambda client: client.close(),
+)
 
 
-# Initialize Anthropic client
-client = Anthropic(api_key=settings.anthropic_api_key)
+def get_anthropic_client() -> "AsyncAnthropic":
+    """Get the shared Anthropic client, creating it on first use."""
+    return services.get("anthropic")
+
+
+def _retry_after(error: Exception) -> float:
+    """Seconds the API asked us to wait, from a rate limit error's headers."""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return DEFAULT_RATE_LIMIT_BACKOFF_SECONDS
 
 
 EXTRACTION_SYSTEM_PROMPT = """You are an AI traffic manager analyzing Alt/Shift PR agency WIP meeting transcripts.
@@ -88,24 +176,119 @@ OUTPUT FORMAT: Return ONLY valid JSON matching this schema:
 }"""
 
 
+@dataclass
+class Extraction:
+    """Extracted data and the model that produced it."""
+
+    data: TranscriptExtractionSchema
+    model: str
+    # Why the fast model's answer was not used, if it was not
+    escalation_reason: str | None = None
+
+
+def escalation_reason(data: TranscriptExtractionSchema) -> str | None:
+    """
+    Decide whether a fast model's extraction needs the full model.
+
+    Returns:
+        "low_confidence" or "low_item_confidence", or None to accept it
+    """
+    if data.overall_confidence < settings.extraction_escalation_confidence:
+        return "low_confidence"
+    items = [*data.projects, *data.assignments, *data.capacity_signals, *data.deadlines]
+    if any(i.confidence < settings.extraction_escalation_item_confidence for i in items):
+        return "low_item_confidence"
+    return None
+
+
+def parse_extraction(json_text: str) -> TranscriptExtractionSchema:
+    """
+    Parse a model response into the extraction schema.
+
+    Raises:
+        ValueError: If the response is not valid JSON or does not match the schema
+    """
+    # Strip markdown code fences if present
+    clean_json = json_text
+    if json_text.startswith("```"):
+        # Remove ```json and ``` markers
+        lines = json_text.split("\n")
+        clean_json = "\n".join(lines[1:-1] if lines[-1] == "```" else lines[1:])
+
+    clean_json = clean_json.strip()
+
+    # Parse and validate (pydantic's ValidationError is a ValueError)
+    try:
+        extracted_data = json.loads(clean_json)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Failed to parse Claude response as JSON: {e}")
+
+    return TranscriptExtractionSchema(**extracted_data)
+
+
+async def _request_extraction(
+    model: str, user_prompt: str, priority: Priority
+) -> TranscriptExtractionSchema:
+    """Send one extraction request through the model scheduler and parse it."""
+    async with model_scheduler.slot(
+        priority,
+        estimate_tokens(EXTRACTION_SYSTEM_PROMPT, user_prompt),
+        EXTRACTION_MAX_TOKENS,
+    ) as grant:
+        client = get_anthropic_client()
+        start = time.perf_counter()
+        try:
+            async with deadlines.cancel_at_deadline("model"):
+                response = await client.messages.create(
+                    model=model,
+                    max_tokens=EXTRACTION_MAX_TOKENS,
+                    system=EXTRACTION_SYSTEM_PROMPT,
+                    messages=[{"role": "user", "content": user_prompt}],
+                )
+        except Exception as e:
+            record_model_call(model, time.perf_counter() - start, outcome=type(e).__name__)
+            from anthropic import RateLimitError
+
+            if isinstance(e, RateLimitError):
+                retry_after = _retry_after(e)
+                model_scheduler.backoff(retry_after)
+                raise ModelBusyError(429, retry_after, "Model API rate limit reached") from e
+            raise
+        grant.usage = response.usage
+    record_model_call(model, time.perf_counter() - start, response.usage)
+
+    return parse_extraction(response.content[0].text)
+
+
 async def extract_from_transcript(
     transcript_text: str,
     meeting_date: str | None = None,
     meeting_type: str = "wip",
-) -> TranscriptExtractionSchema:
+    priority: Priority = "interactive",
+) -> Extraction:
     """
     Extract structured data from meeting transcript using Claude.
 
+    Tries FAST_EXTRACTION_MODEL first and escalates to EXTRACTION_MODEL if
+    its answer is invalid or not confident enough, or if the call failed
+    with an API error other than a rate limit. Every call goes through
+    the model scheduler, which holds it until the per-minute token budget
+    allows and serves interactive calls first.
+
     Args:
         transcript_text: Raw meeting transcript text
         meeting_date: Optional date of the meeting (ISO format)
         meeting_type: Type of meeting (wip, planning, client-debrief)
+        priority: "interactive" for a user waiting on the result,
+            "batch" for backfills
 
     Returns:
-        TranscriptExtractionSchema with extracted data
+        Extraction with the extracted data and the model that produced it
 
     Raises:
-        ValueError: If JSON parsing fails
+        ValueError: If the final model's response fails parsing or validation
+        ModelBusyError: If a call was shed or the API rate limited it
+        DeadlineExceeded: If the request's time budget ran out first
     """
     user_prompt = f"""Analyze this WIP meeting transcript and extract all structured information.
 
@@ -127,29 +310,24 @@ Extract:
 Return ONLY valid JSON. Use confidence scores to indicate certainty.
 Context quotes MUST be exact excerpts from the transcript."""
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=4000,
-        system=EXTRACTION_SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": user_prompt}],
-    )
-
-    # Extract text from response
-    json_text = response.content[0].text
-
-    # Strip markdown code fences if present
-    clean_json = json_text
-    if json_text.startswith("```"):
-        # Remove ```json and ``` markers
-        lines = json_text.split("\n")
-        clean_json = "\n".join(lines[1:-1] if lines[-1] == "```" else lines[1:])
-
-    clean_json = clean_json.strip()
+    reason = None
+    if FAST_EXTRACTION_MODEL and FAST_EXTRACTION_MODEL != EXTRACTION_MODEL:
+        from anthropic import APIError
 
-    # Parse and validate
-    try:
-        extracted_data = json.loads(clean_json)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Failed to parse Claude response as JSON: {e}")
+        try:
+            data = await _request_extraction(FAST_EXTRACTION_MODEL, user_prompt, priority)
+        except ValueError as e:
+            logger.info("Fast extraction invalid, escalating: %s", e)
+            reason = "invalid"
+        except APIError as e:
+            logger.warning("Fast extraction failed, escalating: %s", e)
+            reason = "api_error"
+        else:
+            reason = escalation_reason(data)
+            if reason is None:
+                record_model_escalation(FAST_EXTRACTION_MODEL, "accepted")
+                return Extraction(data, FAST_EXTRACTION_MODEL)
+        record_model_escalation(FAST_EXTRACTION_MODEL, reason)
 
-    return TranscriptExtractionSchema(**extracted_data)
+    data = await _request_extraction(EXTRACTION_MODEL, user_prompt, priority)
+    return Extraction(data, EXTRACTION_MODEL, reason)
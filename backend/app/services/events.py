@@ -0,0 +1,98 @@
+"""
+In-process domain event stream.
+
+Routes publish an event after a write commits; subscribers react to it in the
+order they subscribed. Handlers are awaited before `publish` returns, so by
+the time a route responds every projection of the change (the member-week
+read model, the live capacity stream) is already up to date and a follow-up
+read sees its own write.
+
+Event types are dotted names (`assignment.created`, `capacity.changed`) and
+subscribers match on a prefix.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+from app import deadlines
+from app.telemetry.metrics import record_event_handler_error
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DomainEvent:
+    """A committed change to one or more team members' data."""
+
+    type: str
+    team_member_ids: tuple[str, ...]
+    payload: dict[str, Any] = field(default_factory=dict)
+    sequence: int = 0
+    occurred_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+EventHandler = Callable[[DomainEvent], Awaitable[None]]
+
+
+class EventStream:
+    """Ordered fan-out of domain events to prefix subscribers."""
+
+    def __init__(self):
+        self._handlers: list[tuple[str, EventHandler]] = []
+        self._sequence = 0
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the last published event."""
+        return self._sequence
+
+    def subscribe(self, prefix: str, handler: EventHandler) -> None:
+        """Call `handler` for every event whose type starts with `prefix`."""
+        self._handlers.append((prefix, handler))
+
+    async def publish(
+        self,
+        event_type: str,
+        team_member_ids: list[str],
+        **payload: Any,
+    ) -> DomainEvent:
+        """
+        Publish an event and wait for its subscribers.
+
+        A failing handler is logged and skipped so one broken projection
+        cannot fail the write that has already been committed. Handlers run
+        without the request's deadline.
+
+        Args:
+            event_type: Dotted event name
+            team_member_ids: Members whose data changed (deduplicated)
+            **payload: Extra event data for subscribers
+
+        Returns:
+            The published DomainEvent
+        """
+        self._sequence += 1
+        event = DomainEvent(
+            type=event_type,
+            team_member_ids=tuple(dict.fromkeys(team_member_ids)),
+            payload=payload,
+            sequence=self._sequence,
+        )
+        # The write has committed, so its projections finish even past the
+        # request's deadline
+        with deadlines.unbounded():
+            for prefix, handler in list(self._handlers):
+                if event.type.startswith(prefix):
+                    try:
+                        await handler(event)
+                    except Exception:
+                        name = getattr(handler, "__qualname__", repr(handler))
+                        logger.exception("Error handling %s event in %s", event.type, name)
+                        record_event_handler_error(event.type, name)
+        return event
+
+
+# Shared event stream for this process
+event_stream = EventStream()
@@ -0,0 +1,400 @@
+"""
+Streaming bulk exports for spreadsheets and finance tooling.
+
+Each export is a generator pipeline: paginated database reads yield one page
+of rows at a time, each page is shaped into flat export rows and encoded,
+and the encoded bytes are handed to the response before the next page is
+read. Memory stays at roughly one page however many rows are exported.
+
+Formats:
+    csv      header row, then one line per row
+    parquet  one row group per PARQUET_ROW_GROUP_ROWS rows; needs `pyarrow`
+             (optional dependency; without it the endpoints return 501)
+
+Exports:
+    assignments  one row per assignment, with project and member names
+    capacity     one row per member-week from capacity snapshot history
+    forecast     one row per member per forecast week
+"""
+
+import csv
+import importlib.util
+import io
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Iterator
+
+from app.db.supabase_client import get_client, iter_pages
+from app.services.capacity_calculator import get_week_start
+from app.services.member_weeks import member_weeks
+from app.services.variance import forecast_member, load_actuals
+
+
+# Rows per Parquet row group (pages are buffered up to this size)
+PARQUET_ROW_GROUP_ROWS = 10_000
+
+# Longest forecast export, in weeks
+MAX_FORECAST_WEEKS = 104
+
+# Forecast weeks exported when no end date is given
+DEFAULT_FORECAST_WEEKS = 4
+
+# Column kinds: string, float, int, date, bool
+ASSIGNMENT_COLUMNS = [
+    ("id", "string"),
+    ("project_id", "string"),
+    ("project_name", "string"),
+    ("team_member_id", "string"),
+    ("team_member_name", "string"),
+    ("role_on_project", "string"),
+    ("status", "string"),
+    ("estimated_hours", "float"),
+    ("hours_this_week", "float"),
+    ("hours_consumed", "float"),
+    ("confidence_score", "float"),
+    ("start_date", "date"),
+    ("end_date", "date"),
+]
+
+CAPACITY_COLUMNS = [
+    ("week_start_date", "date"),
+    ("team_member_id", "string"),
+    ("full_name", "string"),
+    ("role", "string"),
+    ("total_capacity_hours", "float"),
+    ("allocated_hours", "float"),
+    ("available_hours", "float"),
+    ("utilization_pct", "float"),
+    ("overallocated", "bool"),
+]
+
+FORECAST_COLUMNS = [
+    ("week_start", "date"),
+    ("team_member_id", "string"),
+    ("full_name", "string"),
+    ("role", "string"),
+    ("capacity", "float"),
+    ("planned", "float"),
+    ("allocated", "float"),
+    ("available", "float"),
+    ("utilization_pct", "float"),
+    ("overallocated", "bool"),
+]
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "parquet": "application/vnd.apache.parquet"}
+
+
+@dataclass
+class ExportFilters:
+    """Filters shared by all exports (each export applies the ones it can)."""
+
+    date_from: date | None = None
+    date_to: date | None = None
+    team_member_id: str | None = None
+    project_id: str | None = None
+    status: str | None = None  # Assignments only
+
+    def validate(self) -> None:
+        """
+        Raises:
+            ValueError: If the date range is inverted
+        """
+        if self.date_from and self.date_to and self.date_from > self.date_to:
+            raise ValueError("date_from must be on or before date_to")
+
+
+@dataclass
+class Export:
+    """A named export: its columns and a lazy stream of row pages."""
+
+    name: str
+    columns: list[tuple[str, str]]
+    pages: Iterator[list[dict[str, Any]]]
+
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _float(value: Any) -> float | None:
+    return None if value is None or value == "" else float(value)
+
+
+def _date(value: Any) -> date | None:
+    if value is None or value == "":
+        return None
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _project_member_ids(project_id: str, client) -> list[str]:
+    """Members with an active assignment on the project."""
+    response = (
+        client.table("assignments")
+        .select("team_member_id")
+        .eq("project_id", project_id)
+        .eq("status", "active")
+        .execute()
+    )
+    return list(dict.fromkeys(r["team_member_id"] for r in response.data))
+
+
+# ----------------------------------------------------------------------
+# Sources
+# ----------------------------------------------------------------------
+
+
+def export_assignments(filters: ExportFilters, client=None) -> Export:
+    """
+    Assignments, optionally overlapping a date range.
+
+    Member, project and status filter in the database. The date range keeps
+    assignments whose [start_date, end_date] overlaps it, with open ends
+    treated as unbounded; because either date may be null it is applied to
+    each page as it streams.
+    """
+    client = client or get_client()
+
+    def build_query():
+        query = client.table("assignments").select(
+            "id, project_id, team_member_id, role_on_project, status, estimated_hours, "
+            "hours_this_week, hours_consumed, confidence_score, start_date, end_date, "
+            "projects(name), team_members(full_name)"
+        )
+        if filters.team_member_id:
+            query = query.eq("team_member_id", filters.team_member_id)
+        if filters.project_id:
+            query = query.eq("project_id", filters.project_id)
+        if filters.status:
+            query = query.eq("status", filters.status)
+        return query.order("id")
+
+    def overlaps(a: dict[str, Any]) -> bool:
+        start, end = _date(a.get("start_date")), _date(a.get("end_date"))
+        if filters.date_to and start and start > filters.date_to:
+            return False
+        if filters.date_from and end and end < filters.date_from:
+            return False
+        return True
+
+    def pages():
+        for page in iter_pages(build_query):
+            rows = [
+                {
+                    "id": a["id"],
+                    "project_id": a["project_id"],
+                    "project_name": (a.get("projects") or {}).get("name"),
+                    "team_member_id": a["team_member_id"],
+                    "team_member_name": (a.get("team_members") or {}).get("full_name"),
+                    "role_on_project": a["role_on_project"],
+                    "status": a["status"],
+                    "estimated_hours": _float(a["estimated_hours"]),
+                    "hours_this_week": _float(a["hours_this_week"]),
+                    "hours_consumed": _float(a["hours_consumed"]),
+                    "confidence_score": _float(a["confidence_score"]),
+                    "start_date": _date(a.get("start_date")),
+                    "end_date": _date(a.get("end_date")),
+                }
+                for a in page
+                if overlaps(a)
+            ]
+            if rows:
+                yield rows
+
+    return Export("assignments", ASSIGNMENT_COLUMNS, pages())
+
+
+def export_capacity(filters: ExportFilters, client=None) -> Export:
+    """
+    Capacity snapshot history by member-week, oldest week first.
+
+    The date range selects weeks by week_start_date. A project filter keeps
+    members currently assigned to the project.
+    """
+    client = client or get_client()
+    member_ids = (
+        _project_member_ids(filters.project_id, client) if filters.project_id else None
+    )
+
+    def build_query():
+        query = client.table("capacity_snapshots").select(
+            "id, team_member_id, week_start_date, total_capacity_hours, allocated_hours, "
+            "team_members(full_name, role)"
+        )
+        if filters.team_member_id:
+            query = query.eq("team_member_id", filters.team_member_id)
+        if member_ids is not None:
+            query = query.in_("team_member_id", member_ids)
+        if filters.date_from:
+            query = query.gte("week_start_date", get_week_start(filters.date_from).isoformat())
+        if filters.date_to:
+            query = query.lte("week_start_date", filters.date_to.isoformat())
+        return query.order("week_start_date").order("id")
+
+    def pages():
+        if member_ids == []:
+            return
+        for page in iter_pages(build_query):
+            rows = []
+            for s in page:
+                member = s.get("team_members") or {}
+                capacity = _float(s["total_capacity_hours"]) or 0.0
+                allocated = _float(s["allocated_hours"]) or 0.0
+                rows.append(
+                    {
+                        "week_start_date": _date(s["week_start_date"]),
+                        "team_member_id": s["team_member_id"],
+                        "full_name": member.get("full_name"),
+                        "role": member.get("role"),
+                        "total_capacity_hours": capacity,
+                        "allocated_hours": allocated,
+                        "available_hours": round(capacity - allocated, 2),
+                        "utilization_pct": round(allocated / capacity * 100, 2) if capacity else 0.0,
+                        "overallocated": allocated > capacity,
+                    }
+                )
+            yield rows
+
+    return Export("capacity", CAPACITY_COLUMNS, pages())
+
+
+def export_forecast(filters: ExportFilters, use_actuals: bool = True, client=None) -> Export:
+    """
+    Forecast by member and week, as served by /api/capacity/forecast.
+
+    The date range selects forecast weeks (from the current week onward,
+    DEFAULT_FORECAST_WEEKS if no end is given). The member rows for one week
+    are computed once and repeated per week, so memory is bounded by team
+    size rather than by the number of rows exported.
+
+    Raises:
+        ValueError: If the range spans more than MAX_FORECAST_WEEKS
+    """
+    client = client or get_client()
+    first = get_week_start()
+    if filters.date_from:
+        first = max(first, get_week_start(filters.date_from))
+    last = (
+        get_week_start(filters.date_to)
+        if filters.date_to
+        else first + timedelta(weeks=DEFAULT_FORECAST_WEEKS - 1)
+    )
+    weeks = (last - first).days // 7 + 1
+    if weeks > MAX_FORECAST_WEEKS:
+        raise ValueError(f"Forecast exports cover at most {MAX_FORECAST_WEEKS} weeks")
+
+    def pages():
+        if weeks <= 0:
+            return
+        rows = member_weeks.read_week(client=client)
+        if filters.team_member_id:
+            rows = [r for r in rows if r["team_member_id"] == filters.team_member_id]
+        if filters.project_id:
+            rows = [
+                r
+                for r in rows
+                if any(p["project_id"] == filters.project_id for p in r["projects"])
+            ]
+        actuals = load_actuals(client=client) if use_actuals else None
+        members = [forecast_member(row, actuals) for row in rows]
+        for week in range(weeks):
+            week_start = first + timedelta(weeks=week)
+            yield [{"week_start": week_start, **m} for m in members]
+
+    return Export("forecast", FORECAST_COLUMNS, pages())
+
+
+# ----------------------------------------------------------------------
+# Encoders
+# ----------------------------------------------------------------------
+
+
+def stream_csv(export: Export) -> Iterator[bytes]:
+    """Encode an export as CSV, one chunk per page."""
+    names = [name for name, _ in export.columns]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=names, extrasaction="ignore")
+    writer.writeheader()
+    for page in export.pages:
+        writer.writerows(page)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink:
+    """Write-only file the Parquet writer fills; drained after each row group."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_parquet(export: Export) -> Iterator[bytes]:
+    """
+    Encode an export as Parquet, yielding each row group as it is written.
+
+    Raises:
+        RuntimeError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet exports require pyarrow (pip install pyarrow)") from e
+
+    types = {
+        "string": pa.string(),
+        "float": pa.float64(),
+        "int": pa.int64(),
+        "date": pa.date32(),
+        "bool": pa.bool_(),
+    }
+    schema = pa.schema([(name, types[kind]) for name, kind in export.columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    pending: list[dict[str, Any]] = []
+    for page in export.pages:
+        pending.extend(page)
+        if len(pending) >= PARQUET_ROW_GROUP_ROWS:
+            writer.write_table(pa.Table.from_pylist(pending, schema=schema))
+            pending = []
+            yield sink.drain()
+    if pending:
+        writer.write_table(pa.Table.from_pylist(pending, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+def encode(export: Export, file_format: str) -> Iterator[bytes]:
+    """Stream an export in `file_format` (csv or parquet)."""
+    return stream_parquet(export) if file_format == "parquet" else stream_csv(export)
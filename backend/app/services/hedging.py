@@ -0,0 +1,130 @@
+"""
+Hedged reads for idempotent blocking queries.
+
+Most capacity reads finish in a few milliseconds; the slow tail is usually
+one stalled connection or a busy database worker, not expensive work. A
+hedged read runs the read in a thread and, if it has not answered after the
+read's recent p95 latency, sends one duplicate. Whichever answers first is
+returned and the other is left to finish and be discarded, so about 5% of
+reads are sent twice and the tail is cut to roughly p95 plus a typical read.
+
+No hedge is sent until a read has HEDGE_MIN_SAMPLES latencies, or when the
+request's deadline would pass before the hedge delay. Only use this for reads
+without side effects.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, TypeVar
+
+from app import deadlines
+from app.config import settings
+from app.telemetry.metrics import record_hedged_read
+
+T = TypeVar("T")
+
+
+# Recent latencies kept per read for its p95
+HEDGE_WINDOW = 200
+
+# Latencies needed before a read is hedged
+HEDGE_MIN_SAMPLES = 20
+
+# Percentile of recent latency after which the hedge is sent
+HEDGE_PERCENTILE = 0.95
+
+
+class LatencyWindow:
+    """The last HEDGE_WINDOW latencies of one read."""
+
+    def __init__(self):
+        self._samples: deque[float] = deque(maxlen=HEDGE_WINDOW)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        """Latency at quantile `q`, or None until there are enough samples."""
+        samples = sorted(self._samples)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _discard(task: asyncio.Future) -> None:
+    if not task.cancelled():
+        task.exception()  # A losing copy's error is not the caller's
+
+
+class Hedger:
+    """Runs blocking reads in threads, hedging the slow ones."""
+
+    def __init__(self, enabled: bool, min_delay: float):
+        self.enabled = enabled
+        self.min_delay = min_delay
+        self._windows: dict[str, LatencyWindow] = {}
+
+    def delay(self, name: str) -> float | None:
+        """Seconds to wait for `name` before hedging, or None to not hedge."""
+        window = self._windows.get(name)
+        p95 = window.percentile(HEDGE_PERCENTILE) if window else None
+        if p95 is None:
+            return None
+        delay = max(p95, self.min_delay)
+        left = deadlines.remaining()
+        if left is not None and delay >= left:
+            return None
+        return delay
+
+    async def run(self, name: str, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run `fn(*args)` off the event loop, hedged if enabled.
+
+        Args:
+            name: Read being run; latency is tracked per name
+            fn: Blocking, side-effect free function
+            *args: Arguments for `fn`
+
+        Returns:
+            The first answer from `fn(*args)`
+
+        Raises:
+            Exception: Whatever `fn` raised, if every copy failed
+        """
+        if not self.enabled:
+            return await asyncio.to_thread(fn, *args)
+
+        window = self._windows.setdefault(name, LatencyWindow())
+
+        def timed() -> T:
+            start = time.perf_counter()
+            result = fn(*args)
+            window.add(time.perf_counter() - start)
+            return result
+
+        delay = self.delay(name)
+        if delay is None:
+            return await asyncio.to_thread(timed)
+
+        primary = asyncio.ensure_future(asyncio.to_thread(timed))
+        primary.add_done_callback(_discard)
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        hedge = asyncio.ensure_future(asyncio.to_thread(timed))
+        hedge.add_done_callback(_discard)
+        pending = {primary, hedge}
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((task for task in done if task.exception() is None), None)
+            if winner is None and pending:
+                continue  # One copy failed; the other may still answer
+            winner = winner or done.pop()
+            record_hedged_read(name, "primary" if winner is primary else "hedge")
+            return winner.result()
+
+
+# Shared hedger for this process
+hedged_reads = Hedger(settings.hedged_reads, settings.hedge_min_delay_ms / 1000)
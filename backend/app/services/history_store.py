@@ -0,0 +1,425 @@
+"""
+Local columnar store for capacity snapshot history.
+
+Snapshot history is copied out of `capacity_snapshots` into one binary file
+per column (stdlib `array`, native byte order) with members dictionary-
+encoded to integer codes. Weekly, monthly and quarterly rollups per member,
+role and the whole team are kept current as member-weeks are added or
+replaced (only the buckets a row falls in change), so trend queries are
+dictionary lookups that never touch the primary database.
+
+Workers sharing a store directory reload it when another worker publishes a
+capacity history invalidation. Writes hold an exclusive lock on the
+directory and reload first if another process saved since this one loaded,
+so concurrent workers never overwrite each other's rows.
+
+Layout under the store directory:
+    meta.json       members dictionary, row count, save generation, last sync time
+    <column>.bin    member codes, week ordinals, capacity and allocated hours
+    rollups.json    {grain: {dimension: {key: {period: [capacity, allocated,
+                    member_weeks, overallocated_weeks]}}}}
+    .lock           held while a process writes the store
+"""
+
+import json
+import os
+import threading
+from array import array
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, single worker only
+    fcntl = None
+
+from app.config import settings
+from app.db.supabase_client import fetch_all, get_client
+from app.models.schemas import CapacitySnapshot, HistoryPoint, HistoryResponse
+from app.services.invalidation import CAPACITY_HISTORY, Invalidation, invalidation_bus
+
+
+# Column name -> array typecode
+COLUMNS = {
+    "member": "I",  # Code into the members dictionary
+    "week": "i",  # date.toordinal() of the week's Monday
+    "capacity": "d",
+    "allocated": "d",
+}
+
+GRAINS = ("weekly", "monthly", "quarterly")
+DIMENSIONS = ("team", "role", "member")
+
+STORE_VERSION = 1
+
+LOCK_FILE = ".lock"
+
+
+def period_key(grain: str, week: date) -> str:
+    """Rollup period a week belongs to (keys sort chronologically)."""
+    if grain == "weekly":
+        return week.isoformat()
+    if grain == "monthly":
+        return f"{week.year}-{week.month:02d}"
+    return f"{week.year}-Q{(week.month - 1) // 3 + 1}"
+
+
+def _round(value: float) -> Decimal:
+    return Decimal(str(round(value, 2)))
+
+
+class CapacityHistoryStore:
+    """Columnar snapshot history with precomputed rollups."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._members: list[dict[str, str]] = []
+        self._codes: dict[str, int] = {}
+        self._columns = {name: array(code) for name, code in COLUMNS.items()}
+        self._index: dict[tuple[int, int], int] = {}
+        self._rollups: dict[str, dict[str, dict[str, dict[str, list[float]]]]] = {}
+        self._period_keys: dict[int, tuple[str, ...]] = {}
+        self._generation = 0  # Saves of the store this copy was loaded from
+        self.synced_at: datetime | None = None
+
+    @property
+    def row_count(self) -> int:
+        self._ensure_loaded()
+        return len(self._columns["week"])
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+    def _read_meta(self) -> dict[str, Any] | None:
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text())
+        if meta.get("version") != STORE_VERSION:
+            return None  # Stale format; the next full sync rebuilds it
+        return meta
+
+    def _load(self) -> None:
+        meta = self._read_meta()
+        if meta is None:
+            return
+
+        rows = meta["rows"]
+        for name, code in COLUMNS.items():
+            column = array(code)
+            with open(self.path / f"{name}.bin", "rb") as f:
+                column.fromfile(f, rows)
+            self._columns[name] = column
+
+        self._members = meta["members"]
+        self._codes = {m["id"]: i for i, m in enumerate(self._members)}
+        self._index = {
+            (member, week): row
+            for row, (member, week) in enumerate(
+                zip(self._columns["member"], self._columns["week"])
+            )
+        }
+        self._rollups = json.loads((self.path / "rollups.json").read_text())
+        self._generation = meta.get("generation", 0)
+        if meta.get("synced_at"):
+            self.synced_at = datetime.fromisoformat(meta["synced_at"])
+
+    def _reset(self) -> None:
+        self._loaded = False
+        self._members = []
+        self._codes = {}
+        self._columns = {name: array(code) for name, code in COLUMNS.items()}
+        self._index = {}
+        self._rollups = {}
+        self._generation = 0
+        self.synced_at = None
+
+    def invalidate(self) -> None:
+        """Drop the in-memory copy; the next access reloads from disk."""
+        with self._lock:
+            self._reset()
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Hold the store for a write, in this process and across processes.
+
+        Reloads from disk first if the copy in memory is not the latest save.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path / LOCK_FILE, "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            meta = self._read_meta()
+            if not self._loaded or (meta or {}).get("generation", 0) != self._generation:
+                self._reset()
+                self._load()
+                self._loaded = True
+            yield
+
+    async def handle_invalidation(self, message: Invalidation) -> None:
+        """Reload after another worker rewrote the store."""
+        if not message.local:
+            self.invalidate()
+
+    def _write(self, name: str, write) -> None:
+        """Write a file atomically so readers never see a partial store."""
+        target = self.path / name
+        temporary = target.with_suffix(target.suffix + ".tmp")
+        with open(temporary, "wb") as f:
+            write(f)
+        os.replace(temporary, target)
+
+    def _save(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        for name in COLUMNS:
+            self._write(f"{name}.bin", self._columns[name].tofile)
+        self._write(
+            "rollups.json", lambda f: f.write(json.dumps(self._rollups).encode())
+        )
+        # Meta last: it records the row count the column files are read with
+        self._generation += 1
+        meta = {
+            "version": STORE_VERSION,
+            "generation": self._generation,
+            "rows": len(self._columns["week"]),
+            "members": self._members,
+            "synced_at": self.synced_at.isoformat() if self.synced_at else None,
+        }
+        self._write("meta.json", lambda f: f.write(json.dumps(meta).encode()))
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def _member_code(self, member_id: str, full_name: str | None, role: str | None) -> int:
+        code = self._codes.get(member_id)
+        if code is None:
+            code = self._codes[member_id] = len(self._members)
+            self._members.append({"id": member_id, "full_name": "", "role": ""})
+        entry = self._members[code]
+        if full_name:
+            entry["full_name"] = full_name
+        if role and role != entry["role"]:
+            # Move the member's history to the new role's rollups
+            rows = [i for i, member in enumerate(self._columns["member"]) if member == code]
+            for row in rows:
+                self._add_to_rollups(code, row, -1.0)
+            entry["role"] = role
+            for row in rows:
+                self._add_to_rollups(code, row)
+        return code
+
+    def _add_to_rollups(self, code: int, row: int, sign: float = 1.0) -> None:
+        """Add (or with sign -1, remove) one stored member-week in every rollup."""
+        week = self._columns["week"][row]
+        capacity = self._columns["capacity"][row]
+        allocated = self._columns["allocated"][row]
+        periods = self._period_keys.get(week)
+        if periods is None:
+            monday = date.fromordinal(week)
+            periods = self._period_keys[week] = tuple(period_key(g, monday) for g in GRAINS)
+
+        member = self._members[code]
+        dimension_keys = (
+            ("team", "team"),
+            ("role", member["role"] or "unknown"),
+            ("member", member["id"]),
+        )
+        delta = (
+            sign * capacity,
+            sign * allocated,
+            sign,
+            sign if allocated > capacity else 0.0,
+        )
+        for grain, period in zip(GRAINS, periods):
+            by_dimension = self._rollups.setdefault(grain, {})
+            for dimension, key in dimension_keys:
+                series = by_dimension.setdefault(dimension, {}).setdefault(key, {})
+                totals = series.setdefault(period, [0.0, 0.0, 0.0, 0.0])
+                for i, value in enumerate(delta):
+                    totals[i] += value
+                if totals[2] <= 0:
+                    del series[period]
+                    if not series:
+                        del by_dimension[dimension][key]
+
+    def _upsert(self, code: int, week: date, capacity: float, allocated: float) -> None:
+        key = (code, week.toordinal())
+        row = self._index.get(key)
+        if row is None:
+            row = self._index[key] = len(self._columns["week"])
+            self._columns["member"].append(code)
+            self._columns["week"].append(key[1])
+            self._columns["capacity"].append(capacity)
+            self._columns["allocated"].append(allocated)
+        else:
+            self._add_to_rollups(code, row, -1.0)
+            self._columns["capacity"][row] = capacity
+            self._columns["allocated"][row] = allocated
+        self._add_to_rollups(code, row)
+
+    def record(self, snapshots: Iterable[CapacitySnapshot]) -> int:
+        """
+        Add or replace member-weeks from freshly calculated snapshots.
+
+        Returns:
+            Number of snapshots recorded
+        """
+        snapshots = list(snapshots)
+        if not snapshots:
+            return 0
+        with self._writing():
+            for s in snapshots:
+                code = self._member_code(s.team_member_id, s.full_name, s.role)
+                self._upsert(
+                    code, s.week_start_date, float(s.total_capacity_hours), float(s.allocated_hours)
+                )
+            self._save()
+        return len(snapshots)
+
+    def sync(self, full: bool = False, client=None) -> dict[str, Any]:
+        """
+        Copy snapshot history from the database into the store.
+
+        Incremental syncs re-read from the latest stored week onward (the
+        current week's snapshots keep changing) and page through the rest.
+
+        Args:
+            full: Re-read all history instead of only recent weeks
+            client: Database client (defaults to the shared client)
+
+        Returns:
+            Dict with rows_synced, total_rows and synced_at
+        """
+        self._ensure_loaded()
+        client = client or get_client()
+
+        since = None
+        if not full and len(self._columns["week"]):
+            since = date.fromordinal(max(self._columns["week"]))
+
+        members = fetch_all(
+            lambda: client.table("team_members").select("id, full_name, role").order("id")
+        )
+
+        def snapshots_query():
+            query = client.table("capacity_snapshots").select(
+                "id, team_member_id, week_start_date, total_capacity_hours, allocated_hours"
+            )
+            if since is not None:
+                query = query.gte("week_start_date", since.isoformat())
+            return query.order("week_start_date").order("id")
+
+        rows = fetch_all(snapshots_query)
+
+        with self._writing():
+            if full:
+                self._columns = {name: array(code) for name, code in COLUMNS.items()}
+                self._index = {}
+                self._rollups = {}
+            for m in members:
+                self._member_code(m["id"], m.get("full_name"), m.get("role"))
+            for r in rows:
+                code = self._member_code(r["team_member_id"], None, None)
+                self._upsert(
+                    code,
+                    date.fromisoformat(str(r["week_start_date"])[:10]),
+                    float(r["total_capacity_hours"] or 0),
+                    float(r["allocated_hours"] or 0),
+                )
+            self.synced_at = datetime.now(timezone.utc)
+            self._save()
+
+        return {
+            "rows_synced": len(rows),
+            "total_rows": len(self._columns["week"]),
+            "synced_at": self.synced_at,
+        }
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query(
+        self,
+        grain: str = "weekly",
+        dimension: str = "team",
+        key: str | None = None,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> HistoryResponse:
+        """
+        Read a utilization trend from the precomputed rollups.
+
+        Args:
+            grain: weekly, monthly or quarterly
+            dimension: team, role or member
+            key: Role name or team member id (all keys of the dimension if omitted)
+            start: First week to include
+            end: Last week to include
+
+        Returns:
+            HistoryResponse with one point per key and period, oldest first
+
+        Raises:
+            ValueError: If grain or dimension is unknown
+        """
+        if grain not in GRAINS:
+            raise ValueError(f"Unknown grain: {grain}")
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension}")
+
+        self._ensure_loaded()
+        series = self._rollups.get(grain, {}).get(dimension, {})
+        keys = [key] if key is not None else sorted(series)
+        first = period_key(grain, start) if start else None
+        last = period_key(grain, end) if end else None
+        names = {m["id"]: m["full_name"] for m in self._members}
+
+        points = []
+        for k in keys:
+            label = names.get(k, k) if dimension == "member" else k
+            for period, (capacity, allocated, member_weeks, overallocated) in sorted(
+                series.get(k, {}).items()
+            ):
+                if (first and period < first) or (last and period > last):
+                    continue
+                points.append(
+                    HistoryPoint(
+                        period=period,
+                        key=k,
+                        label=label,
+                        capacity_hours=_round(capacity),
+                        allocated_hours=_round(allocated),
+                        utilization_pct=_round(allocated / capacity * 100 if capacity else 0),
+                        member_weeks=int(member_weeks),
+                        overallocated_weeks=int(overallocated),
+                    )
+                )
+
+        return HistoryResponse(
+            grain=grain,
+            dimension=dimension,
+            synced_at=self.synced_at,
+            points=points,
+        )
+
+
+# Shared store for this process
+capacity_history = CapacityHistoryStore(settings.history_store_path)
+invalidation_bus.subscribe(CAPACITY_HISTORY, capacity_history.handle_invalidation)
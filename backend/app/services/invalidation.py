@@ -0,0 +1,258 @@
+"""
+Cache invalidation bus shared by all workers.
+
+Each worker keeps some state in process: the live capacity stream's
+member snapshots, the loaded history store. When one worker writes, the
+others must drop what the write made stale. Writers publish an
+`Invalidation` naming a scope and the affected keys (team member ids for
+member-weeks); every worker's subscribers for that scope receive it.
+
+Backends:
+    memory    delivers within this process only (single worker, the default)
+    postgres  also fans out over Postgres LISTEN/NOTIFY, so every worker
+              connected to the same database hears a write within
+              milliseconds. Needs `asyncpg` and DATABASE_URL.
+
+Messages are delivered to local subscribers immediately on publish, and
+flagged `local` so subscribers that already reacted through the in-process
+event stream can ignore them. If the listener connection drops, a reset
+(scope `*`) is delivered once it reconnects, because notifications sent while
+disconnected are lost.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Awaitable, Callable
+
+from app import deadlines
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Member-week capacity rows; keys are team member ids
+MEMBER_WEEKS = "member_weeks"
+
+# The local capacity history store; no keys
+CAPACITY_HISTORY = "capacity_history"
+
+# Transcripts inserted or re-processed; keys are transcript ids
+TRANSCRIPTS = "transcripts"
+
+# Everything, e.g. after missed notifications
+ALL = "*"
+
+# NOTIFY payloads must stay under 8000 bytes; keys are split to fit
+MAX_PAYLOAD_BYTES = 7000
+
+# Seconds between attempts to re-establish a dropped listener connection
+RECONNECT_DELAY_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class Invalidation:
+    """Something other workers may hold stale copies of."""
+
+    scope: str
+    keys: tuple[str, ...] = ()  # Empty means everything in the scope
+    week_start: date | None = None
+    origin: str = ""
+    local: bool = field(default=True, compare=False)
+
+    def to_payload(self) -> str:
+        return json.dumps(
+            {
+                "scope": self.scope,
+                "keys": list(self.keys),
+                "week_start": self.week_start.isoformat() if self.week_start else None,
+                "origin": self.origin,
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_payload(cls, payload: str, local: bool) -> "Invalidation":
+        data = json.loads(payload)
+        return cls(
+            scope=data["scope"],
+            keys=tuple(data.get("keys") or ()),
+            week_start=date.fromisoformat(data["week_start"]) if data.get("week_start") else None,
+            origin=data.get("origin", ""),
+            local=local,
+        )
+
+
+InvalidationHandler = Callable[[Invalidation], Awaitable[None]]
+
+
+class InvalidationBus:
+    """In-process invalidation bus; the base for networked backends."""
+
+    def __init__(self):
+        # Identifies this worker so it can recognise its own notifications
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handlers: list[tuple[str, InvalidationHandler]] = []
+
+    def subscribe(self, scope: str, handler: InvalidationHandler) -> None:
+        """Call `handler` for invalidations of `scope` (and for resets)."""
+        self._handlers.append((scope, handler))
+
+    async def start(self) -> None:
+        """Open connections; called once from the application lifespan."""
+
+    async def stop(self) -> None:
+        """Close connections."""
+
+    async def publish(
+        self,
+        scope: str,
+        keys: list[str] | tuple[str, ...] = (),
+        week_start: date | None = None,
+    ) -> Invalidation:
+        """
+        Invalidate `keys` in `scope` in this worker and, if networked, all others.
+
+        Args:
+            scope: What was invalidated (MEMBER_WEEKS, CAPACITY_HISTORY, ...)
+            keys: Affected keys; empty for the whole scope
+            week_start: Week the keys apply to, for member-weeks
+
+        Returns:
+            The published Invalidation
+        """
+        message = Invalidation(
+            scope=scope,
+            keys=tuple(dict.fromkeys(keys)),
+            week_start=week_start,
+            origin=self.origin,
+        )
+        await self._deliver(message)
+        await self._send(message)
+        return message
+
+    async def _send(self, message: Invalidation) -> None:
+        """Forward to other workers (nothing to do in process)."""
+
+    async def _deliver(self, message: Invalidation) -> None:
+        # Dropping stale state must not stop at the publishing request's deadline
+        with deadlines.unbounded():
+            for scope, handler in list(self._handlers):
+                if message.scope in (scope, ALL):
+                    try:
+                        await handler(message)
+                    except Exception:
+                        logger.exception("Error handling %s invalidation", message.scope)
+
+
+class PostgresInvalidationBus(InvalidationBus):
+    """Invalidation bus fanned out with Postgres LISTEN/NOTIFY."""
+
+    def __init__(self, dsn: str, channel: str):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self._listener = None
+        self._pool = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._pending: set[asyncio.Task] = set()
+        self._stopping = False
+
+    async def start(self) -> None:
+        try:
+            import asyncpg
+        except ImportError as e:
+            raise RuntimeError(
+                "INVALIDATION_BACKEND=postgres requires asyncpg (pip install asyncpg)"
+            ) from e
+        if not self.dsn:
+            raise RuntimeError("INVALIDATION_BACKEND=postgres requires DATABASE_URL")
+
+        self._stopping = False
+        self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=2)
+        await self._listen()
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self._listener is not None and not self._listener.is_closed():
+            await self._listener.close()
+        if self._pool is not None:
+            await self._pool.close()
+        self._listener = self._pool = None
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        self._listener = await asyncpg.connect(self.dsn)
+        self._listener.add_termination_listener(self._on_terminate)
+        await self._listener.add_listener(self.channel, self._on_notify)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            message = Invalidation.from_payload(payload, local=False)
+        except (ValueError, KeyError) as e:
+            logger.warning("Ignoring malformed invalidation payload: %s", e)
+            return
+        if message.origin == self.origin:
+            return  # Already delivered locally on publish
+        self._spawn(self._deliver(message))
+
+    def _on_terminate(self, connection) -> None:
+        if not self._stopping and self._reconnect_task is None:
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        try:
+            while not self._stopping:
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                try:
+                    await self._listen()
+                except Exception as e:
+                    logger.warning("Invalidation listener reconnect failed: %s", e)
+                    continue
+                # Anything published while disconnected was missed
+                await self._deliver(Invalidation(scope=ALL, origin=self.origin, local=False))
+                return
+        finally:
+            self._reconnect_task = None
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _send(self, message: Invalidation) -> None:
+        if self._pool is None:
+            return  # Not started (CLI or tests): local delivery only
+        async with self._pool.acquire() as connection:
+            for payload in _split_payloads(message):
+                await connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+
+def _split_payloads(message: Invalidation) -> list[str]:
+    """Encode a message as NOTIFY payloads, splitting keys to fit the limit."""
+    payload = message.to_payload()
+    if len(payload.encode()) <= MAX_PAYLOAD_BYTES or len(message.keys) <= 1:
+        return [payload]
+    middle = len(message.keys) // 2
+    return _split_payloads(
+        Invalidation(message.scope, message.keys[:middle], message.week_start, message.origin)
+    ) + _split_payloads(
+        Invalidation(message.scope, message.keys[middle:], message.week_start, message.origin)
+    )
+
+
+def create_invalidation_bus() -> InvalidationBus:
+    """Build the bus selected by INVALIDATION_BACKEND."""
+    if settings.invalidation_backend == "postgres":
+        return PostgresInvalidationBus(settings.database_url, settings.invalidation_channel)
+    return InvalidationBus()
+
+
+# Shared bus for this process
+invalidation_bus = create_invalidation_bus()
@@ -0,0 +1,469 @@
+"""
+Member-week capacity read model.
+
+One denormalized `member_week_capacity` row per member per week holds the
+allocated hours, the project list, the urgent project count and the conflict
+flags (plus the conflicts themselves), so capacity reads are a single select
+instead of re-aggregating `assignments` for every member on every request.
+
+Rows are projected from assignment mutation events published on the
+`event_stream`; each event re-projects only the members it names, in a fixed
+number of queries. The matching `capacity_snapshots` rows are written in the
+same pass. A week with no rows yet (first read after rollover) is built on
+demand, and `rebuild` re-derives a whole week for recovery.
+
+Writes that never reach this process (the web app writes assignments,
+projects and team members straight to Supabase) are caught by triggers that
+mark the affected members in `member_week_dirty` (migration 015). Every read
+of the current week claims those marks and re-projects the marked members
+before answering.
+
+After each projection the affected member-weeks are published on the
+invalidation bus so other workers drop their copies.
+
+Every local projection and remote invalidation bumps `version`. Dashboard
+reads go through `coalesce`, which runs them off the event loop and shares
+one in-flight read between concurrent identical requests for the same week
+and version, so a burst of dashboard opens costs one query, not one each.
+Coalesced reads are optionally hedged (see app/services/hedging.py).
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, TypeVar
+
+from app.db.supabase_client import fetch_all, get_client
+from app.models.schemas import CapacityConflict, CapacitySnapshot
+from app.services.capacity_calculator import (
+    build_capacity_snapshot,
+    build_member_conflicts,
+    get_week_start,
+)
+from app.services.events import DomainEvent, event_stream
+from app.services.hedging import hedged_reads
+from app.services.invalidation import MEMBER_WEEKS, Invalidation, invalidation_bus
+from app.services.single_flight import SingleFlight
+
+T = TypeVar("T")
+
+
+TABLE = "member_week_capacity"
+
+# Members marked by the database triggers as changed since their projection
+DIRTY_TABLE = "member_week_dirty"
+
+# Rows written per upsert round trip
+UPSERT_BATCH_SIZE = 500
+
+MEMBER_COLUMNS = "id, full_name, role, weekly_capacity_hours, active"
+
+ASSIGNMENT_COLUMNS = (
+    "id, team_member_id, project_id, hours_this_week, start_date, "
+    "projects(name, priority, deadline)"
+)
+
+ON_CONFLICT = "team_member_id,week_start_date"
+
+
+def build_member_week(
+    member: dict[str, Any],
+    assignments: list[dict[str, Any]],
+    week_start_date: date,
+) -> dict[str, Any]:
+    """
+    Project a member's active assignments into a read model row.
+
+    Args:
+        member: Team member row (id, full_name, role, weekly_capacity_hours)
+        assignments: The member's active assignments with embedded projects
+        week_start_date: Monday of the week
+
+    Returns:
+        Row for the member_week_capacity table
+    """
+    allocated = sum(
+        (Decimal(str(a["hours_this_week"] or 0)) for a in assignments), Decimal(0)
+    )
+    snapshot = build_capacity_snapshot(member, allocated, week_start_date)
+    conflicts = build_member_conflicts(snapshot, assignments)
+
+    projects = []
+    for a in assignments:
+        project = a.get("projects") or {}
+        projects.append(
+            {
+                "assignment_id": a["id"],
+                "project_id": a["project_id"],
+                "name": project.get("name"),
+                "priority": project.get("priority"),
+                "deadline": project.get("deadline"),
+                "hours": float(a["hours_this_week"] or 0),
+                "start_date": a.get("start_date"),
+            }
+        )
+    urgent_count = sum(1 for p in projects if p["priority"] == "urgent")
+
+    return {
+        "team_member_id": member["id"],
+        "week_start_date": week_start_date.isoformat(),
+        "full_name": member["full_name"],
+        "role": member["role"],
+        "total_capacity_hours": float(snapshot.total_capacity_hours),
+        "allocated_hours": float(allocated),
+        "projects": projects,
+        "urgent_count": urgent_count,
+        "overallocated": snapshot.overallocated,
+        "urgent_conflict": urgent_count > 1,
+        "conflicts": [c.model_dump(mode="json") for c in conflicts],
+        "snapshot_id": None,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def snapshot_from_row(row: dict[str, Any]) -> CapacitySnapshot:
+    """Rebuild the CapacitySnapshot a read model row was projected from."""
+    member = {
+        "id": row["team_member_id"],
+        "full_name": row["full_name"],
+        "role": row["role"],
+        "weekly_capacity_hours": row["total_capacity_hours"],
+    }
+    return build_capacity_snapshot(
+        member,
+        Decimal(str(row["allocated_hours"] or 0)),
+        date.fromisoformat(str(row["week_start_date"])[:10]),
+        row.get("snapshot_id") or "",
+    )
+
+
+def conflicts_from_row(row: dict[str, Any]) -> list[CapacityConflict]:
+    """Conflicts stored on a read model row."""
+    return [CapacityConflict.model_validate(c) for c in row.get("conflicts") or []]
+
+
+def _batches(rows: list[dict[str, Any]]):
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        yield rows[start : start + UPSERT_BATCH_SIZE]
+
+
+class MemberWeekReadModel:
+    """Maintains and serves the member_week_capacity table."""
+
+    def __init__(self):
+        # Data version of the rows, part of every coalesced read's key
+        self.version = 0
+        self.flight = SingleFlight("member_weeks")
+
+    async def coalesce(self, name: str, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking capacity read off the event loop, shared by callers.
+
+        Concurrent calls with the same name and arguments, in the same week
+        and at the same data version, await one computation. With
+        HEDGED_READS on, a computation slower than its recent p95 is sent
+        twice (building a missing week upserts the same rows either way).
+
+        Args:
+            name: What is being computed
+            fn: Blocking function computing it
+            *args: Arguments for `fn` (must be hashable)
+
+        Returns:
+            The result of `fn(*args)`
+        """
+        key = (name, get_week_start(), self.version, args)
+        return await self.flight.do(key, lambda: hedged_reads.run(name, fn, *args))
+
+    def _write(
+        self,
+        client,
+        members: list[dict[str, Any]],
+        assignments: list[dict[str, Any]],
+        week: date,
+        errors: list[dict[str, Any]] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Project members, then upsert their snapshots and read model rows.
+
+        A member whose projection fails is added to `errors` and skipped, or
+        the failure is raised when no `errors` list is given.
+        """
+        by_member: dict[str, list[dict[str, Any]]] = {}
+        for a in assignments:
+            by_member.setdefault(a["team_member_id"], []).append(a)
+
+        rows = []
+        for m in members:
+            try:
+                rows.append(build_member_week(m, by_member.get(m["id"], []), week))
+            except Exception as e:
+                if errors is None:
+                    raise
+                errors.append(
+                    {"team_member_id": m["id"], "full_name": m.get("full_name"), "error": str(e)}
+                )
+
+        snapshot_ids: dict[str, str] = {}
+        for batch in _batches(rows):
+            result = (
+                client.table("capacity_snapshots")
+                .upsert(
+                    [
+                        {
+                            "team_member_id": r["team_member_id"],
+                            "week_start_date": r["week_start_date"],
+                            "total_capacity_hours": r["total_capacity_hours"],
+                            "allocated_hours": r["allocated_hours"],
+                        }
+                        for r in batch
+                    ],
+                    on_conflict=ON_CONFLICT,
+                )
+                .execute()
+            )
+            snapshot_ids.update((s["team_member_id"], s["id"]) for s in result.data or [])
+
+        for row in rows:
+            row["snapshot_id"] = snapshot_ids.get(row["team_member_id"])
+        for batch in _batches(rows):
+            client.table(TABLE).upsert(batch, on_conflict=ON_CONFLICT).execute()
+
+        self.version += 1
+        return rows
+
+    def refresh(
+        self,
+        team_member_ids: list[str],
+        week_start_date: date | None = None,
+        client=None,
+    ) -> list[dict[str, Any]]:
+        """
+        Re-project the given members for one week.
+
+        Members that are inactive or no longer exist lose their row. Uses the
+        same handful of queries however many members are named.
+
+        Args:
+            team_member_ids: Members whose assignments changed
+            week_start_date: Monday of the week (defaults to current week)
+            client: Database client (defaults to the shared client)
+
+        Returns:
+            The rows written, one per active member
+        """
+        ids = list(dict.fromkeys(team_member_ids))
+        if not ids:
+            return []
+        client = client or get_client()
+        week = get_week_start(week_start_date)
+
+        members_response = (
+            client.table("team_members").select(MEMBER_COLUMNS).in_("id", ids).execute()
+        )
+        members = [m for m in members_response.data if m.get("active", True)]
+
+        rows = []
+        if members:
+            assignments_response = (
+                client.table("assignments")
+                .select(ASSIGNMENT_COLUMNS)
+                .in_("team_member_id", [m["id"] for m in members])
+                .eq("status", "active")
+                .execute()
+            )
+            rows = self._write(client, members, assignments_response.data, week)
+
+        active_ids = {m["id"] for m in members}
+        gone = [i for i in ids if i not in active_ids]
+        if gone:
+            (
+                client.table(TABLE)
+                .delete()
+                .eq("week_start_date", week.isoformat())
+                .in_("team_member_id", gone)
+                .execute()
+            )
+            self.version += 1
+
+        return rows
+
+    def rebuild(
+        self,
+        week_start_date: date | None = None,
+        client=None,
+        errors: list[dict[str, Any]] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Re-derive a whole week from `team_members` and `assignments`.
+
+        Used on first read of a new week and for recovery after writes that
+        bypassed the event stream.
+
+        Args:
+            week_start_date: Monday of the week (defaults to current week)
+            client: Database client (defaults to the shared client)
+            errors: Collects members that could not be projected (their
+                rows are left as they were); without it the first failure
+                is raised
+
+        Returns:
+            The rows written, one per active member
+        """
+        client = client or get_client()
+        week = get_week_start(week_start_date)
+
+        members = fetch_all(
+            lambda: client.table("team_members")
+            .select(MEMBER_COLUMNS)
+            .eq("active", True)
+            .order("id")
+        )
+        assignments = fetch_all(
+            lambda: client.table("assignments")
+            .select(ASSIGNMENT_COLUMNS)
+            .eq("status", "active")
+            .order("id")
+        )
+        rows = self._write(client, members, assignments, week, errors)
+
+        existing = fetch_all(
+            lambda: client.table(TABLE)
+            .select("team_member_id")
+            .eq("week_start_date", week.isoformat())
+            .order("team_member_id")
+        )
+        active_ids = {m["id"] for m in members}
+        stale = [r["team_member_id"] for r in existing if r["team_member_id"] not in active_ids]
+        if stale:
+            (
+                client.table(TABLE)
+                .delete()
+                .eq("week_start_date", week.isoformat())
+                .in_("team_member_id", stale)
+                .execute()
+            )
+
+        return rows
+
+    def claim_dirty(self, client=None) -> list[str]:
+        """
+        Take the members the database triggers marked as changed.
+
+        The marks are deleted before the members are re-projected, so a
+        change committed after the projection has read leaves a new mark.
+
+        Returns:
+            Ids of the marked members
+        """
+        client = client or get_client()
+        marked = fetch_all(
+            lambda: client.table(DIRTY_TABLE).select("team_member_id").order("team_member_id")
+        )
+        ids = [r["team_member_id"] for r in marked]
+        if ids:
+            client.table(DIRTY_TABLE).delete().in_("team_member_id", ids).execute()
+        return ids
+
+    def _refresh_dirty(
+        self,
+        rows: list[dict[str, Any]],
+        week: date,
+        client,
+    ) -> list[dict[str, Any]]:
+        """Rows with the members changed outside the event stream re-projected."""
+        if week != get_week_start():
+            return rows
+        dirty = self.claim_dirty(client)
+        if not dirty:
+            return rows
+        marked = set(dirty)
+        kept = [r for r in rows if r["team_member_id"] not in marked]
+        return kept + self.refresh(dirty, week, client)
+
+    def read_week(self, week_start_date: date | None = None, client=None) -> list[dict[str, Any]]:
+        """
+        All member rows for a week, building the week if it has none yet.
+
+        Members marked as changed by the database triggers are re-projected
+        first.
+        """
+        client = client or get_client()
+        week = get_week_start(week_start_date)
+        response = (
+            client.table(TABLE).select("*").eq("week_start_date", week.isoformat()).execute()
+        )
+        if response.data:
+            return self._refresh_dirty(response.data, week, client)
+        if week == get_week_start():
+            self.claim_dirty(client)  # The rebuild covers every member
+        return self.rebuild(week, client)
+
+    def read_members(
+        self,
+        team_member_ids: list[str],
+        week_start_date: date | None = None,
+        client=None,
+    ) -> list[dict[str, Any]]:
+        """Stored rows for the given members in one week (no projection)."""
+        if not team_member_ids:
+            return []
+        client = client or get_client()
+        week = get_week_start(week_start_date)
+        response = (
+            client.table(TABLE)
+            .select("*")
+            .eq("week_start_date", week.isoformat())
+            .in_("team_member_id", list(team_member_ids))
+            .execute()
+        )
+        return response.data
+
+    def read_member(
+        self,
+        team_member_id: str,
+        week_start_date: date | None = None,
+        client=None,
+    ) -> dict[str, Any] | None:
+        """
+        One member's row for a week, projecting it if missing or changed.
+
+        Returns:
+            The row, or None if the member is inactive or does not exist
+        """
+        client = client or get_client()
+        week = get_week_start(week_start_date)
+        response = (
+            client.table(TABLE)
+            .select("*")
+            .eq("team_member_id", team_member_id)
+            .eq("week_start_date", week.isoformat())
+            .execute()
+        )
+        for row in self._refresh_dirty(response.data, week, client):
+            if row["team_member_id"] == team_member_id:
+                return row
+        if response.data:
+            return None  # Re-projected away: inactive or deleted
+        rows = self.refresh([team_member_id], week, client)
+        return rows[0] if rows else None
+
+    async def handle_assignment_event(self, event: DomainEvent) -> None:
+        """Re-project the members an assignment event names for the current week."""
+        rows = self.refresh(list(event.team_member_ids))
+        await event_stream.publish(
+            "capacity.changed", list(event.team_member_ids), rows=rows
+        )
+        await invalidation_bus.publish(
+            MEMBER_WEEKS, list(event.team_member_ids), get_week_start()
+        )
+
+    async def handle_invalidation(self, message: Invalidation) -> None:
+        """Rows changed on another worker: new reads must not join older ones."""
+        if not message.local:
+            self.version += 1
+
+
+# Shared read model for this process
+member_weeks = MemberWeekReadModel()
+event_stream.subscribe("assignment.", member_weeks.handle_assignment_event)
+invalidation_bus.subscribe(MEMBER_WEEKS, member_weeks.handle_invalidation)
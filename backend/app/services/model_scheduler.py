@@ -0,0 +1,277 @@
+"""
+Admission control and priority scheduling for model calls.
+
+Every Claude call reserves its estimated input tokens and its `max_tokens`
+output against per-minute token buckets before it is sent, and returns the
+unused part of the reservation once the real usage is known. Calls that do
+not fit wait in a priority queue: interactive work (a producer waiting on the
+review screen) always goes ahead of batch work (backfills), and batch work
+may only use part of the budget so interactive calls find headroom.
+
+Load that cannot be served in time is shed up front instead of piling up:
+    429  the token budget will not free up within the caller's wait limit,
+         or the API itself rate limited us
+    503  the queue is full, or the call waited its whole limit
+Both carry a `retry_after` in seconds for the Retry-After header. A call
+that would have to wait past its request's deadline raises DeadlineExceeded
+(504) instead.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Literal
+
+from app import deadlines
+from app.config import settings
+from app.telemetry.metrics import record_model_admission
+
+Priority = Literal["interactive", "batch"]
+
+PRIORITY_ORDER = {"interactive": 0, "batch": 1}
+
+# Fraction of each token bucket batch calls may draw down
+BATCH_BUDGET_SHARE = 0.8
+
+# Characters per token when estimating prompt size before the call
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token count for prompt text (the API reports the real one)."""
+    return max(1, sum(len(t) for t in texts) // CHARS_PER_TOKEN)
+
+
+class ModelBusyError(Exception):
+    """A model call was not admitted; retry after `retry_after` seconds."""
+
+    def __init__(self, status_code: int, retry_after: float, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = max(1.0, retry_after)
+
+
+class TokenBucket:
+    """Tokens per minute, refilled continuously."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def seconds_until(self, tokens: float, floor: float = 0.0) -> float:
+        """Seconds until `tokens` can be taken leaving at least `floor`."""
+        deficit = tokens + floor - self.tokens
+        return max(0.0, deficit / self.rate) if self.rate else float("inf")
+
+    def give(self, tokens: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + tokens)
+
+
+@dataclass
+class Grant:
+    """Budget reserved for one call; set `usage` once the response arrives."""
+
+    priority: str
+    input_tokens: int
+    output_tokens: int
+    usage: Any | None = None
+
+
+@dataclass(order=True)
+class _Ticket:
+    rank: int
+    sequence: int
+    grant: Grant = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class ModelScheduler:
+    """Token-budgeted, priority-ordered gate in front of the model API."""
+
+    def __init__(
+        self,
+        input_tokens_per_minute: int,
+        output_tokens_per_minute: int,
+        max_concurrency: int,
+        max_queue: int,
+        max_wait: dict[str, float],
+    ):
+        self.input = TokenBucket(input_tokens_per_minute)
+        self.output = TokenBucket(output_tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.running = 0
+        self._queue: list[_Ticket] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._paused_until = 0.0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for t in self._queue if not t.future.done())
+
+    def _floor(self, bucket: TokenBucket, priority: str) -> float:
+        """Headroom batch calls must leave for interactive ones."""
+        return bucket.capacity * (1 - BATCH_BUDGET_SHARE) if priority == "batch" else 0.0
+
+    def _wait_estimate(self, grant: Grant, now: float) -> float:
+        """Seconds until `grant` fits, counting calls queued ahead of it."""
+        rank = PRIORITY_ORDER[grant.priority]
+        ahead_input = ahead_output = 0
+        for ticket in self._queue:
+            if ticket.rank <= rank and not ticket.future.done():
+                ahead_input += ticket.grant.input_tokens
+                ahead_output += ticket.grant.output_tokens
+        return max(
+            self._paused_until - now,
+            self.input.seconds_until(
+                ahead_input + grant.input_tokens, self._floor(self.input, grant.priority)
+            ),
+            self.output.seconds_until(
+                ahead_output + grant.output_tokens, self._floor(self.output, grant.priority)
+            ),
+        )
+
+    async def acquire(self, priority: Priority, input_tokens: int, output_tokens: int) -> Grant:
+        """
+        Reserve budget for a call, waiting in priority order if needed.
+
+        Raises:
+            ModelBusyError: If the call is shed or waits past its limit
+            DeadlineExceeded: If it would wait past the request's deadline
+        """
+        deadlines.check("model")
+        grant = Grant(priority, input_tokens, output_tokens)
+        max_wait = self.max_wait[priority]
+        budget = deadlines.remaining()
+        now = time.monotonic()
+        self.input.refill(now)
+        self.output.refill(now)
+
+        if input_tokens > self.input.capacity or output_tokens > self.output.capacity:
+            record_model_admission(priority, "rejected")
+            raise ModelBusyError(429, 60, "Request is larger than the per-minute token budget")
+        if self.queued >= self.max_queue:
+            record_model_admission(priority, "rejected")
+            raise ModelBusyError(503, max_wait, "Model queue is full")
+        estimate = self._wait_estimate(grant, now)
+        if estimate > max_wait:
+            record_model_admission(priority, "rejected")
+            raise ModelBusyError(
+                429, estimate, f"Model token budget exhausted; retry in {estimate:.0f}s"
+            )
+        if budget is not None and estimate > budget:
+            record_model_admission(priority, "timed_out")
+            raise deadlines.DeadlineExceeded("model")
+
+        ticket = _Ticket(
+            PRIORITY_ORDER[priority],
+            next(self._sequence),
+            grant,
+            asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._queue, ticket)
+        self._dispatch()
+
+        wait = max_wait if budget is None else min(max_wait, budget)
+        try:
+            await asyncio.wait_for(ticket.future, wait)
+        except asyncio.TimeoutError:
+            record_model_admission(priority, "timed_out")
+            if wait < max_wait:
+                raise deadlines.DeadlineExceeded("model")
+            raise ModelBusyError(
+                503, self._wait_estimate(grant, time.monotonic()), "Timed out waiting for model capacity"
+            )
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                self.release(grant)
+            raise
+
+        record_model_admission(priority, "admitted", time.monotonic() - now)
+        return grant
+
+    def release(self, grant: Grant) -> None:
+        """Finish a call, returning whatever it reserved but did not use."""
+        self.running -= 1
+        if grant.usage is not None:
+            self.input.give(grant.input_tokens - (grant.usage.input_tokens or 0))
+            self.output.give(grant.output_tokens - (grant.usage.output_tokens or 0))
+        else:
+            # The call failed before generating anything
+            self.output.give(grant.output_tokens)
+        self._dispatch()
+
+    def backoff(self, seconds: float) -> None:
+        """Hold all calls after the API rate limited us."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self, priority: Priority, input_tokens: int, output_tokens: int
+    ) -> AsyncIterator[Grant]:
+        """Hold a reservation for the duration of one call."""
+        grant = await self.acquire(priority, input_tokens, output_tokens)
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    def _dispatch(self) -> None:
+        """Admit queued calls in priority order while budget allows."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        self.input.refill(now)
+        self.output.refill(now)
+
+        while self._queue:
+            ticket = self._queue[0]
+            if ticket.future.done():  # Timed out or cancelled while queued
+                heapq.heappop(self._queue)
+                continue
+            if self.running >= self.max_concurrency:
+                return  # release() dispatches again
+
+            grant = ticket.grant
+            delay = max(
+                self._paused_until - now,
+                self.input.seconds_until(grant.input_tokens, self._floor(self.input, grant.priority)),
+                self.output.seconds_until(grant.output_tokens, self._floor(self.output, grant.priority)),
+            )
+            if delay > 0:
+                # Head of the queue waits; nothing behind it may jump ahead
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            self.input.tokens -= grant.input_tokens
+            self.output.tokens -= grant.output_tokens
+            self.running += 1
+            ticket.future.set_result(grant)
+
+
+# Shared scheduler for this process
+model_scheduler = ModelScheduler(
+    input_tokens_per_minute=settings.model_input_tokens_per_minute,
+    output_tokens_per_minute=settings.model_output_tokens_per_minute,
+    max_concurrency=settings.model_max_concurrency,
+    max_queue=settings.model_max_queue,
+    max_wait={
+        "interactive": settings.model_max_wait_interactive_seconds,
+        "batch": settings.model_max_wait_batch_seconds,
+    },
+)
@@ -0,0 +1,125 @@
+"""
+MinHash signatures and LSH buckets for near-duplicate transcript detection.
+
+The same meeting notes are often uploaded twice: a different export tool,
+an extra header, re-wrapped lines. Transcripts are normalized to lowercase
+words and shingled into overlapping word 5-grams; two uploads of the same
+notes share most shingles, so the Jaccard similarity of their shingle sets
+is high even when the raw text differs.
+
+Signatures use one-permutation MinHash: each shingle is hashed once and
+kept as the minimum of one of NUM_BINS bins, with empty bins filled from
+their nearest neighbour. That costs one hash per shingle instead of one per
+shingle per bin, and the fraction of equal bins still estimates Jaccard.
+
+The LSH index splits signatures into LSH_BANDS bands of LSH_ROWS bins. Two
+transcripts land in a common bucket with probability 1 - (1 - s^rows)^bands
+for similarity s: about 0.99 at s = 0.85, under 0.01 at s = 0.3. So a lookup
+touches only a handful of candidates, which are then checked against the
+estimated similarity.
+"""
+
+import hashlib
+import re
+
+
+# Bins per signature
+NUM_BINS = 128
+
+# LSH banding (bands x rows must equal NUM_BINS)
+LSH_BANDS = 16
+LSH_ROWS = NUM_BINS // LSH_BANDS
+
+# Words per shingle
+SHINGLE_SIZE = 5
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str) -> set[str]:
+    """Overlapping word n-grams of the normalized text."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {
+        " ".join(words[i : i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def signature(text: str) -> list[int]:
+    """
+    One-permutation MinHash signature of a transcript.
+
+    Args:
+        text: Transcript text
+
+    Returns:
+        NUM_BINS integers; equal positions estimate shared shingles
+    """
+    bins: list[int | None] = [None] * NUM_BINS
+    for shingle in shingles(text):
+        value = int.from_bytes(
+            hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big"
+        )
+        index, value = value % NUM_BINS, value // NUM_BINS
+        current = bins[index]
+        if current is None or value < current:
+            bins[index] = value
+
+    if all(b is None for b in bins):
+        return [0] * NUM_BINS
+
+    # Densify: an empty bin borrows the next non-empty bin's value, offset by
+    # the distance so borrowed values only match bins borrowed the same way
+    filled = []
+    for index in range(NUM_BINS):
+        distance = 0
+        while bins[(index + distance) % NUM_BINS] is None:
+            distance += 1
+        filled.append(bins[(index + distance) % NUM_BINS] + distance)
+    return filled
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not a or len(a) != len(b):
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def _band_keys(sig: list[int]) -> list[tuple[int, int]]:
+    return [
+        (band, hash(tuple(sig[band * LSH_ROWS : (band + 1) * LSH_ROWS])))
+        for band in range(LSH_BANDS)
+    ]
+
+
+class LSHIndex:
+    """Banded LSH buckets over MinHash signatures."""
+
+    def __init__(self):
+        self._buckets: dict[tuple[int, int], set[str]] = {}
+        self._keys: dict[str, list[tuple[int, int]]] = {}
+
+    def add(self, key: str, sig: list[int]) -> None:
+        self.remove(key)
+        if len(sig) != NUM_BINS:
+            return  # Stored before signatures existed; re-indexed on sync
+        keys = self._keys[key] = _band_keys(sig)
+        for bucket in keys:
+            self._buckets.setdefault(bucket, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        for bucket in self._keys.pop(key, ()):
+            members = self._buckets.get(bucket)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._buckets[bucket]
+
+    def candidates(self, sig: list[int]) -> set[str]:
+        """Keys sharing at least one band with `sig`."""
+        found: set[str] = set()
+        for bucket in _band_keys(sig):
+            found.update(self._buckets.get(bucket, ()))
+        return found
@@ -0,0 +1,251 @@
+"""
+Rebalancing solver for overallocation conflicts.
+
+Proposes concrete hour transfers that clear the current week's
+overallocations. The whole team is solved at once: donor assignments from
+every overallocated member are taken lowest priority first, and each
+transfer is charged against the receiver's spare hours, so two conflicts
+never claim the same free capacity. Urgent work is never moved. Hours that
+cannot be placed with anyone are proposed as deferrals.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+from app.db.supabase_client import fetch_all, get_client
+from app.models.schemas import MemberUtilization, RebalanceMove, RebalanceResponse
+from app.services.assignment_optimizer import (
+    MIN_ROLE_FIT,
+    PRIORITY_ORDER,
+    ROSTER_COLUMNS,
+    RosterMember,
+    build_roster,
+    role_fit,
+)
+from app.services.capacity_calculator import get_week_start
+
+
+# Project priorities whose hours are never moved off their current owner
+PROTECTED_PRIORITIES = {"urgent"}
+
+# Smallest spare capacity worth transferring work to, in hours
+MIN_MOVE_HOURS = 0.5
+
+# Tolerance for float hour comparisons
+EPSILON = 1e-6
+
+
+@dataclass
+class _Donation:
+    """Hours on an assignment that may be moved off an overallocated member."""
+
+    assignment: dict[str, Any]
+    remaining: float
+
+    @property
+    def priority(self) -> str:
+        return (self.assignment.get("projects") or {}).get("priority") or "medium"
+
+    @property
+    def project_name(self) -> str:
+        return (self.assignment.get("projects") or {}).get("name") or "Unknown project"
+
+
+def _hours(value: float) -> Decimal:
+    return Decimal(str(round(value, 2)))
+
+
+def _best_receiver(
+    roster: dict[str, RosterMember],
+    donor_id: str,
+    project_id: str,
+    role: str,
+    fit_cache: dict[tuple[str, str], float],
+) -> RosterMember | None:
+    """Member with spare hours who fits the role, preferring current teammates."""
+    best = None
+    best_key = None
+    for member in roster.values():
+        if member.id == donor_id or member.available < MIN_MOVE_HOURS:
+            continue
+        fit = fit_cache.get((member.id, role))
+        if fit is None:
+            fit = fit_cache[(member.id, role)] = role_fit(member, role)
+        if fit < MIN_ROLE_FIT:
+            continue
+        key = (project_id in member.projects, fit, member.available)
+        if best_key is None or key > best_key:
+            best, best_key = member, key
+    return best
+
+
+def solve_rebalance(
+    roster: dict[str, RosterMember],
+    assignments: list[dict[str, Any]],
+) -> list[RebalanceMove]:
+    """
+    Compute moves that bring every member within capacity where possible.
+
+    Mutates the roster's allocations to reflect the proposed moves.
+
+    Args:
+        roster: Active members with current allocation (see `build_roster`)
+        assignments: Active assignment rows with embedded `projects(name, priority)`
+
+    Returns:
+        Transfers first, then deferrals for hours no one can absorb
+    """
+    assignment_by_pair = {
+        (a["team_member_id"], a["project_id"]): a["id"] for a in assignments
+    }
+    donations = [
+        _Donation(a, float(a.get("hours_this_week") or 0))
+        for a in assignments
+        if a["team_member_id"] in roster
+        and roster[a["team_member_id"]].available < 0
+        and float(a.get("hours_this_week") or 0) > 0
+    ]
+    donations = [d for d in donations if d.priority not in PROTECTED_PRIORITIES]
+    # Lowest priority first; within a priority, the most overloaded member first
+    donations.sort(
+        key=lambda d: (
+            -PRIORITY_ORDER.get(d.priority, 2),
+            roster[d.assignment["team_member_id"]].available,
+            -d.remaining,
+        )
+    )
+
+    moves: list[RebalanceMove] = []
+    fit_cache: dict[tuple[str, str], float] = {}
+
+    for donation in donations:
+        a = donation.assignment
+        donor = roster[a["team_member_id"]]
+        role = a.get("role_on_project") or donor.role
+
+        while -donor.available > EPSILON and donation.remaining > EPSILON:
+            receiver = _best_receiver(roster, donor.id, a["project_id"], role, fit_cache)
+            if receiver is None:
+                break
+            hours = min(-donor.available, donation.remaining, receiver.available)
+            donor.allocated -= hours
+            receiver.allocated += hours
+            donation.remaining -= hours
+            already_on_project = a["project_id"] in receiver.projects
+            receiver.projects.add(a["project_id"])
+            moves.append(
+                RebalanceMove(
+                    type="transfer",
+                    assignment_id=a["id"],
+                    project_id=a["project_id"],
+                    project_name=donation.project_name,
+                    project_priority=donation.priority,
+                    from_team_member_id=donor.id,
+                    from_team_member_name=donor.full_name,
+                    to_team_member_id=receiver.id,
+                    to_team_member_name=receiver.full_name,
+                    to_assignment_id=assignment_by_pair.get((receiver.id, a["project_id"]))
+                    if already_on_project
+                    else None,
+                    hours=_hours(hours),
+                    reason=f"{donor.full_name} is over capacity; "
+                    f"{receiver.full_name} has {receiver.available + hours:g}h free "
+                    f"and fits {role}",
+                )
+            )
+
+    # Anything still over capacity can only be deferred
+    for donation in donations:
+        a = donation.assignment
+        donor = roster[a["team_member_id"]]
+        hours = min(-donor.available, donation.remaining)
+        if hours <= EPSILON:
+            continue
+        donor.allocated -= hours
+        donation.remaining -= hours
+        moves.append(
+            RebalanceMove(
+                type="defer",
+                assignment_id=a["id"],
+                project_id=a["project_id"],
+                project_name=donation.project_name,
+                project_priority=donation.priority,
+                from_team_member_id=donor.id,
+                from_team_member_name=donor.full_name,
+                hours=_hours(hours),
+                reason=f"No one with a matching role has spare hours; "
+                f"defer {donation.priority}-priority work to a later week",
+            )
+        )
+
+    return moves
+
+
+async def propose_rebalance(week_start_date: date | None = None) -> RebalanceResponse:
+    """
+    Propose moves resolving all overallocations for the current week.
+
+    Reads the roster and active assignments (one paged read each) and does
+    not write anything; apply accepted moves through the assignment routes.
+    """
+    if week_start_date is None:
+        week_start_date = get_week_start()
+
+    client = get_client()
+    member_rows = fetch_all(
+        lambda: client.table("team_members")
+        .select(ROSTER_COLUMNS)
+        .eq("active", True)
+        .order("id")
+    )
+    assignments = fetch_all(
+        lambda: client.table("assignments")
+        .select(
+            "id, team_member_id, project_id, role_on_project, hours_this_week, "
+            "projects(name, priority)"
+        )
+        .eq("status", "active")
+        .order("id")
+    )
+
+    roster = build_roster(member_rows, assignments)
+    before = {member_id: m.allocated for member_id, m in roster.items()}
+    moves = solve_rebalance(roster, assignments)
+
+    affected = dict.fromkeys(
+        [m.from_team_member_id for m in moves]
+        + [m.to_team_member_id for m in moves if m.to_team_member_id]
+    )
+    members = []
+    for member_id in affected:
+        member = roster[member_id]
+        members.append(
+            MemberUtilization(
+                team_member_id=member.id,
+                full_name=member.full_name,
+                total_capacity_hours=_hours(member.capacity),
+                allocated_before=_hours(before[member_id]),
+                allocated_after=_hours(member.allocated),
+                utilization_before=_hours(
+                    before[member_id] / member.capacity * 100 if member.capacity else 0
+                ),
+                utilization_after=_hours(
+                    member.allocated / member.capacity * 100 if member.capacity else 0
+                ),
+                overallocated_after=member.allocated > member.capacity + EPSILON,
+            )
+        )
+    members.sort(key=lambda m: m.utilization_after, reverse=True)
+
+    return RebalanceResponse(
+        week_start_date=week_start_date,
+        moves=moves,
+        members=members,
+        hours_transferred=_hours(sum(float(m.hours) for m in moves if m.type == "transfer")),
+        hours_deferred=_hours(sum(float(m.hours) for m in moves if m.type == "defer")),
+        remaining_overallocated=sum(
+            1 for m in roster.values() if m.allocated > m.capacity + EPSILON
+        ),
+    )
@@ -0,0 +1,270 @@
+"""
+Incremental re-extraction of edited transcripts.
+
+Fixing a typo or adding a paragraph should not cost a full extraction. The
+edited text is diffed line by line against the stored `raw_text`; only the
+changed regions, padded with a few lines of surrounding context, are sent to
+the model. The result is merged into the stored extraction:
+
+  - stored items quoted from a changed region are dropped (the new excerpt
+    covers them)
+  - stored items from unchanged regions are kept, unless the excerpt
+    re-extracted an item with the same identity (same project, same person on
+    the same project, ...), which replaces it
+  - overall confidence is the stored and new confidence weighted by how much
+    of the text each covers
+
+If most of the transcript changed, a full extraction is cheaper to reason
+about and no less accurate, so the whole text is re-extracted instead.
+"""
+
+import bisect
+import difflib
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, TypeVar
+
+from app.models.schemas import TranscriptExtractionSchema
+from app.services.claude_extractor import extract_from_transcript
+from app.services.model_scheduler import Priority
+
+T = TypeVar("T")
+
+
+# Unchanged lines sent on each side of a change so the model sees who is talking
+CONTEXT_LINES = 2
+
+# Share of the new text that may change before a full re-extraction is used
+FULL_REEXTRACTION_SHARE = 0.5
+
+# Placed between non-adjacent regions in the excerpt sent to the model
+REGION_SEPARATOR = "\n[...]\n"
+
+
+@dataclass
+class Region:
+    """A changed span, as line ranges [start, end) in the old and new text."""
+
+    old_start: int
+    old_end: int
+    new_start: int
+    new_end: int
+
+
+@dataclass
+class Reextraction:
+    """Outcome of re-processing an edited transcript."""
+
+    data: TranscriptExtractionSchema
+    model: str | None  # None when nothing needed re-extracting
+    regions: int
+    full: bool
+    reextracted_chars: int
+
+
+def diff_regions(old_text: str, new_text: str, context: int = CONTEXT_LINES) -> list[Region]:
+    """
+    Changed regions between two transcript texts, padded with context lines.
+
+    Args:
+        old_text: Stored transcript text
+        new_text: Edited transcript text
+        context: Unchanged lines to include on each side of a change
+
+    Returns:
+        Non-overlapping regions in document order (empty if identical)
+    """
+    old_lines = old_text.splitlines()
+    new_lines = new_text.splitlines()
+    # Whitespace-only edits (re-wrapped exports, trailing spaces) are not changes
+    matcher = difflib.SequenceMatcher(
+        None,
+        [" ".join(line.split()) for line in old_lines],
+        [" ".join(line.split()) for line in new_lines],
+        autojunk=False,
+    )
+
+    regions: list[Region] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        region = Region(
+            max(0, i1 - context),
+            min(len(old_lines), i2 + context),
+            max(0, j1 - context),
+            min(len(new_lines), j2 + context),
+        )
+        if regions and region.new_start <= regions[-1].new_end:
+            previous = regions[-1]
+            previous.old_end = max(previous.old_end, region.old_end)
+            previous.new_end = max(previous.new_end, region.new_end)
+        else:
+            regions.append(region)
+    return regions
+
+
+def region_excerpt(new_text: str, regions: list[Region]) -> str:
+    """Text of the new transcript covered by `regions`."""
+    lines = new_text.splitlines()
+    return REGION_SEPARATOR.join(
+        "\n".join(lines[r.new_start : r.new_end]) for r in regions
+    )
+
+
+def _line_locator(text: str) -> Callable[[str | None], tuple[int, int] | None]:
+    """Map a quote to the [start, end) line range it occupies in `text`."""
+    line_starts = [0]
+    for index, char in enumerate(text):
+        if char == "\n":
+            line_starts.append(index + 1)
+
+    def locate(quote: str | None) -> tuple[int, int] | None:
+        if not quote:
+            return None
+        offset = text.find(quote)
+        if offset < 0:
+            return None
+        first = bisect.bisect_right(line_starts, offset) - 1
+        last = bisect.bisect_right(line_starts, offset + len(quote) - 1) - 1
+        return first, last + 1
+
+    return locate
+
+
+def _merge_items(
+    stored: Iterable[T],
+    fresh: list[T],
+    key: Callable[[T], Any],
+    touched: Callable[[T], bool],
+) -> list[T]:
+    """Stored items outside changed regions and not re-extracted, then fresh items."""
+    fresh_keys = {key(item) for item in fresh}
+    kept = [item for item in stored if not touched(item) and key(item) not in fresh_keys]
+    return kept + fresh
+
+
+def merge_extractions(
+    stored: TranscriptExtractionSchema,
+    fresh: TranscriptExtractionSchema,
+    old_text: str,
+    regions: list[Region],
+    changed_share: float,
+) -> TranscriptExtractionSchema:
+    """
+    Merge an extraction of the changed regions into the stored extraction.
+
+    Args:
+        stored: Extraction of the old text
+        fresh: Extraction of the changed regions of the new text
+        old_text: The old text, to locate stored items by their quotes
+        regions: Regions that were re-extracted
+        changed_share: Fraction of the new text the regions cover
+
+    Returns:
+        Extraction of the whole new text
+    """
+    locate = _line_locator(old_text)
+
+    def in_changed_region(quote: str | None) -> bool:
+        lines = locate(quote)
+        if lines is None:
+            return False  # Paraphrased quote: rely on the identity check
+        return any(lines[0] < r.old_end and r.old_start < lines[1] for r in regions)
+
+    def by_context(item) -> bool:
+        return in_changed_region(item.context)
+
+    def fold(*values: str | None) -> tuple[str, ...]:
+        return tuple((v or "").strip().casefold() for v in values)
+
+    metadata = dict(stored.meeting_metadata)
+    attendees = list(stored.meeting_metadata.get("attendees") or [])
+    for name in fresh.meeting_metadata.get("attendees") or []:
+        if name not in attendees:
+            attendees.append(name)
+    if attendees:
+        metadata["attendees"] = attendees
+
+    notes = [n for n in (stored.extraction_notes, fresh.extraction_notes) if n]
+    notes.append(f"Re-extracted {len(regions)} edited region(s)")
+
+    return TranscriptExtractionSchema(
+        meeting_metadata=metadata,
+        projects=_merge_items(
+            stored.projects, fresh.projects, lambda p: fold(p.name), by_context
+        ),
+        assignments=_merge_items(
+            stored.assignments,
+            fresh.assignments,
+            lambda a: fold(a.person_name, a.project_name),
+            by_context,
+        ),
+        capacity_signals=_merge_items(
+            stored.capacity_signals,
+            fresh.capacity_signals,
+            lambda s: fold(s.person_name, s.signal_type),
+            by_context,
+        ),
+        deadlines=_merge_items(
+            stored.deadlines,
+            fresh.deadlines,
+            lambda d: fold(d.project_name, d.milestone),
+            lambda d: in_changed_region(d.deadline_text),
+        ),
+        overall_confidence=round(
+            stored.overall_confidence * (1 - changed_share)
+            + fresh.overall_confidence * changed_share,
+            2,
+        ),
+        extraction_notes="\n".join(notes),
+    )
+
+
+async def reextract_transcript(
+    old_text: str,
+    stored: TranscriptExtractionSchema | None,
+    new_text: str,
+    meeting_date: str | None = None,
+    meeting_type: str = "wip",
+    priority: Priority = "interactive",
+) -> Reextraction:
+    """
+    Re-extract only what changed between the stored and the edited text.
+
+    Args:
+        old_text: Stored transcript text
+        stored: Stored extraction of `old_text` (None forces a full extraction)
+        new_text: Edited transcript text
+        meeting_date: Date of the meeting (ISO format)
+        meeting_type: Type of meeting (wip, planning, client-debrief)
+        priority: Scheduler priority for the model call
+
+    Returns:
+        Reextraction with the merged data
+
+    Raises:
+        ValueError: If the model response fails parsing or validation
+        ModelBusyError: If the model call was shed or rate limited
+    """
+    regions = diff_regions(old_text, new_text)
+    if stored is not None and not regions:
+        return Reextraction(stored, None, 0, False, 0)
+
+    excerpt = region_excerpt(new_text, regions)
+    changed_share = len(excerpt) / max(1, len(new_text))
+    if stored is None or changed_share > FULL_REEXTRACTION_SHARE:
+        extraction = await extract_from_transcript(
+            transcript_text=new_text,
+            meeting_date=meeting_date,
+            meeting_type=meeting_type,
+            priority=priority,
+        )
+        return Reextraction(extraction.data, extraction.model, len(regions), True, len(new_text))
+
+    extraction = await extract_from_transcript(
+        transcript_text=excerpt,
+        meeting_date=meeting_date,
+        meeting_type=meeting_type,
+        priority=priority,
+    )
+    merged = merge_extractions(stored, extraction.data, old_text, regions, changed_share)
+    return Reextraction(merged, extraction.model, len(regions), False, len(excerpt))
@@ -0,0 +1,358 @@
+"""
+What-if scenarios over current capacity.
+
+The team's capacity state (members, open assignments, baseline snapshots and
+conflicts) is loaded once per request. Each scenario is a copy-on-write
+overlay on that state: only assignment rows it creates, updates or deletes
+are copied, and only the members those rows touch are recomputed. Everyone
+else reuses the baseline snapshot and conflicts, so comparing a hundred
+scenarios costs about the same as a single recompute. Nothing is written to
+the database.
+"""
+
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+from app.db.supabase_client import fetch_all, get_client
+from app.models.schemas import (
+    AssignmentCreateRequest,
+    CapacityConflict,
+    CapacityScenario,
+    CapacitySnapshot,
+    ScenarioAssignmentUpdate,
+    ScenarioComparisonRequest,
+    ScenarioComparisonResponse,
+    ScenarioMemberChange,
+    ScenarioResult,
+    ScenarioSummary,
+)
+from app.services.capacity_calculator import (
+    build_capacity_snapshot,
+    build_member_conflicts,
+    diff_conflicts,
+    get_week_start,
+)
+
+
+# Assignment statuses loaded into the state (paused work can be resumed)
+OPEN_STATUSES = ["active", "paused"]
+
+# Project columns embedded on assignment rows for conflict descriptions
+PROJECT_COLUMNS = "name, priority, deadline"
+
+
+def _hours(row: dict[str, Any]) -> Decimal:
+    """Hours a row contributes to its member's week."""
+    if row.get("status") != "active":
+        return Decimal(0)
+    return Decimal(str(row.get("hours_this_week") or 0))
+
+
+def _round(value: Decimal) -> Decimal:
+    return value.quantize(Decimal("0.01"))
+
+
+class CapacityState:
+    """
+    Baseline capacity for the whole team.
+
+    Shared read-only by every scenario evaluated against it.
+    """
+
+    def __init__(
+        self,
+        week_start_date: date,
+        members: list[dict[str, Any]],
+        assignments: list[dict[str, Any]],
+        projects: dict[str, dict[str, Any]] | None = None,
+    ):
+        self.week_start_date = week_start_date
+        self.members = {m["id"]: m for m in members}
+        self.assignments = {a["id"]: a for a in assignments}
+        self.projects = dict(projects or {})
+        self.by_member: dict[str, list[str]] = {member_id: [] for member_id in self.members}
+        for a in assignments:
+            if a["team_member_id"] in self.by_member:
+                self.by_member[a["team_member_id"]].append(a["id"])
+            if a.get("projects"):
+                self.projects.setdefault(a["project_id"], a["projects"])
+
+        self.snapshots: dict[str, CapacitySnapshot] = {}
+        self.conflicts: dict[str, list[CapacityConflict]] = {}
+        for member_id, member in self.members.items():
+            rows = [self.assignments[i] for i in self.by_member[member_id]]
+            snapshot = build_capacity_snapshot(
+                member, sum((_hours(r) for r in rows), Decimal(0)), week_start_date
+            )
+            self.snapshots[member_id] = snapshot
+            if snapshot.overallocated:
+                self.conflicts[member_id] = build_member_conflicts(
+                    snapshot, [r for r in rows if r.get("status") == "active"]
+                )
+
+        self.summary = ScenarioSummary(
+            name="baseline",
+            total_capacity_hours=sum(
+                (s.total_capacity_hours for s in self.snapshots.values()), Decimal(0)
+            ),
+            total_allocated_hours=sum(
+                (s.allocated_hours for s in self.snapshots.values()), Decimal(0)
+            ),
+            utilization_pct=Decimal(0),
+            overallocated_count=sum(1 for s in self.snapshots.values() if s.overallocated),
+            conflict_count=sum(len(c) for c in self.conflicts.values()),
+        )
+        self.summary.utilization_pct = _utilization(
+            self.summary.total_allocated_hours, self.summary.total_capacity_hours
+        )
+
+
+def _utilization(allocated: Decimal, capacity: Decimal) -> Decimal:
+    return _round(allocated / capacity * 100) if capacity > 0 else Decimal(0)
+
+
+def load_capacity_state(
+    week_start_date: date,
+    project_ids: list[str] | None = None,
+    client=None,
+) -> CapacityState:
+    """
+    Load the baseline state: paged member and assignment reads, plus one
+    query for projects only referenced by new assignments.
+
+    Args:
+        week_start_date: Monday of the week being planned
+        project_ids: Projects referenced by hypothetical new assignments
+        client: Database client (defaults to the shared client)
+
+    Returns:
+        CapacityState with baseline snapshots and conflicts
+    """
+    client = client or get_client()
+
+    members = fetch_all(
+        lambda: client.table("team_members")
+        .select("id, full_name, role, weekly_capacity_hours")
+        .eq("active", True)
+        .order("id")
+    )
+    assignments = fetch_all(
+        lambda: client.table("assignments")
+        .select(
+            "id, project_id, team_member_id, role_on_project, estimated_hours, "
+            f"hours_this_week, status, projects({PROJECT_COLUMNS})"
+        )
+        .in_("status", OPEN_STATUSES)
+        .order("id")
+    )
+
+    projects: dict[str, dict[str, Any]] = {}
+    known = {a["project_id"] for a in assignments}
+    missing = [pid for pid in dict.fromkeys(project_ids or []) if pid not in known]
+    if missing:
+        projects_response = (
+            client.table("projects")
+            .select(f"id, {PROJECT_COLUMNS}")
+            .in_("id", missing)
+            .execute()
+        )
+        projects = {p.pop("id"): p for p in projects_response.data}
+
+    return CapacityState(week_start_date, members, assignments, projects)
+
+
+class ScenarioOverlay:
+    """
+    Copy-on-write view of a CapacityState.
+
+    Changed assignment rows live in the overlay (None marks a deletion); all
+    other reads fall through to the shared baseline.
+    """
+
+    def __init__(self, state: CapacityState):
+        self.state = state
+        self.errors: list[str] = []
+        self._rows: dict[str, dict[str, Any] | None] = {}
+        self._touched: set[str] = set()
+
+    def get(self, assignment_id: str) -> dict[str, Any] | None:
+        if assignment_id in self._rows:
+            return self._rows[assignment_id]
+        return self.state.assignments.get(assignment_id)
+
+    def member_rows(self, team_member_id: str) -> list[dict[str, Any]]:
+        """Assignment rows for a member as seen through the overlay."""
+        rows = [
+            self.state.assignments[i]
+            for i in self.state.by_member.get(team_member_id, [])
+            if i not in self._rows
+        ]
+        rows.extend(
+            row
+            for row in self._rows.values()
+            if row is not None and row["team_member_id"] == team_member_id
+        )
+        return rows
+
+    def _already_assigned(self, team_member_id: str, project_id: str) -> bool:
+        """Record an error if the member is already on the project (UNIQUE in the schema)."""
+        if not any(row["project_id"] == project_id for row in self.member_rows(team_member_id)):
+            return False
+        self.errors.append(f"Assignment already exists for {team_member_id} on {project_id}")
+        return True
+
+    def create(self, request: AssignmentCreateRequest) -> None:
+        if request.team_member_id not in self.state.members:
+            self.errors.append(f"Team member not found or inactive: {request.team_member_id}")
+            return
+        project = self.state.projects.get(request.project_id)
+        if project is None:
+            self.errors.append(f"Project not found: {request.project_id}")
+            return
+        if self._already_assigned(request.team_member_id, request.project_id):
+            return
+
+        assignment_id = f"scenario-{len(self._rows) + 1}"
+        self._rows[assignment_id] = {
+            "id": assignment_id,
+            "project_id": request.project_id,
+            "team_member_id": request.team_member_id,
+            "role_on_project": request.role_on_project,
+            "estimated_hours": float(request.estimated_hours),
+            "hours_this_week": float(request.hours_this_week),
+            "status": "active",
+            "projects": project,
+        }
+        self._touched.add(request.team_member_id)
+
+    def update(self, request: ScenarioAssignmentUpdate) -> None:
+        row = self.get(request.assignment_id)
+        if row is None:
+            self.errors.append(f"Assignment not found: {request.assignment_id}")
+            return
+        if request.team_member_id and request.team_member_id not in self.state.members:
+            self.errors.append(f"Team member not found or inactive: {request.team_member_id}")
+            return
+        if (
+            request.team_member_id
+            and request.team_member_id != row["team_member_id"]
+            and self._already_assigned(request.team_member_id, row["project_id"])
+        ):
+            return
+
+        changed = dict(row)
+        changes = request.model_dump(exclude_none=True, exclude={"assignment_id", "notes"})
+        for key, value in changes.items():
+            changed[key] = float(value) if isinstance(value, Decimal) else value
+        self._rows[request.assignment_id] = changed
+        self._touched.update({row["team_member_id"], changed["team_member_id"]})
+
+    def delete(self, assignment_id: str) -> None:
+        row = self.get(assignment_id)
+        if row is None:
+            self.errors.append(f"Assignment not found: {assignment_id}")
+            return
+        self._rows[assignment_id] = None
+        self._touched.add(row["team_member_id"])
+
+    def apply(self, scenario: CapacityScenario) -> "ScenarioOverlay":
+        """Apply deletes, then updates, then creates."""
+        for assignment_id in scenario.deletes:
+            self.delete(assignment_id)
+        for update in scenario.updates:
+            self.update(update)
+        for create in scenario.creates:
+            self.create(create)
+        return self
+
+    def evaluate(self, name: str) -> ScenarioResult:
+        """Recompute touched members and compare against the baseline."""
+        state = self.state
+        baseline = state.summary
+        allocated_total = baseline.total_allocated_hours
+        overallocated_count = baseline.overallocated_count
+        conflict_count = baseline.conflict_count
+        members: list[ScenarioMemberChange] = []
+        added: list[CapacityConflict] = []
+        resolved: list[CapacityConflict] = []
+
+        for member_id in sorted(self._touched):
+            if member_id not in state.members:
+                continue  # Inactive members do not count towards capacity
+            before = state.snapshots[member_id]
+            rows = [r for r in self.member_rows(member_id) if r.get("status") == "active"]
+            after = build_capacity_snapshot(
+                state.members[member_id],
+                sum((_hours(r) for r in rows), Decimal(0)),
+                state.week_start_date,
+            )
+            conflicts = build_member_conflicts(after, rows)
+            new, gone = diff_conflicts(state.conflicts.get(member_id, []), conflicts)
+            added.extend(new)
+            resolved.extend(gone)
+            conflict_count += len(new) - len(gone)
+            allocated_total += after.allocated_hours - before.allocated_hours
+            overallocated_count += int(after.overallocated) - int(before.overallocated)
+
+            if after.allocated_hours != before.allocated_hours:
+                members.append(
+                    ScenarioMemberChange(
+                        team_member_id=member_id,
+                        full_name=after.full_name,
+                        total_capacity_hours=after.total_capacity_hours,
+                        allocated_before=before.allocated_hours,
+                        allocated_after=after.allocated_hours,
+                        utilization_before=_round(before.utilization_pct),
+                        utilization_after=_round(after.utilization_pct),
+                        overallocated_before=before.overallocated,
+                        overallocated_after=after.overallocated,
+                    )
+                )
+
+        members.sort(key=lambda m: m.utilization_after, reverse=True)
+
+        return ScenarioResult(
+            name=name,
+            total_capacity_hours=baseline.total_capacity_hours,
+            total_allocated_hours=allocated_total,
+            utilization_pct=_utilization(allocated_total, baseline.total_capacity_hours),
+            overallocated_count=overallocated_count,
+            conflict_count=conflict_count,
+            members=members,
+            conflicts_added=added,
+            conflicts_resolved=resolved,
+            errors=self.errors,
+        )
+
+
+async def compare_scenarios(
+    request: ScenarioComparisonRequest,
+) -> ScenarioComparisonResponse:
+    """
+    Evaluate every scenario against one load of the current state.
+
+    Args:
+        request: Scenarios to compare and the week they apply to
+
+    Returns:
+        ScenarioComparisonResponse with the baseline and per-scenario results.
+        Changes that reference missing rows are reported in each result's
+        ``errors`` rather than failing the whole request.
+    """
+    week_start_date = get_week_start(request.week_start_date)
+    project_ids = [
+        create.project_id
+        for scenario in request.scenarios
+        for create in scenario.creates
+    ]
+    state = load_capacity_state(week_start_date, project_ids)
+
+    return ScenarioComparisonResponse(
+        week_start_date=week_start_date,
+        baseline=state.summary,
+        scenarios=[
+            ScenarioOverlay(state).apply(scenario).evaluate(scenario.name)
+            for scenario in request.scenarios
+        ],
+    )
@@ -0,0 +1,46 @@
+"""
+Single-flight coalescing of identical concurrent computations.
+
+The first caller for a key starts the computation; callers arriving while it
+is still running await the same task instead of starting their own, and all
+of them get its result (or its exception). Nothing is kept once the task
+finishes, so this is not a cache: keys should include whatever version the
+result depends on, so a caller arriving after a write never joins a
+computation that started before it.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from app.telemetry.metrics import record_single_flight
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """In-flight computations keyed by what they compute."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `compute` once for all concurrent callers with the same key.
+
+        A caller that is cancelled (e.g. the client disconnected) stops
+        waiting without cancelling the shared task.
+        """
+        task = self._calls.get(key)
+        record_single_flight(self.name, joined=task is not None)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved; every waiter already got it
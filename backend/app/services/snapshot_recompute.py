@@ -0,0 +1,446 @@
+"""
+Background recompute of capacity snapshots over a range of past weeks.
+
+`POST /api/capacity/recalculate` rebuilds the current week from the live
+assignment list. After data fixes, months of `capacity_snapshots` need the
+same treatment, which is too much for one request. A recompute job does it
+in the background:
+
+  - team members and the assignments that could overlap the range are read
+    once, and allocated hours for every member-week are derived in one pass
+    (a difference array per member over the range, so the cost is
+    assignments + members x weeks rather than their product)
+  - pending weeks are split into tasks of about UPSERT_BATCH_SIZE snapshot
+    rows, and a thread pool writes each task as one bulk upsert
+  - each finished task records its weeks in `capacity_recompute_job_weeks`
+    and the job row's progress is updated (migration 012)
+
+A worker claims a job with a conditional update that only succeeds while
+no other worker holds it: the job is not running, or its heartbeat
+(`updated_at`, refreshed every HEARTBEAT_SECONDS while it runs) is older
+than JOB_STALE_SECONDS. A job stopped by a restart, a failure or shutdown is
+resumed from the weeks not yet recorded; snapshots are upserted, so
+rewriting a week is harmless.
+
+Past weeks are computed from assignment date ranges: an active or completed
+assignment counts its `hours_this_week` in every week its start and end
+dates overlap, open ends being unbounded. Capacity is each member's current
+`weekly_capacity_hours`. Active members get a snapshot every week; inactive
+members only for weeks they had hours allocated.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from app import deadlines
+from app.config import settings
+from app.db.supabase_client import fetch_all, get_client
+from app.services.capacity_calculator import get_week_start
+from app.services.history_store import capacity_history
+from app.services.invalidation import CAPACITY_HISTORY, invalidation_bus
+from app.services.member_weeks import MEMBER_COLUMNS, ON_CONFLICT, UPSERT_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+JOBS_TABLE = "capacity_recompute_jobs"
+WEEKS_TABLE = "capacity_recompute_job_weeks"
+
+# Longest range one job may cover
+MAX_RECOMPUTE_WEEKS = 260
+
+# Assignment statuses that held capacity in the weeks they covered
+RECOMPUTED_STATUSES = ["active", "completed"]
+
+# A running job whose heartbeat is older than this is treated as abandoned
+JOB_STALE_SECONDS = 300
+
+# Seconds between heartbeats of a running job; well inside JOB_STALE_SECONDS
+HEARTBEAT_SECONDS = 30
+
+
+class RecomputeConflictError(Exception):
+    """The job is already running, here or on another worker."""
+
+
+def _now(offset_seconds: float = 0) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=offset_seconds)).isoformat()
+
+
+def _to_date(value: Any) -> date | None:
+    if value is None or value == "":
+        return None
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def job_weeks(job: dict[str, Any]) -> list[date]:
+    """Mondays of every week a job covers, oldest first."""
+    first, last = _to_date(job["week_from"]), _to_date(job["week_to"])
+    return [first + timedelta(weeks=i) for i in range((last - first).days // 7 + 1)]
+
+
+def allocation_matrix(
+    assignments: list[dict[str, Any]], weeks: list[date]
+) -> dict[str, list[Decimal]]:
+    """
+    Allocated hours per member for each of `weeks`.
+
+    Args:
+        assignments: Assignment rows with team_member_id, hours_this_week,
+            start_date and end_date
+        weeks: Consecutive Mondays, oldest first
+
+    Returns:
+        {team_member_id: hours per week, aligned with `weeks`}
+    """
+    if not weeks:
+        return {}
+    first, count = weeks[0], len(weeks)
+    deltas: dict[str, list[Decimal]] = {}
+
+    for a in assignments:
+        hours = Decimal(str(a["hours_this_week"] or 0))
+        if not hours:
+            continue
+        start, end = _to_date(a.get("start_date")), _to_date(a.get("end_date"))
+        lo = 0 if start is None else max(0, (get_week_start(start) - first).days // 7)
+        hi = count - 1 if end is None else min(count - 1, (get_week_start(end) - first).days // 7)
+        if lo > hi:
+            continue
+        member = deltas.setdefault(a["team_member_id"], [Decimal(0)] * (count + 1))
+        member[lo] += hours
+        member[hi + 1] -= hours
+
+    allocations = {}
+    for member_id, member in deltas.items():
+        running, weekly = Decimal(0), []
+        for delta in member[:count]:
+            running += delta
+            weekly.append(running)
+        allocations[member_id] = weekly
+    return allocations
+
+
+def build_week_snapshots(
+    members: list[dict[str, Any]],
+    allocations: dict[str, list[Decimal]],
+    index: int,
+    week: date,
+) -> list[dict[str, Any]]:
+    """Snapshot upsert rows for one week (see module docstring for who is included)."""
+    rows = []
+    for m in members:
+        weekly = allocations.get(m["id"])
+        allocated = weekly[index] if weekly else Decimal(0)
+        if not m.get("active", True) and not allocated:
+            continue
+        rows.append(
+            {
+                "team_member_id": m["id"],
+                "week_start_date": week.isoformat(),
+                "total_capacity_hours": float(Decimal(str(m["weekly_capacity_hours"] or 40))),
+                "allocated_hours": float(allocated),
+            }
+        )
+    return rows
+
+
+class SnapshotRecomputer:
+    """Creates, runs and resumes snapshot recompute jobs."""
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._stopping = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def create_job(self, week_from: date, week_to: date, client=None) -> dict[str, Any]:
+        """
+        Record a pending job for the weeks containing `week_from`..`week_to`.
+
+        Raises:
+            ValueError: If the range is inverted, too long, or reaches the
+                current week (which /recalculate rebuilds live)
+        """
+        client = client or get_client()
+        first, last = get_week_start(week_from), get_week_start(week_to)
+        if first > last:
+            raise ValueError("week_from must be on or before week_to")
+        if last >= get_week_start():
+            raise ValueError(
+                "Recompute covers past weeks only; use POST /api/capacity/recalculate "
+                "for the current week"
+            )
+        total = (last - first).days // 7 + 1
+        if total > MAX_RECOMPUTE_WEEKS:
+            raise ValueError(f"A recompute job covers at most {MAX_RECOMPUTE_WEEKS} weeks")
+
+        response = (
+            client.table(JOBS_TABLE)
+            .insert(
+                {
+                    "week_from": first.isoformat(),
+                    "week_to": last.isoformat(),
+                    "status": "pending",
+                    "total_weeks": total,
+                    "completed_weeks": 0,
+                    "snapshots_written": 0,
+                }
+            )
+            .execute()
+        )
+        return response.data[0]
+
+    def get_job(self, job_id: str, client=None) -> dict[str, Any] | None:
+        client = client or get_client()
+        response = client.table(JOBS_TABLE).select("*").eq("id", job_id).execute()
+        return response.data[0] if response.data else None
+
+    def _update_job(self, client, job_id: str, **fields: Any) -> None:
+        client.table(JOBS_TABLE).update({**fields, "updated_at": _now()}).eq("id", job_id).execute()
+
+    def _claim(self, client, job: dict[str, Any]) -> dict[str, Any]:
+        """
+        Mark a job running, unless another worker holds it.
+
+        Each update only matches while the job is unclaimed, so of two
+        workers claiming at once exactly one changes the row.
+
+        Returns:
+            The claimed job row
+
+        Raises:
+            RecomputeConflictError: If the job is running and its heartbeat
+                is recent
+        """
+        if job["id"] in self._tasks:
+            raise RecomputeConflictError("Job is already running")
+        claim = {
+            "status": "running",
+            "started_at": job.get("started_at") or _now(),
+            "error": None,
+            "updated_at": _now(),
+        }
+        claimed = (
+            client.table(JOBS_TABLE)
+            .update(claim)
+            .eq("id", job["id"])
+            .neq("status", "running")
+            .execute()
+        ).data
+        if not claimed:
+            # Taken over from a worker that stopped without finishing it
+            claimed = (
+                client.table(JOBS_TABLE)
+                .update(claim)
+                .eq("id", job["id"])
+                .eq("status", "running")
+                .lt("updated_at", _now(-JOB_STALE_SECONDS))
+                .execute()
+            ).data
+        if not claimed:
+            raise RecomputeConflictError("Job is running on another worker")
+        return claimed[0]
+
+    @contextmanager
+    def _heartbeat(self, client, job_id: str) -> Iterator[None]:
+        """Refresh the job's updated_at every HEARTBEAT_SECONDS while the block runs."""
+        finished = threading.Event()
+
+        def beat() -> None:
+            while not finished.wait(HEARTBEAT_SECONDS):
+                try:
+                    self._update_job(client, job_id)
+                except Exception as e:
+                    logger.warning("Heartbeat for snapshot recompute %s failed: %s", job_id, e)
+
+        thread = threading.Thread(
+            target=beat, name="snapshot-recompute-heartbeat", daemon=True
+        )
+        thread.start()
+        try:
+            yield
+        finally:
+            finished.set()
+            thread.join()
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def _write_task(
+        self,
+        client,
+        job_id: str,
+        members: list[dict[str, Any]],
+        allocations: dict[str, list[Decimal]],
+        task: list[tuple[int, date]],
+    ) -> tuple[int, int] | None:
+        """Upsert a task's snapshots, then record its weeks as done."""
+        if self._stopping.is_set():
+            return None
+        weeks = [(w, build_week_snapshots(members, allocations, i, w)) for i, w in task]
+        rows = [row for _, week_rows in weeks for row in week_rows]
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            (
+                client.table("capacity_snapshots")
+                .upsert(rows[start : start + UPSERT_BATCH_SIZE], on_conflict=ON_CONFLICT)
+                .execute()
+            )
+        client.table(WEEKS_TABLE).upsert(
+            [
+                {
+                    "job_id": job_id,
+                    "week_start_date": week.isoformat(),
+                    "snapshots": len(week_rows),
+                    "completed_at": _now(),
+                }
+                for week, week_rows in weeks
+            ],
+            on_conflict="job_id,week_start_date",
+        ).execute()
+        return len(weeks), len(rows)
+
+    def run(self, job_id: str, client=None, claimed: bool = False) -> dict[str, Any]:
+        """
+        Run or resume a job to completion on a worker pool (blocking).
+
+        Args:
+            job_id: Job to run
+            client: Database client (defaults to the shared client)
+            claimed: The caller already claimed the job (see start)
+
+        Returns:
+            The final job row
+
+        Raises:
+            ValueError: If the job does not exist
+            RecomputeConflictError: If another worker is running the job
+        """
+        client = client or get_client()
+        job = self.get_job(job_id, client)
+        if job is None:
+            raise ValueError(f"Recompute job not found: {job_id}")
+        if job["status"] == "completed":
+            return job
+        if not claimed:
+            job = self._claim(client, job)
+        with self._heartbeat(client, job_id):
+            return self._run_claimed(client, job)
+
+    def _run_claimed(self, client, job: dict[str, Any]) -> dict[str, Any]:
+        job_id = job["id"]
+        weeks = job_weeks(job)
+        done = (
+            client.table(WEEKS_TABLE)
+            .select("week_start_date, snapshots")
+            .eq("job_id", job_id)
+            .execute()
+        ).data
+        done_weeks = {_to_date(d["week_start_date"]) for d in done}
+        completed = len(done_weeks)
+        written = sum(d["snapshots"] or 0 for d in done)
+        self._update_job(client, job_id, completed_weeks=completed, snapshots_written=written)
+
+        try:
+            members = client.table("team_members").select(MEMBER_COLUMNS).execute().data
+            assignments = fetch_all(
+                lambda: client.table("assignments")
+                .select("id, team_member_id, hours_this_week, start_date, end_date")
+                .in_("status", RECOMPUTED_STATUSES)
+                .order("id")
+            )
+            allocations = allocation_matrix(assignments, weeks)
+
+            # Weeks per task so each task is about one upsert batch
+            per_task = max(1, UPSERT_BATCH_SIZE // max(1, len(members)))
+            pending = [(i, w) for i, w in enumerate(weeks) if w not in done_weeks]
+            tasks = [pending[i : i + per_task] for i in range(0, len(pending), per_task)]
+
+            with ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="snapshot-recompute"
+            ) as pool:
+                futures = {
+                    pool.submit(self._write_task, client, job_id, members, allocations, task)
+                    for task in tasks
+                }
+                try:
+                    while futures:
+                        finished, futures = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            result = future.result()
+                            if result is None:
+                                continue
+                            completed += result[0]
+                            written += result[1]
+                        self._update_job(
+                            client, job_id, completed_weeks=completed, snapshots_written=written
+                        )
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        except Exception as e:
+            logger.exception("Snapshot recompute %s failed", job_id)
+            self._update_job(client, job_id, status="failed", error=str(e))
+            return self.get_job(job_id, client)
+
+        if completed < len(weeks):
+            self._update_job(client, job_id, status="interrupted")
+            return self.get_job(job_id, client)
+
+        # Rewritten history: refresh the local analytics copy from the database
+        capacity_history.sync(full=True, client=client)
+        self._update_job(client, job_id, status="completed", finished_at=_now())
+        return self.get_job(job_id, client)
+
+    async def _run_in_background(self, job_id: str) -> None:
+        try:
+            job = await asyncio.to_thread(self.run, job_id, claimed=True)
+        except Exception:
+            logger.exception("Snapshot recompute %s failed", job_id)
+            return
+        finally:
+            self._tasks.pop(job_id, None)
+        if job["status"] == "completed":
+            await invalidation_bus.publish(CAPACITY_HISTORY)
+
+    async def start(self, job_id: str, client=None) -> dict[str, Any] | None:
+        """
+        Run or resume a job in the background.
+
+        Returns:
+            The job row, or None if it does not exist
+
+        Raises:
+            RecomputeConflictError: If the job is already running
+        """
+        client = client or get_client()
+        job = self.get_job(job_id, client)
+        if job is None:
+            return None
+        if job["status"] == "completed":
+            return job
+        job = await asyncio.to_thread(self._claim, client, job)
+        self._stopping.clear()
+        with deadlines.unbounded():  # Outlives the request that started it
+            self._tasks[job_id] = asyncio.create_task(self._run_in_background(job_id))
+        return job
+
+    async def stop(self) -> None:
+        """Let in-flight tasks finish and leave jobs resumable (on shutdown)."""
+        self._stopping.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+
+# Shared recompute runner for this process
+snapshot_recompute = SnapshotRecomputer(settings.recompute_workers)
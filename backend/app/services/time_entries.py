@@ -0,0 +1,445 @@
+"""
+Streaming import of timesheet exports into time_entries.
+
+Rows flow through a generator pipeline, so memory stays flat however large
+the export is:
+
+    read (CSV/JSONL) -> parse + validate -> batch -> resolve -> import chunk
+
+Names, emails and project names are resolved against the database once per
+batch for values not seen before. Each chunk is written by the
+`import_time_entry_chunk` function (migration 014), which inserts the entries
+and moves `hours_consumed` on the affected assignments and projects by the
+chunk's hours in one transaction, instead of re-summing all time entries.
+"""
+
+import csv
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+from app.db.supabase_client import get_client
+from app.models.schemas import TimeEntryImportError, TimeEntryImportResponse
+
+
+# Rows resolved and inserted per round trip
+IMPORT_BATCH_SIZE = 1000
+
+# Row errors returned in the response (the rest are only counted)
+MAX_REPORTED_ERRORS = 100
+
+# Values per `in` filter, keeping request URLs short
+LOOKUP_CHUNK_SIZE = 200
+
+# Hours allowed on a single entry
+MAX_ENTRY_HOURS = Decimal(24)
+
+# Alternative column names found in timesheet exports
+COLUMN_ALIASES = {
+    "member_email": "email",
+    "team_member_email": "email",
+    "team_member": "person",
+    "full_name": "person",
+    "name": "person",
+    "project_name": "project",
+    "notes": "description",
+    "duration": "hours",
+    "entry_date": "date",
+}
+
+TRUE_VALUES = {"true", "t", "yes", "y", "1"}
+FALSE_VALUES = {"false", "f", "no", "n", "0"}
+
+
+class RowError(Exception):
+    """A timesheet row that cannot be imported."""
+
+
+@dataclass
+class ParsedEntry:
+    """A validated row whose references are not yet resolved."""
+
+    line: int
+    date: date
+    hours: Decimal
+    billable: bool
+    description: str | None
+    assignment_id: str | None
+    team_member_id: str | None
+    email: str | None
+    person: str | None
+    project_id: str | None
+    project: str | None
+
+
+def _normalise_key(key: str) -> str:
+    key = key.strip().lower().replace(" ", "_").replace("-", "_")
+    return COLUMN_ALIASES.get(key, key)
+
+
+def read_rows(
+    lines: Iterable[str],
+    format: str = "csv",
+) -> Iterator[tuple[int, dict[str, Any] | RowError]]:
+    """
+    Yield (line number, row) pairs from CSV or JSON Lines text.
+
+    JSONL lines that are not JSON objects are yielded as a RowError in place
+    of the row, so one bad line does not stop the import.
+    """
+    if format == "jsonl":
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, RowError(f"Invalid JSON: {e.msg}")
+                continue
+            if not isinstance(row, dict):
+                yield line_number, RowError("Expected a JSON object")
+                continue
+            yield line_number, {_normalise_key(k): v for k, v in row.items()}
+        return
+
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, {
+            _normalise_key(k): v for k, v in row.items() if k is not None
+        }
+
+
+def _text(row: dict[str, Any], key: str) -> str | None:
+    value = row.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _uuid(row: dict[str, Any], key: str) -> str | None:
+    value = _text(row, key)
+    if value is None:
+        return None
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        raise RowError(f"Invalid {key}: {value}")
+
+
+def parse_entry(line: int, row: dict[str, Any]) -> ParsedEntry:
+    """
+    Validate one row.
+
+    Raises:
+        RowError: If a required value is missing or malformed
+    """
+    raw_date = _text(row, "date")
+    if raw_date is None:
+        raise RowError("Missing date")
+    try:
+        entry_date = date.fromisoformat(raw_date[:10])
+    except ValueError:
+        raise RowError(f"Invalid date: {raw_date}")
+
+    raw_hours = _text(row, "hours")
+    try:
+        hours = Decimal(raw_hours) if raw_hours is not None else None
+    except InvalidOperation:
+        hours = None
+    if hours is None or not hours.is_finite():
+        raise RowError(f"Invalid hours: {raw_hours}")
+    if hours <= 0 or hours > MAX_ENTRY_HOURS:
+        raise RowError(f"Hours must be between 0 and {MAX_ENTRY_HOURS}: {hours}")
+
+    raw_billable = (_text(row, "billable") or "true").lower()
+    if raw_billable not in TRUE_VALUES | FALSE_VALUES:
+        raise RowError(f"Invalid billable flag: {raw_billable}")
+
+    entry = ParsedEntry(
+        line=line,
+        date=entry_date,
+        hours=hours.quantize(Decimal("0.01")),
+        billable=raw_billable in TRUE_VALUES,
+        description=_text(row, "description"),
+        assignment_id=_uuid(row, "assignment_id"),
+        team_member_id=_uuid(row, "team_member_id"),
+        email=(_text(row, "email") or "").lower() or None,
+        person=_text(row, "person"),
+        project_id=_uuid(row, "project_id"),
+        project=_text(row, "project"),
+    )
+    if not entry.assignment_id:
+        if not (entry.team_member_id or entry.email or entry.person):
+            raise RowError("Missing team member (team_member_id, email or person)")
+        if not (entry.project_id or entry.project):
+            raise RowError("Missing project (project_id or project)")
+    return entry
+
+
+def parse_entries(
+    rows: Iterable[tuple[int, dict[str, Any] | RowError]],
+) -> Iterator[ParsedEntry | tuple[int, RowError]]:
+    """Validate rows, passing errors through with their line numbers."""
+    for line, row in rows:
+        if isinstance(row, RowError):
+            yield line, row
+            continue
+        try:
+            yield parse_entry(line, row)
+        except RowError as e:
+            yield line, e
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# Marks a name shared by more than one team member or project
+AMBIGUOUS = object()
+
+
+class EntryResolver:
+    """
+    Resolves member and project references to assignment ids.
+
+    Lookups are cached for the whole import, so each distinct email, name or
+    project is queried once, in bulk with the other unknowns of its batch.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.members: dict[tuple[str, str], Any] = {}  # (column, value) -> id
+        self.projects: dict[tuple[str, str], Any] = {}
+        self.assignments: dict[str, tuple[str, str] | None] = {}  # id -> (member, project)
+        self.pairs: dict[tuple[str, str], str] = {}  # (member, project) -> assignment id
+        self.loaded_members: set[str] = set()
+
+    def _lookup(
+        self,
+        table: str,
+        cache: dict[tuple[str, str], Any],
+        column: str,
+        values: set[str],
+    ) -> None:
+        missing = [v for v in values if (column, v) not in cache]
+        rows = []
+        for chunk in batched(missing, LOOKUP_CHUNK_SIZE):
+            rows += (
+                self.client.table(table)
+                .select(f"id, {column}")
+                .in_(column, chunk)
+                .execute()
+            ).data
+        for value in missing:
+            cache[(column, value)] = None
+        for row in rows:
+            key = (column, str(row[column]).lower() if column == "email" else row[column])
+            cache[key] = row["id"] if cache.get(key) in (None, row["id"]) else AMBIGUOUS
+
+    def _load_assignments(self, assignment_ids: set[str], member_ids: set[str]) -> None:
+        ids = [i for i in assignment_ids if i not in self.assignments]
+        members = [m for m in member_ids if m not in self.loaded_members]
+        rows = []
+        for column, values in (("id", ids), ("team_member_id", members)):
+            for chunk in batched(values, LOOKUP_CHUNK_SIZE):
+                rows += (
+                    self.client.table("assignments")
+                    .select("id, team_member_id, project_id")
+                    .in_(column, chunk)
+                    .execute()
+                ).data
+        for i in ids:
+            self.assignments.setdefault(i, None)
+        self.loaded_members.update(members)
+        for row in rows:
+            self.assignments[row["id"]] = (row["team_member_id"], row["project_id"])
+            self.pairs[(row["team_member_id"], row["project_id"])] = row["id"]
+
+    def _member(self, entry: ParsedEntry) -> str:
+        for column, value in (
+            ("id", entry.team_member_id),
+            ("email", entry.email),
+            ("full_name", entry.person),
+        ):
+            if value is None:
+                continue
+            member_id = self.members.get((column, value))
+            if member_id is AMBIGUOUS:
+                raise RowError(f"More than one team member named {value}")
+            if member_id is None:
+                raise RowError(f"Team member not found: {value}")
+            return member_id
+        raise RowError("Missing team member")
+
+    def _project(self, entry: ParsedEntry) -> str:
+        column, value = ("id", entry.project_id) if entry.project_id else ("name", entry.project)
+        project_id = self.projects.get((column, value))
+        if project_id is AMBIGUOUS:
+            raise RowError(f"More than one project named {value}")
+        if project_id is None:
+            raise RowError(f"Project not found: {value}")
+        return project_id
+
+    def resolve(
+        self,
+        entries: list[ParsedEntry],
+    ) -> Iterator[tuple[ParsedEntry, dict[str, Any] | RowError]]:
+        """Yield each entry with its time_entries row, or why it failed."""
+        by_reference = [e for e in entries if not e.assignment_id]
+        # Only the most specific reference on each row is looked up
+        ids, emails, names, project_ids, project_names = set(), set(), set(), set(), set()
+        for e in by_reference:
+            if e.team_member_id:
+                ids.add(e.team_member_id)
+            elif e.email:
+                emails.add(e.email)
+            else:
+                names.add(e.person)
+            if e.project_id:
+                project_ids.add(e.project_id)
+            else:
+                project_names.add(e.project)
+        self._lookup("team_members", self.members, "id", ids)
+        self._lookup("team_members", self.members, "email", emails)
+        self._lookup("team_members", self.members, "full_name", names)
+        self._lookup("projects", self.projects, "id", project_ids)
+        self._lookup("projects", self.projects, "name", project_names)
+
+        resolved: list[tuple[ParsedEntry, str | RowError, str | None]] = []
+        member_ids = set()
+        for entry in entries:
+            if entry.assignment_id:
+                resolved.append((entry, entry.assignment_id, None))
+                continue
+            try:
+                member_id = self._member(entry)
+                project_id = self._project(entry)
+            except RowError as e:
+                resolved.append((entry, e, None))
+                continue
+            member_ids.add(member_id)
+            resolved.append((entry, member_id, project_id))
+
+        self._load_assignments({e.assignment_id for e in entries if e.assignment_id}, member_ids)
+
+        for entry, reference, project_id in resolved:
+            if isinstance(reference, RowError):
+                yield entry, reference
+                continue
+            if project_id is None:
+                pair = self.assignments.get(reference)
+                if pair is None:
+                    yield entry, RowError(f"Assignment not found: {reference}")
+                    continue
+                assignment_id, (member_id, project_id) = reference, pair
+            else:
+                member_id = reference
+                assignment_id = self.pairs.get((member_id, project_id))
+                if assignment_id is None:
+                    yield entry, RowError(
+                        f"No assignment for {entry.email or entry.person or member_id} "
+                        f"on {entry.project or project_id}"
+                    )
+                    continue
+            yield entry, {
+                "assignment_id": assignment_id,
+                "team_member_id": member_id,
+                "project_id": project_id,
+                "date": entry.date.isoformat(),
+                "hours": float(entry.hours),
+                "description": entry.description,
+                "billable": entry.billable,
+            }
+
+
+def detect_format(hint: str | None) -> str:
+    """Pick csv or jsonl from a content type or file name (csv by default)."""
+    hint = (hint or "").lower()
+    if any(marker in hint for marker in ("jsonl", "ndjson", "json")):
+        return "jsonl"
+    return "csv"
+
+
+def import_time_entries(
+    lines: Iterable[str],
+    format: str = "csv",
+    dry_run: bool = False,
+    client=None,
+) -> TimeEntryImportResponse:
+    """
+    Import a timesheet export.
+
+    Rows that fail validation or resolution are skipped and reported; valid
+    rows in the same batch are still imported.
+
+    Args:
+        lines: Text lines of the export (a file object works)
+        format: "csv" (header row required) or "jsonl"
+        dry_run: Validate and resolve without writing anything
+        client: Database client (defaults to the shared client)
+
+    Returns:
+        TimeEntryImportResponse with counts and the first row errors
+    """
+    started = time.perf_counter()
+    client = client or get_client()
+    resolver = EntryResolver(client)
+
+    rows_read = inserted = skipped = 0
+    hours = Decimal(0)
+    assignments: set[str] = set()
+    projects: set[str] = set()
+    errors: list[TimeEntryImportError] = []
+
+    def reject(line: int, error: RowError) -> None:
+        nonlocal skipped
+        skipped += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(TimeEntryImportError(line=line, error=str(error)))
+
+    for batch in batched(parse_entries(read_rows(lines, format)), IMPORT_BATCH_SIZE):
+        rows_read += len(batch)
+        entries = []
+        for item in batch:
+            if isinstance(item, ParsedEntry):
+                entries.append(item)
+            else:
+                reject(*item)
+
+        chunk = []
+        for entry, result in resolver.resolve(entries):
+            if isinstance(result, RowError):
+                reject(entry.line, result)
+            else:
+                chunk.append(result)
+        if not chunk:
+            continue
+
+        if not dry_run:
+            client.rpc("import_time_entry_chunk", {"p_entries": chunk}).execute()
+
+        inserted += len(chunk)
+        hours += sum(Decimal(str(r["hours"])) for r in chunk)
+        assignments.update(r["assignment_id"] for r in chunk)
+        projects.update(r["project_id"] for r in chunk)
+
+    return TimeEntryImportResponse(
+        rows_read=rows_read,
+        inserted=inserted,
+        skipped=skipped,
+        hours_imported=hours,
+        assignments_updated=len(assignments),
+        projects_updated=len(projects),
+        errors=errors,
+        errors_truncated=skipped > len(errors),
+        dry_run=dry_run,
+        duration_seconds=round(time.perf_counter() - started, 3),
+    )
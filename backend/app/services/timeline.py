@@ -0,0 +1,285 @@
+"""
+Timeline conflict detection across multiple weeks.
+
+Every project deadline and open milestone creates a crunch window: the week
+it falls in plus the lead-up weeks before it. Windows are clipped to each
+assignment's start and end dates, so people only crunch on work they are
+actually on. A per-member sweep over the sorted window endpoints then finds
+the stretches where two or more projects crunch at the same time, in
+O(n log n) for n windows, whatever the horizon.
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from app.db.supabase_client import fetch_all, get_client
+from app.models.schemas import CapacityConflict
+from app.services.assignment_optimizer import PRIORITY_ORDER
+from app.services.capacity_calculator import get_week_start
+
+
+# Weeks in a crunch window, counting the week of the deadline itself
+CRUNCH_WEEKS = 2
+
+# Default number of weeks scanned
+DEFAULT_HORIZON_WEEKS = 8
+
+# Longest horizon a request may scan
+MAX_HORIZON_WEEKS = 52
+
+# Milestone types that create crunch (meetings alone do not)
+CRUNCH_MILESTONE_TYPES = {"ppm", "delivery", "review", "milestone", "deadline"}
+
+# Distinct projects crunching at once that always counts as high severity
+HIGH_SEVERITY_PROJECTS = 3
+
+SEVERITY_ORDER = {"low": 0, "medium": 1, "high": 2}
+
+WEEK = timedelta(days=7)
+
+
+@dataclass(frozen=True)
+class CrunchWindow:
+    """Weeks a member is crunching towards one project date."""
+
+    project_id: str
+    project_name: str
+    priority: str
+    reason: str
+    start: date  # Monday of the first week
+    end: date  # Monday of the last week (inclusive)
+
+
+def _parse_date(value: Any) -> date | None:
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def build_crunch_windows(
+    assignments: list[dict[str, Any]],
+    milestones: list[dict[str, Any]],
+    horizon_start: date,
+    horizon_end: date,
+) -> dict[str, list[CrunchWindow]]:
+    """
+    Build crunch windows per member, clipped to assignments and the horizon.
+
+    Args:
+        assignments: Active assignment rows with start/end dates and embedded
+            `projects(name, priority, deadline)`
+        milestones: Open milestone rows (project_id, name, type, date)
+        horizon_start: Monday of the first week scanned
+        horizon_end: Monday of the last week scanned (inclusive)
+
+    Returns:
+        Mapping of team member id to their crunch windows
+    """
+    dates_by_project: dict[str, list[tuple[date, str]]] = {}
+    for m in milestones:
+        milestone_date = _parse_date(m.get("date"))
+        if milestone_date and (m.get("type") or "milestone") in CRUNCH_MILESTONE_TYPES:
+            dates_by_project.setdefault(m["project_id"], []).append(
+                (milestone_date, f"{m['name']} {milestone_date:%d %b}")
+            )
+
+    lead_in = (CRUNCH_WEEKS - 1) * WEEK
+    windows: dict[str, list[CrunchWindow]] = {}
+
+    for a in assignments:
+        project = a.get("projects") or {}
+        dates = list(dates_by_project.get(a["project_id"], []))
+        deadline = _parse_date(project.get("deadline"))
+        if deadline:
+            dates.append((deadline, f"deadline {deadline:%d %b}"))
+        if not dates:
+            continue
+
+        assignment_start = _parse_date(a.get("start_date"))
+        assignment_end = _parse_date(a.get("end_date"))
+        lower, upper = horizon_start, horizon_end
+        if assignment_start:
+            lower = max(lower, get_week_start(assignment_start))
+        if assignment_end:
+            upper = min(upper, get_week_start(assignment_end))
+
+        for crunch_date, reason in dates:
+            due_week = get_week_start(crunch_date)
+            start = max(due_week - lead_in, lower)
+            end = min(due_week, upper)
+            if start > end:
+                continue
+            windows.setdefault(a["team_member_id"], []).append(
+                CrunchWindow(
+                    project_id=a["project_id"],
+                    project_name=project.get("name") or "Unknown project",
+                    priority=project.get("priority") or "medium",
+                    reason=reason,
+                    start=start,
+                    end=end,
+                )
+            )
+
+    return windows
+
+
+def _severity(windows: list[CrunchWindow]) -> str:
+    priorities = {w.priority for w in windows}
+    projects = {w.project_id for w in windows}
+    if len(projects) >= HIGH_SEVERITY_PROJECTS or "urgent" in priorities:
+        return "high"
+    if "high" in priorities:
+        return "medium"
+    return "low"
+
+
+def find_overlaps(windows: list[CrunchWindow]) -> list[tuple[date, date, list[CrunchWindow]]]:
+    """
+    Sweep one member's windows for stretches where 2+ projects crunch.
+
+    A stretch ends whenever the set of crunching projects changes, so each
+    result names exactly the projects competing in its weeks.
+
+    Returns:
+        (first week, last week, windows involved) for each stretch
+    """
+    # Removals sort before additions on the same Monday: a window ending the
+    # week before another starts does not overlap it
+    events = sorted(
+        [(w.start, 1, i) for i, w in enumerate(windows)]
+        + [(w.end + WEEK, 0, i) for i, w in enumerate(windows)]
+    )
+
+    active_by_project: dict[str, int] = {}
+    active: set[int] = set()
+    overlaps = []
+    open_key: frozenset[str] | None = None
+    open_start = date.min
+    involved: dict[int, CrunchWindow] = {}
+
+    position = 0
+    while position < len(events):
+        week = events[position][0]
+        while position < len(events) and events[position][0] == week:
+            _, is_start, index = events[position]
+            project_id = windows[index].project_id
+            if is_start:
+                active.add(index)
+                active_by_project[project_id] = active_by_project.get(project_id, 0) + 1
+            else:
+                active.discard(index)
+                active_by_project[project_id] -= 1
+                if not active_by_project[project_id]:
+                    del active_by_project[project_id]
+            position += 1
+
+        key = frozenset(active_by_project) if len(active_by_project) >= 2 else None
+        if key != open_key:
+            if open_key is not None:
+                overlaps.append((open_start, week - WEEK, list(involved.values())))
+            open_key, open_start, involved = key, week, {}
+        if key is not None:
+            involved.update((i, windows[i]) for i in active)
+
+    return overlaps
+
+
+def find_timeline_conflicts(
+    members: list[dict[str, Any]],
+    windows_by_member: dict[str, list[CrunchWindow]],
+    min_severity: str = "low",
+) -> list[CapacityConflict]:
+    """Report overlapping crunch windows as timeline conflicts."""
+    names = {m["id"]: m["full_name"] for m in members}
+    conflicts: list[CapacityConflict] = []
+
+    for member_id, windows in windows_by_member.items():
+        if member_id not in names or len(windows) < 2:
+            continue
+        for start, end, involved in find_overlaps(windows):
+            severity = _severity(involved)
+            if SEVERITY_ORDER[severity] < SEVERITY_ORDER[min_severity]:
+                continue
+
+            reasons: dict[str, list[str]] = {}
+            priority: dict[str, str] = {}
+            for w in sorted(involved, key=lambda w: w.start):
+                reasons.setdefault(w.project_name, []).append(w.reason)
+                priority[w.project_name] = w.priority
+            projects = sorted(reasons, key=lambda p: PRIORITY_ORDER.get(priority[p], 2))
+            weeks = f"w/c {start:%d %b}" if start == end else f"w/c {start:%d %b} to {end:%d %b}"
+
+            conflicts.append(
+                CapacityConflict(
+                    type="timeline-conflict",
+                    team_member_id=member_id,
+                    team_member_name=names[member_id],
+                    affected_projects=projects,
+                    severity=severity,
+                    description=f"{names[member_id]} has {len(projects)} project crunches "
+                    f"overlapping {weeks}: "
+                    + "; ".join(f"{p} ({', '.join(reasons[p])})" for p in projects),
+                    suggested_resolution=f"Move a {projects[-1]} date or bring in support",
+                    week_start=start,
+                    week_end=end,
+                )
+            )
+
+    conflicts.sort(
+        key=lambda c: (-SEVERITY_ORDER[c.severity], c.week_start, c.team_member_name)
+    )
+    return conflicts
+
+
+def load_timeline_conflicts(
+    week_start_date: date | None = None,
+    weeks: int = DEFAULT_HORIZON_WEEKS,
+    min_severity: str = "low",
+) -> list[CapacityConflict]:
+    """
+    Detect overlapping crunch windows for all active members.
+
+    Three paged reads regardless of horizon: members, active assignments with
+    their project deadlines, and open milestones in range.
+
+    Args:
+        week_start_date: Monday of the first week (defaults to current week)
+        weeks: Number of weeks to scan
+        min_severity: Drop conflicts below this severity
+
+    Returns:
+        List of timeline-conflict CapacityConflict objects with week ranges
+    """
+    horizon_start = get_week_start(week_start_date)
+    horizon_end = horizon_start + (weeks - 1) * WEEK
+    # Dates up to the lead-in past the horizon still crunch inside it
+    last_date = horizon_end + (CRUNCH_WEEKS - 1) * WEEK + timedelta(days=6)
+
+    client = get_client()
+    members = fetch_all(
+        lambda: client.table("team_members")
+        .select("id, full_name")
+        .eq("active", True)
+        .order("id")
+    )
+    assignments = fetch_all(
+        lambda: client.table("assignments")
+        .select(
+            "id, team_member_id, project_id, start_date, end_date, "
+            "projects(name, priority, deadline)"
+        )
+        .eq("status", "active")
+        .order("id")
+    )
+    milestones = fetch_all(
+        lambda: client.table("milestones")
+        .select("id, project_id, name, type, date")
+        .eq("completed", False)
+        .gte("date", horizon_start.isoformat())
+        .lte("date", last_date.isoformat())
+        .order("id")
+    )
+
+    windows = build_crunch_windows(assignments, milestones, horizon_start, horizon_end)
+    return find_timeline_conflicts(members, windows, min_severity)
@@ -0,0 +1,271 @@
+"""
+Apply an approved transcript's extraction to projects, assignments and capacity.
+
+Approving a meeting used to mean one request per person and project from the
+review screen. The apply stage does it in one pass:
+
+  1. resolve: people are matched to active team members and projects to
+     existing projects by name, against one read of each table
+  2. plan: project upserts (new projects, milestones from inferred deadlines)
+     and assignment inserts are built from `extracted_data`, or from the
+     reviewer's selection when one is sent. Without a selection, extracted
+     assignments below APPLY_MIN_ASSIGNMENT_CONFIDENCE are skipped
+  3. commit: `apply_transcript_extraction` (migration 013) writes the plan,
+     recomputes the affected members' snapshots for the week and marks the
+     transcript approved, all in one transaction
+
+Weekly hours come from the reviewer when set, otherwise from the
+extraction's workload signal (WORKLOAD_HOURS); an assignment with neither is
+booked at 0h rather than a guess. Existing (project, member) assignments are
+left untouched. The apply key
+hashes the transcript, the extraction it was processed into and the
+selection; the database function stores the result per key, so a retried
+approval returns the first result instead of applying twice.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+from app.config import settings
+from app.db.supabase_client import fetch_all, get_client
+from app.models.schemas import ApprovedAssignment, TranscriptExtractionSchema
+from app.services.capacity_calculator import get_week_start
+
+
+# Weekly hours implied by an extracted workload signal, used when the
+# reviewer did not set any
+WORKLOAD_HOURS = {
+    "light": Decimal(4),
+    "medium": Decimal(8),
+    "heavy": Decimal(16),
+    "overloaded": Decimal(24),
+}
+
+
+@dataclass
+class ApplyPlan:
+    """Resolved writes for one approval."""
+
+    projects: list[dict[str, Any]] = field(default_factory=list)
+    assignments: list[dict[str, Any]] = field(default_factory=list)
+    unresolved_people: list[str] = field(default_factory=list)
+    unresolved_projects: list[str] = field(default_factory=list)  # Ambiguous names
+    skipped_assignments: list[ApprovedAssignment] = field(default_factory=list)  # Low confidence
+
+
+def _fold(name: str | None) -> str:
+    return " ".join((name or "").casefold().split())
+
+
+def match_name(name: str, rows: list[dict[str, Any]], column: str) -> dict[str, Any] | bool | None:
+    """
+    Find the row a spoken name refers to.
+
+    Tries an exact (case and spacing insensitive) match, then rows whose
+    name contains it, then, for people named by a single word, a unique
+    first name. A longer name that matches nobody ("Sarah Jones" when only
+    Sarah Smith exists) is not guessed at.
+
+    Returns:
+        The row, None if nothing matches, or False if several rows match
+    """
+    key = _fold(name)
+    if not key:
+        return None
+    for matches in (
+        [r for r in rows if _fold(r[column]) == key],
+        [r for r in rows if key in _fold(r[column])],
+        [r for r in rows if _fold(r[column]).split()[:1] == [key]]
+        if column == "full_name" and " " not in key
+        else [],
+    ):
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            return False
+    return None
+
+
+def build_plan(
+    extracted: TranscriptExtractionSchema,
+    members: list[dict[str, Any]],
+    projects: list[dict[str, Any]],
+    selection: list[ApprovedAssignment] | None = None,
+    today: date | None = None,
+    min_confidence: float | None = None,
+) -> ApplyPlan:
+    """
+    Resolve names and build the project and assignment writes.
+
+    Args:
+        extracted: The transcript's extraction
+        members: Active team members (id, full_name, role)
+        projects: Existing projects (id, name)
+        selection: Assignments the reviewer approved (defaults to the
+            extracted assignments at least `min_confidence` confident)
+        today: Deadlines before this date are not used as milestones
+        min_confidence: Confidence threshold without a selection (defaults
+            to settings.apply_min_assignment_confidence)
+
+    Returns:
+        ApplyPlan ready for `apply_transcript_extraction`
+    """
+    today = today or date.today()
+    if min_confidence is None:
+        min_confidence = settings.apply_min_assignment_confidence
+    plan = ApplyPlan()
+    planned: dict[str, dict[str, Any]] = {}  # Folded name -> project write
+
+    # The earliest upcoming dated deadline becomes the project's next milestone
+    milestones: dict[str, tuple[date, str]] = {}
+    for d in extracted.deadlines:
+        when = d.deadline_date_inferred
+        key = _fold(d.project_name)
+        if when and when >= today and (key not in milestones or when < milestones[key][0]):
+            milestones[key] = (when, d.milestone)
+
+    def plan_project(name: str, extraction=None) -> dict[str, Any] | None:
+        key = _fold(name)
+        if key in planned:
+            return planned[key]
+        existing = match_name(name, projects, "name")
+        if existing is False:
+            if name not in plan.unresolved_projects:
+                plan.unresolved_projects.append(name)
+            return None
+        milestone = milestones.get(key)
+        next_milestone = milestone[1] if milestone else None
+        if next_milestone is None and extraction:
+            next_milestone = extraction.next_milestone
+        write = {
+            "id": existing["id"] if existing else None,
+            "name": existing["name"] if existing else name.strip(),
+            "client": extraction.client if extraction else None,
+            "status": extraction.status if extraction else "active",
+            "next_milestone": next_milestone,
+            "next_milestone_date": milestone[0].isoformat() if milestone else None,
+        }
+        planned[key] = write
+        # Existing projects only named in an assignment need no write
+        if extraction or not existing:
+            plan.projects.append(write)
+        return write
+
+    for p in extracted.projects:
+        plan_project(p.name, p)
+
+    extracted_by_pair = {
+        (_fold(a.person_name), _fold(a.project_name)): a for a in extracted.assignments
+    }
+    if selection is None:
+        selection = []
+        for a in extracted.assignments:
+            approved = ApprovedAssignment(
+                person_name=a.person_name,
+                project_name=a.project_name,
+                role_on_project=a.role_inferred,
+            )
+            if a.confidence < min_confidence:
+                plan.skipped_assignments.append(approved)
+            else:
+                selection.append(approved)
+
+    seen: set[tuple[str, str]] = set()
+    for s in selection:
+        member = match_name(s.person_name, members, "full_name")
+        if not member:
+            if s.person_name not in plan.unresolved_people:
+                plan.unresolved_people.append(s.person_name)
+            continue
+        project = plan_project(s.project_name)
+        if project is None:
+            continue
+        pair = (member["id"], _fold(project["name"]))
+        if pair in seen:
+            continue
+        seen.add(pair)
+
+        source = extracted_by_pair.get((_fold(s.person_name), _fold(s.project_name)))
+        hours = s.hours_this_week
+        if hours is None:
+            signal = source.workload_signal if source else None
+            hours = WORKLOAD_HOURS.get(signal, Decimal(0))
+        plan.assignments.append(
+            {
+                "project_id": project["id"],
+                "project_name": project["name"],
+                "team_member_id": member["id"],
+                "role_on_project": s.role_on_project
+                or (source.role_inferred if source else None)
+                or member["role"],
+                "hours_this_week": float(hours),
+                "estimated_hours": float(hours),
+                "confidence_score": source.confidence if source else None,
+                "notes": source.context if source else None,
+            }
+        )
+
+    return plan
+
+
+def apply_key(transcript: dict[str, Any], selection: list[ApprovedAssignment] | None) -> str:
+    """Idempotency key for applying this extraction with this selection."""
+    material = {
+        "transcript_id": transcript["id"],
+        "processed_at": str(transcript.get("processed_at")),
+        "selection": [s.model_dump(mode="json") for s in selection]
+        if selection is not None
+        else None,
+    }
+    digest = hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+    return f"{transcript['id']}:{digest[:32]}"
+
+
+def apply_transcript(
+    transcript: dict[str, Any],
+    selection: list[ApprovedAssignment] | None = None,
+    client=None,
+) -> tuple[dict[str, Any], ApplyPlan]:
+    """
+    Resolve, plan and commit an approved transcript.
+
+    Args:
+        transcript: Transcript row (id, processed_at, extracted_data)
+        selection: Assignments the reviewer approved (defaults to all)
+        client: Database client (defaults to the shared client)
+
+    Returns:
+        The database function's result (counts, assignment_ids,
+        team_member_ids, replayed) and the plan that was sent
+    """
+    client = client or get_client()
+    extracted = TranscriptExtractionSchema.model_validate(transcript.get("extracted_data") or {})
+
+    members: list[dict[str, Any]] = []
+    projects: list[dict[str, Any]] = []
+    if extracted.assignments or selection:
+        members = (
+            client.table("team_members")
+            .select("id, full_name, role")
+            .eq("active", True)
+            .execute()
+        ).data
+    if extracted.projects or extracted.assignments or selection:
+        projects = fetch_all(lambda: client.table("projects").select("id, name").order("id"))
+
+    plan = build_plan(extracted, members, projects, selection)
+    result = client.rpc(
+        "apply_transcript_extraction",
+        {
+            "p_transcript_id": transcript["id"],
+            "p_apply_key": apply_key(transcript, selection),
+            "p_projects": plan.projects,
+            "p_assignments": plan.assignments,
+            "p_week_start": get_week_start().isoformat(),
+        },
+    ).execute()
+    return result.data, plan
@@ -0,0 +1,517 @@
+"""
+Local full-text search over the transcript archive.
+
+An in-memory inverted index maps each term to the transcripts containing it
+and a weighted term frequency, so a query only touches the postings of its
+own terms instead of scanning `transcripts`. Terms come from three fields,
+weighted by how much a match in them says about the meeting:
+
+    names   project, client and people names from the extraction  x3
+    quotes  extracted `context` quotes                             x2
+    text    the raw transcript                                     x1
+
+Results are ranked with BM25 and can be filtered by meeting date and type.
+The index also keeps a MinHash signature per transcript in LSH buckets (see
+near_duplicates), so uploads can be checked for near-duplicates of the
+archive without reading it.
+
+The index is kept current incrementally: routes that insert or re-process a
+transcript add it directly and publish a transcripts invalidation so other
+workers index it too. The index is saved under SEARCH_INDEX_PATH after each
+sync and on shutdown; on first use a worker loads the saved copy and then
+reconciles it with the table by `processed_at`, fetching only transcripts
+that are new or changed since it was saved.
+
+The web app uploads and deletes transcripts straight in Supabase, which
+publishes nothing, so the reconcile (a read of `id, processed_at` only) is
+repeated every RECONCILE_SECONDS. Only the first one makes queries wait;
+later ones run in one caller while the others read the index as it is.
+"""
+
+import asyncio
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterable
+
+from app.config import settings
+from app.db.supabase_client import fetch_all, get_client
+from app.models.schemas import TranscriptSearchHit, TranscriptSearchResponse
+from app.services.invalidation import TRANSCRIPTS, Invalidation, invalidation_bus
+from app.services.near_duplicates import LSHIndex, signature, similarity
+
+
+# Term frequency multiplier per field
+FIELD_WEIGHTS = {"names": 3.0, "quotes": 2.0, "text": 1.0}
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Transcripts fetched per round trip when syncing
+SYNC_BATCH_SIZE = 200
+
+# Seconds between reconciles with the transcripts table, to pick up
+# transcripts written outside the backend
+RECONCILE_SECONDS = 30
+
+INDEX_VERSION = 2
+
+TRANSCRIPT_COLUMNS = "id, meeting_date, meeting_type, raw_text, extracted_data, processed_at"
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by did do for from has have he her his i if in is it "
+    "its me my no not of on or our she so that the their them they this to up was "
+    "we were what when where which who will with you your".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercase word terms with stopwords dropped and plurals folded."""
+    terms = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+
+@dataclass
+class IndexedTranscript:
+    """What the index keeps per transcript."""
+
+    id: str
+    meeting_date: date | None
+    meeting_type: str | None
+    processed_at: str
+    terms: dict[str, float]  # Weighted term frequencies
+    length: float  # Weighted term count
+    quotes: list[str] = field(default_factory=list)
+    signature: list[int] = field(default_factory=list)  # MinHash of raw_text
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "meeting_date": self.meeting_date.isoformat() if self.meeting_date else None,
+            "meeting_type": self.meeting_type,
+            "processed_at": self.processed_at,
+            "terms": self.terms,
+            "length": self.length,
+            "quotes": self.quotes,
+            "signature": self.signature,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "IndexedTranscript":
+        return cls(
+            id=data["id"],
+            meeting_date=date.fromisoformat(data["meeting_date"]) if data["meeting_date"] else None,
+            meeting_type=data["meeting_type"],
+            processed_at=data["processed_at"],
+            terms=data["terms"],
+            length=data["length"],
+            quotes=data["quotes"],
+            signature=data.get("signature") or [],
+        )
+
+
+def build_document(row: dict[str, Any]) -> IndexedTranscript:
+    """Tokenize a transcripts row into its index entry."""
+    extracted = row.get("extracted_data") or {}
+    names: list[str] = list((extracted.get("meeting_metadata") or {}).get("attendees") or [])
+    quotes: list[str] = []
+    for project in extracted.get("projects") or []:
+        names += [project.get("name"), project.get("client")]
+        quotes.append(project.get("context"))
+    for assignment in extracted.get("assignments") or []:
+        names += [assignment.get("person_name"), assignment.get("project_name")]
+        quotes.append(assignment.get("context"))
+    for signal in extracted.get("capacity_signals") or []:
+        names.append(signal.get("person_name"))
+        quotes.append(signal.get("context"))
+    for deadline in extracted.get("deadlines") or []:
+        names.append(deadline.get("project_name"))
+        quotes.append(deadline.get("milestone"))
+    quotes = list(dict.fromkeys(q for q in quotes if q))
+
+    terms: dict[str, float] = {}
+    length = 0.0
+    fields = {
+        "names": [n for n in names if n],
+        "quotes": quotes,
+        "text": [row.get("raw_text")],
+    }
+    for name, texts in fields.items():
+        weight = FIELD_WEIGHTS[name]
+        for text in texts:
+            for term in tokenize(text):
+                terms[term] = terms.get(term, 0.0) + weight
+                length += weight
+
+    meeting_date = row.get("meeting_date")
+    return IndexedTranscript(
+        id=row["id"],
+        meeting_date=date.fromisoformat(str(meeting_date)[:10]) if meeting_date else None,
+        meeting_type=row.get("meeting_type"),
+        processed_at=str(row.get("processed_at") or ""),
+        terms=terms,
+        length=length,
+        quotes=quotes,
+        signature=signature(row.get("raw_text") or ""),
+    )
+
+
+class TranscriptSearchIndex:
+    """BM25 inverted index over transcripts, persisted to a local file."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        # Held for a whole sync, so queries only wait on _lock briefly
+        self._sync_lock = threading.Lock()
+        self._loaded = False
+        self._synced = False
+        self._synced_at = 0.0  # time.monotonic() of the last reconcile
+        self._dirty = False
+        self._docs: dict[str, IndexedTranscript] = {}
+        self._postings: dict[str, dict[str, float]] = {}
+        self._total_length = 0.0
+        # BM25 length normalization per transcript; rebuilt after changes
+        self._norms: dict[str, float] | None = None
+        self._lsh = LSHIndex()
+
+    @property
+    def size(self) -> int:
+        return len(self._docs)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _put(self, doc: IndexedTranscript) -> None:
+        self._drop(doc.id)
+        self._norms = None
+        self._docs[doc.id] = doc
+        self._lsh.add(doc.id, doc.signature)
+        self._total_length += doc.length
+        for term, frequency in doc.terms.items():
+            self._postings.setdefault(term, {})[doc.id] = frequency
+
+    def _drop(self, transcript_id: str) -> None:
+        doc = self._docs.pop(transcript_id, None)
+        if doc is None:
+            return
+        self._norms = None
+        self._lsh.remove(transcript_id)
+        self._total_length -= doc.length
+        for term in doc.terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(transcript_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def add(self, rows: Iterable[dict[str, Any]]) -> int:
+        """
+        Index (or re-index) transcripts rows.
+
+        Args:
+            rows: Rows with the TRANSCRIPT_COLUMNS fields
+
+        Returns:
+            Number of transcripts indexed
+        """
+        docs = [build_document(row) for row in rows]
+        with self._lock:
+            for doc in docs:
+                self._put(doc)
+            self._dirty = self._dirty or bool(docs)
+        return len(docs)
+
+    def _fetch(self, transcript_ids: list[str], client) -> list[dict[str, Any]]:
+        rows = []
+        for start in range(0, len(transcript_ids), SYNC_BATCH_SIZE):
+            response = (
+                client.table("transcripts")
+                .select(TRANSCRIPT_COLUMNS)
+                .in_("id", transcript_ids[start : start + SYNC_BATCH_SIZE])
+                .execute()
+            )
+            rows.extend(response.data)
+        return rows
+
+    def refresh(self, transcript_ids: list[str], client=None) -> int:
+        """Re-read and index the given transcripts (another worker changed them)."""
+        rows = self._fetch(list(dict.fromkeys(transcript_ids)), client or get_client())
+        return self.add(rows)
+
+    def sync(self, full: bool = False, client=None) -> dict[str, Any]:
+        """
+        Reconcile the index with the transcripts table.
+
+        Reads only `id, processed_at` for every transcript, then fetches and
+        indexes the ones that are missing or were re-processed, and drops
+        ones that no longer exist.
+
+        Args:
+            full: Re-index every transcript
+            client: Database client (defaults to the shared client)
+
+        Returns:
+            Dict with indexed, removed and total
+        """
+        self._load()
+        client = client or get_client()
+        started = time.monotonic()
+        # Transcripts added while the listing is read are not in it
+        with self._lock:
+            known = list(self._docs)
+        listing = fetch_all(
+            lambda: client.table("transcripts").select("id, processed_at").order("id")
+        )
+        current = {r["id"]: str(r.get("processed_at") or "") for r in listing}
+
+        with self._lock:
+            stale = [
+                transcript_id
+                for transcript_id, processed_at in current.items()
+                if full
+                or transcript_id not in self._docs
+                or self._docs[transcript_id].processed_at != processed_at
+            ]
+            removed = [transcript_id for transcript_id in known if transcript_id not in current]
+
+        indexed = self.add(self._fetch(stale, client))
+        with self._lock:
+            for transcript_id in removed:
+                self._drop(transcript_id)
+            self._synced = True
+            self._synced_at = started
+            self._dirty = self._dirty or bool(removed)
+            self.save()
+
+        return {"indexed": indexed, "removed": len(removed), "total": self.size}
+
+    def _length_norms(self) -> dict[str, float]:
+        if self._norms is None:
+            average = self._total_length / len(self._docs) if self._docs else 0.0
+            self._norms = {
+                transcript_id: BM25_K1 * (1 - BM25_B + BM25_B * doc.length / (average or 1))
+                for transcript_id, doc in self._docs.items()
+            }
+        return self._norms
+
+    def _is_current(self) -> bool:
+        return self._synced and time.monotonic() - self._synced_at < RECONCILE_SECONDS
+
+    def _ensure_synced(self) -> None:
+        if self._is_current():
+            return
+        # Once synced, a reconcile already under way is not waited for
+        if not self._sync_lock.acquire(blocking=not self._synced):
+            return
+        try:
+            if not self._is_current():
+                self.sync()
+        finally:
+            self._sync_lock.release()
+
+    def warm(self) -> None:
+        """Load and sync the index now, e.g. at startup, if it is not current."""
+        self._ensure_synced()
+
+    async def handle_invalidation(self, message: Invalidation) -> None:
+        """Index transcripts another worker inserted or re-processed."""
+        if message.local:
+            return
+        if message.keys and self._synced:
+            await asyncio.to_thread(self.refresh, list(message.keys))
+        else:
+            self._synced_at = 0.0  # Reconcile on next search
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            index_path = self.path / "index.json"
+            if not index_path.exists():
+                return
+            data = json.loads(index_path.read_text())
+            if data.get("version") != INDEX_VERSION:
+                return  # Stale format; the sync re-indexes everything
+            for entry in data["transcripts"]:
+                # Transcripts added since startup are newer than the saved copy
+                if entry["id"] not in self._docs:
+                    self._put(IndexedTranscript.from_dict(entry))
+
+    def save(self) -> None:
+        """Write the index atomically if it changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.mkdir(parents=True, exist_ok=True)
+            target = self.path / "index.json"
+            temporary = target.with_suffix(".json.tmp")
+            temporary.write_text(
+                json.dumps(
+                    {
+                        "version": INDEX_VERSION,
+                        "transcripts": [d.to_dict() for d in self._docs.values()],
+                    }
+                )
+            )
+            os.replace(temporary, target)
+            self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        meeting_type: str | None = None,
+        sort: str = "relevance",
+        limit: int = 20,
+        offset: int = 0,
+    ) -> TranscriptSearchResponse:
+        """
+        Find transcripts matching a free-text query.
+
+        Args:
+            query: Free text; transcripts matching any term are returned
+            date_from: Earliest meeting date to include
+            date_to: Latest meeting date to include
+            meeting_type: Only this meeting type (wip, planning, client-debrief)
+            sort: "relevance" (BM25, newest first on ties) or "recent"
+            limit: Maximum hits to return
+            offset: Hits to skip, for paging
+
+        Returns:
+            TranscriptSearchResponse with the total match count and one page of hits
+
+        Raises:
+            ValueError: If sort is unknown
+        """
+        if sort not in ("relevance", "recent"):
+            raise ValueError(f"Unknown sort: {sort}")
+
+        self._ensure_synced()
+        terms = list(dict.fromkeys(tokenize(query)))
+
+        with self._lock:
+            total_docs = len(self._docs)
+            norms = self._length_norms()
+            allowed = None
+            if date_from or date_to or meeting_type:
+                allowed = {
+                    transcript_id
+                    for transcript_id, doc in self._docs.items()
+                    if (not meeting_type or doc.meeting_type == meeting_type)
+                    and (not date_from or (doc.meeting_date and doc.meeting_date >= date_from))
+                    and (not date_to or (doc.meeting_date and doc.meeting_date <= date_to))
+                }
+
+            scores: dict[str, float] = {}
+            matched: dict[str, list[str]] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                boost = idf * (BM25_K1 + 1)
+                for transcript_id, frequency in postings.items():
+                    if allowed is not None and transcript_id not in allowed:
+                        continue
+                    scores[transcript_id] = scores.get(transcript_id, 0.0) + boost * frequency / (
+                        frequency + norms[transcript_id]
+                    )
+                    matched.setdefault(transcript_id, []).append(term)
+
+            docs = self._docs
+
+            def recency(transcript_id: str) -> int:
+                meeting_date = docs[transcript_id].meeting_date
+                return meeting_date.toordinal() if meeting_date else 0
+
+            def rank(transcript_id: str) -> tuple:
+                if sort == "recent":
+                    return recency(transcript_id), scores[transcript_id]
+                return scores[transcript_id], recency(transcript_id)
+
+            ranked = heapq.nlargest(offset + limit, scores, key=rank)
+
+            hits = []
+            for transcript_id in ranked[offset:]:
+                doc = docs[transcript_id]
+                hits.append(
+                    TranscriptSearchHit(
+                        transcript_id=transcript_id,
+                        meeting_date=doc.meeting_date,
+                        meeting_type=doc.meeting_type,
+                        score=round(scores[transcript_id], 4),
+                        matched_terms=matched[transcript_id],
+                        snippet=_best_quote(doc.quotes, set(matched[transcript_id])),
+                    )
+                )
+
+        return TranscriptSearchResponse(
+            query=query, terms=terms, total=len(scores), hits=hits
+        )
+
+    def find_near_duplicates(self, text: str, threshold: float) -> list[tuple[str, float]]:
+        """
+        Stored transcripts whose text is nearly the same as `text`.
+
+        Args:
+            text: Transcript text about to be processed
+            threshold: Minimum estimated Jaccard similarity of word shingles
+
+        Returns:
+            (transcript_id, similarity) pairs, most similar first
+        """
+        self._ensure_synced()
+        sig = signature(text)
+        with self._lock:
+            matches = [
+                (transcript_id, similarity(sig, self._docs[transcript_id].signature))
+                for transcript_id in self._lsh.candidates(sig)
+            ]
+        return sorted(
+            ((t, round(s, 4)) for t, s in matches if s >= threshold),
+            key=lambda match: match[1],
+            reverse=True,
+        )
+
+
+def _best_quote(quotes: list[str], terms: set[str]) -> str | None:
+    """The extracted quote sharing the most terms with the query, if any."""
+    best, best_overlap = None, 0
+    for quote in quotes:
+        overlap = len(terms.intersection(tokenize(quote)))
+        if overlap > best_overlap:
+            best, best_overlap = quote, overlap
+    return best
+
+
+# Shared index for this process
+transcript_index = TranscriptSearchIndex(settings.search_index_path)
+invalidation_bus.subscribe(TRANSCRIPTS, transcript_index.handle_invalidation)
@@ -0,0 +1,338 @@
+"""
+Plan-vs-actual variance from time entries.
+
+Time entries in a trailing window of complete weeks are aggregated by
+assignment, member-week and project in a single pass, then joined against
+planned `hours_this_week` on the assignments. Per project this gives the
+actual weekly burn rate, its variance from plan, and a projected total and
+overrun at the deadline given hours already consumed.
+
+The forecast uses the per-assignment burn (see `effective_weekly_hours`) so
+assignments that consistently run over plan show their real load.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any
+
+from app.db.supabase_client import fetch_all, get_client
+from app.models.schemas import (
+    AssignmentVariance,
+    MemberWeekVariance,
+    ProjectVariance,
+    VarianceResponse,
+)
+from app.services.capacity_calculator import get_week_start
+
+
+# Complete weeks of actuals used for burn rates
+DEFAULT_LOOKBACK_WEEKS = 4
+
+# Longest lookback a request may read
+MAX_LOOKBACK_WEEKS = 52
+
+# Burn above plan by more than this fraction flags a project as at risk
+OVERRUN_TOLERANCE = 0.10
+
+WEEK = timedelta(days=7)
+
+
+def _hours(value: Any) -> float:
+    return float(value or 0)
+
+
+def _round(value: float) -> Decimal:
+    return Decimal(str(round(value, 2)))
+
+
+@dataclass
+class VarianceWindow:
+    """The complete weeks actuals are read from."""
+
+    start: date  # Monday of the first week
+    weeks: int
+
+    @property
+    def end(self) -> date:
+        """Last day of the window (the Sunday before the current week)."""
+        return self.start + self.weeks * WEEK - timedelta(days=1)
+
+    def weeks_active(self, start_date: Any) -> int:
+        """Window weeks from an assignment's start (at least one)."""
+        if not start_date:
+            return self.weeks
+        first = get_week_start(date.fromisoformat(str(start_date)[:10]))
+        if first <= self.start:
+            return self.weeks
+        return max(1, self.weeks - (first - self.start).days // 7)
+
+
+@dataclass
+class VarianceResult:
+    """Aggregates from one pass over the window's time entries."""
+
+    window: VarianceWindow
+    by_assignment: dict[str, float] = field(default_factory=dict)
+    by_member_week: dict[tuple[str, date], float] = field(default_factory=dict)
+    by_project: dict[str, float] = field(default_factory=dict)
+
+
+def aggregate_actuals(
+    entries: list[dict[str, Any]],
+    window: VarianceWindow,
+) -> VarianceResult:
+    """Sum entry hours by assignment, member-week and project in one pass."""
+    result = VarianceResult(window)
+    by_assignment = result.by_assignment
+    by_member_week = result.by_member_week
+    by_project = result.by_project
+    weeks: dict[str, date] = {}
+
+    for e in entries:
+        hours = _hours(e["hours"])
+        day = str(e["date"])[:10]
+        week = weeks.get(day)
+        if week is None:
+            week = weeks[day] = get_week_start(date.fromisoformat(day))
+        by_assignment[e["assignment_id"]] = by_assignment.get(e["assignment_id"], 0.0) + hours
+        key = (e["team_member_id"], week)
+        by_member_week[key] = by_member_week.get(key, 0.0) + hours
+        by_project[e["project_id"]] = by_project.get(e["project_id"], 0.0) + hours
+
+    return result
+
+
+def effective_weekly_hours(
+    assignment: dict[str, Any],
+    actuals: VarianceResult | None,
+) -> float:
+    """Planned weekly hours, raised to the actual burn when it runs higher."""
+    planned = _hours(assignment.get("hours_this_week"))
+    if actuals is None:
+        return planned
+    actual = actuals.by_assignment.get(assignment["id"], 0.0) / actuals.window.weeks_active(
+        assignment.get("start_date")
+    )
+    return max(planned, actual)
+
+
+def forecast_member(row: dict[str, Any], actuals: VarianceResult | None) -> dict[str, Any]:
+    """
+    A member's forecast week from their read model row.
+
+    Args:
+        row: member_week_capacity row
+        actuals: Recent actuals, or None to forecast on planned hours only
+
+    Returns:
+        Dict with capacity, planned and allocated (effective) hours, available
+        hours, utilization and the overallocated flag
+    """
+    planned = float(row["allocated_hours"] or 0)
+    allocated = sum(
+        effective_weekly_hours(
+            {
+                "id": p["assignment_id"],
+                "hours_this_week": p["hours"],
+                "start_date": p.get("start_date"),
+            },
+            actuals,
+        )
+        for p in row["projects"]
+    )
+    planned, allocated = round(planned, 2), round(allocated, 2)
+    capacity = float(row["total_capacity_hours"] or 40)
+    return {
+        "team_member_id": row["team_member_id"],
+        "full_name": row["full_name"],
+        "role": row["role"],
+        "capacity": capacity,
+        "planned": planned,
+        "allocated": allocated,
+        "available": round(capacity - allocated, 2),
+        "utilization_pct": round((allocated / capacity * 100) if capacity else 0, 1),
+        "overallocated": allocated > capacity,
+    }
+
+
+def build_variance(
+    assignments: list[dict[str, Any]],
+    projects: list[dict[str, Any]],
+    members: dict[str, str],
+    actuals: VarianceResult,
+    today: date,
+    include_assignments: bool = False,
+) -> VarianceResponse:
+    """
+    Join aggregated actuals against plans.
+
+    Args:
+        assignments: Active assignment rows (id, team_member_id, project_id,
+            hours_this_week, start_date)
+        projects: Project rows (id, name, estimated_total_hours,
+            hours_consumed, deadline)
+        members: Team member id -> full name
+        actuals: Output of `aggregate_actuals`
+        today: Date projections are made from
+        include_assignments: Also return per-assignment variance
+
+    Returns:
+        VarianceResponse
+    """
+    window = actuals.window
+    project_names = {p["id"]: p["name"] for p in projects}
+    planned_by_project: dict[str, float] = {}
+    planned_by_member: dict[str, float] = {}
+    assignment_rows = []
+
+    for a in assignments:
+        planned = _hours(a.get("hours_this_week"))
+        planned_by_project[a["project_id"]] = planned_by_project.get(a["project_id"], 0.0) + planned
+        planned_by_member[a["team_member_id"]] = (
+            planned_by_member.get(a["team_member_id"], 0.0) + planned
+        )
+        if include_assignments:
+            actual = actuals.by_assignment.get(a["id"], 0.0) / window.weeks_active(
+                a.get("start_date")
+            )
+            assignment_rows.append(
+                AssignmentVariance(
+                    assignment_id=a["id"],
+                    project_id=a["project_id"],
+                    project_name=project_names.get(a["project_id"], "Unknown project"),
+                    team_member_id=a["team_member_id"],
+                    full_name=members.get(a["team_member_id"], "Unknown"),
+                    planned_weekly_hours=_round(planned),
+                    actual_weekly_hours=_round(actual),
+                    variance_hours=_round(actual - planned),
+                    burn_ratio=round(actual / planned, 3) if planned else None,
+                )
+            )
+
+    project_rows = []
+    for p in projects:
+        planned = planned_by_project.get(p["id"], 0.0)
+        burn = actuals.by_project.get(p["id"], 0.0) / window.weeks
+        if not planned and not burn:
+            continue
+
+        consumed = _hours(p.get("hours_consumed"))
+        estimate = _hours(p.get("estimated_total_hours")) or None
+        deadline = date.fromisoformat(str(p["deadline"])[:10]) if p.get("deadline") else None
+        weeks_left = max(0.0, (deadline - today).days / 7) if deadline else None
+        projected = consumed + burn * weeks_left if weeks_left is not None else None
+        overrun = projected - estimate if projected is not None and estimate else None
+
+        project_rows.append(
+            ProjectVariance(
+                project_id=p["id"],
+                project_name=p["name"],
+                estimated_total_hours=_round(estimate) if estimate else None,
+                hours_consumed=_round(consumed),
+                planned_weekly_hours=_round(planned),
+                burn_rate=_round(burn),
+                variance_hours=_round(burn - planned),
+                weeks_to_deadline=round(weeks_left, 1) if weeks_left is not None else None,
+                projected_total_hours=_round(projected) if projected is not None else None,
+                projected_overrun_hours=_round(overrun) if overrun is not None else None,
+                at_risk=bool(
+                    (overrun is not None and overrun > 0)
+                    or (planned and burn > planned * (1 + OVERRUN_TOLERANCE))
+                ),
+            )
+        )
+    project_rows.sort(
+        key=lambda r: (r.projected_overrun_hours or Decimal(0), r.variance_hours), reverse=True
+    )
+
+    # Every planned member-week, so weeks with nothing logged show their gap,
+    # plus weeks logged by members with no planned hours
+    member_week_keys = {
+        (member_id, window.start + i * WEEK)
+        for member_id, planned in planned_by_member.items()
+        if planned
+        for i in range(window.weeks)
+    }
+    member_week_keys.update(actuals.by_member_week)
+    member_rows = []
+    for member_id, week in member_week_keys:
+        planned = planned_by_member.get(member_id, 0.0)
+        actual = actuals.by_member_week.get((member_id, week), 0.0)
+        member_rows.append(
+            MemberWeekVariance(
+                team_member_id=member_id,
+                full_name=members.get(member_id, "Unknown"),
+                week_start=week,
+                planned_hours=_round(planned),
+                actual_hours=_round(actual),
+                variance_hours=_round(actual - planned),
+            )
+        )
+    member_rows.sort(key=lambda r: (r.week_start, -r.variance_hours))
+
+    return VarianceResponse(
+        window_start=window.start,
+        window_end=window.end,
+        weeks=window.weeks,
+        projects=project_rows,
+        member_weeks=member_rows,
+        assignments=assignment_rows,
+    )
+
+
+def load_actuals(weeks: int = DEFAULT_LOOKBACK_WEEKS, client=None) -> VarianceResult:
+    """Aggregate time entries for the last `weeks` complete weeks."""
+    client = client or get_client()
+    window = VarianceWindow(get_week_start() - weeks * WEEK, weeks)
+    entries = fetch_all(
+        lambda: client.table("time_entries")
+        .select("assignment_id, team_member_id, project_id, date, hours")
+        .gte("date", window.start.isoformat())
+        .lte("date", window.end.isoformat())
+        .order("id")
+    )
+    return aggregate_actuals(entries, window)
+
+
+async def calculate_variance(
+    weeks: int = DEFAULT_LOOKBACK_WEEKS,
+    include_assignments: bool = False,
+) -> VarianceResponse:
+    """
+    Compare planned and actual hours over the last `weeks` complete weeks.
+
+    Args:
+        weeks: Complete weeks of time entries to read
+        include_assignments: Also return per-assignment variance
+
+    Returns:
+        VarianceResponse with project burn, member-week variance and
+        (optionally) assignment variance
+    """
+    client = get_client()
+    actuals = load_actuals(weeks, client)
+
+    assignments = fetch_all(
+        lambda: client.table("assignments")
+        .select("id, team_member_id, project_id, hours_this_week, start_date")
+        .eq("status", "active")
+        .order("id")
+    )
+    projects = fetch_all(
+        lambda: client.table("projects")
+        .select("id, name, estimated_total_hours, hours_consumed, deadline")
+        .order("id")
+    )
+    members = fetch_all(
+        lambda: client.table("team_members").select("id, full_name").order("id")
+    )
+
+    return build_variance(
+        assignments,
+        projects,
+        {m["id"]: m["full_name"] for m in members},
+        actuals,
+        date.today(),
+        include_assignments,
+    )
@@ -0,0 +1 @@
+# Telemetry module
@@ -0,0 +1,448 @@
+"""
+Prometheus-style metrics with hot-path instrumentation.
+
+Metrics are plain in-process counters and histograms rendered in the
+Prometheus text exposition format by the `/metrics` endpoint. Recording a
+value is a dict lookup and a few additions under a lock, cheap enough to
+leave on in production.
+"""
+
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any
+
+from app.db.instrumentation import QueryEvent, add_query_listener
+
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# Buckets for database round trips per request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        return self._values.get(key, 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(items)
+        ]
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets and optional labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._series: dict[tuple[str, ...], list[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        series = self._series.get(key)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = [(k, list(v[0]), v[1]) for k, v in self._series.items()]
+
+        lines = []
+        bucket_labels = self.labelnames + ("le",)
+        for key, counts, total in sorted(items):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(bucket_labels, key + (_format_value(bound),))}"
+                    f" {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: list[Counter | Histogram] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        lines.extend(_cache_ratio_samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_request_duration = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route template.",
+        ("method", "route", "status"),
+    )
+)
+db_queries_per_request = REGISTRY.register(
+    Histogram(
+        "db_queries_per_request",
+        "Database round trips made while serving a request.",
+        ("method", "route"),
+        buckets=QUERY_COUNT_BUCKETS,
+    )
+)
+db_query_duration = REGISTRY.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "Database round trip latency.",
+        ("table", "operation"),
+    )
+)
+db_query_errors = REGISTRY.register(
+    Counter(
+        "db_query_errors_total",
+        "Database round trips that raised an error.",
+        ("table", "operation"),
+    )
+)
+model_request_duration = REGISTRY.register(
+    Histogram(
+        "claude_request_duration_seconds",
+        "Claude API call latency, including SDK retries.",
+        ("model", "outcome"),
+    )
+)
+model_tokens = REGISTRY.register(
+    Counter(
+        "claude_tokens_total",
+        "Claude tokens by kind (input, output, cache_read, cache_creation).",
+        ("model", "kind"),
+    )
+)
+model_retries = REGISTRY.register(
+    Counter(
+        "claude_retries_total",
+        "Claude API requests retried by the SDK, by the failed attempt's "
+        "status (429, 5xx, timeout, ...).",
+        ("status",),
+    )
+)
+model_admissions = REGISTRY.register(
+    Counter(
+        "claude_admissions_total",
+        "Model call admission decisions by priority and outcome "
+        "(admitted, rejected, timed_out).",
+        ("priority", "outcome"),
+    )
+)
+model_queue_wait = REGISTRY.register(
+    Histogram(
+        "claude_queue_wait_seconds",
+        "Time admitted model calls waited for token budget.",
+        ("priority",),
+    )
+)
+model_escalations = REGISTRY.register(
+    Counter(
+        "claude_escalations_total",
+        "Fast-model extractions by outcome (accepted, or the escalation reason).",
+        ("model", "outcome"),
+    )
+)
+cache_requests = REGISTRY.register(
+    Counter(
+        "cache_requests_total",
+        "Cache lookups by cache name and result (hit or miss).",
+        ("cache", "result"),
+    )
+)
+
+
+single_flight_calls = REGISTRY.register(
+    Counter(
+        "single_flight_calls_total",
+        "Coalesced computations by flight and result (leader ran it, joined shared it).",
+        ("flight", "result"),
+    )
+)
+
+request_deadlines_exceeded = REGISTRY.register(
+    Counter(
+        "request_deadlines_exceeded_total",
+        "Requests that ran out of time budget, by route and the stage it ran out in "
+        "(database, model, request).",
+        ("route", "stage"),
+    )
+)
+hedged_reads = REGISTRY.register(
+    Counter(
+        "hedged_reads_total",
+        "Reads that sent a hedged duplicate, by read and which copy answered "
+        "(primary, hedge).",
+        ("read", "winner"),
+    )
+)
+event_handler_errors = REGISTRY.register(
+    Counter(
+        "event_handler_errors_total",
+        "Domain event handlers that raised, by event type and handler. Each is a "
+        "projection left behind the committed write.",
+        ("event", "handler"),
+    )
+)
+
+
+def record_single_flight(flight: str, joined: bool) -> None:
+    """Count a call that either led a computation or joined one in flight."""
+    single_flight_calls.inc(flight=flight, result="joined" if joined else "leader")
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a lookup against an in-process cache."""
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_model_call(
+    model: str,
+    duration: float,
+    usage: Any | None = None,
+    outcome: str = "success",
+) -> None:
+    """
+    Record latency and token usage for a Claude API call.
+
+    Args:
+        model: Model name the call was made against
+        duration: Wall-clock seconds for the call
+        usage: The response's ``usage`` object, if the call succeeded
+        outcome: "success" or an error class name
+    """
+    model_request_duration.observe(duration, model=model, outcome=outcome)
+    if usage is None:
+        return
+
+    model_tokens.inc(usage.input_tokens or 0, model=model, kind="input")
+    model_tokens.inc(usage.output_tokens or 0, model=model, kind="output")
+    cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+    cache_creation = getattr(usage, "cache_creation_input_tokens", None) or 0
+    model_tokens.inc(cache_read, model=model, kind="cache_read")
+    model_tokens.inc(cache_creation, model=model, kind="cache_creation")
+    record_cache_lookup("claude_prompt", hit=cache_read > 0)
+
+
+def record_model_admission(priority: str, outcome: str, waited: float | None = None) -> None:
+    """Count an admission decision and, for admitted calls, the queue wait."""
+    model_admissions.inc(priority=priority, outcome=outcome)
+    if waited is not None:
+        model_queue_wait.observe(waited, priority=priority)
+
+
+def record_model_escalation(model: str, outcome: str) -> None:
+    """Count whether a fast model's answer was kept or escalated, and why."""
+    model_escalations.inc(model=model, outcome=outcome)
+
+
+def record_deadline_exceeded(route: str, stage: str) -> None:
+    """Count a request that ran out of time budget."""
+    request_deadlines_exceeded.inc(route=route, stage=stage)
+
+
+def record_hedged_read(read: str, winner: str) -> None:
+    """Count a hedged read and whether the primary or the hedge answered."""
+    hedged_reads.inc(read=read, winner=winner)
+
+
+def record_event_handler_error(event: str, handler: str) -> None:
+    """Count a domain event handler that failed."""
+    event_handler_errors.inc(event=event, handler=handler)
+
+
+# Status of the last Anthropic response in this task; the SDK retries in the
+# same task, so the next request's hook sees why it is being retried
+_last_model_status: ContextVar[int | None] = ContextVar("last_model_status", default=None)
+
+
+def _retry_status(status_code: int | None) -> str:
+    if status_code is None:
+        return "timeout"  # No response: timed out or the connection failed
+    if status_code >= 500:
+        return "5xx"
+    return str(status_code)
+
+
+async def record_model_response(response) -> None:
+    """httpx response hook noting the status a retry would be answering."""
+    _last_model_status.set(response.status_code)
+
+
+async def record_model_retry(request) -> None:
+    """httpx request hook counting retries made by the Anthropic SDK, by cause."""
+    status_code = _last_model_status.get()
+    _last_model_status.set(None)
+    if request.headers.get("x-stainless-retry-count", "0") != "0":
+        model_retries.inc(status=_retry_status(status_code))
+
+
+def _cache_ratio_samples() -> list[str]:
+    """Derived hit ratio per cache, so dashboards need no PromQL for it."""
+    totals: dict[str, list[float]] = {}
+    for (cache, result), value in list(cache_requests._values.items()):
+        hits_and_total = totals.setdefault(cache, [0, 0])
+        hits_and_total[1] += value
+        if result == "hit":
+            hits_and_total[0] += value
+
+    lines = [
+        "# HELP cache_hit_ratio Fraction of cache lookups that were hits.",
+        "# TYPE cache_hit_ratio gauge",
+    ]
+    for cache, (hits, total) in sorted(totals.items()):
+        ratio = hits / total if total else 0
+        lines.append(f'cache_hit_ratio{{cache="{_escape(cache)}"}} {_format_value(ratio)}')
+    return lines
+
+
+# ============================================================================
+# Request and database instrumentation
+# ============================================================================
+
+# Mutable per-request query counter, set by the middleware
+_request_queries: ContextVar[list[int] | None] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def _record_query(event: QueryEvent) -> None:
+    db_query_duration.observe(
+        event.duration, table=event.table, operation=event.operation
+    )
+    if event.failed:
+        db_query_errors.inc(table=event.table, operation=event.operation)
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+add_query_listener(_record_query)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and database round trips per route.
+
+    Routes are labelled by their path template (e.g. `/api/assignments/{assignment_id}`)
+    so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        queries = [0]
+        token = _request_queries.set(queries)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_queries.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                method=method,
+                route=route_path,
+                status=str(status),
+            )
+            db_queries_per_request.observe(queries[0], method=method, route=route_path)
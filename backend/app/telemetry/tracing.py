@@ -0,0 +1,290 @@
+"""
+Per-request database query tracing with N+1 detection.
+
+When enabled (QUERY_TRACING=true) the middleware records every database call
+made while serving a request: table, operation, filters, duration and the
+application call site. Queries that repeat with the same shape (same table,
+operation and filter columns) are flagged as likely N+1 patterns, and recent
+traces can be dumped as JSON from `/debug/query-traces`.
+
+`capture_queries` and `assert_max_queries` give tests the same view without
+the middleware.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from app.db.instrumentation import (
+    QueryEvent,
+    add_query_listener,
+    remove_query_listener,
+)
+
+logger = logging.getLogger(__name__)
+
+# Same-shape queries within one request before they are flagged
+REPEAT_THRESHOLD = 3
+
+# Number of finished traces kept for the debug endpoint
+MAX_STORED_TRACES = 100
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SKIP_DIRS = (
+    os.path.join(_APP_DIR, "db") + os.sep,
+    os.path.join(_APP_DIR, "telemetry") + os.sep,
+)
+
+
+@dataclass
+class QueryRecord:
+    """A traced database call."""
+
+    table: str
+    operation: str
+    filters: list[tuple[str, str, Any]]
+    duration_ms: float
+    failed: bool
+    call_site: str
+    shape: tuple
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "table": self.table,
+            "operation": self.operation,
+            "filters": [
+                {"column": c, "op": op, "value": _jsonable(v)}
+                for c, op, v in self.filters
+            ],
+            "duration_ms": round(self.duration_ms, 3),
+            "failed": self.failed,
+            "call_site": self.call_site,
+        }
+
+
+@dataclass
+class RequestTrace:
+    """All queries made while serving one request."""
+
+    method: str
+    path: str
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    route: str | None = None
+    status: int | None = None
+    duration_ms: float = 0.0
+    queries: list[QueryRecord] = field(default_factory=list)
+
+    def repeated_queries(self, threshold: int = REPEAT_THRESHOLD) -> list[dict[str, Any]]:
+        """Query shapes issued at least `threshold` times (likely N+1 loops)."""
+        counts = Counter(q.shape for q in self.queries)
+        flagged = []
+        for shape, count in counts.most_common():
+            if count < threshold:
+                break
+            matching = [q for q in self.queries if q.shape == shape]
+            table, operation, filters = shape
+            flagged.append(
+                {
+                    "table": table,
+                    "operation": operation,
+                    "filter_columns": [f"{c}.{op}" for c, op in filters],
+                    "count": count,
+                    "total_ms": round(sum(q.duration_ms for q in matching), 3),
+                    "call_sites": sorted({q.call_site for q in matching}),
+                }
+            )
+        return flagged
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 3),
+            "query_count": len(self.queries),
+            "query_time_ms": round(sum(q.duration_ms for q in self.queries), 3),
+            "repeated_queries": self.repeated_queries(),
+            "queries": [q.to_dict() for q in self.queries],
+        }
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return [_jsonable(v) for v in value]
+    return str(value)
+
+
+def _call_site() -> str:
+    """First stack frame inside the app that isn't instrumentation code."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and not filename.startswith(_SKIP_DIRS):
+            relative = os.path.relpath(filename, os.path.dirname(_APP_DIR))
+            return f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+def _to_record(event: QueryEvent) -> QueryRecord:
+    return QueryRecord(
+        table=event.table,
+        operation=event.operation,
+        filters=list(event.filters),
+        duration_ms=event.duration * 1000,
+        failed=event.failed,
+        call_site=_call_site(),
+        shape=event.shape,
+    )
+
+
+# ============================================================================
+# Request tracing middleware
+# ============================================================================
+
+_current_trace: ContextVar[RequestTrace | None] = ContextVar(
+    "current_trace", default=None
+)
+_recent_traces: deque[RequestTrace] = deque(maxlen=MAX_STORED_TRACES)
+
+
+def _trace_query(event: QueryEvent) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.queries.append(_to_record(event))
+
+
+def get_recent_traces() -> list[RequestTrace]:
+    """Most recent finished traces, newest first."""
+    return list(reversed(_recent_traces))
+
+
+def get_trace(trace_id: str) -> RequestTrace | None:
+    """Look up a stored trace by ID."""
+    for trace in _recent_traces:
+        if trace.trace_id == trace_id:
+            return trace
+    return None
+
+
+class QueryTracingMiddleware:
+    """
+    ASGI middleware tracing the database calls of every request.
+
+    Adds `X-Query-Count` and `X-Query-Trace-Id` response headers and logs a
+    warning when a request repeats the same query shape.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        add_query_listener(_trace_query)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(method=scope.get("method", ""), path=scope.get("path", ""))
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(len(trace.queries)).encode()))
+                headers.append((b"x-query-trace-id", trace.trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_trace.reset(token)
+            trace.duration_ms = (time.perf_counter() - start) * 1000
+            trace.route = getattr(scope.get("route"), "path", None)
+            _recent_traces.append(trace)
+
+            for repeated in trace.repeated_queries():
+                logger.warning(
+                    "Possible N+1 on %s %s: %d x %s %s (%s)",
+                    trace.method,
+                    trace.route or trace.path,
+                    repeated["count"],
+                    repeated["operation"],
+                    repeated["table"],
+                    ", ".join(repeated["call_sites"]),
+                )
+
+
+# ============================================================================
+# Test helpers
+# ============================================================================
+
+
+@contextmanager
+def capture_queries() -> Iterator[list[QueryRecord]]:
+    """
+    Record every database call made while the block runs, on any thread.
+
+    Works with FastAPI's TestClient, which serves requests on a separate
+    thread, because capture uses a process-wide listener.
+
+    Example:
+        with capture_queries() as queries:
+            client.get("/api/capacity/summary")
+        assert len(queries) < 10
+    """
+    records: list[QueryRecord] = []
+    lock = threading.Lock()
+
+    def listener(event: QueryEvent) -> None:
+        record = _to_record(event)
+        with lock:
+            records.append(record)
+
+    add_query_listener(listener)
+    try:
+        yield records
+    finally:
+        remove_query_listener(listener)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[list[QueryRecord]]:
+    """
+    Fail if the block makes more than `limit` database calls.
+
+    The assertion message includes the repeated query shapes and their call
+    sites, pointing straight at the N+1 loop.
+
+    Example:
+        with assert_max_queries(3):
+            client.get("/api/capacity/current-week")
+    """
+    with capture_queries() as queries:
+        yield queries
+
+    if len(queries) > limit:
+        trace = RequestTrace(method="", path="", queries=list(queries))
+        details = "\n".join(
+            f"  {r['count']} x {r['operation']} {r['table']} "
+            f"[{', '.join(r['filter_columns'])}] at {', '.join(r['call_sites'])}"
+            for r in trace.repeated_queries(threshold=2)
+        )
+        raise AssertionError(
+            f"Expected at most {limit} queries, got {len(queries)}"
+            + (f"\nRepeated queries:\n{details}" if details else "")
+        )
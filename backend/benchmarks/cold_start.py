@@ -0,0 +1,138 @@
+"""
+Cold start budget check.
+
+Measures, each in a fresh interpreter:
+  - import time of `app.main`, and that the deferred SDKs (anthropic,
+    supabase) are not imported by it
+  - startup time of the lifespan (client prewarm) against the in-memory
+    Supabase stand-in and the fake model server
+  - latency of the first requests after startup
+
+Exits non-zero if any measurement is over budget; tests/test_cold_start.py
+runs the same probes under pytest.
+
+Usage (from backend/):
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --runs 5 --import-budget 1.5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+# Seconds to import app.main in a fresh interpreter (median of runs)
+IMPORT_BUDGET_SECONDS = 0.9
+
+# Seconds for the first response from a route after startup
+FIRST_REQUEST_BUDGET_SECONDS = 0.25
+
+# Modules that must only be imported on first use
+DEFERRED_MODULES = ("anthropic", "supabase")
+
+FIRST_REQUESTS = ("/health", "/api/capacity/current-week", "/api/capacity/summary")
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+_REQUEST_PROBE = """
+import json, os, time
+from benchmarks.fake_anthropic import FakeModelConfig, FakeModelServer
+
+model = FakeModelServer(FakeModelConfig()).start()
+os.environ["ANTHROPIC_BASE_URL"] = model.base_url
+os.environ["ANTHROPIC_API_KEY"] = "sk-ant-fake"
+
+from fastapi.testclient import TestClient
+from app.db.supabase_client import set_client
+from app.main import app
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.generator import SIZES, generate_agency
+
+set_client(FakeSupabase(generate_agency(SIZES["small"], seed=1)))
+start = time.perf_counter()
+with TestClient(app) as client:
+    result = {"startup": time.perf_counter() - start, "requests": {}}
+    for path in %r:
+        start = time.perf_counter()
+        response = client.get(path)
+        response.raise_for_status()
+        result["requests"][path] = time.perf_counter() - start
+    result["prewarm"] = app.state.prewarm
+model.stop()
+print(json.dumps(result))
+"""
+
+
+def _probe(code: str) -> dict:
+    # Measure the default configuration, whatever the caller's environment
+    env = {**os.environ, "PREWARM_ON_STARTUP": "true"}
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_imports(runs: int) -> dict:
+    """Median import time of app.main and the deferred modules it loaded."""
+    imports = [_probe(_IMPORT_PROBE % (DEFERRED_MODULES,)) for _ in range(runs)]
+    return {
+        "seconds": statistics.median(r["seconds"] for r in imports),
+        "loaded": sorted({m for r in imports for m in r["loaded"]}),
+    }
+
+
+def measure_first_requests(runs: int) -> dict:
+    """Median startup time and first request latency per path."""
+    results = [_probe(_REQUEST_PROBE % (FIRST_REQUESTS,)) for _ in range(runs)]
+    return {
+        "startup": statistics.median(r["startup"] for r in results),
+        "prewarm": results[-1]["prewarm"],
+        "requests": {
+            path: statistics.median(r["requests"][path] for r in results)
+            for path in FIRST_REQUESTS
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per probe")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_SECONDS)
+    parser.add_argument("--request-budget", type=float, default=FIRST_REQUEST_BUDGET_SECONDS)
+    args = parser.parse_args(argv)
+
+    failures = []
+
+    imports = measure_imports(args.runs)
+    print(f"import app.main          {imports['seconds'] * 1000:8.1f}ms  (budget {args.import_budget * 1000:.0f}ms)")
+    if imports["seconds"] > args.import_budget:
+        failures.append("import time over budget")
+    if imports["loaded"]:
+        failures.append(f"imported eagerly: {', '.join(imports['loaded'])}")
+
+    first = measure_first_requests(args.runs)
+    print(f"startup (prewarm)        {first['startup'] * 1000:8.1f}ms  {first['prewarm']}")
+    for path, seconds in first["requests"].items():
+        print(f"first GET {path:<28} {seconds * 1000:8.1f}ms  (budget {args.request_budget * 1000:.0f}ms)")
+        if seconds > args.request_budget:
+            failures.append(f"first request to {path} over budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
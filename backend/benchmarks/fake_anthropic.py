@@ -0,0 +1,295 @@
+"""
+Local stand-in for the Anthropic Messages API.
+
+Serves `POST /v1/messages` with a plausible extraction built from the
+transcript in the prompt, so transcript throughput can be measured without
+spending API credits. Latency, token rate, 429 injection and malformed-JSON
+injection are configurable.
+
+Run standalone and point the backend at it:
+    python -m benchmarks.fake_anthropic --port 8787 --latency-ms 600 --rate-limit-rate 0.05
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8787 uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.transcripts import CLIENTS, DELIVERABLES, PEOPLE
+
+
+@dataclass
+class FakeModelConfig:
+    """Behaviour of the fake model endpoint."""
+
+    # Time to first token
+    latency_ms: float = 500.0
+    # Output generation speed; response time grows with output length
+    tokens_per_second: float = 80.0
+    # Latency and generation speed multiplier for models named "haiku"
+    fast_model_speedup: float = 3.0
+    # Fraction of requests answered with 429 rate_limit_error
+    rate_limit_rate: float = 0.0
+    # Fraction of responses whose JSON is truncated
+    malformed_rate: float = 0.0
+    # Retry-After sent with injected 429s
+    retry_after_ms: int = 250
+    seed: int | None = None
+
+
+@dataclass
+class FakeModelStats:
+    requests: int = 0
+    rate_limited: int = 0
+    malformed: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    models: dict[str, int] = field(default_factory=dict)
+
+
+_PROJECT_RE = re.compile(
+    r"\b(" + "|".join(CLIENTS) + r") (" + "|".join(map(re.escape, DELIVERABLES)) + r")\b"
+)
+_PERSON_RE = re.compile(r"\b(" + "|".join(PEOPLE) + r")\b")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def _prompt_text(body: dict[str, Any]) -> str:
+    content = body.get("messages", [{}])[-1].get("content", "")
+    if isinstance(content, list):
+        return "\n".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return str(content)
+
+
+def build_extraction(prompt: str, rng: random.Random) -> dict[str, Any]:
+    """Build an extraction-shaped response from the names in the prompt."""
+    lines = [line for line in prompt.splitlines() if line.strip()]
+    projects: dict[str, str] = {}
+    assignments: dict[tuple[str, str], str] = {}
+    signals = []
+
+    for line in lines:
+        project_match = _PROJECT_RE.search(line)
+        people = [p for p in _PERSON_RE.findall(line)]
+        if project_match:
+            name = project_match.group(0)
+            projects.setdefault(name, line.strip())
+            for person in people[1:] or people:
+                assignments.setdefault((person, name), line.strip())
+        elif people and any(w in line for w in ("overloaded", "jam packed", "too much", "out ")):
+            signals.append((people[0], line.strip()))
+
+    def confidence() -> float:
+        return round(rng.uniform(0.55, 0.98), 2)
+
+    return {
+        "meeting_metadata": {
+            "meeting_type": "wip",
+            "attendees": sorted({p for p, _ in assignments} | {p for p, _ in signals}),
+        },
+        "projects": [
+            {
+                "name": name,
+                "client": name.split(" ")[0],
+                "status": "active",
+                "phase": "production",
+                "next_milestone": None,
+                "next_milestone_timeframe": None,
+                "context": context,
+                "confidence": confidence(),
+            }
+            for name, context in projects.items()
+        ],
+        "assignments": [
+            {
+                "person_name": person,
+                "project_name": project,
+                "role_inferred": "producer",
+                "assignment_type": rng.choice(["explicit", "implicit", "inferred"]),
+                "workload_signal": None,
+                "context": context,
+                "confidence": confidence(),
+            }
+            for (person, project), context in assignments.items()
+        ],
+        "capacity_signals": [
+            {
+                "person_name": person,
+                "signal_type": "overallocated",
+                "description": f"{person} reports a heavy workload",
+                "timeframe": None,
+                "context": context,
+                "confidence": confidence(),
+            }
+            for person, context in signals
+        ],
+        "deadlines": [],
+        "overall_confidence": confidence(),
+        "extraction_notes": "Generated by the fake model",
+    }
+
+
+def create_app(config: FakeModelConfig) -> FastAPI:
+    """Create the fake Messages API application."""
+    app = FastAPI(title="Fake Anthropic Messages API")
+    rng = random.Random(config.seed)
+    stats = FakeModelStats()
+    app.state.stats = stats
+
+    @app.post("/v1/messages")
+    async def create_message(request: Request):
+        body = await request.json()
+        stats.requests += 1
+        model = body.get("model", "unknown")
+        stats.models[model] = stats.models.get(model, 0) + 1
+
+        if rng.random() < config.rate_limit_rate:
+            stats.rate_limited += 1
+            return JSONResponse(
+                status_code=429,
+                content={
+                    "type": "error",
+                    "error": {"type": "rate_limit_error", "message": "Injected rate limit"},
+                },
+                headers={
+                    "retry-after-ms": str(config.retry_after_ms),
+                    "retry-after": str(max(1, round(config.retry_after_ms / 1000))),
+                },
+            )
+
+        prompt = _prompt_text(body)
+        system = body.get("system", "")
+        if isinstance(system, list):
+            system = "\n".join(block.get("text", "") for block in system)
+
+        text = json.dumps(build_extraction(prompt, rng), indent=2)
+        if rng.random() < config.malformed_rate:
+            stats.malformed += 1
+            text = text[: len(text) // 2]
+
+        input_tokens = estimate_tokens(system + prompt)
+        output_tokens = estimate_tokens(text)
+        stats.input_tokens += input_tokens
+        stats.output_tokens += output_tokens
+
+        speedup = config.fast_model_speedup if "haiku" in model else 1.0
+        await asyncio.sleep(
+            (config.latency_ms / 1000 + output_tokens / config.tokens_per_second) / speedup
+        )
+
+        return {
+            "id": f"msg_fake_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 0,
+            },
+        }
+
+    @app.get("/v1/models")
+    async def list_models():
+        # Hit by the backend's startup prewarm
+        return {
+            "data": [
+                {
+                    "type": "model",
+                    "id": "claude-sonnet-4-20250514",
+                    "display_name": "Fake Sonnet",
+                    "created_at": "2025-05-14T00:00:00Z",
+                }
+            ],
+            "has_more": False,
+            "first_id": "claude-sonnet-4-20250514",
+            "last_id": "claude-sonnet-4-20250514",
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats.__dict__
+
+    return app
+
+
+class FakeModelServer:
+    """Runs the fake model on a background thread for in-process load tests."""
+
+    def __init__(self, config: FakeModelConfig, host: str = "127.0.0.1", port: int = 0):
+        self.app = create_app(config)
+        self._server = uvicorn.Server(
+            uvicorn.Config(self.app, host=host, port=port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def stats(self) -> FakeModelStats:
+        return self.app.state.stats
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, timeout: float = 10.0) -> "FakeModelServer":
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake model server did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Command line flags shared with the load driver."""
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after-ms", type=int, default=250)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeModelConfig:
+    return FakeModelConfig(
+        latency_ms=args.latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate,
+        retry_after_ms=args.retry_after_ms,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Anthropic Messages API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port)
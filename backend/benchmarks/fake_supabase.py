@@ -0,0 +1,631 @@
+"""
+In-memory stand-in for the subset of the Supabase table API the backend uses.
+
+Supports the postgrest builder chain used by the routes (select with embedded
+relations, filters, order, range, single, insert/update/upsert/delete and
+rpc), generated columns on capacity_snapshots, and hash indexes for equality
+filters so 100k-row tables stay fast enough to benchmark against.
+
+Inject it with `app.db.supabase_client.set_client(FakeSupabase(...))`.
+"""
+
+import copy
+import re
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+
+from postgrest.exceptions import APIError
+
+
+# Foreign key used to embed a related table, keyed by (table, related table)
+EMBEDS = {
+    ("assignments", "projects"): "project_id",
+    ("assignments", "team_members"): "team_member_id",
+    ("capacity_snapshots", "team_members"): "team_member_id",
+    ("time_entries", "assignments"): "assignment_id",
+    ("time_entries", "projects"): "project_id",
+    ("time_entries", "team_members"): "team_member_id",
+    ("milestones", "projects"): "project_id",
+}
+
+# Column defaults applied on insert
+DEFAULTS: dict[str, dict[str, Any]] = {
+    "team_members": {"weekly_capacity_hours": 40.0, "active": True, "skills": []},
+    "projects": {"status": "active", "priority": "medium", "hours_consumed": 0},
+    "assignments": {
+        "hours_this_week": 0,
+        "hours_consumed": 0,
+        "status": "active",
+        "assigned_by": "ai",
+        "confidence_score": None,
+        "start_date": None,
+        "end_date": None,
+        "notes": None,
+    },
+    "transcripts": {"approved": False},
+}
+
+# Unique constraints used to resolve upserts when on_conflict is omitted
+UNIQUE = {
+    "capacity_snapshots": ("team_member_id", "week_start_date"),
+    "assignments": ("project_id", "team_member_id"),
+    "member_week_capacity": ("team_member_id", "week_start_date"),
+}
+
+# Mirror of the member_week_dirty triggers (migration 015): table -> events
+# and the updated columns that mark members
+DIRTY_TRIGGERS: dict[str, tuple[set[str], set[str]]] = {
+    "assignments": (
+        {"insert", "update", "delete"},
+        {"team_member_id", "project_id", "hours_this_week", "status", "start_date"},
+    ),
+    "projects": ({"update"}, {"name", "priority", "deadline"}),
+    "team_members": (
+        {"insert", "update"},
+        {"full_name", "role", "weekly_capacity_hours", "active"},
+    ),
+}
+
+_EMBED_RE = re.compile(r"(\w+)\(([^)]*)\)")
+
+
+def _generated(table: str, row: dict[str, Any]) -> None:
+    """Maintain generated columns the real schema computes."""
+    if table == "capacity_snapshots":
+        total = float(row.get("total_capacity_hours") or 0)
+        allocated = float(row.get("allocated_hours") or 0)
+        row["available_hours"] = total - allocated
+        row["utilization_pct"] = (allocated / total * 100) if total > 0 else 0
+        row["overallocated"] = allocated > total
+
+
+class FakeResponse:
+    def __init__(self, data: Any, count: int | None = None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """Chainable query builder mirroring postgrest's request builders."""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self._db = db
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._payload: Any = None
+        self._filters: list[tuple[str, str, Any]] = []
+        self._order: list[tuple[str, bool]] = []
+        self._range: tuple[int, int] | None = None
+        self._single = False
+        self._maybe_single = False
+        self._on_conflict: str | None = None
+        self._count = None
+
+    # --- operations -------------------------------------------------------
+
+    def select(self, columns: str = "*", count: str | None = None):
+        self._columns = columns
+        self._count = count
+        return self
+
+    def insert(self, data, **_):
+        self._op, self._payload = "insert", data
+        return self
+
+    def upsert(self, data, on_conflict: str | None = None, **_):
+        self._op, self._payload, self._on_conflict = "upsert", data, on_conflict
+        return self
+
+    def update(self, data, **_):
+        self._op, self._payload = "update", data
+        return self
+
+    def delete(self, **_):
+        self._op = "delete"
+        return self
+
+    # --- filters ----------------------------------------------------------
+
+    def _filter(self, op: str, column: str, value: Any):
+        self._filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, value)
+
+    def gte(self, column, value):
+        return self._filter("gte", column, value)
+
+    def lt(self, column, value):
+        return self._filter("lt", column, value)
+
+    def lte(self, column, value):
+        return self._filter("lte", column, value)
+
+    def in_(self, column, values):
+        return self._filter("in", column, list(values))
+
+    def is_(self, column, value):
+        return self._filter("is", column, value)
+
+    def ilike(self, column, pattern):
+        return self._filter("ilike", column, pattern)
+
+    def order(self, column: str, desc: bool = False, **_):
+        self._order.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int):
+        self._range = (start, end)
+        return self
+
+    def limit(self, size: int):
+        self._range = (0, size - 1)
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    def maybe_single(self):
+        self._maybe_single = True
+        return self
+
+    # --- execution --------------------------------------------------------
+
+    def _matches(self, row: dict[str, Any]) -> bool:
+        for op, column, value in self._filters:
+            actual = row.get(column)
+            if isinstance(value, bool) or actual is None or value is None:
+                left, right = actual, value
+            else:
+                left, right = _comparable(actual), _comparable(value)
+            if op == "eq" and left != right:
+                return False
+            if op == "neq" and left == right:
+                return False
+            if op == "gt" and not (left is not None and left > right):
+                return False
+            if op == "gte" and not (left is not None and left >= right):
+                return False
+            if op == "lt" and not (left is not None and left < right):
+                return False
+            if op == "lte" and not (left is not None and left <= right):
+                return False
+            if op == "in" and actual not in value:
+                return False
+            if op == "is" and not (
+                (value in (None, "null") and actual is None) or actual == value
+            ):
+                return False
+            if op == "ilike":
+                pattern = re.escape(str(value).lower()).replace("%", ".*")
+                if not re.fullmatch(pattern, str(actual or "").lower()):
+                    return False
+        return True
+
+    def execute(self) -> FakeResponse:
+        self._db.calls += 1
+        rows = self._db.tables.setdefault(self._table, [])
+
+        if self._op == "insert":
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            created = [self._db.insert_row(self._table, item) for item in payload]
+            return FakeResponse([copy.copy(r) for r in created])
+
+        if self._op == "upsert":
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            keys = (
+                tuple(c.strip() for c in self._on_conflict.split(","))
+                if self._on_conflict
+                else UNIQUE.get(self._table, ("id",))
+            )
+            result = []
+            for item in payload:
+                existing = self._db.find_unique(self._table, keys, item)
+                if existing is not None:
+                    before = copy.copy(existing)
+                    existing.update(item)
+                    _generated(self._table, existing)
+                    self._db.drop_indexes(self._table, item.keys())
+                    self._db.fire_triggers(self._table, "update", [before, existing], item.keys())
+                    result.append(copy.copy(existing))
+                else:
+                    result.append(copy.copy(self._db.insert_row(self._table, item)))
+            return FakeResponse(result)
+
+        # Paging through a large ordered result re-uses the sorted rows
+        page_key = None
+        if self._op == "select" and self._range is not None and self._order:
+            page_key = (
+                self._table,
+                repr(self._filters),
+                tuple(self._order),
+                self._db.versions.get(self._table, 0),
+            )
+            if self._db.page_cache[0] == page_key:
+                matched = self._db.page_cache[1]
+                return self._respond(matched[self._range[0] : self._range[1] + 1], len(matched))
+
+        matched = [r for r in self._candidates(rows) if self._matches(r)]
+
+        if self._op == "update":
+            before = [copy.copy(r) for r in matched]
+            for row in matched:
+                row.update(self._payload)
+                _generated(self._table, row)
+            self._db.drop_indexes(self._table, self._payload.keys())
+            self._db.fire_triggers(self._table, "update", before + matched, self._payload.keys())
+            return FakeResponse([copy.copy(r) for r in matched])
+
+        if self._op == "delete":
+            doomed = {id(r) for r in matched}
+            self._db.tables[self._table] = [r for r in rows if id(r) not in doomed]
+            self._db.reindex(self._table)
+            self._db.fire_triggers(self._table, "delete", matched)
+            return FakeResponse([copy.copy(r) for r in matched])
+
+        for column, desc in reversed(self._order):
+            matched.sort(
+                key=lambda r: (r.get(column) is None, _comparable(r.get(column))),
+                reverse=desc,
+            )
+        if page_key is not None:
+            self._db.page_cache = (page_key, matched)
+        total = len(matched)
+        if self._range is not None:
+            start, end = self._range
+            matched = matched[start : end + 1]
+        return self._respond(matched, total)
+
+    def _respond(self, matched: list[dict[str, Any]], total: int) -> FakeResponse:
+        count = total if self._count else None
+        if self._db.max_rows is not None:
+            matched = matched[: self._db.max_rows]
+        data = [self._project(r) for r in matched]
+
+        if self._single or self._maybe_single:
+            if len(data) == 1:
+                return FakeResponse(data[0], count)
+            if self._maybe_single and not data:
+                return FakeResponse(None, count)
+            raise APIError(
+                {
+                    "code": "PGRST116",
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "details": f"The result contains {len(data)} rows",
+                    "hint": None,
+                }
+            )
+        return FakeResponse(data, count)
+
+    def _candidates(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Narrow rows with the first indexable equality filter."""
+        for op, column, value in self._filters:
+            if op != "eq":
+                continue
+            if column == "id":
+                row = self._db.get_by_id(self._table, value)
+                return [row] if row is not None else []
+            return self._db.lookup(self._table, column, value)
+        return rows
+
+    def _project(self, row: dict[str, Any]) -> dict[str, Any]:
+        columns = self._columns
+        embeds = _EMBED_RE.findall(columns)
+        plain = [
+            c.strip()
+            for c in _EMBED_RE.sub("", columns).split(",")
+            if c.strip()
+        ]
+        out = dict(row) if "*" in plain or not plain else {c: row.get(c) for c in plain}
+        for related, related_columns in embeds:
+            fk = EMBEDS.get((self._table, related))
+            target = self._db.get_by_id(related, row.get(fk)) if fk else None
+            if target is None:
+                out[related] = None
+                continue
+            wanted = [c.strip() for c in related_columns.split(",") if c.strip()]
+            out[related] = (
+                dict(target) if "*" in wanted else {c: target.get(c) for c in wanted}
+            )
+        return out
+
+
+class FakeRPC:
+    def __init__(self, db: "FakeSupabase", name: str, params: dict[str, Any]):
+        self._db, self._name, self._params = db, name, params
+
+    def execute(self) -> FakeResponse:
+        self._db.calls += 1
+        handler = self._db.rpc_handlers.get(self._name)
+        if handler is None:
+            raise APIError({"code": "PGRST202", "message": f"Unknown function {self._name}"})
+        return FakeResponse(handler(self._db, **self._params))
+
+
+def _import_time_entry_chunk(
+    db: "FakeSupabase",
+    p_entries: list[dict[str, Any]],
+) -> dict[str, int]:
+    """Mirror of import_time_entry_chunk (migration 014), without the transaction."""
+    totals: dict[str, dict[str, float]] = {"assignments": {}, "projects": {}}
+    for entry in p_entries:
+        db.insert_row("time_entries", {**entry, "billable": entry.get("billable", True)})
+        for table, key in (("assignments", "assignment_id"), ("projects", "project_id")):
+            totals[table][entry[key]] = totals[table].get(entry[key], 0) + entry["hours"]
+    counts = {}
+    for table, hours_by_id in totals.items():
+        counts[table] = 0
+        for row_id, hours in hours_by_id.items():
+            row = db.get_by_id(table, row_id)
+            if row is not None:
+                row["hours_consumed"] = float(row.get("hours_consumed") or 0) + hours
+                counts[table] += 1
+        db.drop_indexes(table, ["hours_consumed"])
+    return {"inserted": len(p_entries), **counts}
+
+
+def _apply_transcript_extraction(
+    db: "FakeSupabase",
+    p_transcript_id: str,
+    p_apply_key: str,
+    p_projects: list[dict[str, Any]] | None = None,
+    p_assignments: list[dict[str, Any]] | None = None,
+    p_week_start: str | None = None,
+) -> dict[str, Any]:
+    """Mirror of apply_transcript_extraction (migration 013), without the transaction."""
+    transcript = db.get_by_id("transcripts", p_transcript_id)
+    if transcript is None:
+        raise APIError({"code": "P0002", "message": f"Transcript not found: {p_transcript_id}"})
+    for row in db.lookup("transcript_applications", "apply_key", p_apply_key):
+        return {**row["result"], "replayed": True}
+
+    project_ids: dict[str, str] = {}
+    created = updated = 0
+    for project in p_projects or []:
+        row = db.get_by_id("projects", project.get("id")) if project.get("id") else None
+        if row is None:
+            name = project["name"].lower()
+            row = next((p for p in db.tables.get("projects", []) if p["name"].lower() == name), None)
+        if row is None:
+            row = db.insert_row(
+                "projects",
+                {
+                    "name": project["name"],
+                    "client": project.get("client"),
+                    "status": project.get("status") or "active",
+                    "next_milestone": project.get("next_milestone"),
+                    "next_milestone_date": project.get("next_milestone_date"),
+                },
+            )
+            created += 1
+        else:
+            row["client"] = row.get("client") or project.get("client")
+            row["next_milestone"] = project.get("next_milestone") or row.get("next_milestone")
+            row["next_milestone_date"] = (
+                project.get("next_milestone_date") or row.get("next_milestone_date")
+            )
+            db.drop_indexes("projects", ["client", "next_milestone", "next_milestone_date"])
+            updated += 1
+        project_ids[project["name"].lower()] = row["id"]
+
+    requested, assignment_ids, member_ids = 0, [], []
+    for a in p_assignments or []:
+        project_id = a.get("project_id") or project_ids.get((a.get("project_name") or "").lower())
+        if not project_id:
+            continue
+        requested += 1
+        if db.find_unique(
+            "assignments", ("project_id", "team_member_id"), {**a, "project_id": project_id}
+        ):
+            continue
+        row = db.insert_row(
+            "assignments",
+            {
+                "project_id": project_id,
+                "team_member_id": a["team_member_id"],
+                "role_on_project": a["role_on_project"],
+                "estimated_hours": a["estimated_hours"],
+                "hours_this_week": a["hours_this_week"],
+                "confidence_score": a.get("confidence_score"),
+                "notes": a.get("notes"),
+                "assigned_by": "ai",
+                "status": "active",
+            },
+        )
+        assignment_ids.append(row["id"])
+        if a["team_member_id"] not in member_ids:
+            member_ids.append(a["team_member_id"])
+
+    if p_week_start:
+        for member_id in member_ids:
+            member = db.get_by_id("team_members", member_id)
+            item = {
+                "team_member_id": member_id,
+                "week_start_date": p_week_start,
+                "total_capacity_hours": float(member.get("weekly_capacity_hours") or 40),
+                "allocated_hours": sum(
+                    float(a.get("hours_this_week") or 0)
+                    for a in db.lookup("assignments", "team_member_id", member_id)
+                    if a.get("status") == "active"
+                ),
+            }
+            existing = db.find_unique(
+                "capacity_snapshots", ("team_member_id", "week_start_date"), item
+            )
+            if existing is not None:
+                existing.update(item)
+                _generated("capacity_snapshots", existing)
+                db.drop_indexes("capacity_snapshots", item.keys())
+            else:
+                db.insert_row("capacity_snapshots", item)
+
+    transcript["approved"] = True
+    transcript["approved_at"] = datetime.now(timezone.utc).isoformat()
+    db.drop_indexes("transcripts", ["approved", "approved_at"])
+
+    result = {
+        "projects_created": created,
+        "projects_updated": updated,
+        "assignments_created": len(assignment_ids),
+        "assignments_existing": requested - len(assignment_ids),
+        "assignment_ids": assignment_ids,
+        "team_member_ids": member_ids,
+    }
+    db.insert_row(
+        "transcript_applications",
+        {"apply_key": p_apply_key, "transcript_id": p_transcript_id, "result": result},
+    )
+    return {**result, "replayed": False}
+
+
+# Database functions from the migrations, callable through rpc()
+FUNCTIONS = {
+    "apply_transcript_extraction": _apply_transcript_extraction,
+    "import_time_entry_chunk": _import_time_entry_chunk,
+}
+
+
+class FakeSupabase:
+    """
+    In-memory database exposing ``table()`` and ``rpc()`` like a Supabase client.
+
+    ``calls`` counts executed round trips so benchmarks can compare query
+    volume between versions. ``max_rows`` caps the rows a select returns,
+    like PostgREST's max-rows setting, so unpaged reads of large tables show
+    up as truncated results.
+    """
+
+    def __init__(
+        self,
+        tables: dict[str, list[dict[str, Any]]] | None = None,
+        max_rows: int | None = None,
+    ):
+        self.max_rows = max_rows
+        self.tables: dict[str, list[dict[str, Any]]] = {}
+        self._by_id: dict[str, dict[str, dict[str, Any]]] = {}
+        self._indexes: dict[tuple[str, str], dict[Any, list[dict[str, Any]]]] = {}
+        self.rpc_handlers: dict[str, Any] = dict(FUNCTIONS)
+        # Bumped on every write so cached pages are never stale
+        self.versions: dict[str, int] = {}
+        self.page_cache: tuple[Any, list[dict[str, Any]]] = (None, [])
+        self.calls = 0
+        # Seed rows are loaded as if the read model were already current
+        self.triggers = False
+        for table, rows in (tables or {}).items():
+            for row in rows:
+                self.insert_row(table, row)
+        self.triggers = True
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict[str, Any] | None = None) -> FakeRPC:
+        return FakeRPC(self, name, params or {})
+
+    def insert_row(self, table: str, item: dict[str, Any]) -> dict[str, Any]:
+        row = dict(DEFAULTS.get(table, {}))
+        row.update(item)
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        for key, value in list(row.items()):
+            if isinstance(value, Decimal):
+                row[key] = float(value)
+        _generated(table, row)
+        self.versions[table] = self.versions.get(table, 0) + 1
+        self.tables.setdefault(table, []).append(row)
+        self._by_id.setdefault(table, {})[row["id"]] = row
+        for (indexed_table, column), index in self._indexes.items():
+            if indexed_table == table:
+                index.setdefault(_index_key(row.get(column)), []).append(row)
+        self.fire_triggers(table, "insert", [row])
+        return row
+
+    def fire_triggers(self, table: str, event: str, rows, columns=()) -> None:
+        """Mark the members a write affects, like the triggers of migration 015."""
+        events, watched = DIRTY_TRIGGERS.get(table, (set(), set()))
+        if not self.triggers or event not in events:
+            return
+        if event == "update" and not watched & set(columns):
+            return
+        if table == "assignments":
+            member_ids = {r["team_member_id"] for r in rows}
+        elif table == "projects":
+            member_ids = {
+                a["team_member_id"]
+                for r in rows
+                for a in self.lookup("assignments", "project_id", r["id"])
+                if a.get("status") == "active"
+            }
+        else:
+            member_ids = {r["id"] for r in rows}
+        marked_at = datetime.now(timezone.utc).isoformat()
+        for member_id in member_ids:
+            if self.get_by_id("team_members", member_id) is None:
+                continue
+            mark = self.find_unique(
+                "member_week_dirty", ("team_member_id",), {"team_member_id": member_id}
+            )
+            if mark is not None:
+                mark["marked_at"] = marked_at
+            else:
+                self.insert_row(
+                    "member_week_dirty", {"team_member_id": member_id, "marked_at": marked_at}
+                )
+
+    def lookup(self, table: str, column: str, value: Any) -> list[dict[str, Any]]:
+        """Rows where column equals value, via a lazily built hash index."""
+        index = self._indexes.get((table, column))
+        if index is None:
+            index = {}
+            for row in self.tables.get(table, []):
+                index.setdefault(_index_key(row.get(column)), []).append(row)
+            self._indexes[(table, column)] = index
+        return index.get(_index_key(value), [])
+
+    def drop_indexes(self, table: str, columns) -> None:
+        """Invalidate indexes on columns that were modified in place."""
+        self.versions[table] = self.versions.get(table, 0) + 1
+        for column in columns:
+            self._indexes.pop((table, column), None)
+
+    def get_by_id(self, table: str, row_id: Any) -> dict[str, Any] | None:
+        return self._by_id.get(table, {}).get(row_id)
+
+    def find_unique(self, table, keys, item) -> dict[str, Any] | None:
+        if keys == ("id",) and "id" in item:
+            return self.get_by_id(table, item["id"])
+        for row in self.lookup(table, keys[0], item.get(keys[0])):
+            if all(row.get(k) == item.get(k) for k in keys):
+                return row
+        return None
+
+    def reindex(self, table: str) -> None:
+        self.versions[table] = self.versions.get(table, 0) + 1
+        self._by_id[table] = {r["id"]: r for r in self.tables.get(table, [])}
+        for key in [k for k in self._indexes if k[0] == table]:
+            del self._indexes[key]
+
+
+def _index_key(value: Any) -> Any:
+    if isinstance(value, bool) or value is None:
+        return (type(value).__name__, value)
+    return _comparable(value)
+
+
+def _comparable(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
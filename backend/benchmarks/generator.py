@@ -0,0 +1,183 @@
+"""
+Synthetic agency data for benchmarks.
+
+Generates team members, projects, assignments, milestones and transcripts
+with realistic shapes: most people sit near capacity, a tail is overallocated,
+and a handful of projects are urgent.
+"""
+
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+
+ROLES = ["producer", "creative", "strategy", "director", "editor", "designer"]
+SKILLS = [
+    "production",
+    "client-presentations",
+    "editing",
+    "copywriting",
+    "social",
+    "video",
+    "media-relations",
+    "design",
+    "analytics",
+    "events",
+]
+CLIENTS = ["Lego", "Nike", "Qantas", "Telstra", "Coles", "Canva", "Atlassian", "Bunnings"]
+PRIORITIES = ["low", "medium", "medium", "high", "urgent"]
+PHASES = ["pre-production", "production", "post-production", "client-review"]
+FIRST_NAMES = ["Jess", "Sam", "Alex", "Priya", "Tom", "Mia", "Noah", "Ava", "Leo", "Zoe"]
+LAST_NAMES = ["Nguyen", "Smith", "Patel", "Brown", "Chen", "Wilson", "Taylor", "Lee"]
+
+
+@dataclass(frozen=True)
+class AgencySize:
+    """Row counts for a synthetic agency."""
+
+    name: str
+    members: int
+    projects: int
+    assignments: int
+    transcripts: int
+
+
+SIZES = {
+    "small": AgencySize("small", members=50, projects=40, assignments=400, transcripts=50),
+    "medium": AgencySize("medium", members=500, projects=400, assignments=10_000, transcripts=500),
+    "large": AgencySize("large", members=2_000, projects=1_500, assignments=100_000, transcripts=2_000),
+}
+
+
+def _id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate_agency(size: AgencySize, seed: int = 42) -> dict[str, list[dict[str, Any]]]:
+    """
+    Generate table rows for a synthetic agency.
+
+    Args:
+        size: Row counts to generate
+        seed: Random seed, so runs across versions use identical data
+
+    Returns:
+        Mapping of table name to rows, ready for `FakeSupabase(tables)`
+    """
+    rng = random.Random(seed)
+    today = date.today()
+
+    members = []
+    for i in range(size.members):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        members.append(
+            {
+                "id": _id(rng),
+                "email": f"{first.lower()}.{last.lower()}.{i}@altshift.test",
+                "full_name": f"{first} {last} {i}",
+                "role": rng.choice(ROLES),
+                "weekly_capacity_hours": rng.choice([40.0, 40.0, 38.0, 32.0, 24.0]),
+                "billable_target_hours": 32.0,
+                "skills": rng.sample(SKILLS, k=rng.randint(1, 4)),
+                "core_roles": [],
+                "capabilities": rng.sample(SKILLS, k=rng.randint(0, 3)),
+                "industries": [],
+                "known_clients": rng.sample(CLIENTS, k=rng.randint(0, 2)),
+                "active": rng.random() > 0.03,
+            }
+        )
+
+    projects = []
+    for i in range(size.projects):
+        start = today - timedelta(days=rng.randint(0, 120))
+        projects.append(
+            {
+                "id": _id(rng),
+                "name": f"{rng.choice(CLIENTS)} campaign {i}",
+                "client": rng.choice(CLIENTS),
+                "status": rng.choice(["active", "active", "active", "briefing", "on-hold"]),
+                "phase": rng.choice(PHASES),
+                "priority": rng.choice(PRIORITIES),
+                "estimated_total_hours": float(rng.randint(40, 800)),
+                "hours_consumed": 0,
+                "start_date": start.isoformat(),
+                "deadline": (today + timedelta(days=rng.randint(-7, 120))).isoformat(),
+            }
+        )
+
+    # Spread assignments so per-person load averages a little over capacity
+    per_member_target = size.assignments / max(size.members, 1)
+    pairs: set[tuple[int, int]] = set()
+    assignments = []
+    max_pairs = size.members * size.projects
+    while len(assignments) < min(size.assignments, max_pairs):
+        m = rng.randrange(size.members)
+        p = rng.randrange(size.projects)
+        if (m, p) in pairs:
+            continue
+        pairs.add((m, p))
+        project = projects[p]
+        hours = round(rng.uniform(0.5, 1.2) * 42 / per_member_target, 1)
+        start = date.fromisoformat(project["start_date"])
+        assignments.append(
+            {
+                "id": _id(rng),
+                "project_id": project["id"],
+                "team_member_id": members[m]["id"],
+                "role_on_project": rng.choice(["lead", "support", members[m]["role"]]),
+                "estimated_hours": float(rng.randint(8, 200)),
+                "hours_this_week": hours,
+                "hours_consumed": 0,
+                "status": rng.choice(["active"] * 8 + ["paused", "completed"]),
+                "assigned_by": "ai",
+                "confidence_score": round(rng.uniform(0.5, 1.0), 2),
+                "start_date": start.isoformat(),
+                "end_date": project["deadline"],
+            }
+        )
+
+    milestones = [
+        {
+            "id": _id(rng),
+            "project_id": project["id"],
+            "name": rng.choice(["PPM", "Shoot", "Client presentation", "Delivery"]),
+            "type": rng.choice(["ppm", "client-meeting", "delivery", "review"]),
+            "date": (today + timedelta(days=rng.randint(0, 90))).isoformat(),
+            "completed": False,
+        }
+        for project in projects
+        for _ in range(rng.randint(0, 3))
+    ]
+
+    transcripts = []
+    for i in range(size.transcripts):
+        meeting_date = today - timedelta(days=7 * (i % 104))
+        transcripts.append(
+            {
+                "id": _id(rng),
+                "meeting_date": meeting_date.isoformat(),
+                "meeting_type": "wip",
+                "raw_text": f"WIP meeting {i}. "
+                + " ".join(
+                    f"{rng.choice(FIRST_NAMES)} is on {rng.choice(projects)['name']}."
+                    for _ in range(20)
+                ),
+                "extracted_data": {"projects": [], "assignments": []},
+                "extraction_model": "claude-sonnet-4-20250514",
+                "extraction_confidence": round(rng.uniform(0.5, 1.0), 2),
+                "processed_at": meeting_date.isoformat(),
+                "approved": rng.random() > 0.5,
+            }
+        )
+
+    return {
+        "team_members": members,
+        "projects": projects,
+        "assignments": assignments,
+        "milestones": milestones,
+        "transcripts": transcripts,
+        "capacity_snapshots": [],
+        "time_entries": [],
+    }
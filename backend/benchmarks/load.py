@@ -0,0 +1,163 @@
+"""
+End-to-end transcript throughput under load.
+
+Starts the fake model (`benchmarks.fake_anthropic`), points the extractor at
+it, and hammers `POST /api/transcripts/process` with synthetic WIP
+transcripts at each concurrency level, reporting p50/p95/p99 latency,
+throughput and status codes.
+
+By default the backend runs in-process on an in-memory database. Pass
+`--target` to load a running backend instead (start it with
+ANTHROPIC_BASE_URL pointing at a fake model server).
+
+Usage (from backend/):
+    python -m benchmarks.load --concurrency 1,8,32 --requests 64
+    python -m benchmarks.load --rate-limit-rate 0.1 --malformed-rate 0.05
+    python -m benchmarks.load --target http://127.0.0.1:8000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+import httpx
+
+from benchmarks.fake_anthropic import (
+    FakeModelServer,
+    add_config_arguments,
+    config_from_args,
+)
+from benchmarks.transcripts import generate_transcript
+
+
+@dataclass
+class LevelResult:
+    """Outcome of one concurrency level."""
+
+    concurrency: int
+    latencies_ms: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    wall_seconds: float = 0.0
+
+    def percentile(self, pct: float) -> float:
+        ordered = sorted(self.latencies_ms)
+        if not ordered:
+            return 0.0
+        rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+        return ordered[rank]
+
+    @property
+    def throughput(self) -> float:
+        ok = self.statuses.get(200, 0)
+        return ok / self.wall_seconds if self.wall_seconds else 0.0
+
+    def describe(self) -> str:
+        statuses = ", ".join(f"{code}: {n}" for code, n in sorted(self.statuses.items()))
+        return (
+            f"concurrency {self.concurrency:>4}  "
+            f"p50 {self.percentile(50):>8.0f}ms  "
+            f"p95 {self.percentile(95):>8.0f}ms  "
+            f"p99 {self.percentile(99):>8.0f}ms  "
+            f"{self.throughput:>7.2f} transcripts/s  [{statuses}]"
+        )
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    concurrency: int,
+    requests: int,
+    rng: random.Random,
+) -> LevelResult:
+    """Send `requests` transcripts with at most `concurrency` in flight."""
+    result = LevelResult(concurrency)
+    bodies = [
+        {"transcript_text": generate_transcript(rng).text, "meeting_type": "wip"}
+        for _ in range(requests)
+    ]
+    queue: asyncio.Queue = asyncio.Queue()
+    for body in bodies:
+        queue.put_nowait(body)
+
+    async def worker():
+        while True:
+            try:
+                body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                response = await client.post("/api/transcripts/process", json=body)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            result.latencies_ms.append((time.perf_counter() - start) * 1000)
+            result.statuses[status] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.wall_seconds = time.perf_counter() - start
+    return result
+
+
+async def run_load(args: argparse.Namespace, base_url: str, transport=None) -> list[LevelResult]:
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    rng = random.Random(args.seed)
+    results = []
+    limits = httpx.Limits(max_connections=max(levels) * 2)
+    async with httpx.AsyncClient(
+        base_url=base_url, transport=transport, timeout=args.timeout, limits=limits
+    ) as client:
+        for concurrency in levels:
+            result = await run_level(client, concurrency, args.requests, rng)
+            results.append(result)
+            print(result.describe())
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Comma-separated levels")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per level")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--target", help="URL of a running backend to load instead")
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.target:
+        asyncio.run(run_load(args, args.target))
+        return 0
+
+    model = FakeModelServer(config_from_args(args)).start()
+    print(f"Fake model at {model.base_url}")
+
+    # Settings are read at import, so configure before importing the app
+    os.environ["ANTHROPIC_BASE_URL"] = model.base_url
+    os.environ.setdefault("ANTHROPIC_API_KEY", "sk-ant-fake")
+
+    from app.db.supabase_client import set_client
+    from app.main import app
+    from benchmarks.fake_supabase import FakeSupabase
+
+    set_client(FakeSupabase())
+    try:
+        asyncio.run(
+            run_load(args, "http://backend", transport=httpx.ASGITransport(app=app))
+        )
+    finally:
+        model.stop()
+        stats = model.stats
+        print(
+            f"Model calls: {stats.requests} "
+            f"(429s injected: {stats.rate_limited}, malformed: {stats.malformed}, "
+            f"tokens in/out: {stats.input_tokens}/{stats.output_tokens})"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,445 @@
+"""
+Benchmark every capacity, assignment and transcript route.
+
+Runs the FastAPI app in-process against an in-memory Supabase stand-in
+loaded with a synthetic agency, timing each route and counting the database
+round trips it makes. Results are written to `benchmarks/results/` keyed by
+app version and git revision, and compared with the previous run so
+regressions in latency or query count show up across versions.
+
+Usage (from backend/):
+    python -m benchmarks.run                      # small + medium agencies
+    python -m benchmarks.run --sizes large        # 2,000 members / 100k assignments
+    python -m benchmarks.run --baseline results/1.0.0-abc1234.json --fail-on-regression
+
+Model calls are replaced by a canned extraction, so transcript timings are
+backend overhead only (see `benchmarks.load` for end-to-end throughput).
+The SSE stream route is long-lived and not timed here.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from fastapi.testclient import TestClient
+
+from app.db.supabase_client import set_client
+from app.main import app
+from app.models.schemas import TranscriptExtractionSchema
+from app.services.claude_extractor import FAST_EXTRACTION_MODEL, Extraction
+from app.telemetry.tracing import capture_queries
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.generator import SIZES, generate_agency
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# A route is a regression if p50 latency grows by more than this fraction...
+LATENCY_TOLERANCE = 0.25
+# ...and by more than this many milliseconds (filters out timer noise)
+LATENCY_FLOOR_MS = 1.0
+
+
+@dataclass
+class Case:
+    """A timed request against one route."""
+
+    name: str
+    method: str
+    path: Callable[[], str]
+    body: Callable[[], Any] | None = None
+    setup: Callable[[], None] | None = None
+    teardown: Callable[[Any], None] | None = None
+    repeat: int | None = None
+
+
+@dataclass
+class CaseResult:
+    name: str
+    latencies_ms: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    statuses: set[int] = field(default_factory=set)
+
+    def summary(self) -> dict[str, Any]:
+        ordered = sorted(self.latencies_ms)
+        return {
+            "runs": len(ordered),
+            "p50_ms": round(statistics.median(ordered), 3),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+            "mean_ms": round(statistics.fmean(ordered), 3),
+            "queries": int(statistics.median(self.queries)),
+            "statuses": sorted(self.statuses),
+        }
+
+
+async def _canned_extraction(**_) -> Extraction:
+    data = TranscriptExtractionSchema(
+        meeting_metadata={"meeting_type": "wip", "attendees": ["Jess", "Sam"]},
+        projects=[
+            {
+                "name": "Lego campaign 1",
+                "status": "active",
+                "context": "Lego is in production",
+                "confidence": 0.9,
+            }
+        ],
+        assignments=[
+            {
+                "person_name": "Jess",
+                "project_name": "Lego campaign 1",
+                "assignment_type": "explicit",
+                "context": "Jess is producing Lego",
+                "confidence": 0.9,
+            }
+        ],
+        overall_confidence=0.85,
+    )
+    return Extraction(data, FAST_EXTRACTION_MODEL)
+
+
+def build_cases(db: FakeSupabase, rng: random.Random) -> list[Case]:
+    """Build route cases against the data loaded in the fake."""
+    members = [m for m in db.tables["team_members"] if m["active"]]
+    projects = db.tables["projects"]
+    active = [a for a in db.tables["assignments"] if a["status"] == "active"]
+    sample_assignment = active[0]
+    sample_member = sample_assignment["team_member_id"]
+    sample_transcript = db.tables["transcripts"][0]["id"]
+    taken = {(a["project_id"], a["team_member_id"]) for a in db.tables["assignments"]}
+
+    def fresh_pair() -> tuple[str, str]:
+        while True:
+            pair = (rng.choice(projects)["id"], rng.choice(members)["id"])
+            if pair not in taken:
+                return pair
+
+    def new_assignment() -> dict[str, Any]:
+        project_id, member_id = fresh_pair()
+        return {
+            "project_id": project_id,
+            "team_member_id": member_id,
+            "role_on_project": "support",
+            "estimated_hours": 20,
+            "hours_this_week": 6,
+        }
+
+    def delete_created(response) -> None:
+        payload = response.json()
+        created = payload.get("created", [payload]) if isinstance(payload, dict) else []
+        for item in created:
+            if "id" in item:
+                db.table("assignments").delete().eq("id", item["id"]).execute()
+
+    scratch: dict[str, str] = {}
+
+    def insert_scratch_assignment() -> None:
+        row = db.insert_row("assignments", new_assignment())
+        scratch["id"] = row["id"]
+
+    def delete_transcript(response) -> None:
+        transcript_id = response.json().get("transcript_id")
+        if transcript_id:
+            db.table("transcripts").delete().eq("id", transcript_id).execute()
+
+    def insert_approvable_transcript() -> None:
+        # A meeting naming 40 people on projects they are not yet assigned to
+        by_id = {m["id"]: m for m in members}
+        project_names = {p["id"]: p["name"] for p in projects}
+        assignments = []
+        for project_id, member_id in (fresh_pair() for _ in range(40)):
+            name = by_id[member_id]["full_name"]
+            assignments.append(
+                {
+                    "person_name": name,
+                    "project_name": project_names[project_id],
+                    "assignment_type": "explicit",
+                    "context": f"{name} is picking up {project_names[project_id]}",
+                    "confidence": 0.9,
+                }
+            )
+        row = db.insert_row(
+            "transcripts",
+            {
+                "meeting_date": date.today().isoformat(),
+                "meeting_type": "wip",
+                "raw_text": "WIP meeting",
+                "extracted_data": {"assignments": assignments, "overall_confidence": 0.9},
+                "processed_at": datetime.now(timezone.utc).isoformat(),
+            },
+        )
+        scratch["transcript_id"] = row["id"]
+
+    def delete_applied(response) -> None:
+        for assignment_id in response.json().get("assignment_ids", []):
+            db.table("assignments").delete().eq("id", assignment_id).execute()
+        db.table("transcripts").delete().eq("id", scratch["transcript_id"]).execute()
+
+    hours = iter(range(10**9))
+
+    return [
+        # Capacity
+        Case("GET /api/capacity/current-week", "GET", lambda: "/api/capacity/current-week"),
+        Case("GET /api/capacity/conflicts", "GET", lambda: "/api/capacity/conflicts"),
+        Case("GET /api/capacity/forecast", "GET", lambda: "/api/capacity/forecast?weeks=4"),
+        Case(
+            "GET /api/capacity/team-member/{id}",
+            "GET",
+            lambda: f"/api/capacity/team-member/{sample_member}",
+        ),
+        Case("GET /api/capacity/summary", "GET", lambda: "/api/capacity/summary"),
+        Case("POST /api/capacity/recalculate", "POST", lambda: "/api/capacity/recalculate"),
+        Case(
+            "POST /api/capacity/scenarios (x100)",
+            "POST",
+            lambda: "/api/capacity/scenarios",
+            body=lambda: {
+                "scenarios": [
+                    {
+                        "name": f"scenario-{i}",
+                        "creates": [new_assignment()],
+                        "updates": [
+                            {"assignment_id": sample_assignment["id"], "hours_this_week": i % 20}
+                        ],
+                    }
+                    for i in range(100)
+                ]
+            },
+        ),
+        # Assignments
+        Case(
+            "POST /api/assignments/",
+            "POST",
+            lambda: "/api/assignments/",
+            body=new_assignment,
+            teardown=delete_created,
+        ),
+        Case(
+            "POST /api/assignments/bulk",
+            "POST",
+            lambda: "/api/assignments/bulk",
+            body=lambda: {"assignments": [new_assignment() for _ in range(10)]},
+            teardown=delete_created,
+        ),
+        Case(
+            "GET /api/assignments/{id}",
+            "GET",
+            lambda: f"/api/assignments/{sample_assignment['id']}",
+        ),
+        Case(
+            "PATCH /api/assignments/{id}",
+            "PATCH",
+            lambda: f"/api/assignments/{sample_assignment['id']}",
+            body=lambda: {"hours_this_week": 4 + next(hours) % 4},
+        ),
+        Case(
+            "DELETE /api/assignments/{id}",
+            "DELETE",
+            lambda: f"/api/assignments/{scratch['id']}",
+            setup=insert_scratch_assignment,
+        ),
+        Case(
+            "GET /api/assignments/?team_member_id",
+            "GET",
+            lambda: f"/api/assignments/?team_member_id={sample_member}",
+        ),
+        Case("GET /api/assignments/", "GET", lambda: "/api/assignments/", repeat=3),
+        # Transcripts
+        Case(
+            "POST /api/transcripts/process",
+            "POST",
+            lambda: "/api/transcripts/process",
+            body=lambda: {
+                "transcript_text": "WIP: Jess is producing Lego this week, shoot on Friday. "
+                * 4,
+                "meeting_type": "wip",
+                "dedupe": False,
+            },
+            teardown=delete_transcript,
+        ),
+        Case(
+            "POST /api/transcripts/process (duplicate)",
+            "POST",
+            lambda: "/api/transcripts/process",
+            body=lambda: {
+                # Re-export of a stored transcript: returned without extracting
+                "transcript_text": "  " + db.tables["transcripts"][1]["raw_text"] + "\n",
+                "meeting_type": "wip",
+            },
+        ),
+        Case(
+            "GET /api/transcripts/{id}",
+            "GET",
+            lambda: f"/api/transcripts/{sample_transcript}",
+        ),
+        Case("GET /api/transcripts/", "GET", lambda: "/api/transcripts/?limit=50"),
+        Case(
+            "GET /api/transcripts/search",
+            "GET",
+            lambda: f"/api/transcripts/search?q={rng.choice(projects)['name']}",
+        ),
+        Case(
+            "POST /api/transcripts/{id}/approve",
+            "POST",
+            lambda: f"/api/transcripts/{sample_transcript}/approve",
+        ),
+        Case(
+            "POST /api/transcripts/{id}/approve (x40)",
+            "POST",
+            lambda: f"/api/transcripts/{scratch['transcript_id']}/approve",
+            setup=insert_approvable_transcript,
+            teardown=delete_applied,
+        ),
+    ]
+
+
+def run_case(client: TestClient, case: Case, repeat: int) -> CaseResult:
+    result = CaseResult(case.name)
+    for _ in range(case.repeat or repeat):
+        if case.setup:
+            case.setup()
+        body = case.body() if case.body else None
+        with capture_queries() as queries:
+            start = time.perf_counter()
+            response = client.request(case.method, case.path(), json=body)
+            elapsed = (time.perf_counter() - start) * 1000
+        result.latencies_ms.append(elapsed)
+        result.queries.append(len(queries))
+        result.statuses.add(response.status_code)
+        if case.teardown:
+            case.teardown(response)
+    return result
+
+
+def run_size(size_name: str, repeat: int, seed: int) -> dict[str, Any]:
+    size = SIZES[size_name]
+    started = time.perf_counter()
+    db = FakeSupabase(generate_agency(size, seed=seed))
+    print(
+        f"\n[{size_name}] {size.members} members, {size.projects} projects, "
+        f"{len(db.tables['assignments'])} assignments "
+        f"(generated in {time.perf_counter() - started:.1f}s)"
+    )
+    set_client(db)
+
+    from app.api.routes import transcripts as transcript_routes
+
+    original_extract = transcript_routes.extract_from_transcript
+    transcript_routes.extract_from_transcript = _canned_extraction
+    try:
+        results = {}
+        with TestClient(app) as client:
+            for case in build_cases(db, random.Random(seed)):
+                summary = run_case(client, case, repeat).summary()
+                results[case.name] = summary
+                print(
+                    f"  {case.name:<42} p50 {summary['p50_ms']:>10.2f}ms  "
+                    f"p95 {summary['p95_ms']:>10.2f}ms  queries {summary['queries']:>6}"
+                )
+    finally:
+        transcript_routes.extract_from_transcript = original_extract
+        set_client(None)
+
+    return {
+        "members": size.members,
+        "projects": size.projects,
+        "assignments": size.assignments,
+        "routes": results,
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+
+def find_baseline(exclude: Path) -> Path | None:
+    """Most recent stored result other than the one just written."""
+    candidates = [
+        p for p in RESULTS_DIR.glob("*.json") if p.resolve() != exclude.resolve()
+    ]
+    return max(candidates, key=lambda p: p.stat().st_mtime) if candidates else None
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    """Describe routes that got slower or make more queries than the baseline."""
+    regressions = []
+    for size_name, size_result in current["sizes"].items():
+        base_size = baseline.get("sizes", {}).get(size_name)
+        if not base_size:
+            continue
+        for route, now in size_result["routes"].items():
+            before = base_size["routes"].get(route)
+            if not before:
+                continue
+            if now["queries"] > before["queries"]:
+                regressions.append(
+                    f"[{size_name}] {route}: queries {before['queries']} -> {now['queries']}"
+                )
+            slower = now["p50_ms"] - before["p50_ms"]
+            if slower > LATENCY_FLOOR_MS and slower > before["p50_ms"] * LATENCY_TOLERANCE:
+                regressions.append(
+                    f"[{size_name}] {route}: p50 {before['p50_ms']:.2f}ms -> {now['p50_ms']:.2f}ms"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="small,medium", help="Comma-separated: " + ",".join(SIZES))
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per route")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", type=Path, help="Result file to compare against")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"Unknown sizes: {', '.join(unknown)}")
+
+    report = {
+        "version": app.version,
+        "revision": _git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "sizes": {name: run_size(name, args.repeat, args.seed) for name in sizes},
+    }
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    output = RESULTS_DIR / f"{report['version']}-{report['revision']}.json"
+    if output.exists():
+        # Keep sizes from earlier runs of the same revision
+        previous = json.loads(output.read_text())
+        report["sizes"] = {**previous.get("sizes", {}), **report["sizes"]}
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nResults written to {output}")
+
+    baseline_path = args.baseline or find_baseline(output)
+    if baseline_path is None:
+        return 0
+
+    regressions = compare(report, json.loads(baseline_path.read_text()))
+    print(f"Compared with {baseline_path.name}: {len(regressions)} regression(s)")
+    for line in regressions:
+        print(f"  {line}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Synthetic WIP meeting transcripts.
+
+Produces conversational transcripts in the shape the extractor sees in
+practice: a facilitator walking through projects, people giving updates,
+capacity complaints and deadlines, with speaker labels and filler.
+"""
+
+import random
+from dataclasses import dataclass, field
+
+
+PEOPLE = ["Jess", "Sam", "Alex", "Priya", "Tom", "Mia", "Noah", "Ava", "Leo", "Zoe"]
+CLIENTS = ["Lego", "Nike", "Qantas", "Telstra", "Coles", "Canva", "Atlassian", "Bunnings"]
+DELIVERABLES = ["launch", "shoot", "social push", "media tour", "brand refresh", "PPM"]
+TIMEFRAMES = ["this Friday", "next Tuesday", "end of the month", "before Christmas", "Thursday"]
+UPDATES = [
+    "{person}, what's happening with {project}?",
+    "{person} is producing {project}, we're in pre-production.",
+    "{person} is leading {project} and the client is happy with the first round.",
+    "{person} is helping out on {project} with the edit.",
+    "Can {person} pick up {project}? It needs someone on strategy.",
+    "{project} is on hold until the client signs off budget.",
+]
+CAPACITY = [
+    "{person}: I'm jam packed front of the week.",
+    "{person}: honestly I'm completely overloaded right now.",
+    "{person}: I'll have time from Wednesday.",
+    "{person}: I'm out Thursday and Friday.",
+    "{person}: three proactive briefs in a week is too much.",
+]
+DEADLINES = [
+    "The {milestone} for {project} is {timeframe}.",
+    "We need the {milestone} deck for {project} by {timeframe}.",
+]
+FILLER = [
+    "Okay, moving on.",
+    "Sorry, you're on mute.",
+    "Can everyone see my screen?",
+    "Let's take that offline.",
+    "Great, thanks everyone.",
+]
+
+
+@dataclass
+class SyntheticTranscript:
+    """A generated transcript and the facts it mentions."""
+
+    text: str
+    people: list[str] = field(default_factory=list)
+    projects: list[str] = field(default_factory=list)
+
+
+def generate_transcript(
+    rng: random.Random,
+    projects: int = 6,
+    lines_per_project: int = 4,
+) -> SyntheticTranscript:
+    """
+    Generate one WIP transcript.
+
+    Args:
+        rng: Random source (seed it for reproducible load runs)
+        projects: Number of projects discussed
+        lines_per_project: Approximate lines of discussion per project
+
+    Returns:
+        SyntheticTranscript with the text and the people/projects mentioned
+    """
+    facilitator = rng.choice(PEOPLE)
+    project_names = [
+        f"{rng.choice(CLIENTS)} {rng.choice(DELIVERABLES)}" for _ in range(projects)
+    ]
+    mentioned: set[str] = set()
+
+    lines = [f"{facilitator}: Morning all, let's run through the WIP."]
+    for project in project_names:
+        lines.append(f"{facilitator}: Next up, {project}.")
+        for _ in range(lines_per_project):
+            person = rng.choice(PEOPLE)
+            mentioned.add(person)
+            roll = rng.random()
+            if roll < 0.55:
+                template = rng.choice(UPDATES)
+                lines.append(f"{facilitator}: " + template.format(person=person, project=project))
+            elif roll < 0.75:
+                lines.append(rng.choice(CAPACITY).format(person=person))
+            elif roll < 0.9:
+                lines.append(
+                    f"{person}: "
+                    + rng.choice(DEADLINES).format(
+                        milestone=rng.choice(DELIVERABLES),
+                        project=project,
+                        timeframe=rng.choice(TIMEFRAMES),
+                    )
+                )
+            else:
+                lines.append(f"{person}: {rng.choice(FILLER)}")
+    lines.append(f"{facilitator}: That's everything, thanks team.")
+
+    return SyntheticTranscript(
+        text="\n".join(lines),
+        people=sorted(mentioned),
+        projects=project_names,
+    )
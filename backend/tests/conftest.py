@@ -0,0 +1,42 @@
+"""
+Shared fixtures: the app served against an in-memory Supabase stand-in.
+
+Local stores (capacity history, search index) are written to a temporary
+directory and startup prewarm is off, so tests need no network or services.
+"""
+
+import os
+import tempfile
+
+_DATA_DIR = tempfile.mkdtemp(prefix="traffic-manager-tests-")
+os.environ.setdefault("PREWARM_ON_STARTUP", "false")
+os.environ.setdefault("HISTORY_STORE_PATH", os.path.join(_DATA_DIR, "capacity_history"))
+os.environ.setdefault("SEARCH_INDEX_PATH", os.path.join(_DATA_DIR, "transcript_index"))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.db.supabase_client import PAGE_SIZE, set_client  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase  # noqa: E402
+from benchmarks.generator import SIZES, AgencySize, generate_agency  # noqa: E402
+
+
+def make_db(size: str | AgencySize = "small", seed: int = 7) -> FakeSupabase:
+    """A fake database loaded with a generated agency, injected as the client."""
+    agency = SIZES[size] if isinstance(size, str) else size
+    db = FakeSupabase(generate_agency(agency, seed=seed), max_rows=PAGE_SIZE)
+    set_client(db)
+    return db
+
+
+@pytest.fixture
+def db():
+    yield make_db()
+    set_client(None)
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(app) as test_client:
+        yield test_client
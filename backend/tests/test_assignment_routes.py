@@ -0,0 +1,69 @@
+"""
+Bulk assignment creation: partial results when the time budget runs out.
+"""
+
+from app.api.routes import assignments
+from app.deadlines import DeadlineExceeded
+from benchmarks.fake_supabase import FakeQuery
+
+
+def _bulk_request(db) -> tuple[list[dict], dict]:
+    """Three new assignments of one active member."""
+    member = next(m for m in db.tables["team_members"] if m.get("active", True))
+    assigned = {a["project_id"] for a in db.lookup("assignments", "team_member_id", member["id"])}
+    projects = [p for p in db.tables["projects"] if p["id"] not in assigned][:3]
+    body = {
+        "assignments": [
+            {
+                "project_id": p["id"],
+                "team_member_id": member["id"],
+                "role_on_project": "lead",
+                "estimated_hours": 10,
+                "hours_this_week": 4,
+            }
+            for p in projects
+        ]
+    }
+    return projects, body
+
+
+def test_bulk_create_reports_rows_left_when_the_deadline_hits(client, db, monkeypatch):
+    projects, body = _bulk_request(db)
+    inserts = 0
+    execute = FakeQuery.execute
+
+    def execute_until_deadline(query):
+        nonlocal inserts
+        if query._table == "assignments" and query._op == "insert":
+            inserts += 1
+            if inserts > 1:
+                raise DeadlineExceeded("database")
+        return execute(query)
+
+    monkeypatch.setattr(FakeQuery, "execute", execute_until_deadline)
+
+    response = client.post("/api/assignments/bulk", json=body)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [a["project_id"] for a in body["created"]] == [projects[0]["id"]]
+    assert [(e["index"], e["project_id"]) for e in body["errors"]] == [
+        (1, projects[1]["id"]),
+        (2, projects[2]["id"]),
+    ]
+    assert "may or may not have been created" in body["errors"][0]["error"]
+    assert body["errors"][1]["error"] == "Not attempted: request deadline reached"
+
+
+def test_bulk_create_keeps_time_to_answer(client, db, monkeypatch):
+    # A reserve larger than the whole budget: nothing is started
+    monkeypatch.setattr(assignments, "BULK_FINISH_RESERVE_SECONDS", 10_000)
+    _, body = _bulk_request(db)
+
+    response = client.post("/api/assignments/bulk", json=body)
+
+    assert response.status_code == 200
+    assert response.json()["created"] == []
+    assert {e["error"] for e in response.json()["errors"]} == {
+        "Not attempted: request deadline reached"
+    }
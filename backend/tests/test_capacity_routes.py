@@ -0,0 +1,86 @@
+"""
+Capacity route behaviour: parameter bounds and conflict reporting.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+
+from app.services.capacity_calculator import get_week_start
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/api/capacity/timeline-conflicts?weeks=0",
+        "/api/capacity/timeline-conflicts?weeks=-3",
+        "/api/capacity/forecast?weeks=-1",
+        "/api/capacity/forecast?weeks=0",
+        "/api/capacity/variance?weeks=0",
+        "/api/capacity/variance?weeks=-2",
+    ],
+)
+def test_week_counts_must_be_positive(client, path):
+    assert client.get(path).status_code == 422
+
+
+def test_conflicts_report_one_timeline_conflict_per_member(client, db):
+    member = next(m for m in db.tables["team_members"] if m.get("active", True))
+    deadline = get_week_start() + timedelta(days=3)
+    for project in db.tables["projects"][:2]:
+        db.table("projects").update(
+            {"priority": "urgent", "deadline": deadline.isoformat()}
+        ).eq("id", project["id"]).execute()
+        db.table("assignments").insert(
+            {
+                "project_id": project["id"],
+                "team_member_id": member["id"],
+                "role_on_project": "lead",
+                "estimated_hours": 10,
+                "hours_this_week": 10,
+            }
+        ).execute()
+
+    conflicts = client.get("/api/capacity/conflicts").json()
+
+    timeline = Counter(
+        c["team_member_id"] for c in conflicts if c["type"] == "timeline-conflict"
+    )
+    assert timeline[member["id"]] == 1
+    assert max(timeline.values()) == 1
+
+
+def test_scenario_reassignment_onto_an_existing_pair_is_an_error(client, db):
+    active = {m["id"] for m in db.tables["team_members"] if m.get("active", True)}
+    rows = [
+        a
+        for a in db.tables["assignments"]
+        if a["status"] == "active" and a["team_member_id"] in active
+    ]
+    moved, kept = next(
+        (a, b)
+        for a in rows
+        for b in rows
+        if a["project_id"] == b["project_id"] and a["team_member_id"] != b["team_member_id"]
+    )
+
+    response = client.post(
+        "/api/capacity/scenarios",
+        json={
+            "scenarios": [
+                {
+                    "name": "double up",
+                    "updates": [
+                        {"assignment_id": moved["id"], "team_member_id": kept["team_member_id"]}
+                    ],
+                }
+            ]
+        },
+    )
+
+    result = response.json()["scenarios"][0]
+    assert result["errors"] == [
+        f"Assignment already exists for {kept['team_member_id']} on {kept['project_id']}"
+    ]
+    assert result["members"] == []
@@ -0,0 +1,132 @@
+"""
+Extraction cascade: when the fast model's answer or failure escalates.
+"""
+
+import json
+from types import SimpleNamespace
+
+import anthropic
+import httpx
+import pytest
+
+from app.container import services
+from app.services import claude_extractor
+from app.services.model_scheduler import ModelBusyError
+from app.telemetry.metrics import model_retries, record_model_response, record_model_retry
+
+FAST, FULL = "fast-model", "full-model"
+
+EXTRACTION = {"projects": [], "assignments": [], "overall_confidence": 0.95}
+
+
+def _error(cls, status: int, headers: dict | None = None) -> anthropic.APIStatusError:
+    request = httpx.Request("POST", "https://api.test/v1/messages")
+    response = httpx.Response(status, headers=headers, request=request)
+    return cls(f"HTTP {status}", response=response, body=None)
+
+
+class StubMessages:
+    """Answers per model: an exception to raise, or an extraction to return."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.models: list[str] = []
+
+    async def create(self, model, **_):
+        self.models.append(model)
+        answer = self.answers[model]
+        if isinstance(answer, Exception):
+            raise answer
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=json.dumps(answer))],
+            usage=SimpleNamespace(input_tokens=100, output_tokens=50),
+        )
+
+
+@pytest.fixture
+def answer(monkeypatch):
+    monkeypatch.setattr(claude_extractor, "FAST_EXTRACTION_MODEL", FAST)
+    monkeypatch.setattr(claude_extractor, "EXTRACTION_MODEL", FULL)
+
+    def install(fast):
+        messages = StubMessages({FAST: fast, FULL: EXTRACTION})
+        services.override("anthropic", SimpleNamespace(messages=messages))
+        return messages
+
+    yield install
+    services.override("anthropic", None)
+
+
+async def test_confident_fast_answer_is_used(answer):
+    messages = answer(fast=EXTRACTION)
+
+    result = await claude_extractor.extract_from_transcript("Jess is on Legos")
+
+    assert (result.model, result.escalation_reason) == (FAST, None)
+    assert messages.models == [FAST]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        _error(anthropic.NotFoundError, 404),
+        _error(anthropic.InternalServerError, 500),
+        _error(anthropic.InternalServerError, 529),
+        anthropic.APIConnectionError(request=httpx.Request("POST", "https://api.test")),
+    ],
+)
+async def test_fast_model_api_errors_fall_back_to_the_full_model(answer, error):
+    messages = answer(fast=error)
+
+    result = await claude_extractor.extract_from_transcript("Jess is on Legos")
+
+    assert (result.model, result.escalation_reason) == (FULL, "api_error")
+    assert messages.models == [FAST, FULL]
+
+
+async def test_fast_model_rate_limit_is_not_escalated(answer):
+    # Retry-After 0 so the scheduler's backoff does not hold later tests
+    messages = answer(fast=_error(anthropic.RateLimitError, 429, {"retry-after": "0"}))
+
+    with pytest.raises(ModelBusyError):
+        await claude_extractor.extract_from_transcript("Jess is on Legos")
+
+    assert messages.models == [FAST]
+
+
+async def test_sdk_retries_are_counted_by_cause():
+    statuses = iter([529, 429])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = next(statuses, 200)
+        if status != 200:
+            return httpx.Response(status, headers={"retry-after-ms": "1"}, json={})
+        return httpx.Response(
+            200,
+            json={
+                "id": "msg_1",
+                "type": "message",
+                "role": "assistant",
+                "model": FAST,
+                "content": [{"type": "text", "text": "{}"}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": 1, "output_tokens": 1},
+            },
+        )
+
+    client = anthropic.AsyncAnthropic(
+        api_key="test",
+        base_url="https://api.test",
+        http_client=anthropic.DefaultAsyncHttpxClient(
+            transport=httpx.MockTransport(handler),
+            event_hooks={
+                "request": [record_model_retry],
+                "response": [record_model_response],
+            },
+        ),
+    )
+    before = {s: model_retries.get(status=s) for s in ("5xx", "429")}
+
+    await client.messages.create(model=FAST, max_tokens=10, messages=[])
+
+    assert {s: model_retries.get(status=s) - before[s] for s in before} == {"5xx": 1, "429": 1}
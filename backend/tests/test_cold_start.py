@@ -0,0 +1,40 @@
+"""
+Cold start budgets, measured in fresh interpreters by benchmarks/cold_start.py.
+"""
+
+import pytest
+
+from benchmarks.cold_start import (
+    FIRST_REQUEST_BUDGET_SECONDS,
+    FIRST_REQUESTS,
+    IMPORT_BUDGET_SECONDS,
+    measure_first_requests,
+    measure_imports,
+)
+
+# Fresh interpreters per probe; the median is compared with the budget
+RUNS = 3
+
+
+def test_importing_the_app_is_cheap_and_defers_sdks():
+    imports = measure_imports(RUNS)
+
+    assert imports["loaded"] == []
+    assert imports["seconds"] <= IMPORT_BUDGET_SECONDS
+
+
+@pytest.fixture(scope="module")
+def first_requests():
+    return measure_first_requests(RUNS)
+
+
+def test_startup_prewarms_every_client(first_requests):
+    prewarm = first_requests["prewarm"]
+
+    assert set(prewarm) == {"supabase", "anthropic"}
+    assert all(isinstance(seconds, float) for seconds in prewarm.values()), prewarm
+
+
+@pytest.mark.parametrize("path", FIRST_REQUESTS)
+def test_first_request_is_within_budget(first_requests, path):
+    assert first_requests["requests"][path] <= FIRST_REQUEST_BUDGET_SECONDS
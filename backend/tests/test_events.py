@@ -0,0 +1,32 @@
+"""
+Domain event stream: a failing projection is logged and counted.
+"""
+
+import logging
+
+from app.services.events import DomainEvent, EventStream
+from app.telemetry.metrics import event_handler_errors
+
+
+async def test_failing_handler_is_logged_counted_and_skipped(caplog):
+    stream = EventStream()
+    received: list[DomainEvent] = []
+
+    async def broken_projection(event: DomainEvent) -> None:
+        raise RuntimeError("boom")
+
+    async def collect(event: DomainEvent) -> None:
+        received.append(event)
+
+    stream.subscribe("assignment.", broken_projection)
+    stream.subscribe("assignment.", collect)
+    labels = {"event": "assignment.created", "handler": broken_projection.__qualname__}
+    before = event_handler_errors.get(**labels)
+
+    with caplog.at_level(logging.ERROR, logger="app.services.events"):
+        await stream.publish("assignment.created", ["m-1"])
+
+    assert [e.team_member_ids for e in received] == [("m-1",)]
+    assert event_handler_errors.get(**labels) == before + 1
+    assert "Error handling assignment.created event" in caplog.text
+    assert "RuntimeError: boom" in caplog.text
@@ -0,0 +1,105 @@
+"""
+Capacity history store: incremental rollups and shared-directory writes.
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.schemas import CapacitySnapshot
+from app.services.history_store import GRAINS, CapacityHistoryStore, period_key
+
+MONDAY = date(2026, 1, 5)
+
+
+def snapshot(member: int, week: int, allocated: float, role: str = "designer") -> CapacitySnapshot:
+    return CapacitySnapshot(
+        id="",
+        team_member_id=f"m{member}",
+        full_name=f"Member {member}",
+        role=role,
+        week_start_date=MONDAY + timedelta(weeks=week),
+        total_capacity_hours=40,
+        allocated_hours=allocated,
+        available_hours=40 - allocated,
+        utilization_pct=allocated / 40 * 100,
+        overallocated=allocated > 40,
+    )
+
+
+def recomputed_rollups(store: CapacityHistoryStore) -> dict:
+    """Rollups derived from scratch from the stored columns."""
+    rollups: dict = {}
+    columns = store._columns
+    for member, week, capacity, allocated in zip(
+        columns["member"], columns["week"], columns["capacity"], columns["allocated"]
+    ):
+        entry = store._members[member]
+        for grain in GRAINS:
+            period = period_key(grain, date.fromordinal(week))
+            for dimension, key in (
+                ("team", "team"),
+                ("role", entry["role"] or "unknown"),
+                ("member", entry["id"]),
+            ):
+                totals = (
+                    rollups.setdefault(grain, {})
+                    .setdefault(dimension, {})
+                    .setdefault(key, {})
+                    .setdefault(period, [0.0, 0.0, 0.0, 0.0])
+                )
+                totals[0] += capacity
+                totals[1] += allocated
+                totals[2] += 1
+                totals[3] += 1.0 if allocated > capacity else 0.0
+    return rollups
+
+
+def assert_rollups_match(store: CapacityHistoryStore) -> None:
+    expected = recomputed_rollups(store)
+    actual = {
+        grain: {dimension: keys for dimension, keys in by_dimension.items() if keys}
+        for grain, by_dimension in store._rollups.items()
+    }
+    assert actual.keys() == expected.keys()
+    for grain in expected:
+        assert actual[grain].keys() == expected[grain].keys()
+        for dimension, keys in expected[grain].items():
+            assert actual[grain][dimension].keys() == keys.keys()
+            for key, periods in keys.items():
+                assert actual[grain][dimension][key].keys() == periods.keys()
+                for period, totals in periods.items():
+                    assert actual[grain][dimension][key][period] == pytest.approx(totals)
+
+
+def test_incremental_rollups_match_a_full_recompute(tmp_path):
+    store = CapacityHistoryStore(tmp_path)
+    rng = random.Random(3)
+
+    for _ in range(20):
+        store.record(
+            snapshot(rng.randrange(8), rng.randrange(30), rng.uniform(0, 60))
+            for _ in range(25)
+        )
+    # Role change moves the member's whole history
+    store.record([snapshot(2, 3, 12, role="producer")])
+
+    assert_rollups_match(store)
+    assert "producer" in store._rollups["monthly"]["role"]
+
+
+def test_writers_sharing_a_directory_keep_each_others_rows(tmp_path):
+    first = CapacityHistoryStore(tmp_path)
+    second = CapacityHistoryStore(tmp_path)
+    first.record([snapshot(1, 0, 10)])
+    second.row_count  # Loaded before the next write by `first`
+
+    first.record([snapshot(2, 0, 20)])
+    second.record([snapshot(3, 0, 30)])
+
+    reader = CapacityHistoryStore(tmp_path)
+    assert reader.row_count == 3
+    team = reader.query("weekly", "team").points
+    assert [float(p.allocated_hours) for p in team] == [60.0]
+    assert_rollups_match(reader)
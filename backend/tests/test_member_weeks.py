@@ -0,0 +1,88 @@
+"""
+Member-week read model: writes that bypass the backend's events.
+
+The web app writes straight to Supabase. The fake database mirrors the
+member_week_dirty triggers, so these writes mark members the way the real
+schema does.
+"""
+
+import pytest
+
+from app.services.member_weeks import member_weeks
+
+
+def _row(client, member_id):
+    rows = client.get("/api/capacity/current-week").json()
+    return next(r for r in rows if r["team_member_id"] == member_id)
+
+
+@pytest.fixture
+def assignment(client, db):
+    """An active assignment of an active member, once the week is built."""
+    client.get("/api/capacity/current-week")
+    return next(
+        a
+        for a in db.tables["assignments"]
+        if a["status"] == "active" and db.get_by_id("team_members", a["team_member_id"])["active"]
+    )
+
+
+def test_direct_assignment_update_is_reprojected(client, db, assignment):
+    member_id = assignment["team_member_id"]
+    before = float(_row(client, member_id)["allocated_hours"])
+
+    db.table("assignments").update(
+        {"hours_this_week": float(assignment["hours_this_week"] or 0) + 7}
+    ).eq("id", assignment["id"]).execute()
+
+    assert float(_row(client, member_id)["allocated_hours"]) == pytest.approx(before + 7)
+    assert db.tables["member_week_dirty"] == []
+
+
+def test_direct_assignment_insert_is_reprojected(client, db, assignment):
+    member_id = assignment["team_member_id"]
+    before = float(_row(client, member_id)["allocated_hours"])
+    assigned = {a["project_id"] for a in db.lookup("assignments", "team_member_id", member_id)}
+    project = next(p for p in db.tables["projects"] if p["id"] not in assigned)
+
+    db.table("assignments").insert(
+        {"project_id": project["id"], "team_member_id": member_id, "hours_this_week": 5}
+    ).execute()
+
+    assert float(_row(client, member_id)["allocated_hours"]) == pytest.approx(before + 5)
+
+
+def test_member_capacity_and_active_changes_are_reprojected(client, db, assignment):
+    member_id = assignment["team_member_id"]
+
+    db.table("team_members").update({"weekly_capacity_hours": 12}).eq("id", member_id).execute()
+    assert float(_row(client, member_id)["total_capacity_hours"]) == 12
+
+    db.table("team_members").update({"active": False}).eq("id", member_id).execute()
+    rows = client.get("/api/capacity/current-week").json()
+    assert member_id not in {r["team_member_id"] for r in rows}
+    assert client.get(f"/api/capacity/team-member/{member_id}").status_code == 404
+
+
+def test_project_priority_change_is_reprojected(client, db, assignment):
+    member_id = assignment["team_member_id"]
+    projects = {
+        a["project_id"]
+        for a in db.tables["assignments"]
+        if a["team_member_id"] == member_id and a["status"] == "active"
+    }
+
+    db.table("projects").update({"priority": "urgent"}).in_("id", list(projects)).execute()
+
+    assert member_weeks.read_member(member_id)["urgent_count"] == len(projects)
+
+
+def test_recalculate_reports_members_it_could_not_project(client, db):
+    broken = db.tables["team_members"][0]
+    db.table("team_members").update({"role": None}).eq("id", broken["id"]).execute()
+
+    result = client.post("/api/capacity/recalculate").json()
+
+    assert [e["team_member_id"] for e in result["errors"]] == [broken["id"]]
+    assert broken["id"] not in {r["team_member_id"] for r in result["recalculated"]}
+    assert result["total"] == len(result["recalculated"]) > 0
@@ -0,0 +1,75 @@
+"""
+Team-wide reads page past PostgREST's max-rows cap.
+
+The fake database returns at most PAGE_SIZE rows per select, like the real
+server; the medium agency has 10,000 assignments.
+"""
+
+import asyncio
+
+import pytest
+
+from app.db.supabase_client import set_client
+from app.services.assignment_optimizer import load_roster
+from app.services.capacity_calculator import get_week_start
+from app.services.rebalancer import propose_rebalance
+from app.services.scenarios import OPEN_STATUSES, load_capacity_state
+from app.services.timeline import load_timeline_conflicts
+from app.services.variance import calculate_variance
+from tests.conftest import make_db
+
+
+@pytest.fixture
+def large_db():
+    yield make_db("medium")
+    set_client(None)
+
+
+def _active_hours(db) -> dict[str, float]:
+    hours: dict[str, float] = {}
+    for a in db.tables["assignments"]:
+        if a["status"] == "active":
+            hours[a["team_member_id"]] = hours.get(a["team_member_id"], 0.0) + float(
+                a["hours_this_week"] or 0
+            )
+    return hours
+
+
+def test_roster_sees_every_active_assignment(large_db):
+    roster = load_roster()
+
+    expected = _active_hours(large_db)
+    for member_id, member in roster.items():
+        assert member.allocated == pytest.approx(expected.get(member_id, 0.0))
+
+
+def test_rebalance_sees_every_active_assignment(large_db):
+    proposal = asyncio.run(propose_rebalance())
+
+    expected = _active_hours(large_db)
+    assert proposal.members
+    for member in proposal.members:
+        assert float(member.allocated_before) == pytest.approx(
+            expected[member.team_member_id], abs=0.01
+        )
+
+
+def test_scenario_baseline_loads_every_open_assignment(large_db):
+    state = load_capacity_state(get_week_start())
+
+    open_ids = {a["id"] for a in large_db.tables["assignments"] if a["status"] in OPEN_STATUSES}
+    assert set(state.assignments) == open_ids
+
+
+def test_timeline_conflicts_match_an_uncapped_read(large_db):
+    capped = load_timeline_conflicts(weeks=8)
+
+    large_db.max_rows = None
+    assert capped == load_timeline_conflicts(weeks=8)
+
+
+def test_variance_matches_an_uncapped_read(large_db):
+    capped = asyncio.run(calculate_variance(include_assignments=True))
+
+    large_db.max_rows = None
+    assert capped == asyncio.run(calculate_variance(include_assignments=True))
@@ -0,0 +1,78 @@
+"""
+Database round trips per capacity endpoint.
+
+Pins the N+1 fixes: each endpoint makes a fixed number of queries however
+many members, projects and assignments the agency has.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.supabase_client import get_client, set_client
+from app.main import app
+from app.telemetry.tracing import assert_max_queries, capture_queries
+from benchmarks.generator import AgencySize
+from tests.conftest import make_db
+
+# Route -> most queries it may make once the week's read model exists. Each
+# read of the week is two: the rows and the members marked by direct writes.
+CAPACITY_QUERY_LIMITS = {
+    "/api/capacity/current-week": 2,
+    "/api/capacity/summary": 2,
+    "/api/capacity/conflicts": 5,
+    "/api/capacity/forecast": 3,
+}
+
+
+@pytest.mark.parametrize("path,limit", CAPACITY_QUERY_LIMITS.items())
+def test_capacity_endpoint_query_limit(client, path, limit):
+    client.get("/api/capacity/current-week")  # Builds the week on first read
+
+    with assert_max_queries(limit):
+        response = client.get(path)
+
+    assert response.status_code == 200
+
+
+def test_team_member_capacity_is_one_read(client, db):
+    client.get("/api/capacity/current-week")
+    member_id = db.tables["team_members"][0]["id"]
+
+    with assert_max_queries(2):
+        response = client.get(f"/api/capacity/team-member/{member_id}")
+
+    assert response.status_code == 200
+
+
+# Ten times the members of the small agency, still within one page per table
+WIDE_AGENCY = AgencySize("wide", members=500, projects=200, assignments=900, transcripts=10)
+
+
+@pytest.mark.parametrize("path", CAPACITY_QUERY_LIMITS)
+def test_query_count_does_not_grow_with_team_size(path):
+    counts = []
+    try:
+        for size in ("small", WIDE_AGENCY):
+            make_db(size)
+            with TestClient(app) as client:
+                client.get("/api/capacity/current-week")
+                with capture_queries() as queries:
+                    assert client.get(path).status_code == 200
+            counts.append(len(queries))
+    finally:
+        set_client(None)
+
+    assert counts[0] == counts[1]
+
+
+def test_assert_max_queries_reports_repeated_shapes(db):
+    with pytest.raises(AssertionError) as failure:
+        with assert_max_queries(2):
+            for member in db.tables["team_members"][:3]:
+                get_client().table("assignments").select("id").eq(
+                    "team_member_id", member["id"]
+                ).execute()
+
+    message = str(failure.value)
+    assert "Expected at most 2 queries, got 3" in message
+    assert "3 x select assignments [team_member_id.eq]" in message
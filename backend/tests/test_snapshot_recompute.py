@@ -0,0 +1,67 @@
+"""
+Snapshot recompute jobs: claiming across workers and heartbeats.
+"""
+
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from app.services import snapshot_recompute as recompute
+from app.services.snapshot_recompute import RecomputeConflictError, SnapshotRecomputer
+
+
+@pytest.fixture
+def job(db):
+    today = date.today()
+    return SnapshotRecomputer(workers=2).create_job(
+        today - timedelta(weeks=10), today - timedelta(weeks=8)
+    )
+
+
+def test_only_one_worker_claims_a_job(db, job):
+    first, second = SnapshotRecomputer(workers=1), SnapshotRecomputer(workers=1)
+
+    assert first._claim(db, job)["status"] == "running"
+    with pytest.raises(RecomputeConflictError):
+        second._claim(db, job)
+
+
+def test_a_job_with_a_stale_heartbeat_can_be_taken_over(db, job):
+    SnapshotRecomputer(workers=1)._claim(db, job)
+    stale = recompute._now(-recompute.JOB_STALE_SECONDS - 60)
+    db.table(recompute.JOBS_TABLE).update({"updated_at": stale}).eq("id", job["id"]).execute()
+
+    claimed = SnapshotRecomputer(workers=1)._claim(db, job)
+
+    assert claimed["updated_at"] > stale
+
+
+def test_cli_run_refuses_a_job_running_elsewhere(db, job):
+    SnapshotRecomputer(workers=1)._claim(db, job)
+
+    with pytest.raises(RecomputeConflictError):
+        SnapshotRecomputer(workers=1).run(job["id"])
+
+
+def test_heartbeat_is_written_while_the_job_runs(db, job, monkeypatch):
+    monkeypatch.setattr(recompute, "HEARTBEAT_SECONDS", 0.01)
+    allocation_matrix = recompute.allocation_matrix
+
+    def slow_allocation_matrix(*args):
+        time.sleep(0.2)  # A long read phase with no task finishing
+        return allocation_matrix(*args)
+
+    monkeypatch.setattr(recompute, "allocation_matrix", slow_allocation_matrix)
+    runner = SnapshotRecomputer(workers=2)
+    beats = []
+    update_job = runner._update_job
+    runner._update_job = lambda client, job_id, **fields: (
+        beats.append(job_id) if not fields else None,
+        update_job(client, job_id, **fields),
+    )
+
+    result = runner.run(job["id"])
+
+    assert result["status"] == "completed"
+    assert len(beats) >= 5
@@ -0,0 +1,53 @@
+"""
+Timesheet import: row validation and the chunk write.
+"""
+
+import pytest
+
+from app.services.time_entries import RowError, import_time_entries, parse_entry
+from app.telemetry.tracing import capture_queries
+
+
+@pytest.mark.parametrize("column", ["assignment_id", "team_member_id", "project_id"])
+def test_malformed_ids_are_row_errors(column):
+    row = {"date": "2026-10-12", "hours": "2", column: "not-a-uuid", "project": "X", "person": "Y"}
+    with pytest.raises(RowError, match=f"Invalid {column}: not-a-uuid"):
+        parse_entry(2, row)
+
+
+def test_import_skips_malformed_ids_and_writes_the_rest(client, db):
+    assignment = db.tables["assignments"][0]
+    project = db.get_by_id("projects", assignment["project_id"])
+    assignment_before = float(assignment.get("hours_consumed") or 0)
+    project_before = float(project.get("hours_consumed") or 0)
+    body = "\n".join(
+        [
+            "date,hours,assignment_id,team_member_id,project_id",
+            f"2026-10-12,3.5,{assignment['id']},,",
+            "2026-10-12,2,,123,456",
+            f"2026-10-13,1.5,{assignment['id'].upper()},,",
+        ]
+    )
+
+    response = client.post(
+        "/api/time-entries/import", content=body, headers={"content-type": "text/csv"}
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["inserted"], result["skipped"]) == (2, 1)
+    assert result["errors"] == [{"line": 3, "error": "Invalid team_member_id: 123"}]
+    assert len(db.tables["time_entries"]) == 2
+    assert assignment["hours_consumed"] == pytest.approx(assignment_before + 5)
+    assert project["hours_consumed"] == pytest.approx(project_before + 5)
+
+
+def test_each_chunk_is_written_in_one_call(db):
+    assignment = db.tables["assignments"][0]
+    lines = ["date,hours,assignment_id", f"2026-10-12,1,{assignment['id']}"]
+
+    with capture_queries() as queries:
+        import_time_entries(lines)
+
+    writes = [q for q in queries if q.operation != "select"]
+    assert [(q.table, q.operation) for q in writes] == [("rpc:import_time_entry_chunk", "rpc")]
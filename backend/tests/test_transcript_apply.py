@@ -0,0 +1,95 @@
+"""
+Transcript apply plans: name matching, booked hours and low-confidence assignments.
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from app.models.schemas import ApprovedAssignment, TranscriptExtractionSchema
+from app.services.transcript_apply import build_plan, match_name
+
+MEMBERS = [
+    {"id": "m-jess", "full_name": "Jess Nguyen", "role": "producer"},
+    {"id": "m-sam", "full_name": "Sam Ortiz", "role": "editor"},
+    {"id": "m-ravi", "full_name": "Ravi Shah", "role": "creative"},
+]
+PROJECTS = [{"id": "p-legos", "name": "Legos"}]
+
+
+def _extraction(*assignments: tuple[str, str | None, float]) -> TranscriptExtractionSchema:
+    return TranscriptExtractionSchema(
+        assignments=[
+            {
+                "person_name": person,
+                "project_name": "Legos",
+                "assignment_type": "explicit",
+                "workload_signal": signal,
+                "context": f"{person} is on Legos",
+                "confidence": confidence,
+            }
+            for person, signal, confidence in assignments
+        ]
+    )
+
+
+def _hours(plan) -> dict[str, float]:
+    return {a["team_member_id"]: a["hours_this_week"] for a in plan.assignments}
+
+
+def test_hours_come_from_the_workload_signal_or_are_zero():
+    extracted = _extraction(("Jess", "heavy", 0.9), ("Sam", None, 0.9))
+
+    plan = build_plan(extracted, MEMBERS, PROJECTS)
+
+    assert _hours(plan) == {"m-jess": 16.0, "m-sam": 0.0}
+
+
+def test_low_confidence_assignments_are_skipped_unless_selected():
+    extracted = _extraction(("Jess", "light", 0.9), ("Sam", "medium", 0.3))
+
+    plan = build_plan(extracted, MEMBERS, PROJECTS, min_confidence=0.6)
+
+    assert _hours(plan) == {"m-jess": 4.0}
+    assert [(s.person_name, s.project_name) for s in plan.skipped_assignments] == [
+        ("Sam", "Legos")
+    ]
+
+    selected = [
+        ApprovedAssignment(person_name="Sam", project_name="Legos"),
+        ApprovedAssignment(person_name="Ravi", project_name="Legos", hours_this_week=Decimal(6)),
+    ]
+    plan = build_plan(extracted, MEMBERS, PROJECTS, selected, min_confidence=0.6)
+
+    assert _hours(plan) == {"m-sam": 8.0, "m-ravi": 6.0}
+    assert plan.skipped_assignments == []
+
+
+@pytest.mark.parametrize(
+    "spoken, expected",
+    [
+        ("Sarah", "m-sarah"),
+        ("sarah  smith", "m-sarah"),
+        ("Sarah Jones", None),
+        ("Tom from the client side", None),
+    ],
+)
+def test_first_names_only_match_when_spoken_alone(spoken, expected):
+    members = [
+        {"id": "m-sarah", "full_name": "Sarah Smith"},
+        {"id": "m-tom", "full_name": "Tom Lee"},
+    ]
+
+    match = match_name(spoken, members, "full_name")
+
+    assert (match["id"] if match else match) == expected
+
+
+def test_unmatched_full_names_are_left_unresolved():
+    extracted = _extraction(("Jess Jones", "heavy", 0.9), ("Tom from the client side", None, 0.9))
+    members = MEMBERS + [{"id": "m-tom", "full_name": "Tom Lee", "role": "producer"}]
+
+    plan = build_plan(extracted, members, PROJECTS)
+
+    assert plan.assignments == []
+    assert plan.unresolved_people == ["Jess Jones", "Tom from the client side"]
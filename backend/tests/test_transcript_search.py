@@ -0,0 +1,99 @@
+"""
+Transcript search index: keeping up with writes made outside the backend.
+
+The web app uploads and deletes transcripts straight in Supabase, so the
+index only learns about them from its periodic reconcile.
+"""
+
+import threading
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.services import transcript_search
+from app.services.invalidation import TRANSCRIPTS, Invalidation
+from app.services.transcript_search import TranscriptSearchIndex
+from app.telemetry.tracing import capture_queries
+
+
+def _transcript(text: str) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "meeting_date": "2026-10-12",
+        "meeting_type": "wip",
+        "raw_text": text,
+        "extracted_data": {"projects": [], "assignments": []},
+        "processed_at": "2026-10-12T09:00:00+00:00",
+    }
+
+
+def _hit_ids(index: TranscriptSearchIndex, query: str) -> set[str]:
+    return {hit.transcript_id for hit in index.search(query).hits}
+
+
+@pytest.fixture
+def index(db, tmp_path):
+    index = TranscriptSearchIndex(tmp_path)
+    index.sync()
+    return index
+
+
+def test_direct_uploads_and_deletes_are_picked_up_on_reconcile(db, index, monkeypatch):
+    uploaded = _transcript("Quokka rebrand kickoff")
+    db.table("transcripts").insert(uploaded).execute()
+    deleted = db.tables["transcripts"][0]
+    db.table("transcripts").delete().eq("id", deleted["id"]).execute()
+
+    # Within the interval the index is read as it is
+    assert _hit_ids(index, "quokka") == set()
+
+    monkeypatch.setattr(transcript_search, "RECONCILE_SECONDS", 0)
+    assert _hit_ids(index, "quokka") == {uploaded["id"]}
+    assert deleted["id"] not in _hit_ids(index, "wip meeting")
+
+
+def test_saved_index_is_loaded_after_an_early_add(db, index, tmp_path):
+    index.save()
+    uploaded = _transcript("Quokka rebrand kickoff")
+    db.table("transcripts").insert(uploaded).execute()
+
+    restarted = TranscriptSearchIndex(tmp_path)
+    restarted.add([uploaded])
+    with capture_queries() as queries:
+        hits = _hit_ids(restarted, "quokka wip meeting")
+
+    assert restarted.size == len(db.tables["transcripts"])
+    assert uploaded["id"] in hits
+    # Only the id, processed_at listing; no raw_text re-fetch
+    assert [q.table for q in queries] == ["transcripts"]
+
+
+async def test_invalidations_are_indexed_off_the_event_loop(db, index):
+    changed = db.tables["transcripts"][0]
+    db.table("transcripts").update(
+        {"raw_text": "Quokka rebrand kickoff", "processed_at": "2026-10-13T09:00:00+00:00"}
+    ).eq("id", changed["id"]).execute()
+    threads = []
+    refresh = index.refresh
+    index.refresh = lambda ids: threads.append(threading.get_ident()) or refresh(ids)
+
+    await index.handle_invalidation(Invalidation(TRANSCRIPTS, (changed["id"],), local=False))
+
+    assert threads and threads[0] != threading.get_ident()
+    assert _hit_ids(index, "quokka") == {changed["id"]}
+
+
+def test_startup_warms_the_index_in_the_background(db, tmp_path, monkeypatch):
+    warmed = TranscriptSearchIndex(tmp_path)
+    monkeypatch.setattr(main, "transcript_index", warmed)
+    monkeypatch.setattr(main.settings, "prewarm_on_startup", True)
+
+    with TestClient(main.app):
+        deadline = time.monotonic() + 5
+        while warmed.size < len(db.tables["transcripts"]) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert warmed.size == len(db.tables["transcripts"])
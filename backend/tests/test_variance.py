@@ -0,0 +1,50 @@
+"""
+Plan-vs-actual variance: member-weeks with nothing logged.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from app.services.variance import VarianceWindow, aggregate_actuals, build_variance
+
+WINDOW = VarianceWindow(date(2026, 9, 21), weeks=2)
+
+
+def test_planned_member_who_logged_nothing_shows_the_gap():
+    assignments = [
+        {"id": "a-1", "team_member_id": "m-jess", "project_id": "p-1", "hours_this_week": 10},
+        {"id": "a-2", "team_member_id": "m-sam", "project_id": "p-1", "hours_this_week": 5},
+    ]
+    entries = [
+        {
+            "assignment_id": "a-2",
+            "team_member_id": "m-sam",
+            "project_id": "p-1",
+            "date": "2026-09-22",
+            "hours": 5,
+        }
+    ]
+    actuals = aggregate_actuals(entries, WINDOW)
+
+    result = build_variance(
+        assignments,
+        [{"id": "p-1", "name": "Legos"}],
+        {"m-jess": "Jess", "m-sam": "Sam"},
+        actuals,
+        date(2026, 10, 5),
+    )
+
+    rows = {(r.team_member_id, r.week_start): r for r in result.member_weeks}
+    assert set(rows) == {
+        ("m-jess", date(2026, 9, 21)),
+        ("m-jess", date(2026, 9, 28)),
+        ("m-sam", date(2026, 9, 21)),
+        ("m-sam", date(2026, 9, 28)),
+    }
+    jess = rows[("m-jess", date(2026, 9, 28))]
+    assert (jess.planned_hours, jess.actual_hours, jess.variance_hours) == (
+        Decimal("10.0"),
+        Decimal("0.0"),
+        Decimal("-10.0"),
+    )
+    assert rows[("m-sam", date(2026, 9, 21))].variance_hours == 0
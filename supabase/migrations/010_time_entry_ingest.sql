@@ -0,0 +1,38 @@
+-- ============================================================================
+-- Alt/Shift Traffic Manager - Time Entry Ingest
+-- Migration: 010_time_entry_ingest.sql
+-- ============================================================================
+
+-- Apply hours_consumed deltas for a batch of imported time entries.
+-- Called once per inserted chunk, so running totals move by the chunk's hours
+-- instead of being re-summed from all time_entries.
+--
+-- p_assignment_deltas / p_project_deltas: [{"id": "<uuid>", "hours": 7.5}, ...]
+CREATE OR REPLACE FUNCTION apply_hours_consumed_deltas(
+  p_assignment_deltas JSONB DEFAULT '[]'::JSONB,
+  p_project_deltas JSONB DEFAULT '[]'::JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_assignments INTEGER;
+  v_projects INTEGER;
+BEGIN
+  UPDATE assignments a
+  SET hours_consumed = COALESCE(a.hours_consumed, 0) + d.hours
+  FROM jsonb_to_recordset(p_assignment_deltas) AS d(id UUID, hours DECIMAL)
+  WHERE a.id = d.id;
+  GET DIAGNOSTICS v_assignments = ROW_COUNT;
+
+  UPDATE projects p
+  SET hours_consumed = COALESCE(p.hours_consumed, 0) + d.hours
+  FROM jsonb_to_recordset(p_project_deltas) AS d(id UUID, hours DECIMAL)
+  WHERE p.id = d.id;
+  GET DIAGNOSTICS v_projects = ROW_COUNT;
+
+  RETURN jsonb_build_object('assignments', v_assignments, 'projects', v_projects);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Lookups used when resolving timesheet rows
+CREATE INDEX IF NOT EXISTS idx_time_entries_assignment ON time_entries(assignment_id);
+CREATE INDEX IF NOT EXISTS idx_projects_name ON projects(name);
@@ -0,0 +1,54 @@
+-- ============================================================================
+-- Alt/Shift Traffic Manager - Member-Week Capacity Read Model
+-- Migration: 011_member_week_capacity.sql
+-- ============================================================================
+
+-- Denormalized capacity per member per week, maintained by the backend from
+-- assignment mutation events. Capacity reads come from here instead of
+-- re-aggregating assignments. Rebuild with `python -m app.cli rebuild-read-model`.
+CREATE TABLE IF NOT EXISTS member_week_capacity (
+  team_member_id UUID NOT NULL REFERENCES team_members(id) ON DELETE CASCADE,
+  week_start_date DATE NOT NULL, -- Monday of the week
+
+  -- Member details at projection time
+  full_name TEXT NOT NULL,
+  role TEXT,
+
+  -- Allocation
+  total_capacity_hours DECIMAL(5,2) NOT NULL,
+  allocated_hours DECIMAL(6,2) NOT NULL DEFAULT 0,
+  -- [{assignment_id, project_id, name, priority, deadline, hours, start_date}]
+  projects JSONB NOT NULL DEFAULT '[]'::JSONB,
+  urgent_count INTEGER NOT NULL DEFAULT 0,
+
+  -- Conflict flags and the conflicts they produce
+  overallocated BOOLEAN NOT NULL DEFAULT FALSE,
+  urgent_conflict BOOLEAN NOT NULL DEFAULT FALSE,
+  conflicts JSONB NOT NULL DEFAULT '[]'::JSONB,
+
+  snapshot_id UUID REFERENCES capacity_snapshots(id) ON DELETE SET NULL,
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+
+  PRIMARY KEY (team_member_id, week_start_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_member_week_capacity_week
+  ON member_week_capacity(week_start_date);
+
+ALTER TABLE member_week_capacity ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Authenticated users can view member week capacity"
+ON member_week_capacity FOR SELECT
+USING (auth.uid() IS NOT NULL);
+
+CREATE POLICY "Managers can insert member week capacity"
+ON member_week_capacity FOR INSERT
+WITH CHECK (can_edit(auth.uid()));
+
+CREATE POLICY "Managers can update member week capacity"
+ON member_week_capacity FOR UPDATE
+USING (can_edit(auth.uid()));
+
+CREATE POLICY "Managers can delete member week capacity"
+ON member_week_capacity FOR DELETE
+USING (can_edit(auth.uid()));
@@ -0,0 +1,68 @@
+-- ============================================================================
+-- Alt/Shift Traffic Manager - Capacity Snapshot Recompute Jobs
+-- Migration: 012_capacity_recompute_jobs.sql
+-- ============================================================================
+
+-- Background rebuilds of capacity_snapshots over a range of past weeks,
+-- started with POST /api/capacity/recompute. Progress is stored here so any
+-- worker can report it, and so an interrupted job resumes where it stopped.
+CREATE TABLE IF NOT EXISTS capacity_recompute_jobs (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  week_from DATE NOT NULL, -- Monday of the first week
+  week_to DATE NOT NULL, -- Monday of the last week
+  status TEXT NOT NULL DEFAULT 'pending'
+    CHECK (status IN ('pending', 'running', 'interrupted', 'completed', 'failed')),
+
+  -- Progress
+  total_weeks INTEGER NOT NULL,
+  completed_weeks INTEGER NOT NULL DEFAULT 0,
+  snapshots_written INTEGER NOT NULL DEFAULT 0,
+  error TEXT,
+
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  started_at TIMESTAMPTZ,
+  finished_at TIMESTAMPTZ,
+  updated_at TIMESTAMPTZ DEFAULT NOW(), -- Heartbeat while running
+
+  CHECK (week_from <= week_to)
+);
+
+-- Weeks a job has finished writing; a resumed job skips them
+CREATE TABLE IF NOT EXISTS capacity_recompute_job_weeks (
+  job_id UUID NOT NULL REFERENCES capacity_recompute_jobs(id) ON DELETE CASCADE,
+  week_start_date DATE NOT NULL,
+  snapshots INTEGER NOT NULL DEFAULT 0,
+  completed_at TIMESTAMPTZ DEFAULT NOW(),
+
+  PRIMARY KEY (job_id, week_start_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_capacity_recompute_jobs_created
+  ON capacity_recompute_jobs(created_at DESC);
+
+ALTER TABLE capacity_recompute_jobs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE capacity_recompute_job_weeks ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Authenticated users can view recompute jobs"
+ON capacity_recompute_jobs FOR SELECT
+USING (auth.uid() IS NOT NULL);
+
+CREATE POLICY "Managers can insert recompute jobs"
+ON capacity_recompute_jobs FOR INSERT
+WITH CHECK (can_edit(auth.uid()));
+
+CREATE POLICY "Managers can update recompute jobs"
+ON capacity_recompute_jobs FOR UPDATE
+USING (can_edit(auth.uid()));
+
+CREATE POLICY "Authenticated users can view recompute job weeks"
+ON capacity_recompute_job_weeks FOR SELECT
+USING (auth.uid() IS NOT NULL);
+
+CREATE POLICY "Managers can insert recompute job weeks"
+ON capacity_recompute_job_weeks FOR INSERT
+WITH CHECK (can_edit(auth.uid()));
+
+CREATE POLICY "Managers can update recompute job weeks"
+ON capacity_recompute_job_weeks FOR UPDATE
+USING (can_edit(auth.uid()));
@@ -0,0 +1,175 @@
+-- ============================================================================
+-- Alt/Shift Traffic Manager - Transcript Apply
+-- Migration: 013_transcript_apply.sql
+-- ============================================================================
+
+-- One row per applied extraction. The key covers the transcript, the
+-- extraction it was processed into and the approved selection, so a retried
+-- approval replays the stored result instead of applying twice.
+CREATE TABLE IF NOT EXISTS transcript_applications (
+  apply_key TEXT PRIMARY KEY,
+  transcript_id UUID NOT NULL REFERENCES transcripts(id) ON DELETE CASCADE,
+  result JSONB NOT NULL,
+  applied_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_transcript_applications_transcript
+  ON transcript_applications(transcript_id);
+
+ALTER TABLE transcript_applications ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Authenticated users can view transcript applications"
+ON transcript_applications FOR SELECT
+USING (auth.uid() IS NOT NULL);
+
+CREATE POLICY "Managers can insert transcript applications"
+ON transcript_applications FOR INSERT
+WITH CHECK (can_edit(auth.uid()));
+
+-- Apply an approved transcript's resolved extraction in one transaction:
+-- create or update projects, insert assignments, recompute the affected
+-- members' capacity snapshots for the week and mark the transcript approved.
+-- Existing (project, member) assignments are left as they are.
+--
+-- p_projects: [{"id": "<uuid>" | null, "name": "...", "client": "...",
+--               "status": "active", "next_milestone": "...",
+--               "next_milestone_date": "2026-11-02"}, ...]
+--             Projects without an id are matched by name or created.
+-- p_assignments: [{"project_id": "<uuid>" | null, "project_name": "...",
+--                  "team_member_id": "<uuid>", "role_on_project": "...",
+--                  "hours_this_week": 8, "estimated_hours": 8,
+--                  "confidence_score": 0.9, "notes": "..."}, ...]
+--                Assignments without a project_id use the project of that
+--                name from p_projects.
+CREATE OR REPLACE FUNCTION apply_transcript_extraction(
+  p_transcript_id UUID,
+  p_apply_key TEXT,
+  p_projects JSONB DEFAULT '[]'::JSONB,
+  p_assignments JSONB DEFAULT '[]'::JSONB,
+  p_week_start DATE DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_result JSONB;
+  v_project JSONB;
+  v_project_id UUID;
+  v_project_ids JSONB := '{}'::JSONB; -- lower(name) -> id
+  v_projects_created INTEGER := 0;
+  v_projects_updated INTEGER := 0;
+  v_requested INTEGER;
+  v_assignment_ids UUID[];
+  v_member_ids UUID[];
+BEGIN
+  -- Serialize applies of the same transcript
+  PERFORM 1 FROM transcripts WHERE id = p_transcript_id FOR UPDATE;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Transcript not found: %', p_transcript_id USING ERRCODE = 'P0002';
+  END IF;
+
+  SELECT result INTO v_result FROM transcript_applications WHERE apply_key = p_apply_key;
+  IF FOUND THEN
+    RETURN v_result || jsonb_build_object('replayed', true);
+  END IF;
+
+  FOR v_project IN SELECT * FROM jsonb_array_elements(p_projects) LOOP
+    v_project_id := NULLIF(v_project->>'id', '')::UUID;
+    IF v_project_id IS NULL THEN
+      SELECT id INTO v_project_id
+      FROM projects
+      WHERE lower(name) = lower(v_project->>'name')
+      ORDER BY created_at
+      LIMIT 1;
+    END IF;
+
+    IF v_project_id IS NULL THEN
+      INSERT INTO projects (name, client, status, next_milestone, next_milestone_date)
+      VALUES (
+        v_project->>'name',
+        v_project->>'client',
+        COALESCE(v_project->>'status', 'active'),
+        v_project->>'next_milestone',
+        (v_project->>'next_milestone_date')::DATE
+      )
+      RETURNING id INTO v_project_id;
+      v_projects_created := v_projects_created + 1;
+    ELSE
+      UPDATE projects
+      SET client = COALESCE(client, v_project->>'client'),
+          next_milestone = COALESCE(v_project->>'next_milestone', next_milestone),
+          next_milestone_date = COALESCE((v_project->>'next_milestone_date')::DATE, next_milestone_date),
+          updated_at = NOW()
+      WHERE id = v_project_id;
+      v_projects_updated := v_projects_updated + 1;
+    END IF;
+
+    v_project_ids := v_project_ids || jsonb_build_object(lower(v_project->>'name'), v_project_id);
+  END LOOP;
+
+  WITH requested AS (
+    SELECT
+      COALESCE(
+        NULLIF(a->>'project_id', '')::UUID,
+        (v_project_ids->>lower(a->>'project_name'))::UUID
+      ) AS project_id,
+      (a->>'team_member_id')::UUID AS team_member_id,
+      a->>'role_on_project' AS role_on_project,
+      (a->>'estimated_hours')::DECIMAL AS estimated_hours,
+      (a->>'hours_this_week')::DECIMAL AS hours_this_week,
+      (a->>'confidence_score')::DECIMAL AS confidence_score,
+      a->>'notes' AS notes
+    FROM jsonb_array_elements(p_assignments) AS a
+  ),
+  inserted AS (
+    INSERT INTO assignments (
+      project_id, team_member_id, role_on_project, estimated_hours,
+      hours_this_week, confidence_score, notes, assigned_by, status
+    )
+    SELECT
+      project_id, team_member_id, role_on_project, estimated_hours,
+      hours_this_week, confidence_score, notes, 'ai', 'active'
+    FROM requested
+    WHERE project_id IS NOT NULL
+    ON CONFLICT (project_id, team_member_id) DO NOTHING
+    RETURNING id, team_member_id
+  )
+  SELECT
+    (SELECT COUNT(*) FROM requested WHERE project_id IS NOT NULL),
+    COALESCE(array_agg(id), '{}'),
+    COALESCE(array_agg(DISTINCT team_member_id), '{}')
+  INTO v_requested, v_assignment_ids, v_member_ids
+  FROM inserted;
+
+  IF p_week_start IS NOT NULL AND cardinality(v_member_ids) > 0 THEN
+    INSERT INTO capacity_snapshots (
+      team_member_id, week_start_date, total_capacity_hours, allocated_hours
+    )
+    SELECT
+      tm.id,
+      p_week_start,
+      COALESCE(tm.weekly_capacity_hours, 40),
+      COALESCE(SUM(a.hours_this_week), 0)
+    FROM team_members tm
+    LEFT JOIN assignments a ON a.team_member_id = tm.id AND a.status = 'active'
+    WHERE tm.id = ANY(v_member_ids)
+    GROUP BY tm.id, tm.weekly_capacity_hours
+    ON CONFLICT (team_member_id, week_start_date) DO UPDATE
+    SET total_capacity_hours = EXCLUDED.total_capacity_hours,
+        allocated_hours = EXCLUDED.allocated_hours;
+  END IF;
+
+  UPDATE transcripts SET approved = TRUE, approved_at = NOW() WHERE id = p_transcript_id;
+
+  v_result := jsonb_build_object(
+    'projects_created', v_projects_created,
+    'projects_updated', v_projects_updated,
+    'assignments_created', cardinality(v_assignment_ids),
+    'assignments_existing', v_requested - cardinality(v_assignment_ids),
+    'assignment_ids', to_jsonb(v_assignment_ids),
+    'team_member_ids', to_jsonb(v_member_ids)
+  );
+  INSERT INTO transcript_applications (apply_key, transcript_id, result)
+  VALUES (p_apply_key, p_transcript_id, v_result);
+
+  RETURN v_result || jsonb_build_object('replayed', false);
+END;
+$$ LANGUAGE plpgsql;
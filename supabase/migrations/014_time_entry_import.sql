@@ -0,0 +1,60 @@
+-- ============================================================================
+-- Alt/Shift Traffic Manager - Time Entry Import
+-- Migration: 014_time_entry_import.sql
+-- ============================================================================
+
+-- Insert a chunk of imported time entries and move hours_consumed on their
+-- assignments and projects by the chunk's hours, in one transaction. A chunk
+-- that fails leaves neither the entries nor the totals behind.
+--
+-- p_entries: [{"assignment_id": "<uuid>", "team_member_id": "<uuid>",
+--              "project_id": "<uuid>", "date": "2026-10-12", "hours": 7.5,
+--              "description": "...", "billable": true}, ...]
+CREATE OR REPLACE FUNCTION import_time_entry_chunk(p_entries JSONB)
+RETURNS JSONB AS $$
+DECLARE
+  v_inserted INTEGER;
+  v_assignments INTEGER;
+  v_projects INTEGER;
+BEGIN
+  CREATE TEMP TABLE _imported ON COMMIT DROP AS
+  SELECT *
+  FROM jsonb_to_recordset(p_entries) AS e(
+    assignment_id UUID,
+    team_member_id UUID,
+    project_id UUID,
+    date DATE,
+    hours DECIMAL(4,2),
+    description TEXT,
+    billable BOOLEAN
+  );
+
+  INSERT INTO time_entries (
+    assignment_id, team_member_id, project_id, date, hours, description, billable
+  )
+  SELECT assignment_id, team_member_id, project_id, date, hours, description,
+         COALESCE(billable, true)
+  FROM _imported;
+  GET DIAGNOSTICS v_inserted = ROW_COUNT;
+
+  UPDATE assignments a
+  SET hours_consumed = COALESCE(a.hours_consumed, 0) + d.hours
+  FROM (SELECT assignment_id, SUM(hours) AS hours FROM _imported GROUP BY assignment_id) d
+  WHERE a.id = d.assignment_id;
+  GET DIAGNOSTICS v_assignments = ROW_COUNT;
+
+  UPDATE projects p
+  SET hours_consumed = COALESCE(p.hours_consumed, 0) + d.hours
+  FROM (SELECT project_id, SUM(hours) AS hours FROM _imported GROUP BY project_id) d
+  WHERE p.id = d.project_id;
+  GET DIAGNOSTICS v_projects = ROW_COUNT;
+
+  DROP TABLE _imported;
+
+  RETURN jsonb_build_object(
+    'inserted', v_inserted,
+    'assignments', v_assignments,
+    'projects', v_projects
+  );
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,94 @@
+-- ============================================================================
+-- Alt/Shift Traffic Manager - Member-Week Change Marks
+-- Migration: 015_member_week_dirty.sql
+-- ============================================================================
+
+-- Members whose member_week_capacity rows may be out of date. The backend
+-- re-projects its read model from its own assignment events, but the web app
+-- writes assignments, projects and team members straight to the database.
+-- These triggers mark every member such a write affects; the backend claims
+-- the marks and re-projects those members on its next capacity read.
+CREATE TABLE IF NOT EXISTS member_week_dirty (
+  team_member_id UUID PRIMARY KEY REFERENCES team_members(id) ON DELETE CASCADE,
+  marked_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE member_week_dirty ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Managers can view member week marks"
+ON member_week_dirty FOR SELECT
+USING (can_edit(auth.uid()));
+
+CREATE POLICY "Managers can delete member week marks"
+ON member_week_dirty FOR DELETE
+USING (can_edit(auth.uid()));
+
+-- Runs as the owner: web app users may mark members but not insert marks
+-- directly. Members that no longer exist (cascaded deletes) are skipped.
+CREATE OR REPLACE FUNCTION mark_member_weeks_dirty(p_team_member_ids UUID[])
+RETURNS VOID AS $$
+BEGIN
+  INSERT INTO member_week_dirty (team_member_id)
+  SELECT DISTINCT tm.id
+  FROM unnest(p_team_member_ids) AS marked(member_id)
+  JOIN team_members tm ON tm.id = marked.member_id
+  ON CONFLICT (team_member_id) DO UPDATE SET marked_at = NOW();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Assignment rows: the member before and after the change
+CREATE OR REPLACE FUNCTION trigger_mark_assignment_members()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM mark_member_weeks_dirty(ARRAY[NEW.team_member_id]);
+    RETURN NEW;
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM mark_member_weeks_dirty(ARRAY[OLD.team_member_id]);
+    RETURN OLD;
+  END IF;
+  PERFORM mark_member_weeks_dirty(ARRAY[OLD.team_member_id, NEW.team_member_id]);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Projects: everyone with an active assignment on the project
+CREATE OR REPLACE FUNCTION trigger_mark_project_members()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM mark_member_weeks_dirty(ARRAY(
+    SELECT team_member_id FROM assignments
+    WHERE project_id = NEW.id AND status = 'active'
+  ));
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Team members: the member themselves
+CREATE OR REPLACE FUNCTION trigger_mark_team_member()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM mark_member_weeks_dirty(ARRAY[NEW.id]);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the columns the read model projects; hours_consumed updates from
+-- time entry imports do not mark anyone
+DROP TRIGGER IF EXISTS mark_member_weeks_on_assignment ON assignments;
+CREATE TRIGGER mark_member_weeks_on_assignment
+  AFTER INSERT OR DELETE OR UPDATE OF
+    team_member_id, project_id, hours_this_week, status, start_date
+  ON assignments
+  FOR EACH ROW EXECUTE FUNCTION trigger_mark_assignment_members();
+
+DROP TRIGGER IF EXISTS mark_member_weeks_on_project ON projects;
+CREATE TRIGGER mark_member_weeks_on_project
+  AFTER UPDATE OF name, priority, deadline ON projects
+  FOR EACH ROW EXECUTE FUNCTION trigger_mark_project_members();
+
+DROP TRIGGER IF EXISTS mark_member_weeks_on_team_member ON team_members;
+CREATE TRIGGER mark_member_weeks_on_team_member
+  AFTER INSERT OR UPDATE OF full_name, role, weekly_capacity_hours, active
+  ON team_members
+  FOR EACH ROW EXECUTE FUNCTION trigger_mark_team_member();
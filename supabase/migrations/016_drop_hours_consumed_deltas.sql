@@ -0,0 +1,9 @@
+-- ============================================================================
+-- Alt/Shift Traffic Manager - Drop Hours Consumed Deltas
+-- Migration: 016_drop_hours_consumed_deltas.sql
+-- ============================================================================
+
+-- Time entry imports write each chunk with import_time_entry_chunk
+-- (migration 014), which updates hours_consumed in the same transaction as
+-- the inserts. Nothing calls the delta function from migration 010 any more.
+DROP FUNCTION IF EXISTS apply_hours_consumed_deltas(JSONB, JSONB);